@@ -2,8 +2,28 @@
 Arch CLI - Ferramenta para gerenciamento de times de Arquitetura, SRE e DevOps com foco em AWS
 """
 
-from .utils import detect_os, log, run_command, setup_config_dir
-from .dependencies import check_dependencies
-from .finops import finops_menu
+import importlib
 
 __version__ = "3.0.0"
+
+# Reexportações carregadas sob demanda: importar o pacote (e o CLI) não importa rich, boto3 ou o finops
+_EXPORTS = {
+    "detect_os": "utils",
+    "log": "utils",
+    "run_command": "utils",
+    "setup_config_dir": "utils",
+    "check_dependencies": "dependencies",
+    "finops_menu": "finops",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
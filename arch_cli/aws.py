@@ -0,0 +1,62 @@
+"""
+Sessões e clientes boto3 compartilhados pelos módulos Python do Arch CLI
+"""
+
+import os
+import threading
+import boto3
+from botocore.config import Config
+
+# Configuração padrão dos clientes: retries adaptativos para lidar com throttling
+# e pool de conexões suficiente para os coletores concorrentes
+BOTO_CONFIG = Config(
+    retries={"max_attempts": 10, "mode": "adaptive"},
+    max_pool_connections=32,
+    connect_timeout=10,
+    read_timeout=60,
+)
+
+_sessions = {}
+_clients = {}
+# boto3.Session não é thread-safe; clientes já criados podem ser compartilhados
+_lock = threading.RLock()
+
+def _reset_after_fork():
+    """Descarta sessões herdadas do processo pai (pools de conexão não sobrevivem ao fork)"""
+    global _lock
+    _lock = threading.RLock()
+    _sessions.clear()
+    _clients.clear()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_session(profile=None):
+    """Retorna a sessão boto3 do perfil, criando-a uma única vez por processo"""
+    with _lock:
+        if profile not in _sessions:
+            _sessions[profile] = boto3.session.Session(profile_name=profile)
+        return _sessions[profile]
+
+def get_client(service, profile=None, region=None):
+    """Retorna um cliente boto3 reutilizável para (perfil, serviço, região)"""
+    key = (profile, service, region)
+    with _lock:
+        if key not in _clients:
+            session = get_session(profile)
+            _clients[key] = session.client(service, region_name=region, config=BOTO_CONFIG)
+        return _clients[key]
+
+def paginate(client, operation, **kwargs):
+    """Itera sobre todas as páginas de uma operação, com ou sem paginator"""
+    if client.can_paginate(operation):
+        for page in client.get_paginator(operation).paginate(**kwargs):
+            yield page
+    else:
+        yield getattr(client, operation)(**kwargs)
+
+def get_enabled_regions(profile=None):
+    """Lista as regiões habilitadas na conta do perfil"""
+    client = get_client("ec2", profile, "us-east-1")
+    response = client.describe_regions(AllRegions=False)
+    return sorted(region["RegionName"] for region in response["Regions"])
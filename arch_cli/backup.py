@@ -0,0 +1,390 @@
+"""
+Orquestrador de backups (snapshots EBS e RDS e backups do DynamoDB) em paralelo, com limite de taxa,
+espera por waiters e diário local para retomar execuções interrompidas
+"""
+
+import os
+import re
+import json
+import time
+import random
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.exceptions import BotoCoreError, ClientError, WaiterError
+from botocore.waiter import WaiterModel, create_waiter_with_client
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .utils import CONFIG_DIR, log
+
+console = Console()
+
+JOURNAL_DIR = os.path.join(CONFIG_DIR, "backups")
+SERVICES = ["ebs", "rds", "dynamodb"]
+MAX_WORKERS = 16
+# Chamadas de criação por segundo, por serviço (EC2, RDS e DynamoDB têm limites independentes)
+DEFAULT_RATE = 5.0
+DEFAULT_TIMEOUT = 120
+CREATE_RETRIES = 5
+WAIT_DELAY = 15
+# Backups acompanhados por chamada de descrição (e, portanto, por waiter)
+WAIT_BATCH = {"ebs": 100, "rds": 50, "rds-cluster": 50, "dynamodb": 1}
+RUN_TAG = "arch-cli:run-id"
+THROTTLING_CODES = {"Throttling", "ThrottlingException", "RequestLimitExceeded", "LimitExceededException",
+                    "SnapshotCreationPerVolumeRateExceeded"}
+ALREADY_EXISTS = {"DBSnapshotAlreadyExists", "DBClusterSnapshotAlreadyExistsFault"}
+KIND_LABELS = {"ebs": "Volumes EBS", "rds": "Instâncias RDS", "rds-cluster": "Clusters RDS", "dynamodb": "Tabelas DynamoDB"}
+KIND_CLIENTS = {"ebs": "ec2", "rds": "rds", "rds-cluster": "rds", "dynamodb": "dynamodb"}
+
+# Waiters próprios: os do botocore falham na primeira resposta NotFound (consistência eventual logo
+# após a criação) e não existe waiter para backups do DynamoDB
+WAITERS = WaiterModel({
+    "version": 2,
+    "waiters": {
+        "ebs": {
+            "operation": "DescribeSnapshots", "delay": WAIT_DELAY, "maxAttempts": 40,
+            "acceptors": [
+                {"matcher": "pathAll", "argument": "Snapshots[].State", "expected": "completed", "state": "success"},
+                {"matcher": "pathAny", "argument": "Snapshots[].State", "expected": "error", "state": "failure"},
+                {"matcher": "error", "expected": "InvalidSnapshot.NotFound", "state": "retry"},
+            ],
+        },
+        "rds": {
+            "operation": "DescribeDBSnapshots", "delay": WAIT_DELAY, "maxAttempts": 40,
+            "acceptors": [
+                {"matcher": "pathAll", "argument": "DBSnapshots[].Status", "expected": "available", "state": "success"},
+                {"matcher": "pathAny", "argument": "DBSnapshots[].Status", "expected": "failed", "state": "failure"},
+            ],
+        },
+        "rds-cluster": {
+            "operation": "DescribeDBClusterSnapshots", "delay": WAIT_DELAY, "maxAttempts": 40,
+            "acceptors": [
+                {"matcher": "pathAll", "argument": "DBClusterSnapshots[].Status", "expected": "available",
+                 "state": "success"},
+                {"matcher": "pathAny", "argument": "DBClusterSnapshots[].Status", "expected": "failed",
+                 "state": "failure"},
+            ],
+        },
+        "dynamodb": {
+            "operation": "DescribeBackup", "delay": 5, "maxAttempts": 40,
+            "acceptors": [
+                {"matcher": "path", "argument": "BackupDescription.BackupDetails.BackupStatus", "expected": "AVAILABLE",
+                 "state": "success"},
+                {"matcher": "path", "argument": "BackupDescription.BackupDetails.BackupStatus", "expected": "DELETED",
+                 "state": "failure"},
+            ],
+        },
+    },
+})
+
+class TokenBucket:
+    """Limita a taxa de chamadas: até `capacity` imediatas e depois `rate` por segundo, entre threads"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class Journal:
+    """Diário somente com acréscimos (JSON Lines) do estado de cada recurso na execução.
+    Cada registro é gravado com fsync; ao abrir, o último registro de cada recurso prevalece."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.resumed = os.path.exists(path)
+        if self.resumed:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Última linha truncada por uma interrupção durante a gravação
+                        continue
+                    self.entries.setdefault(record["key"], {}).update(record)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, key, **fields):
+        with self._lock:
+            entry = self.entries.setdefault(key, {"key": key})
+            entry.update(fields, time=datetime.datetime.now().isoformat(timespec="seconds"))
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+def default_run_id():
+    """Uma execução por dia: rodar de novo no mesmo dia retoma a execução"""
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d")
+
+def journal_path(profile, region, run_id):
+    return os.path.join(JOURNAL_DIR, f"{profile or 'default'}-{region or 'default'}-{run_id}.jsonl")
+
+def _has_tags(tag_list, tags):
+    present = {tag["Key"]: tag["Value"] for tag in tag_list or []}
+    return all(present.get(key) == value for key, value in tags.items())
+
+def discover(profile, region, services, tags=None):
+    """Recursos a copiar de cada serviço ([{kind, id}]); com filtro de tags, apenas EBS e RDS"""
+    tags = tags or {}
+    resources = []
+    if "ebs" in services:
+        filters = [{"Name": f"tag:{key}", "Values": [value]} for key, value in tags.items()]
+        for page in paginate(get_client("ec2", profile, region), "describe_volumes", Filters=filters):
+            resources += [{"kind": "ebs", "id": volume["VolumeId"]} for volume in page.get("Volumes", [])]
+    if "rds" in services:
+        client = get_client("rds", profile, region)
+        for page in paginate(client, "describe_db_clusters"):
+            for cluster in page.get("DBClusters", []):
+                if cluster.get("Status") == "available" and _has_tags(cluster.get("TagList"), tags):
+                    resources.append({"kind": "rds-cluster", "id": cluster["DBClusterIdentifier"]})
+        for page in paginate(client, "describe_db_instances"):
+            for instance in page.get("DBInstances", []):
+                # Instâncias de clusters são copiadas pelo snapshot do cluster
+                if instance.get("DBClusterIdentifier") or instance.get("DBInstanceStatus") != "available":
+                    continue
+                if _has_tags(instance.get("TagList"), tags):
+                    resources.append({"kind": "rds", "id": instance["DBInstanceIdentifier"]})
+    if "dynamodb" in services and tags:
+        log("WARNING", "O filtro de tags não se aplica ao DynamoDB: tabelas ignoradas nesta execução.")
+    elif "dynamodb" in services:
+        for page in paginate(get_client("dynamodb", profile, region), "list_tables"):
+            resources += [{"kind": "dynamodb", "id": name} for name in page.get("TableNames", [])]
+    return resources
+
+def _key(resource):
+    return f"{resource['kind']}:{resource['id']}"
+
+def reconcile(profile, region, run_id, journal, resources):
+    """Ao retomar, associa backups desta execução criados mas não registrados (interrupção entre a
+    criação e a gravação no diário) para que não sejam criados de novo"""
+    pending = {_key(resource) for resource in resources if _key(resource) not in journal.entries}
+    kinds = {key.split(":", 1)[0] for key in pending}
+    if "ebs" in kinds:
+        for page in paginate(get_client("ec2", profile, region), "describe_snapshots", OwnerIds=["self"],
+                             Filters=[{"Name": f"tag:{RUN_TAG}", "Values": [run_id]}]):
+            for snapshot in page.get("Snapshots", []):
+                key = f"ebs:{snapshot['VolumeId']}"
+                if key in pending and snapshot.get("State") != "error":
+                    journal.record(key, status="created", backup_id=snapshot["SnapshotId"])
+    if "dynamodb" in kinds:
+        for page in paginate(get_client("dynamodb", profile, region), "list_backups", BackupType="USER"):
+            for backup in page.get("BackupSummaries", []):
+                key = f"dynamodb:{backup['TableName']}"
+                if key in pending and backup["BackupName"] == _backup_name(backup["TableName"], run_id):
+                    journal.record(key, status="created", backup_id=backup["BackupArn"])
+    # Snapshots RDS têm identificador determinístico: a criação repetida é tratada como já existente
+
+def _backup_name(resource_id, run_id):
+    return f"{resource_id}-arch-{run_id}"
+
+def _create(client, resource, run_id):
+    """Cria o backup do recurso e retorna o identificador usado para acompanhá-lo"""
+    kind, resource_id = resource["kind"], resource["id"]
+    tags = [{"Key": RUN_TAG, "Value": run_id}]
+    if kind == "ebs":
+        return client.create_snapshot(
+            VolumeId=resource_id, Description=f"Backup automático via Arch CLI - {run_id}",
+            TagSpecifications=[{"ResourceType": "snapshot", "Tags": tags}])["SnapshotId"]
+    if kind == "dynamodb":
+        return client.create_backup(TableName=resource_id,
+                                    BackupName=_backup_name(resource_id, run_id))["BackupDetails"]["BackupArn"]
+    identifier = _backup_name(resource_id, run_id)
+    try:
+        if kind == "rds":
+            client.create_db_snapshot(DBSnapshotIdentifier=identifier, DBInstanceIdentifier=resource_id, Tags=tags)
+        else:
+            client.create_db_cluster_snapshot(DBClusterSnapshotIdentifier=identifier,
+                                              DBClusterIdentifier=resource_id, Tags=tags)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") not in ALREADY_EXISTS:
+            raise
+    return identifier
+
+def create_backup(clients, buckets, journal, resource, run_id):
+    """Cria um backup respeitando o limite de taxa do serviço, com novas tentativas em throttling"""
+    kind = resource["kind"]
+    for attempt in range(CREATE_RETRIES + 1):
+        buckets[KIND_CLIENTS[kind]].acquire()
+        try:
+            backup_id = _create(clients[kind], resource, run_id)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in THROTTLING_CODES and attempt < CREATE_RETRIES:
+                time.sleep(min(30, 2 ** attempt) + random.random())
+                continue
+            journal.record(_key(resource), status="failed", error=str(e))
+            return
+        except BotoCoreError as e:
+            journal.record(_key(resource), status="failed", error=str(e))
+            return
+        journal.record(_key(resource), status="created", backup_id=backup_id)
+        return
+
+def _describe(client, kind, ids):
+    """Estado de cada backup do lote: 'completed', 'failed' ou 'pending'"""
+    if kind == "ebs":
+        items = client.describe_snapshots(SnapshotIds=ids)["Snapshots"]
+        states = {item["SnapshotId"]: item["State"] for item in items}
+        mapping = {"completed": "completed", "error": "failed"}
+    elif kind == "dynamodb":
+        details = client.describe_backup(BackupArn=ids[0])["BackupDescription"]["BackupDetails"]
+        states = {ids[0]: details["BackupStatus"]}
+        mapping = {"AVAILABLE": "completed", "DELETED": "failed"}
+    elif kind == "rds":
+        items = client.describe_db_snapshots(Filters=[{"Name": "db-snapshot-id", "Values": ids}])["DBSnapshots"]
+        states = {item["DBSnapshotIdentifier"]: item["Status"] for item in items}
+        mapping = {"available": "completed", "failed": "failed"}
+    else:
+        items = client.describe_db_cluster_snapshots(
+            Filters=[{"Name": "db-cluster-snapshot-id", "Values": ids}])["DBClusterSnapshots"]
+        states = {item["DBClusterSnapshotIdentifier"]: item["Status"] for item in items}
+        mapping = {"available": "completed", "failed": "failed"}
+    return {backup_id: mapping.get(states.get(backup_id), "pending") for backup_id in ids}
+
+def _wait_args(kind, ids):
+    if kind == "ebs":
+        return {"SnapshotIds": ids}
+    if kind == "dynamodb":
+        return {"BackupArn": ids[0]}
+    name = "db-snapshot-id" if kind == "rds" else "db-cluster-snapshot-id"
+    return {"Filters": [{"Name": name, "Values": ids}]}
+
+def wait_batch(client, journal, kind, batch, deadline):
+    """Espera um lote de backups com um waiter e registra o estado final de cada um.
+    `batch` é uma lista de (chave, backup_id)."""
+    delay = WAITERS.get_waiter(kind).delay
+    waiter = create_waiter_with_client(kind, WAITERS, client)
+    while batch:
+        ids = [backup_id for _, backup_id in batch]
+        attempts = max(1, int((deadline - time.monotonic()) // delay))
+        try:
+            waiter.wait(WaiterConfig={"Delay": delay, "MaxAttempts": attempts}, **_wait_args(kind, ids))
+        except WaiterError:
+            # Falha em algum item ou tempo esgotado: o estado individual é lido abaixo
+            pass
+        states = _describe(client, kind, ids)
+        for key, backup_id in batch:
+            if states[backup_id] == "completed":
+                journal.record(key, status="completed")
+            elif states[backup_id] == "failed":
+                journal.record(key, status="failed", error="backup em estado de erro")
+        # Os demais itens do lote continuam sendo acompanhados até o tempo limite
+        batch = [(key, backup_id) for key, backup_id in batch if states[backup_id] == "pending"]
+        if time.monotonic() >= deadline:
+            break
+
+def summarize(journal, resources):
+    """Contagem por tipo de recurso: concluídos, pendentes e com falha"""
+    summary = {}
+    for resource in resources:
+        counts = summary.setdefault(resource["kind"], {"total": 0, "completed": 0, "created": 0, "failed": 0})
+        counts["total"] += 1
+        status = journal.entries.get(_key(resource), {}).get("status")
+        if status in counts:
+            counts[status] += 1
+    return summary
+
+def render_summary(summary, run_id):
+    table = Table(title=f"Backups - execução {run_id}")
+    for column in ("Recurso", "Total", "Concluídos", "Em andamento", "Falhas"):
+        table.add_column(column, justify="left" if column == "Recurso" else "right")
+    for kind in ("ebs", "rds", "rds-cluster", "dynamodb"):
+        counts = summary.get(kind)
+        if not counts:
+            continue
+        table.add_row(KIND_LABELS[kind], str(counts["total"]), f"[green]{counts['completed']}[/green]",
+                      str(counts["created"]), f"[red]{counts['failed']}[/red]" if counts["failed"] else "0")
+    console.print(table)
+
+def run_backups(profile=None, region=None, services=None, tags=None, run_id=None, rate=DEFAULT_RATE,
+                max_workers=MAX_WORKERS, timeout=DEFAULT_TIMEOUT, wait=True):
+    """Cria (ou retoma) os backups da execução e espera a conclusão de todos dentro do tempo limite"""
+    start = time.monotonic()
+    services = list(services) if services else SERVICES
+    run_id = re.sub(r"[^A-Za-z0-9]+", "-", run_id or default_run_id()).strip("-")
+    try:
+        resources = discover(profile, region, services, tags)
+    except (BotoCoreError, ClientError) as e:
+        log("ERROR", f"Falha ao listar os recursos: {str(e)}")
+        return False
+    if not resources:
+        log("INFO", "Nenhum recurso encontrado para backup.")
+        return True
+
+    journal = Journal(journal_path(profile, region, run_id))
+    try:
+        if journal.resumed:
+            log("INFO", f"Retomando a execução {run_id} ({journal.path})")
+            try:
+                reconcile(profile, region, run_id, journal, resources)
+            except (BotoCoreError, ClientError) as e:
+                log("WARNING", f"Não foi possível conferir backups já criados: {str(e)}")
+
+        clients = {kind: get_client(service, profile, region) for kind, service in KIND_CLIENTS.items()}
+        buckets = {service: TokenBucket(rate) for service in set(KIND_CLIENTS.values())}
+        # Recursos concluídos ou já criados nesta execução não recebem outro backup
+        todo = [resource for resource in resources
+                if journal.entries.get(_key(resource), {}).get("status") not in ("created", "completed")]
+        if todo:
+            log("INFO", f"Criando {len(todo)} backup(s) ({len(resources) - len(todo)} já feitos nesta execução) "
+                        f"a até {rate:g} chamada(s)/s por serviço")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(create_backup, clients, buckets, journal, resource, run_id) for resource in todo]
+            for future in as_completed(futures):
+                future.result()
+
+            waiting = {}
+            for resource in resources:
+                entry = journal.entries.get(_key(resource), {})
+                if entry.get("status") == "created":
+                    waiting.setdefault(resource["kind"], []).append((_key(resource), entry["backup_id"]))
+            if wait and waiting:
+                log("INFO", f"Aguardando a conclusão de {sum(len(items) for items in waiting.values())} backup(s)")
+                deadline = time.monotonic() + timeout * 60
+                futures = [executor.submit(wait_batch, clients[kind], journal, kind, items[i:i + WAIT_BATCH[kind]],
+                                           deadline)
+                           for kind, items in waiting.items() for i in range(0, len(items), WAIT_BATCH[kind])]
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except (BotoCoreError, ClientError) as e:
+                        log("WARNING", f"Falha ao consultar o estado de backups: {str(e)}")
+
+        summary = summarize(journal, resources)
+    finally:
+        journal.close()
+
+    render_summary(summary, run_id)
+    failed = [_key(resource) for resource in resources
+              if journal.entries.get(_key(resource), {}).get("status") == "failed"]
+    for key in failed[:10]:
+        log("ERROR", f"{key}: {journal.entries[key].get('error')}")
+    pending = sum(counts["created"] for counts in summary.values())
+    if failed:
+        log("WARNING", f"{len(failed)} backup(s) com falha. Execute novamente com --run-id {run_id} para repetir.")
+        return False
+    if pending:
+        log("WARNING" if wait else "SUCCESS",
+            f"{pending} backup(s) ainda em andamento. Execute novamente com --run-id {run_id} para acompanhar.")
+        return not wait
+    log("SUCCESS", f"Todos os {len(resources)} backup(s) concluídos em {time.monotonic() - start:.1f}s.")
+    return True
@@ -0,0 +1,123 @@
+"""
+Cache local de recursos AWS em SQLite, com TTL por serviço
+"""
+
+import os
+import json
+import time
+import sqlite3
+from .utils import CONFIG_DIR, load_config
+
+CACHE_FILE = os.path.join(CONFIG_DIR, "cache.db")
+
+# Modos de uso do cache
+MODE_AUTO = "auto"        # usa entradas dentro do TTL e busca apenas as expiradas
+MODE_CACHED = "cached"    # usa qualquer entrada existente, mesmo expirada
+MODE_REFRESH = "refresh"  # ignora o cache e busca tudo novamente
+
+DEFAULT_TTL = 900
+
+# TTL padrão (segundos) por serviço; pode ser sobrescrito em config.json na chave "cache_ttl"
+SERVICE_TTLS = {
+    "ec2": 300,
+    "s3": 3600,
+    "rds": 600,
+    "lambda": 900,
+    "iam": 3600,
+    "cloudformation": 900,
+    # Topologia do ECS muda com deploys e autoscaling: cache curto
+    "ecs": 60,
+}
+
+_initialized = False
+
+def _connect():
+    """Abre uma conexão com o banco do cache, criando o esquema se necessário"""
+    global _initialized
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    conn = sqlite3.connect(CACHE_FILE, timeout=30)
+    if not _initialized:
+        # WAL permite leituras concorrentes enquanto outros processos escrevem
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS resources (
+                profile TEXT NOT NULL,
+                region TEXT NOT NULL,
+                service TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (profile, region, service)
+            )"""
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+def get_ttl(service):
+    """Retorna o TTL configurado para o serviço"""
+    overrides = load_config().get("cache_ttl", {})
+    return overrides.get(service, SERVICE_TTLS.get(service, DEFAULT_TTL))
+
+def get_entry(profile, region, service):
+    """Retorna (dados, fetched_at) de uma entrada do cache ou None"""
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT data, fetched_at FROM resources WHERE profile = ? AND region = ? AND service = ?",
+            (profile or "", region or "", service),
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return json.loads(row[0]), row[1]
+
+def put_entry(profile, region, service, data):
+    """Grava uma entrada no cache"""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO resources (profile, region, service, fetched_at, data) VALUES (?, ?, ?, ?, ?)",
+                (profile or "", region or "", service, time.time(), json.dumps(data)),
+            )
+    finally:
+        conn.close()
+
+def delete_entry(profile, region, service):
+    """Remove uma entrada do cache (ex.: após alterar o recurso)"""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM resources WHERE profile = ? AND region = ? AND service = ?",
+                         (profile or "", region or "", service))
+    finally:
+        conn.close()
+
+def clear_cache(profile=None):
+    """Remove as entradas do cache (de um perfil ou todas)"""
+    conn = _connect()
+    try:
+        with conn:
+            if profile:
+                conn.execute("DELETE FROM resources WHERE profile = ?", (profile,))
+            else:
+                conn.execute("DELETE FROM resources")
+    finally:
+        conn.close()
+
+def cached_fetch(profile, region, service, fetch, mode=MODE_AUTO, ttl=None):
+    """Retorna (dados, do_cache) buscando na AWS apenas quando a entrada não serve.
+    fetch() deve retornar None em caso de erro para que nada seja gravado."""
+    if mode != MODE_REFRESH:
+        entry = get_entry(profile, region, service)
+        if entry is not None:
+            data, fetched_at = entry
+            ttl = get_ttl(service) if ttl is None else ttl
+            if mode == MODE_CACHED or time.time() - fetched_at < ttl:
+                return data, True
+
+    data = fetch()
+    if data is not None:
+        put_entry(profile, region, service, data)
+    return data, False
@@ -0,0 +1,230 @@
+"""
+Armazenamento local de custos do Cost Explorer com sincronização diária incremental
+"""
+
+import os
+import time
+import sqlite3
+import datetime
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client
+from .fanout import DEFAULT_TIMEOUT, resolve_targets, run_targets
+from .utils import CONFIG_DIR, log
+
+console = Console()
+
+COST_DB = os.path.join(CONFIG_DIR, "costs.db")
+# Dias recentes que o Cost Explorer ainda pode reprocessar, mesmo sem a marca de estimado
+MUTABLE_DAYS = 3
+
+def _connect():
+    """Abre o banco de custos, criando o esquema se necessário"""
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    conn = sqlite3.connect(COST_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS costs (
+            profile TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            day TEXT NOT NULL,
+            key TEXT NOT NULL,
+            blended REAL NOT NULL,
+            unblended REAL NOT NULL,
+            unit TEXT,
+            PRIMARY KEY (profile, dimension, day, key)
+        );
+        CREATE TABLE IF NOT EXISTS synced_days (
+            profile TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            day TEXT NOT NULL,
+            estimated INTEGER NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (profile, dimension, day)
+        );
+        """
+    )
+    return conn
+
+def dimension_name(tag=None):
+    """Nome da dimensão armazenada: SERVICE ou TAG:<chave>"""
+    return f"TAG:{tag}" if tag else "SERVICE"
+
+def _group_by(dimension):
+    if dimension.startswith("TAG:"):
+        return {"Type": "TAG", "Key": dimension[4:]}
+    return {"Type": "DIMENSION", "Key": dimension}
+
+def _days(start, end):
+    """Dias no intervalo [start, end)"""
+    day = start
+    while day < end:
+        yield day
+        day += datetime.timedelta(days=1)
+
+def _ranges(days):
+    """Agrupa dias ordenados em intervalos contíguos [início, fim) para minimizar chamadas"""
+    ranges = []
+    for day in days:
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + datetime.timedelta(days=1)
+        else:
+            ranges.append([day, day + datetime.timedelta(days=1)])
+    return ranges
+
+def days_to_fetch(conn, profile, dimension, start, end, today=None):
+    """Dias que ainda não estão no armazenamento ou que ainda podem mudar"""
+    today = today or datetime.date.today()
+    mutable_from = today - datetime.timedelta(days=MUTABLE_DAYS)
+    synced = {
+        row[0]: bool(row[1])
+        for row in conn.execute(
+            "SELECT day, estimated FROM synced_days WHERE profile = ? AND dimension = ? AND day >= ? AND day < ?",
+            (profile or "", dimension, start.isoformat(), end.isoformat()),
+        )
+    }
+    return [
+        day for day in _days(start, end)
+        if day.isoformat() not in synced or synced[day.isoformat()] or day >= mutable_from
+    ]
+
+def _fetch_range(client, dimension, start, end):
+    """Busca custos diários de um intervalo seguindo NextPageToken"""
+    request = {
+        "TimePeriod": {"Start": start.isoformat(), "End": end.isoformat()},
+        "Granularity": "DAILY",
+        "Metrics": ["BlendedCost", "UnblendedCost"],
+        "GroupBy": [_group_by(dimension)],
+    }
+    while True:
+        response = client.get_cost_and_usage(**request)
+        for result in response.get("ResultsByTime", []):
+            yield result
+        token = response.get("NextPageToken")
+        if not token:
+            break
+        request["NextPageToken"] = token
+
+def sync_costs(profile=None, tag=None, start=None, end=None):
+    """Sincroniza o armazenamento local, buscando apenas dias ausentes ou ainda mutáveis"""
+    today = datetime.date.today()
+    start = start or today.replace(day=1)
+    end = end or today + datetime.timedelta(days=1)
+    dimension = dimension_name(tag)
+
+    conn = _connect()
+    try:
+        ranges = _ranges(days_to_fetch(conn, profile, dimension, start, end, today))
+        if not ranges:
+            return {"calls": 0, "days": 0}
+
+        client = get_client("ce", profile, "us-east-1")
+        fetched_days = 0
+        for range_start, range_end in ranges:
+            results = list(_fetch_range(client, dimension, range_start, range_end))
+            with conn:
+                conn.execute(
+                    "DELETE FROM costs WHERE profile = ? AND dimension = ? AND day >= ? AND day < ?",
+                    (profile or "", dimension, range_start.isoformat(), range_end.isoformat()),
+                )
+                for result in results:
+                    day = result["TimePeriod"]["Start"]
+                    for group in result.get("Groups", []):
+                        metrics = group["Metrics"]
+                        conn.execute(
+                            "INSERT OR REPLACE INTO costs (profile, dimension, day, key, blended, unblended, unit) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (profile or "", dimension, day, group["Keys"][0],
+                             float(metrics["BlendedCost"]["Amount"]), float(metrics["UnblendedCost"]["Amount"]),
+                             metrics["BlendedCost"].get("Unit")),
+                        )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO synced_days (profile, dimension, day, estimated, fetched_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (profile or "", dimension, day, int(result.get("Estimated", False)), time.time()),
+                    )
+                    fetched_days += 1
+        return {"calls": len(ranges), "days": fetched_days}
+    finally:
+        conn.close()
+
+def query_costs(profile=None, tag=None, start=None, end=None, metric="blended"):
+    """Soma os custos armazenados por chave (serviço ou valor de tag) no intervalo [start, end)"""
+    today = datetime.date.today()
+    start = start or today.replace(day=1)
+    end = end or today + datetime.timedelta(days=1)
+    column = "unblended" if metric == "unblended" else "blended"
+
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            f"SELECT key, SUM({column}), MAX(unit) FROM costs "
+            f"WHERE profile = ? AND dimension = ? AND day >= ? AND day < ? "
+            f"GROUP BY key ORDER BY SUM({column}) DESC",
+            (profile or "", dimension_name(tag), start.isoformat(), end.isoformat()),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    if tag:
+        # O Cost Explorer retorna as chaves de tag como "Chave$valor"
+        rows = [(key.split("$", 1)[-1] or "(sem tag)", amount, unit) for key, amount, unit in rows]
+    return rows
+
+def sync_target(profile, region, tag=None, start=None, end=None):
+    """Sincronização de um perfil executada no pool de processos (Cost Explorer é global)"""
+    return sync_costs(profile, tag, start, end)
+
+def render_costs(rows, title):
+    """Exibe os custos agregados"""
+    total = sum(amount for _, amount, _ in rows)
+    unit = rows[0][2] if rows else "USD"
+    table = Table(title=title)
+    table.add_column("Chave")
+    table.add_column(f"Custo ({unit})", justify="right")
+    table.add_column("%", justify="right")
+    for key, amount, _ in rows:
+        table.add_row(key, f"{amount:,.2f}", f"{100.0 * amount / total:.1f}" if total else "0.0")
+    table.add_row("[bold]Total[/bold]", f"[bold]{total:,.2f}[/bold]", "")
+    console.print(table)
+
+def cost_report(profile=None, tag=None, start=None, end=None, metric="blended", offline=False,
+                all_profiles=False, processes=None, timeout=DEFAULT_TIMEOUT):
+    """Sincroniza (a menos que offline) e exibe o relatório de custos calculado localmente"""
+    today = datetime.date.today()
+    start = start or today.replace(day=1)
+    end = end or today + datetime.timedelta(days=1)
+    label = f"tag {tag}" if tag else "serviço"
+
+    profiles = [target_profile for target_profile, _ in resolve_targets(profile, all_profiles)]
+    failed = 0
+    if not offline:
+        log("INFO", f"Sincronizando custos por {label} de {start} a {end}")
+        if all_profiles:
+            targets = [(target_profile, None, tag, start, end) for target_profile in profiles]
+            for done in run_targets(sync_target, targets, processes, timeout):
+                if done["error"]:
+                    failed += 1
+                    log("ERROR", f"Falha ao sincronizar custos do perfil '{done['profile']}': {done['error']}")
+                else:
+                    log("INFO", f"{done['profile']}: {done['result']['days']} dia(s) em {done['result']['calls']} chamada(s)")
+        else:
+            try:
+                stats = sync_costs(profile, tag, start, end)
+                log("INFO", f"{stats['days']} dia(s) atualizados em {stats['calls']} chamada(s) ao Cost Explorer")
+            except (BotoCoreError, ClientError) as e:
+                log("ERROR", f"Falha ao sincronizar custos: {str(e)}")
+                failed += 1
+
+    for target_profile in profiles:
+        rows = query_costs(target_profile, tag, start, end, metric)
+        prefix = f"{target_profile} - " if all_profiles else ""
+        render_costs(rows, f"{prefix}Custos por {label} de {start} a {end - datetime.timedelta(days=1)}")
+
+    if failed:
+        log("WARNING", "Relatório gerado com dados locais possivelmente desatualizados.")
+        return False
+    log("SUCCESS", "Análise de custos concluída.")
+    return True
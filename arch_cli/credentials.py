@@ -0,0 +1,195 @@
+"""
+Auditoria de chaves de acesso, logins e MFA baseada no relatório de credenciais do IAM
+"""
+
+import os
+import csv
+import time
+import datetime
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client
+from .cache import get_entry, put_entry
+from .fanout import DEFAULT_TIMEOUT, resolve_targets, run_targets
+from .utils import CONFIG_DIR, log
+
+console = Console()
+
+REPORT_DIR = os.path.join(CONFIG_DIR, "credential_reports")
+# O IAM só gera um novo relatório a cada 4 horas; antes disso o mesmo conteúdo é devolvido
+REPORT_TTL = 4 * 3600
+# Tempo máximo de espera pela geração do relatório, em segundos
+REPORT_TIMEOUT = 120
+DEFAULT_MAX_AGE = 90
+CHECKS = ["keys", "unused", "mfa"]
+
+def _report_path(profile):
+    return os.path.join(REPORT_DIR, f"{profile or 'default'}.csv")
+
+def _parse_date(value):
+    """Converte as datas do relatório (ISO 8601) ou retorna None para N/A, no_information etc."""
+    if not value or value in ("N/A", "no_information", "not_supported"):
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+def _days_since(value, now):
+    return (now - value).days if value else None
+
+def download_report(profile=None, refresh=False):
+    """Retorna o caminho do relatório de credenciais, gerando-o apenas quando o cache expirou"""
+    path = _report_path(profile)
+    if not refresh:
+        entry = get_entry(profile, None, "credential_report")
+        if entry and os.path.exists(path) and time.time() < entry[0]["generated_at"] + REPORT_TTL:
+            return path, entry[0]["generated_at"], True
+
+    client = get_client("iam", profile)
+    delay = 1
+    deadline = time.monotonic() + REPORT_TIMEOUT
+    while client.generate_credential_report()["State"] != "COMPLETE":
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"relatório de credenciais não gerado em {REPORT_TIMEOUT}s")
+        time.sleep(delay)
+        delay = min(delay * 2, 10)
+
+    report = client.get_credential_report()
+    generated_at = report["GeneratedTime"].timestamp()
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(report["Content"])
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+
+    put_entry(profile, None, "credential_report", {"generated_at": generated_at})
+    return path, generated_at, False
+
+def audit_report(path, max_age=DEFAULT_MAX_AGE, checks=None, now=None):
+    """Lê o relatório linha a linha e responde idade/uso das chaves, uso de senha e MFA em uma passagem"""
+    checks = checks or CHECKS
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    result = {"keys": [], "unused": [], "mfa": [], "users": 0, "console_users": 0, "console_mfa": 0}
+
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            user = row["user"]
+            result["users"] += 1
+            password_enabled = row.get("password_enabled") == "true"
+            mfa_active = row.get("mfa_active") == "true"
+
+            if password_enabled:
+                result["console_users"] += 1
+                if mfa_active:
+                    result["console_mfa"] += 1
+
+            if "mfa" in checks and not mfa_active:
+                result["mfa"].append({"user": user, "console": password_enabled})
+
+            if "unused" in checks and password_enabled:
+                last_used = _parse_date(row.get("password_last_used"))
+                days = _days_since(last_used, now)
+                if last_used is None:
+                    result["unused"].append({"user": user, "credential": "senha", "detail": "Nunca utilizada"})
+                elif days > max_age:
+                    result["unused"].append({"user": user, "credential": "senha",
+                                             "detail": f"Não utilizada há {days} dias (última vez: {last_used.date()})"})
+
+            for slot in ("1", "2"):
+                if row.get(f"access_key_{slot}_active") != "true":
+                    continue
+                key = f"access_key_{slot}"
+
+                if "keys" in checks:
+                    rotated = _parse_date(row.get(f"{key}_last_rotated"))
+                    age = _days_since(rotated, now)
+                    if age is not None and age > max_age:
+                        result["keys"].append({"user": user, "key": key, "age": age})
+
+                if "unused" in checks:
+                    last_used = _parse_date(row.get(f"{key}_last_used_date"))
+                    days = _days_since(last_used, now)
+                    if last_used is None:
+                        result["unused"].append({"user": user, "credential": key, "detail": "Nunca utilizada"})
+                    elif days > max_age:
+                        result["unused"].append({"user": user, "credential": key,
+                                                 "detail": f"Não utilizada há {days} dias (última vez: {last_used.date()})"})
+    return result
+
+def audit_target(profile, region, max_age=DEFAULT_MAX_AGE, checks=None, refresh=False):
+    """Audita as credenciais de um perfil (IAM é global, a região é ignorada)"""
+    path, generated_at, cached = download_report(profile, refresh)
+    result = audit_report(path, max_age, checks)
+    result["generated_at"] = generated_at
+    result["cached"] = cached
+    return result
+
+def render_audit(result, max_age=DEFAULT_MAX_AGE, checks=None, profile=None):
+    """Exibe o resultado da auditoria de credenciais"""
+    checks = checks or CHECKS
+    prefix = f"{profile} - " if profile else ""
+    generated = datetime.datetime.fromtimestamp(result["generated_at"]).strftime("%Y-%m-%d %H:%M:%S")
+    coverage = 100.0 * result["console_mfa"] / result["console_users"] if result["console_users"] else 100.0
+    console.print(f"[bold]{prefix}Relatório de credenciais[/bold] gerado em {generated}"
+                  f"{' (cache)' if result['cached'] else ''}: {result['users']} usuário(s), "
+                  f"cobertura de MFA no console {coverage:.1f}% ({result['console_mfa']}/{result['console_users']})")
+
+    if "keys" in checks:
+        table = Table(title=f"{prefix}Chaves de acesso com mais de {max_age} dias - {len(result['keys'])}")
+        table.add_column("Usuário")
+        table.add_column("Chave")
+        table.add_column("Idade (dias)", justify="right")
+        for item in sorted(result["keys"], key=lambda item: -item["age"]):
+            table.add_row(item["user"], item["key"], str(item["age"]))
+        console.print(table)
+
+    if "unused" in checks:
+        table = Table(title=f"{prefix}Credenciais não utilizadas nos últimos {max_age} dias - {len(result['unused'])}")
+        table.add_column("Usuário")
+        table.add_column("Credencial")
+        table.add_column("Situação")
+        for item in result["unused"]:
+            table.add_row(item["user"], item["credential"], item["detail"])
+        console.print(table)
+
+    if "mfa" in checks:
+        table = Table(title=f"{prefix}Usuários sem MFA ativado - {len(result['mfa'])}")
+        table.add_column("Usuário")
+        table.add_column("Acesso ao console")
+        for item in result["mfa"]:
+            table.add_row(item["user"], "sim" if item["console"] else "não")
+        console.print(table)
+
+def audit_credentials(profile=None, max_age=DEFAULT_MAX_AGE, checks=None, refresh=False,
+                      all_profiles=False, processes=None, timeout=DEFAULT_TIMEOUT):
+    """Audita chaves de acesso, logins e MFA de um ou vários perfis"""
+    log("INFO", "Iniciando auditoria de credenciais")
+
+    if not all_profiles:
+        try:
+            render_audit(audit_target(profile, None, max_age, checks, refresh), max_age, checks)
+        except (BotoCoreError, ClientError, TimeoutError) as e:
+            log("ERROR", f"Falha ao auditar credenciais do perfil '{profile}': {str(e)}")
+            return False
+        log("SUCCESS", "Auditoria de credenciais concluída.")
+        return True
+
+    targets = [(target_profile, None, max_age, checks, refresh)
+               for target_profile, _ in resolve_targets(profile, all_profiles)]
+    failed = 0
+    for done in run_targets(audit_target, targets, processes, timeout):
+        if done["error"]:
+            failed += 1
+            log("ERROR", f"Falha ao auditar credenciais do perfil '{done['profile']}': {done['error']}")
+            continue
+        render_audit(done["result"], max_age, checks, done["profile"])
+
+    if failed:
+        log("WARNING", f"{failed} perfil(is) não puderam ser auditados.")
+        return False
+    log("SUCCESS", "Auditoria de credenciais concluída.")
+    return True
@@ -0,0 +1,330 @@
+"""
+Recomendação de capacidade do DynamoDB (sob demanda x provisionada) a partir das métricas de consumo
+"""
+
+import time
+import random
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .metrics import build_matrix, get_metric_data, metric_query, summarize
+from .utils import log
+
+console = Console()
+
+MAX_WORKERS = 8
+DEFAULT_DAYS = 14
+DEFAULT_PERIOD = 300
+# Utilização alvo da capacidade provisionada sobre o p99 do consumo
+TARGET_UTILIZATION = 0.7
+MIN_CAPACITY = 1
+# Diferença mínima (fração) para recomendar mudança de capacidade ou de modo
+CHANGE_MARGIN = 0.2
+# Preços em us-east-1: unidade provisionada por hora e milhão de unidades de requisição sob demanda
+RCU_HOUR_PRICE = 0.00013
+WCU_HOUR_PRICE = 0.00065
+READ_REQUEST_PRICE = 0.125
+WRITE_REQUEST_PRICE = 0.625
+HOURS_PER_MONTH = 730
+# Aplicação: tabelas atualizadas por lote e intervalo mínimo entre lotes (segundos)
+APPLY_BATCH = 5
+APPLY_INTERVAL = 2.0
+APPLY_RETRIES = 5
+RETRY_CODES = {"LimitExceededException", "ThrottlingException", "ResourceInUseException"}
+
+# Métricas coletadas por tabela/índice: (chave, métrica); todas com a estatística Sum
+METRICS = [
+    ("read", "ConsumedReadCapacityUnits"),
+    ("write", "ConsumedWriteCapacityUnits"),
+    ("read_throttles", "ReadThrottleEvents"),
+    ("write_throttles", "WriteThrottleEvents"),
+]
+
+def _resources(table):
+    """Tabela e seus GSIs como recursos independentes (o modo de cobrança é sempre o da tabela)"""
+    name = table["TableName"]
+    mode = (table.get("BillingModeSummary") or {}).get("BillingMode", "PROVISIONED")
+    resources = [{"table": name, "index": None, "mode": mode, "status": table.get("TableStatus"),
+                  "read": table.get("ProvisionedThroughput", {}).get("ReadCapacityUnits", 0),
+                  "write": table.get("ProvisionedThroughput", {}).get("WriteCapacityUnits", 0)}]
+    for index in table.get("GlobalSecondaryIndexes", []):
+        resources.append({"table": name, "index": index["IndexName"], "mode": mode, "status": index.get("IndexStatus"),
+                          "read": index.get("ProvisionedThroughput", {}).get("ReadCapacityUnits", 0),
+                          "write": index.get("ProvisionedThroughput", {}).get("WriteCapacityUnits", 0)})
+    return resources
+
+def _autoscaled(profile, region):
+    """Recursos com Application Auto Scaling: {(tabela, índice)}"""
+    client = get_client("application-autoscaling", profile, region)
+    managed = set()
+    for page in paginate(client, "describe_scalable_targets", ServiceNamespace="dynamodb"):
+        for target in page.get("ScalableTargets", []):
+            parts = target["ResourceId"].split("/")
+            managed.add((parts[1], parts[3] if len(parts) > 3 else None))
+    return managed
+
+def list_resources(profile=None, region=None, tables=None, max_workers=MAX_WORKERS):
+    """Descreve as tabelas em paralelo (junto com os alvos de auto scaling). Retorna (recursos, erros)."""
+    client = get_client("dynamodb", profile, region)
+    names = list(tables) if tables else [name for page in paginate(client, "list_tables")
+                                         for name in page.get("TableNames", [])]
+    resources, errors = [], []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names) + 1))) as executor:
+        autoscaling = executor.submit(_autoscaled, profile, region)
+        futures = {executor.submit(client.describe_table, TableName=name): name for name in names}
+        for future in as_completed(futures):
+            try:
+                resources.extend(_resources(future.result()["Table"]))
+            except (BotoCoreError, ClientError) as e:
+                errors.append(f"{futures[future]}: {str(e)}")
+        try:
+            managed = autoscaling.result()
+        except (BotoCoreError, ClientError) as e:
+            log("WARNING", f"Não foi possível consultar o auto scaling: {str(e)}")
+            managed = set()
+    resources.sort(key=lambda resource: (resource["table"], resource["index"] or ""))
+    for resource in resources:
+        resource["autoscaled"] = (resource["table"], resource["index"]) in managed
+    return resources, errors
+
+def collect_usage(profile, region, resources, start, end, period):
+    """Busca o consumo e os throttles de todos os recursos em chamadas de GetMetricData em lote.
+    Retorna {chave: matriz (recursos × períodos)}; o consumo é convertido em unidades por segundo."""
+    queries = []
+    for i, resource in enumerate(resources):
+        dimensions = {"TableName": resource["table"]}
+        if resource["index"]:
+            dimensions["GlobalSecondaryIndexName"] = resource["index"]
+        queries += [metric_query(f"m{i}_{j}", "AWS/DynamoDB", metric, dimensions, "Sum", period)
+                    for j, (_, metric) in enumerate(METRICS)]
+    series = get_metric_data(get_client("cloudwatch", profile, region), queries, start, end)
+    matrices = {}
+    for j, (key, _) in enumerate(METRICS):
+        matrices[key] = build_matrix([series.get(f"m{i}_{j}", ([], [])) for i in range(len(resources))],
+                                     start, end, period)
+    matrices["read"] = matrices["read"] / period
+    matrices["write"] = matrices["write"] / period
+    return matrices
+
+def _changed(current, recommended):
+    return np.abs(recommended - current) > CHANGE_MARGIN * np.maximum(current, MIN_CAPACITY)
+
+def recommend(resources, matrices):
+    """Calcula p50/p99, capacidade recomendada e custos de cada recurso de forma vetorizada e escolhe,
+    por tabela (somando os GSIs), o modo de cobrança mais barato. Preenche os campos nos recursos."""
+    stats = {key: summarize(np.nan_to_num(matrices[key]), percentiles=(50, 99)) for key in ("read", "write")}
+    throttles = np.nansum(matrices["read_throttles"], axis=1) + np.nansum(matrices["write_throttles"], axis=1)
+    columns = matrices["read"].shape[1]
+
+    recommended = {}
+    for key in ("read", "write"):
+        # A capacidade cobre o pico observado (picos raros ficam fora do p99); com throttling o próprio
+        # pico subestima a demanda e também recebe a folga da utilização alvo
+        required = np.fmax(stats[key]["p99"] / TARGET_UTILIZATION, stats[key]["max"])
+        required = np.where(throttles > 0, stats[key]["max"] / TARGET_UTILIZATION, required)
+        recommended[key] = np.maximum(MIN_CAPACITY, np.ceil(required))
+    current = {key: np.array([resource[key] for resource in resources], dtype=float) for key in ("read", "write")}
+
+    def provisioned_cost(read, write):
+        return (read * RCU_HOUR_PRICE + write * WCU_HOUR_PRICE) * HOURS_PER_MONTH
+
+    # Média sobre todo o intervalo (períodos sem consumo contam como zero)
+    mean_read = np.nansum(matrices["read"], axis=1) / columns
+    mean_write = np.nansum(matrices["write"], axis=1) / columns
+    on_demand = (mean_read * READ_REQUEST_PRICE + mean_write * WRITE_REQUEST_PRICE) * HOURS_PER_MONTH * 3600 / 1e6
+    provisioned = provisioned_cost(recommended["read"], recommended["write"])
+    current_provisioned = provisioned_cost(current["read"], current["write"])
+
+    # Custos agregados por tabela: a troca de modo vale para a tabela e todos os GSIs
+    tables = sorted({resource["table"] for resource in resources})
+    position = {name: i for i, name in enumerate(tables)}
+    group = np.array([position[resource["table"]] for resource in resources], dtype=int)
+    table_on_demand = np.zeros(len(tables))
+    table_provisioned = np.zeros(len(tables))
+    np.add.at(table_on_demand, group, on_demand)
+    np.add.at(table_provisioned, group, provisioned)
+
+    for i, resource in enumerate(resources):
+        t = group[i]
+        is_on_demand = resource["mode"] == "PAY_PER_REQUEST"
+        current_cost = on_demand[i] if is_on_demand else current_provisioned[i]
+        if is_on_demand:
+            switch = table_provisioned[t] < table_on_demand[t] * (1 - CHANGE_MARGIN)
+        else:
+            switch = table_on_demand[t] < table_provisioned[t] * (1 - CHANGE_MARGIN)
+        if switch:
+            action = "provisionado" if is_on_demand else "sob demanda"
+        elif is_on_demand:
+            action = "manter"
+        elif resource["autoscaled"]:
+            action = "auto scaling"
+        elif _changed(current["read"][i], recommended["read"][i]) or _changed(current["write"][i], recommended["write"][i]):
+            action = "ajustar"
+        else:
+            action = "manter"
+        new_mode = ("PROVISIONED" if is_on_demand else "PAY_PER_REQUEST") if switch else resource["mode"]
+        resource.update(
+            read_p50=float(stats["read"]["p50"][i]), read_p99=float(stats["read"]["p99"][i]),
+            write_p50=float(stats["write"]["p50"][i]), write_p99=float(stats["write"]["p99"][i]),
+            throttles=int(throttles[i]), action=action, new_mode=new_mode,
+            new_read=int(recommended["read"][i]), new_write=int(recommended["write"][i]),
+            current_cost=float(current_cost),
+            new_cost=float(on_demand[i] if new_mode == "PAY_PER_REQUEST" else
+                           provisioned[i] if action in ("ajustar", "provisionado") else current_cost),
+        )
+    return resources
+
+def _throughput(resource):
+    return {"ReadCapacityUnits": resource["new_read"], "WriteCapacityUnits": resource["new_write"]}
+
+def build_updates(resources):
+    """Agrupa as recomendações em uma chamada de update_table por tabela. Retorna (requisições, ignoradas)."""
+    by_table = {}
+    for resource in resources:
+        by_table.setdefault(resource["table"], []).append(resource)
+    updates, skipped = [], []
+    for name, items in by_table.items():
+        table = items[0]
+        changes = [item for item in items if item["action"] in ("ajustar", "provisionado", "sob demanda")]
+        if not changes:
+            continue
+        if any(item["status"] != "ACTIVE" for item in items):
+            skipped.append(f"{name}: tabela ou índice não está ACTIVE")
+            continue
+        if table["new_mode"] != table["mode"] and any(item["autoscaled"] for item in items):
+            skipped.append(f"{name}: remova o auto scaling antes de trocar o modo de cobrança")
+            continue
+        request = {"TableName": name}
+        if table["new_mode"] == "PAY_PER_REQUEST":
+            request["BillingMode"] = "PAY_PER_REQUEST"
+        else:
+            to_provisioned = table["mode"] == "PAY_PER_REQUEST"
+            if to_provisioned:
+                request["BillingMode"] = "PROVISIONED"
+            # Na troca para provisionado a capacidade de todos os GSIs é obrigatória
+            targets = items if to_provisioned else changes
+            if table in targets:
+                request["ProvisionedThroughput"] = _throughput(table)
+            indexes = [{"Update": {"IndexName": item["index"], "ProvisionedThroughput": _throughput(item)}}
+                       for item in targets if item["index"]]
+            if indexes:
+                request["GlobalSecondaryIndexUpdates"] = indexes
+        updates.append(request)
+    return updates, skipped
+
+def _update_table(client, request):
+    """Executa um update_table repetindo com backoff em limites da API ou tabela ocupada"""
+    for attempt in range(APPLY_RETRIES + 1):
+        try:
+            client.update_table(**request)
+            return None
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in RETRY_CODES or attempt == APPLY_RETRIES:
+                return str(e)
+            time.sleep(min(30, 2 ** attempt) + random.random())
+        except BotoCoreError as e:
+            return str(e)
+
+def apply_updates(client, updates, batch_size=APPLY_BATCH, interval=APPLY_INTERVAL):
+    """Aplica as atualizações em lotes de batch_size tabelas, com intervalo mínimo entre lotes.
+    Retorna {tabela: erro ou None}."""
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, batch_size)) as executor:
+        for start in range(0, len(updates), batch_size):
+            batch_start = time.monotonic()
+            batch = updates[start:start + batch_size]
+            for request, error in zip(batch, executor.map(lambda request: _update_table(client, request), batch)):
+                results[request["TableName"]] = error
+                if error:
+                    log("ERROR", f"Falha ao atualizar a tabela '{request['TableName']}': {error}")
+                else:
+                    log("SUCCESS", f"Tabela '{request['TableName']}' atualizada.")
+            if start + batch_size < len(updates):
+                time.sleep(max(0.0, interval - (time.monotonic() - batch_start)))
+    return results
+
+def _units(read, write):
+    return f"{read:,.1f}/{write:,.1f}"
+
+def render_recommendations(resources, days):
+    """Tabela com consumo, recomendação e custo mensal estimado de cada tabela e GSI"""
+    table = Table(title=f"Capacidade do DynamoDB - últimos {days} dia(s)")
+    for column in ("Tabela / índice", "Modo", "Provisionado L/E", "Consumo p50 L/E", "Consumo p99 L/E", "Throttles",
+                   "Recomendação", "Novo L/E", "Custo atual (USD/mês)", "Custo recomendado (USD/mês)"):
+        table.add_column(column, justify="left" if column in ("Tabela / índice", "Modo", "Recomendação") else "right")
+    colors = {"ajustar": "yellow", "provisionado": "cyan", "sob demanda": "cyan", "auto scaling": "dim"}
+    modes = {"PAY_PER_REQUEST": "sob demanda", "PROVISIONED": "provisionado"}
+    for resource in resources:
+        name = f"  └ {resource['index']}" if resource["index"] else f"[bold]{resource['table']}[/bold]"
+        provisioned = resource["mode"] == "PROVISIONED"
+        color = colors.get(resource["action"])
+        action = f"[{color}]{resource['action']}[/{color}]" if color else resource["action"]
+        new_capacity = (f"{resource['new_read']}/{resource['new_write']}"
+                        if resource["action"] in ("ajustar", "provisionado") else "-")
+        table.add_row(
+            name, modes.get(resource["mode"], resource["mode"]),
+            f"{resource['read']}/{resource['write']}" if provisioned else "-",
+            _units(resource["read_p50"], resource["write_p50"]), _units(resource["read_p99"], resource["write_p99"]),
+            f"[red]{resource['throttles']:,}[/red]" if resource["throttles"] else "0",
+            action, new_capacity, f"{resource['current_cost']:,.2f}", f"{resource['new_cost']:,.2f}",
+        )
+    console.print(table)
+
+def capacity_advisor(profile=None, region=None, tables=None, days=DEFAULT_DAYS, period=DEFAULT_PERIOD, apply=False,
+                     max_workers=MAX_WORKERS):
+    """Recomenda o modo de cobrança e a capacidade de cada tabela e GSI e, com apply, aplica as mudanças"""
+    try:
+        resources, errors = list_resources(profile, region, tables, max_workers)
+    except (BotoCoreError, ClientError) as e:
+        log("ERROR", f"Falha ao listar tabelas DynamoDB: {str(e)}")
+        return False
+    for error in errors:
+        log("ERROR", f"Falha ao descrever a tabela {error}")
+    if not resources:
+        log("INFO", "Nenhuma tabela DynamoDB encontrada.")
+        return not errors
+
+    table_count = len({resource["table"] for resource in resources})
+    log("INFO", f"Coletando consumo de {table_count} tabela(s) e {len(resources) - table_count} GSI(s) "
+                f"dos últimos {days} dia(s)")
+    now = int(time.time())
+    end = datetime.datetime.fromtimestamp(now - now % period, datetime.timezone.utc)
+    start = end - datetime.timedelta(days=days)
+    try:
+        matrices = collect_usage(profile, region, resources, start, end, period)
+    except (BotoCoreError, ClientError) as e:
+        log("ERROR", f"Falha ao obter métricas do CloudWatch: {str(e)}")
+        return False
+
+    recommend(resources, matrices)
+    render_recommendations(resources, days)
+    current = sum(resource["current_cost"] for resource in resources)
+    new = sum(resource["new_cost"] for resource in resources)
+    console.print(f"Custo mensal estimado: [bold]{current:,.2f} USD[/bold] → [bold]{new:,.2f} USD[/bold] "
+                  f"(preços de us-east-1)")
+    throttled = [resource for resource in resources if resource["throttles"]]
+    if throttled:
+        log("WARNING", f"{len(throttled)} tabela(s)/índice(s) com throttling no período.")
+
+    updates, skipped = build_updates(resources)
+    for reason in skipped:
+        log("WARNING", f"Ignorada: {reason}")
+    if not updates:
+        log("SUCCESS", "Nenhuma alteração de capacidade recomendada.")
+        return not errors
+    if not apply:
+        log("SUCCESS", f"{len(updates)} tabela(s) com alteração recomendada. Use --apply para aplicar.")
+        return not errors
+
+    log("INFO", f"Aplicando {len(updates)} atualização(ões) em lotes de {APPLY_BATCH}")
+    results = apply_updates(get_client("dynamodb", profile, region), updates)
+    failed = sum(1 for error in results.values() if error)
+    if failed or errors:
+        log("WARNING", f"{len(results) - failed} de {len(results)} tabela(s) atualizada(s).")
+        return False
+    log("SUCCESS", f"{len(results)} tabela(s) atualizada(s).")
+    return True
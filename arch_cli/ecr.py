@@ -0,0 +1,202 @@
+"""
+Retenção de imagens do ECR em todos os repositórios em paralelo, com simulação (dry-run)
+"""
+
+import re
+import time
+import random
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .utils import log
+
+console = Console()
+
+MAX_WORKERS = 8
+PAGE_SIZE = 1000
+# Limite de imagens por chamada de BatchDeleteImage
+DELETE_BATCH = 100
+DELETE_RETRIES = 5
+# Preço de armazenamento do ECR por GB-mês (us-east-1)
+STORAGE_PRICE = 0.10
+THROTTLING_CODES = {"ThrottlingException", "TooManyRequestsException", "RequestLimitExceeded"}
+
+def compile_rules(keep_last=None, max_age=None, keep_tags=None, untagged_only=False):
+    """Normaliza as regras de retenção; expressões de tag são compiladas uma única vez"""
+    return {
+        "keep_last": keep_last or 0,
+        "max_age": max_age,
+        "keep_tags": [re.compile(pattern) for pattern in keep_tags or []],
+        "untagged_only": untagged_only,
+    }
+
+def _image(item):
+    """Campos usados pelas regras (a página completa não é mantida em memória)"""
+    pushed = item.get("imagePushedAt")
+    return (item["imageDigest"], tuple(item.get("imageTags", [])), pushed.timestamp() if pushed else 0.0,
+            item.get("imageSizeInBytes", 0))
+
+def select_expired(images, rules, now=None):
+    """Aplica as regras: mantém as N mais recentes, as mais novas que max_age dias e as com tag
+    protegida; com untagged_only apenas imagens sem tag são candidatas. Retorna as imagens a excluir."""
+    now = now or time.time()
+    ordered = sorted(images, key=lambda image: image[2], reverse=True)
+    cutoff = now - rules["max_age"] * 86400 if rules["max_age"] is not None else None
+    expired = []
+    for position, image in enumerate(ordered):
+        _, tags, pushed, _ = image
+        if position < rules["keep_last"]:
+            continue
+        if cutoff is not None and pushed >= cutoff:
+            continue
+        if rules["untagged_only"] and tags:
+            continue
+        if any(pattern.search(tag) for pattern in rules["keep_tags"] for tag in tags):
+            continue
+        expired.append(image)
+    return expired
+
+def delete_images(client, repository, digests, registry_id=None):
+    """Exclui as imagens em lotes de DELETE_BATCH, repetindo com backoff quando há throttling.
+    Retorna (excluídas, [falhas])."""
+    deleted, failures = 0, []
+    for start in range(0, len(digests), DELETE_BATCH):
+        pending = [{"imageDigest": digest} for digest in digests[start:start + DELETE_BATCH]]
+        for attempt in range(DELETE_RETRIES + 1):
+            request = {"repositoryName": repository, "imageIds": pending}
+            if registry_id:
+                request["registryId"] = registry_id
+            try:
+                response = client.batch_delete_image(**request)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in THROTTLING_CODES or attempt == DELETE_RETRIES:
+                    raise
+                time.sleep(min(30, 2 ** attempt) + random.random())
+                continue
+            deleted += len(response.get("imageIds", []))
+            throttled = [failure for failure in response.get("failures", [])
+                         if failure.get("failureCode") in THROTTLING_CODES]
+            failures.extend(failure for failure in response.get("failures", []) if failure not in throttled)
+            if not throttled:
+                break
+            if attempt == DELETE_RETRIES:
+                failures.extend(throttled)
+                break
+            pending = [{"imageDigest": failure["imageId"]["imageDigest"]} for failure in throttled]
+            time.sleep(min(30, 2 ** attempt) + random.random())
+    return deleted, failures
+
+def process_repository(client, repository, rules, apply=False):
+    """Avalia as regras em um repositório (páginas de describe_images em streaming) e, com apply, exclui"""
+    name = repository["repositoryName"]
+    result = {"repository": name, "images": 0, "bytes": 0, "expired": 0, "reclaimable": 0,
+              "deleted": 0, "failures": [], "error": None}
+    try:
+        images = []
+        for page in paginate(client, "describe_images", repositoryName=name, registryId=repository["registryId"],
+                             PaginationConfig={"PageSize": PAGE_SIZE}):
+            for item in page.get("imageDetails", []):
+                image = _image(item)
+                images.append(image)
+                result["bytes"] += image[3]
+        result["images"] = len(images)
+
+        expired = select_expired(images, rules)
+        result["expired"] = len(expired)
+        result["reclaimable"] = sum(image[3] for image in expired)
+        if apply and expired:
+            result["deleted"], result["failures"] = delete_images(
+                client, name, [image[0] for image in expired], repository["registryId"])
+    except (BotoCoreError, ClientError) as e:
+        result["error"] = str(e)
+    return result
+
+def _gb(size):
+    return size / 1024 ** 3
+
+def render_report(results, apply=False):
+    """Exibe, por repositório, as imagens e os bytes recuperados (ou recuperáveis, na simulação)"""
+    title = "Retenção de imagens do ECR" + ("" if apply else " (simulação)")
+    table = Table(title=title)
+    columns = ["Repositório", "Imagens", "Tamanho (GB)", "Expiradas", "Recuperável (GB)", "Custo/mês (USD)"]
+    if apply:
+        columns += ["Excluídas", "Falhas"]
+    for column in columns:
+        table.add_column(column, justify="left" if column == "Repositório" else "right")
+
+    totals = {"images": 0, "bytes": 0, "expired": 0, "reclaimable": 0, "deleted": 0, "failures": 0}
+    for result in sorted(results, key=lambda result: result["reclaimable"], reverse=True):
+        if result["error"]:
+            log("ERROR", f"Falha no repositório '{result['repository']}': {result['error']}")
+            continue
+        row = [result["repository"], str(result["images"]), f"{_gb(result['bytes']):,.2f}", str(result["expired"]),
+               f"{_gb(result['reclaimable']):,.2f}", f"{_gb(result['reclaimable']) * STORAGE_PRICE:,.2f}"]
+        if apply:
+            row += [str(result["deleted"]), str(len(result["failures"]))]
+        table.add_row(*row)
+        for key in ("images", "bytes", "expired", "reclaimable", "deleted"):
+            totals[key] += result[key]
+        totals["failures"] += len(result["failures"])
+
+    row = ["[bold]Total[/bold]", str(totals["images"]), f"{_gb(totals['bytes']):,.2f}", str(totals["expired"]),
+           f"{_gb(totals['reclaimable']):,.2f}", f"{_gb(totals['reclaimable']) * STORAGE_PRICE:,.2f}"]
+    if apply:
+        row += [str(totals["deleted"]), str(totals["failures"])]
+    table.add_row(*row)
+    console.print(table)
+    # Camadas compartilhadas entre imagens só são liberadas quando nenhuma imagem as referencia
+    console.print("[dim]Tamanhos recuperáveis são estimados pelo tamanho de cada imagem (camadas compartilhadas "
+                  "podem reduzir o valor real).[/dim]")
+    return totals
+
+def apply_retention(profile=None, region=None, repositories=None, keep_last=None, max_age=None, keep_tags=None,
+                    untagged_only=False, apply=False, max_workers=MAX_WORKERS):
+    """Aplica (ou simula) as regras de retenção em todos os repositórios, em paralelo"""
+    if not keep_last and max_age is None and not untagged_only:
+        log("ERROR", "Informe ao menos uma regra de retenção (--keep-last, --max-age ou --untagged-only).")
+        return False
+    try:
+        rules = compile_rules(keep_last, max_age, keep_tags, untagged_only)
+    except re.error as e:
+        log("ERROR", f"Expressão de tag inválida: {str(e)}")
+        return False
+
+    client = get_client("ecr", profile, region)
+    try:
+        request = {"repositoryNames": list(repositories)} if repositories else {}
+        repos = [repo for page in paginate(client, "describe_repositories", **request)
+                 for repo in page.get("repositories", [])]
+    except (BotoCoreError, ClientError) as e:
+        log("ERROR", f"Falha ao listar repositórios ECR: {str(e)}")
+        return False
+    if not repos:
+        log("INFO", "Nenhum repositório ECR encontrado.")
+        return True
+
+    mode = "Aplicando" if apply else "Simulando"
+    log("INFO", f"{mode} retenção em {len(repos)} repositório(s) em "
+                f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(repos)))) as executor:
+        futures = [executor.submit(process_repository, client, repo, rules, apply) for repo in repos]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    totals = render_report(results, apply)
+    for result in results:
+        for failure in result["failures"][:5]:
+            log("WARNING", f"{result['repository']}: {failure.get('imageId', {}).get('imageDigest')} - "
+                           f"{failure.get('failureCode')}: {failure.get('failureReason')}")
+
+    if any(result["error"] for result in results) or totals["failures"]:
+        log("WARNING", "A retenção não foi concluída em todos os repositórios.")
+        return False
+    if apply:
+        log("SUCCESS", f"{totals['deleted']} imagem(ns) excluída(s), {_gb(totals['reclaimable']):,.2f} GB liberados.")
+    else:
+        log("SUCCESS", f"Simulação concluída: {totals['expired']} imagem(ns), {_gb(totals['reclaimable']):,.2f} GB "
+                       f"recuperáveis. Use --apply para excluir.")
+    return True
@@ -0,0 +1,284 @@
+"""
+Snapshot da topologia do ECS (cluster → serviço → tarefa → instância de container) com APIs em lote
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .cache import cached_fetch, delete_entry
+from .utils import log
+
+console = Console()
+
+MAX_WORKERS = 8
+# Tamanhos máximos de lote das APIs de descrição do ECS
+CLUSTERS_PER_CALL = 100
+SERVICES_PER_CALL = 10
+TASKS_PER_CALL = 100
+INSTANCES_PER_CALL = 100
+CACHE_KEY = "ecs"
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def _name(arn):
+    return arn.rsplit("/", 1)[-1] if arn else None
+
+def _time(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S") if hasattr(value, "strftime") else value
+
+def _service(item):
+    return {
+        "arn": item["serviceArn"],
+        "name": item["serviceName"],
+        "status": item.get("status"),
+        "desired": item.get("desiredCount", 0),
+        "running": item.get("runningCount", 0),
+        "pending": item.get("pendingCount", 0),
+        "launch_type": item.get("launchType") or ("CAPACITY_PROVIDER" if item.get("capacityProviderStrategy") else None),
+        "task_definition": _name(item.get("taskDefinition")),
+        "deployments": [
+            {"status": deployment.get("status"), "rollout": deployment.get("rolloutState"),
+             "desired": deployment.get("desiredCount", 0), "running": deployment.get("runningCount", 0),
+             "pending": deployment.get("pendingCount", 0), "task_definition": _name(deployment.get("taskDefinition")),
+             "updated_at": _time(deployment.get("updatedAt"))}
+            for deployment in item.get("deployments", [])
+        ],
+        "events": [event.get("message") for event in item.get("events", [])[:5]],
+    }
+
+def _task(item):
+    group = item.get("group") or ""
+    return {
+        "arn": item["taskArn"],
+        "id": _name(item["taskArn"]),
+        "service": group[len("service:"):] if group.startswith("service:") else None,
+        "status": item.get("lastStatus"),
+        "desired_status": item.get("desiredStatus"),
+        "health": item.get("healthStatus"),
+        "launch_type": item.get("launchType"),
+        "instance": item.get("containerInstanceArn"),
+        "az": item.get("availabilityZone"),
+        "started_at": _time(item.get("startedAt")),
+        "task_definition": _name(item.get("taskDefinitionArn")),
+        "cpu": item.get("cpu"),
+        "memory": item.get("memory"),
+        "containers": [
+            {"name": container.get("name"), "status": container.get("lastStatus"),
+             "health": container.get("healthStatus"), "exit_code": container.get("exitCode"),
+             "image": container.get("image")}
+            for container in item.get("containers", [])
+        ],
+    }
+
+def _instance(item):
+    remaining = {resource["name"]: resource.get("integerValue") for resource in item.get("remainingResources", [])}
+    return {
+        "arn": item["containerInstanceArn"],
+        "ec2_instance": item.get("ec2InstanceId"),
+        "status": item.get("status"),
+        "agent_connected": item.get("agentConnected"),
+        "running_tasks": item.get("runningTasksCount", 0),
+        "pending_tasks": item.get("pendingTasksCount", 0),
+        "remaining_cpu": remaining.get("CPU"),
+        "remaining_memory": remaining.get("MEMORY"),
+    }
+
+def collect_cluster(client, cluster):
+    """Coleta serviços, tarefas e instâncias de um cluster usando as APIs de descrição em lote"""
+    arn = cluster["clusterArn"]
+    result = {"arn": arn, "name": cluster["clusterName"], "status": cluster.get("status"),
+              "services": [], "tasks": [], "instances": [], "error": None}
+    try:
+        service_arns = [service_arn for page in paginate(client, "list_services", cluster=arn)
+                        for service_arn in page.get("serviceArns", [])]
+        for chunk in _chunks(service_arns, SERVICES_PER_CALL):
+            response = client.describe_services(cluster=arn, services=chunk)
+            result["services"].extend(_service(item) for item in response.get("services", []))
+
+        task_arns = [task_arn for page in paginate(client, "list_tasks", cluster=arn)
+                     for task_arn in page.get("taskArns", [])]
+        for chunk in _chunks(task_arns, TASKS_PER_CALL):
+            response = client.describe_tasks(cluster=arn, tasks=chunk)
+            result["tasks"].extend(_task(item) for item in response.get("tasks", []))
+
+        instance_arns = [instance_arn for page in paginate(client, "list_container_instances", cluster=arn)
+                         for instance_arn in page.get("containerInstanceArns", [])]
+        for chunk in _chunks(instance_arns, INSTANCES_PER_CALL):
+            response = client.describe_container_instances(cluster=arn, containerInstances=chunk)
+            result["instances"].extend(_instance(item) for item in response.get("containerInstances", []))
+    except (BotoCoreError, ClientError) as e:
+        result["error"] = str(e)
+    result["services"].sort(key=lambda service: service["name"])
+    return result
+
+def collect_snapshot(profile=None, region=None, max_workers=MAX_WORKERS):
+    """Monta o snapshot de todos os clusters da região, coletando os clusters em paralelo"""
+    client = get_client("ecs", profile, region)
+    cluster_arns = [cluster_arn for page in paginate(client, "list_clusters")
+                    for cluster_arn in page.get("clusterArns", [])]
+    clusters = []
+    for chunk in _chunks(cluster_arns, CLUSTERS_PER_CALL):
+        clusters.extend(client.describe_clusters(clusters=chunk).get("clusters", []))
+
+    results = []
+    if clusters:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(clusters)))) as executor:
+            futures = [executor.submit(collect_cluster, client, cluster) for cluster in clusters]
+            for future in as_completed(futures):
+                results.append(future.result())
+    results.sort(key=lambda cluster: cluster["name"])
+    return {"fetched_at": time.time(), "clusters": results}
+
+def get_snapshot(profile=None, region=None, cache_mode="auto", max_workers=MAX_WORKERS):
+    """Retorna (snapshot, do_cache, erro); o snapshot fica em cache por pouco tempo (TTL "ecs")"""
+    state = {"error": None, "partial": None}
+
+    def fetch():
+        try:
+            snapshot = collect_snapshot(profile, region, max_workers)
+        except (BotoCoreError, ClientError) as e:
+            state["error"] = str(e)
+            return None
+        # Snapshots com clusters incompletos são exibidos, mas não gravados no cache
+        if any(cluster["error"] for cluster in snapshot["clusters"]):
+            state["partial"] = snapshot
+            return None
+        return snapshot
+
+    snapshot, cached = cached_fetch(profile, region, CACHE_KEY, fetch, cache_mode)
+    if snapshot is None and state["partial"] is not None:
+        return state["partial"], False, None
+    return snapshot, cached, state["error"]
+
+def find_service(snapshot, cluster, service):
+    """Localiza (cluster, serviço) no snapshot pelo nome ou ARN"""
+    for item in snapshot["clusters"]:
+        if cluster not in (item["name"], item["arn"]):
+            continue
+        for candidate in item["services"]:
+            if service in (candidate["name"], candidate["arn"]):
+                return item, candidate
+        return item, None
+    return None, None
+
+def render_snapshot(snapshot, cluster=None):
+    """Exibe os serviços de cada cluster com contagens de tarefas e instâncias"""
+    for item in snapshot["clusters"]:
+        if cluster and cluster not in (item["name"], item["arn"]):
+            continue
+        if item["error"]:
+            log("ERROR", f"Falha ao coletar o cluster '{item['name']}': {item['error']}")
+        tasks_by_service = {}
+        for task in item["tasks"]:
+            tasks_by_service[task["service"]] = tasks_by_service.get(task["service"], 0) + 1
+        connected = sum(1 for instance in item["instances"] if instance["agent_connected"])
+
+        table = Table(title=f"{item['name']} - {len(item['services'])} serviço(s), "
+                            f"{len(item['tasks'])} tarefa(s), {connected}/{len(item['instances'])} instância(s)")
+        for column in ("Serviço", "Status", "Desejado", "Executando", "Pendente", "Tarefas", "Tipo", "Task definition"):
+            table.add_column(column)
+        for service in item["services"]:
+            healthy = service["running"] >= service["desired"] and not service["pending"]
+            color = "green" if healthy else "yellow"
+            table.add_row(service["name"], service["status"] or "-", str(service["desired"]),
+                          f"[{color}]{service['running']}[/{color}]", str(service["pending"]),
+                          str(tasks_by_service.get(service["name"], 0)), service["launch_type"] or "-",
+                          service["task_definition"] or "-")
+        console.print(table)
+
+def _container_label(container):
+    label = f"{container['name']}={container['status']}"
+    if container["exit_code"] is not None:
+        label = f"{label} (saída {container['exit_code']})"
+    return label
+
+def render_service(cluster, service):
+    """Exibe implantações, tarefas (com contêineres e instância) e eventos recentes de um serviço"""
+    console.print(f"[bold]{cluster['name']} / {service['name']}[/bold] - {service['status']} - "
+                  f"desejado {service['desired']}, executando {service['running']}, pendente {service['pending']}")
+
+    deployments = Table(title="Implantações")
+    for column in ("Status", "Rollout", "Desejado", "Executando", "Pendente", "Task definition", "Atualizado em"):
+        deployments.add_column(column)
+    for deployment in service["deployments"]:
+        deployments.add_row(deployment["status"] or "-", deployment["rollout"] or "-", str(deployment["desired"]),
+                            str(deployment["running"]), str(deployment["pending"]),
+                            deployment["task_definition"] or "-", deployment["updated_at"] or "-")
+    console.print(deployments)
+
+    instances = {instance["arn"]: instance for instance in cluster["instances"]}
+    tasks = Table(title="Tarefas")
+    for column in ("Tarefa", "Status", "Saúde", "Instância", "AZ", "Iniciada em", "Contêineres"):
+        tasks.add_column(column, overflow="fold")
+    for task in cluster["tasks"]:
+        if task["service"] != service["name"]:
+            continue
+        instance = instances.get(task["instance"]) or {}
+        containers = ", ".join(_container_label(container) for container in task["containers"])
+        tasks.add_row(task["id"], task["status"] or "-", task["health"] or "-",
+                      instance.get("ec2_instance") or task["launch_type"] or "-", task["az"] or "-",
+                      task["started_at"] or "-", containers)
+    console.print(tasks)
+
+    for message in service["events"]:
+        console.print(f"  [dim]{message}[/dim]")
+
+def show_ecs(profile=None, region=None, cluster=None, cache_mode="auto", max_workers=MAX_WORKERS):
+    """Exibe o snapshot do ECS (de todos os clusters ou de um)"""
+    start = time.monotonic()
+    snapshot, cached, error = get_snapshot(profile, region, cache_mode, max_workers)
+    if snapshot is None:
+        log("ERROR", f"Falha ao coletar a topologia do ECS: {error}")
+        return False
+    if not snapshot["clusters"]:
+        log("INFO", "Nenhum cluster ECS encontrado.")
+        return True
+    if cluster and not any(cluster in (item["name"], item["arn"]) for item in snapshot["clusters"]):
+        log("ERROR", f"Cluster '{cluster}' não encontrado.")
+        return False
+    render_snapshot(snapshot, cluster)
+    source = "cache" if cached else f"coletado em {time.monotonic() - start:.1f}s"
+    log("SUCCESS", f"Topologia do ECS exibida ({source}).")
+    return not any(item["error"] for item in snapshot["clusters"])
+
+def inspect_service(profile=None, region=None, cluster=None, service=None, cache_mode="auto"):
+    """Detalha um serviço a partir do snapshot"""
+    snapshot, _, error = get_snapshot(profile, region, cache_mode)
+    if snapshot is None:
+        log("ERROR", f"Falha ao coletar a topologia do ECS: {error}")
+        return False
+    cluster_item, service_item = find_service(snapshot, cluster, service)
+    if cluster_item is None:
+        log("ERROR", f"Cluster '{cluster}' não encontrado.")
+        return False
+    if service_item is None:
+        log("ERROR", f"Serviço '{service}' não encontrado no cluster '{cluster_item['name']}'.")
+        return False
+    render_service(cluster_item, service_item)
+    return True
+
+def scale_service(profile=None, region=None, cluster=None, service=None, desired=0, cache_mode="auto"):
+    """Altera o número desejado de tarefas de um serviço localizado no snapshot e invalida o cache"""
+    snapshot, _, error = get_snapshot(profile, region, cache_mode)
+    if snapshot is None:
+        log("ERROR", f"Falha ao coletar a topologia do ECS: {error}")
+        return False
+    cluster_item, service_item = find_service(snapshot, cluster, service)
+    if cluster_item is None or service_item is None:
+        log("ERROR", f"Serviço '{service}' não encontrado no cluster '{cluster}'.")
+        return False
+
+    log("INFO", f"Atualizando serviço {service_item['name']} de {service_item['desired']} para {desired} tarefas")
+    try:
+        get_client("ecs", profile, region).update_service(cluster=cluster_item["arn"], service=service_item["arn"],
+                                                          desiredCount=desired)
+    except (BotoCoreError, ClientError) as e:
+        log("ERROR", f"Erro ao atualizar serviço: {str(e)}")
+        return False
+    delete_entry(profile, region, CACHE_KEY)
+    log("SUCCESS", "Serviço atualizado com sucesso.")
+    return True
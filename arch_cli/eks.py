@@ -0,0 +1,213 @@
+"""
+Inventário de clusters EKS (nodegroups, perfis Fargate e add-ons) em todas as regiões habilitadas
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .fanout import resolve_targets
+from .utils import log
+
+console = Console()
+
+MAX_WORKERS = 16
+
+def _version_key(version):
+    try:
+        return tuple(int(part) for part in str(version).split("."))
+    except ValueError:
+        return ()
+
+def get_version_support(profile=None, region=None):
+    """Status de suporte de cada versão do Kubernetes no EKS ({versão: status}); vazio se indisponível"""
+    try:
+        client = get_client("eks", profile, region or "us-east-1")
+        support = {}
+        for page in paginate(client, "describe_cluster_versions", includeAll=True):
+            for item in page.get("clusterVersions", []):
+                support[item["clusterVersion"]] = item.get("versionStatus") or item.get("status")
+        return support
+    except (AttributeError, BotoCoreError, ClientError):
+        # Versões antigas do botocore não têm DescribeClusterVersions
+        return {}
+
+# Cada tarefa executa uma chamada e retorna as próximas tarefas; assim nenhuma thread do pool
+# fica bloqueada esperando outra e todas as chamadas de todos os clusters compartilham o mesmo pool
+
+def _list_clusters(inventory, profile, region):
+    client = get_client("eks", profile, region)
+    tasks = []
+    for page in paginate(client, "list_clusters"):
+        for name in page.get("clusters", []):
+            inventory[(profile, region, name)] = {
+                "profile": profile, "region": region, "name": name, "version": None, "status": None,
+                "platform": None, "nodegroups": [], "fargate": [], "addons": [], "errors": [],
+            }
+            tasks += [(_describe_cluster, profile, region, name), (_list_nodegroups, profile, region, name),
+                      (_list_fargate, profile, region, name), (_list_addons, profile, region, name)]
+    return tasks
+
+def _describe_cluster(inventory, profile, region, name):
+    cluster = get_client("eks", profile, region).describe_cluster(name=name)["cluster"]
+    entry = inventory[(profile, region, name)]
+    entry.update(version=cluster.get("version"), status=cluster.get("status"),
+                 platform=cluster.get("platformVersion"),
+                 support_type=(cluster.get("upgradePolicy") or {}).get("supportType"))
+    return []
+
+def _list_nodegroups(inventory, profile, region, name):
+    client = get_client("eks", profile, region)
+    return [(_describe_nodegroup, profile, region, name, nodegroup)
+            for page in paginate(client, "list_nodegroups", clusterName=name)
+            for nodegroup in page.get("nodegroups", [])]
+
+def _describe_nodegroup(inventory, profile, region, name, nodegroup):
+    item = get_client("eks", profile, region).describe_nodegroup(clusterName=name, nodegroupName=nodegroup)["nodegroup"]
+    scaling = item.get("scalingConfig", {})
+    inventory[(profile, region, name)]["nodegroups"].append({
+        "name": nodegroup, "status": item.get("status"), "version": item.get("version"),
+        "instance_types": item.get("instanceTypes") or [], "capacity_type": item.get("capacityType"),
+        "desired": scaling.get("desiredSize", 0), "min": scaling.get("minSize", 0), "max": scaling.get("maxSize", 0),
+    })
+    return []
+
+def _list_fargate(inventory, profile, region, name):
+    client = get_client("eks", profile, region)
+    return [(_describe_fargate, profile, region, name, fargate)
+            for page in paginate(client, "list_fargate_profiles", clusterName=name)
+            for fargate in page.get("fargateProfileNames", [])]
+
+def _describe_fargate(inventory, profile, region, name, fargate):
+    item = get_client("eks", profile, region).describe_fargate_profile(
+        clusterName=name, fargateProfileName=fargate)["fargateProfile"]
+    inventory[(profile, region, name)]["fargate"].append({
+        "name": fargate, "status": item.get("status"),
+        "namespaces": [selector.get("namespace") for selector in item.get("selectors", [])],
+    })
+    return []
+
+def _list_addons(inventory, profile, region, name):
+    client = get_client("eks", profile, region)
+    return [(_describe_addon, profile, region, name, addon)
+            for page in paginate(client, "list_addons", clusterName=name)
+            for addon in page.get("addons", [])]
+
+def _describe_addon(inventory, profile, region, name, addon):
+    item = get_client("eks", profile, region).describe_addon(clusterName=name, addonName=addon)["addon"]
+    inventory[(profile, region, name)]["addons"].append({
+        "name": addon, "version": item.get("addonVersion"), "status": item.get("status"),
+    })
+    return []
+
+def collect_inventory(targets, max_workers=MAX_WORKERS):
+    """Executa todas as chamadas (regiões, clusters, nodegroups, Fargate e add-ons) em um único pool.
+    Retorna (clusters, erros por região)."""
+    inventory, region_errors = {}, []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_list_clusters, inventory, profile, region): (_list_clusters, profile, region)
+                   for profile, region in targets}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                try:
+                    followups = future.result()
+                except (BotoCoreError, ClientError) as e:
+                    profile, region = task[1], task[2]
+                    if task[0] is _list_clusters:
+                        region_errors.append({"profile": profile, "region": region, "error": str(e)})
+                    else:
+                        inventory[(profile, region, task[3])]["errors"].append(f"{task[0].__name__[1:]}: {str(e)}")
+                    continue
+                for followup in followups:
+                    pending[executor.submit(followup[0], inventory, *followup[1:])] = followup
+
+    clusters = sorted(inventory.values(), key=lambda cluster: (cluster["profile"] or "", cluster["region"], cluster["name"]))
+    for cluster in clusters:
+        for key in ("nodegroups", "fargate", "addons"):
+            cluster[key].sort(key=lambda item: item["name"])
+    return clusters, region_errors
+
+def classify(cluster, support, min_version=None):
+    """Situação da versão do cluster: 'desatualizado', 'suporte estendido', 'padrão' ou '-'"""
+    version = cluster["version"]
+    if not version:
+        return "-"
+    if min_version and _version_key(version) < _version_key(min_version):
+        return "desatualizado"
+    # versionStatus vem como UNSUPPORTED/EXTENDED_SUPPORT e o campo legado status como unsupported/extended-support
+    status = (support.get(version) or "").upper().replace("-", "_") or None
+    if status == "UNSUPPORTED":
+        return "desatualizado"
+    if status == "EXTENDED_SUPPORT":
+        return "suporte estendido"
+    if status in ("STANDARD_SUPPORT", "ACTIVE"):
+        return "padrão"
+    if support and status is None:
+        # Versão que não aparece mais na lista do EKS: fora de suporte
+        return "desatualizado"
+    return "-"
+
+def render_inventory(clusters, show_profile=False):
+    """Tabela única: um cluster por linha com versão, capacidade somada e tipos de instância"""
+    table = Table(title=f"Clusters EKS - {len(clusters)} cluster(s)")
+    columns = (["Perfil"] if show_profile else []) + ["Região", "Cluster", "Versão", "Suporte", "Status", "Nodegroups",
+                                                      "Desejado/Mín/Máx", "Tipos de instância", "Fargate", "Add-ons"]
+    for column in columns:
+        table.add_column(column, overflow="fold")
+    colors = {"desatualizado": "red", "suporte estendido": "yellow", "padrão": "green"}
+    for cluster in clusters:
+        nodegroups = cluster["nodegroups"]
+        versions = sorted({nodegroup["version"] for nodegroup in nodegroups if nodegroup["version"]}, key=_version_key)
+        version = cluster["version"] or "-"
+        if versions and versions != [cluster["version"]]:
+            # Nodegroups em versão diferente do plano de controle
+            version = f"{version} (nós: {', '.join(versions)})"
+        types = sorted({instance_type for nodegroup in nodegroups for instance_type in nodegroup["instance_types"]})
+        capacity = "/".join(str(sum(nodegroup[key] for nodegroup in nodegroups)) for key in ("desired", "min", "max"))
+        color = colors.get(cluster["support"])
+        support = f"[{color}]{cluster['support']}[/{color}]" if color else cluster["support"]
+        row = ([cluster["profile"] or "-"] if show_profile else []) + [
+            cluster["region"], cluster["name"], version, support, cluster["status"] or "-", str(len(nodegroups)),
+            capacity if nodegroups else "-", ", ".join(types) or "-", str(len(cluster["fargate"])),
+            ", ".join(f"{addon['name']} {addon['version']}" for addon in cluster["addons"]) or "-",
+        ]
+        table.add_row(*row)
+    console.print(table)
+
+def eks_inventory(profile=None, all_profiles=False, regions=None, min_version=None, outdated_only=False,
+                  max_workers=MAX_WORKERS):
+    """Lista os clusters EKS de todas as regiões habilitadas (ou das informadas) em paralelo"""
+    start = time.monotonic()
+    targets = resolve_targets(profile, all_profiles, regions or ["all"])
+    if not targets:
+        return False
+    log("INFO", f"Coletando clusters EKS em {len(targets)} alvo(s) (perfil × região)")
+
+    clusters, region_errors = collect_inventory(targets, max_workers)
+    # A lista de versões é a mesma em todas as regiões: consultada uma vez, em uma região que respondeu
+    reference = clusters[0] if clusters else {"profile": targets[0][0], "region": targets[0][1]}
+    support = get_version_support(reference["profile"], reference["region"])
+    for cluster in clusters:
+        cluster["support"] = classify(cluster, support, min_version)
+    if outdated_only:
+        clusters = [cluster for cluster in clusters if cluster["support"] in ("desatualizado", "suporte estendido")]
+
+    for error in region_errors:
+        log("ERROR", f"{error['profile']} - Falha ao listar clusters em {error['region']}: {error['error']}")
+    for cluster in clusters:
+        for error in cluster["errors"]:
+            log("WARNING", f"{cluster['name']} ({cluster['region']}): {error}")
+
+    render_inventory(clusters, all_profiles)
+    outdated = sum(1 for cluster in clusters if cluster["support"] in ("desatualizado", "suporte estendido"))
+    if outdated:
+        log("WARNING", f"{outdated} cluster(s) em versão desatualizada ou em suporte estendido.")
+    if region_errors or any(cluster["errors"] for cluster in clusters):
+        log("WARNING", "Inventário do EKS incompleto: algumas regiões ou clusters não puderam ser coletados.")
+        return False
+    log("SUCCESS", f"Inventário do EKS concluído em {time.monotonic() - start:.1f}s.")
+    return True
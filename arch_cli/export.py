@@ -0,0 +1,79 @@
+"""
+Exportação em streaming de resultados (NDJSON/CSV, opcionalmente com gzip)
+"""
+
+import os
+import csv
+import gzip
+import json
+import datetime
+
+FORMATS = ["ndjson", "csv"]
+
+def default_export_dir(name="aws_resources"):
+    """Diretório de exportação padrão, no mesmo formato usado pelos módulos bash"""
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return os.path.join(".", name, timestamp)
+
+def _json_default(value):
+    """Serializa tipos retornados pelo boto3 que o json não conhece"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+class StreamWriter:
+    """Grava itens página a página em NDJSON (registro completo) ou CSV (colunas da tabela).
+    O arquivo é escrito como .part e renomeado apenas quando fechado com sucesso."""
+
+    def __init__(self, path, fmt="ndjson", compress=False, columns=None, row=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato de exportação inválido: {fmt}")
+        self.fmt = fmt
+        self.path = f"{path}.{fmt}" + (".gz" if compress else "")
+        self.count = 0
+        self._row = row
+        self._tmp_path = f"{self.path}.part"
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if compress:
+            self._file = gzip.open(self._tmp_path, "wt", encoding="utf-8", newline="")
+        else:
+            self._file = open(self._tmp_path, "w", encoding="utf-8", newline="")
+
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(columns or [])
+
+    def write_page(self, items):
+        """Grava os itens de uma página"""
+        if self._csv is not None:
+            self._csv.writerows(self._row(item) if self._row else item for item in items)
+        else:
+            for item in items:
+                self._file.write(json.dumps(item, default=_json_default))
+                self._file.write("\n")
+        self.count += len(items)
+
+    def close(self, success=True):
+        """Fecha o arquivo, publicando-o apenas em caso de sucesso"""
+        if self._file.closed:
+            return
+        self._file.close()
+        if success:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(success=exc_type is None)
+        return False
+
+def tee_pages(pages, writer):
+    """Grava cada página no writer à medida que chega e a repassa adiante"""
+    for items in pages:
+        writer.write_page(items)
+        yield items
@@ -0,0 +1,128 @@
+"""
+Execução de coletores em múltiplos perfis e regiões usando um pool de processos
+"""
+
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, TimeoutError
+from .utils import get_aws_profiles, log
+
+DEFAULT_TIMEOUT = 300
+
+class TargetTimeout(Exception):
+    """Tempo limite de execução de um alvo (perfil × região) excedido"""
+
+def _on_alarm(signum, frame):
+    raise TargetTimeout()
+
+def parse_regions(value):
+    """Converte o valor de --regions (separado por vírgula) em lista"""
+    if not value:
+        return None
+    return [region.strip() for region in value.split(",") if region.strip()]
+
+def resolve_targets(profile=None, all_profiles=False, regions=None):
+    """Monta a lista de alvos (perfil, região) a partir dos perfis configurados"""
+    profiles = [p for p in get_aws_profiles() if p] if all_profiles else [profile]
+    if not profiles:
+        log("ERROR", "Nenhum perfil AWS encontrado.")
+        return []
+
+    if regions != ["all"]:
+        return [(p, region) for p in profiles for region in (regions or [None])]
+
+    # Descobrir as regiões habilitadas de cada conta em paralelo
+    from .aws import get_enabled_regions
+
+    targets = []
+    with ThreadPoolExecutor(max_workers=min(8, len(profiles))) as executor:
+        futures = {executor.submit(get_enabled_regions, p): p for p in profiles}
+        for future in as_completed(futures):
+            p = futures[future]
+            try:
+                targets.extend((p, region) for region in future.result())
+            except Exception as e:
+                log("ERROR", f"Falha ao listar regiões do perfil '{p}': {str(e)}")
+    return sorted(targets, key=lambda target: (target[0] or "", target[1] or ""))
+
+def _run_target(func, profile, region, args, timeout):
+    """Executa func(profile, region, *args) no processo filho respeitando o tempo limite"""
+    start = time.monotonic()
+    # SIGALRM interrompe inclusive chamadas de rede bloqueadas (indisponível no Windows)
+    use_alarm = bool(timeout) and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    result, error = None, None
+    try:
+        result = func(profile, region, *args)
+    except TargetTimeout:
+        error = f"Tempo limite de {timeout}s excedido"
+    except Exception as e:
+        error = str(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    return {
+        "profile": profile,
+        "region": region,
+        "result": result,
+        "error": error,
+        "duration": time.monotonic() - start,
+    }
+
+def _terminate(executor):
+    """Encerra os processos do pool que ainda executam alvos. Futures em execução não podem ser
+    cancelados e o encerramento do executor (inclusive na saída do interpretador) espera os filhos,
+    então um filho que ignora o SIGALRM bloquearia o CLI."""
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.terminate()
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+
+def run_targets(func, targets, max_workers=None, timeout=DEFAULT_TIMEOUT):
+    """Executa func(profile, region, *args) para cada alvo (profile, region, *args) em
+    um pool de processos, retornando os resultados à medida que cada alvo termina"""
+    if not targets:
+        return
+
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(targets)))
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    futures = {
+        executor.submit(_run_target, func, target[0], target[1], tuple(target[2:]), timeout): target
+        for target in targets
+    }
+
+    # Proteção no processo pai caso um filho não consiga ser interrompido
+    overall = None
+    if timeout:
+        overall = timeout * -(-len(targets) // max_workers) + 30
+
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=overall):
+            pending.discard(future)
+            yield future.result()
+    except TimeoutError:
+        for future in pending:
+            # Impede que alvos ainda na fila sejam iniciados; os em execução são encerrados abaixo
+            future.cancel()
+            target = futures[future]
+            yield {
+                "profile": target[0],
+                "region": target[1],
+                "result": None,
+                "error": f"Tempo limite de {timeout}s excedido",
+                "duration": overall,
+            }
+    finally:
+        if pending:
+            _terminate(executor)
+        executor.shutdown(wait=True)
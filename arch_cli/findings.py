@@ -0,0 +1,382 @@
+"""
+Armazenamento local dos achados do Prowler em SQLite, com consultas indexadas e comparação entre varreduras
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+import sqlite3
+import datetime
+from rich.console import Console
+from rich.table import Table
+from .utils import CONFIG_DIR, log
+
+console = Console()
+
+FINDINGS_DB = os.path.join(CONFIG_DIR, "findings.db")
+BATCH_ROWS = 5000
+DEFAULT_LIMIT = 50
+FORMATS = ["table", "ndjson"]
+
+# Colunas do CSV do Prowler (v3 e v4) usadas em cada campo, em ordem de preferência
+COLUMNS = {
+    "account": ["ACCOUNT_UID", "ACCOUNT_ID"],
+    "region": ["REGION"],
+    "check_id": ["CHECK_ID"],
+    "resource": ["RESOURCE_UID", "RESOURCE_ARN", "RESOURCE_ID"],
+    "status": ["STATUS"],
+    "severity": ["SEVERITY"],
+    "service": ["SERVICE_NAME"],
+    "title": ["CHECK_TITLE"],
+    "detail": ["STATUS_EXTENDED"],
+}
+FIELDS = list(COLUMNS)
+# Colunas com o início da varredura (v4 e v3)
+TIME_COLUMNS = ["TIMESTAMP", "ASSESSMENT_START_TIME"]
+# Data e hora no nome do diretório (arch-cli prowler scan: 2024-05-01_12-00-00) ou do arquivo
+# (prowler-output-<conta>-20240501120000.csv)
+NAME_TIME = re.compile(r"(?<!\d)(\d{4})-?(\d{2})-?(\d{2})(?:[T_ -]?(\d{2})[-:]?(\d{2})(?:[-:]?(\d{2}))?)?(?!\d)")
+# Ordem das varreduras: horário da varredura ou, se desconhecido, o da importação
+SCAN_ORDER = "COALESCE(scanned_at, ingested_at)"
+
+def _connect():
+    """Abre o banco de achados, criando o esquema e os índices se necessário"""
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    conn = sqlite3.connect(FINDINGS_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS scans (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            path TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            ingested_at REAL NOT NULL,
+            findings INTEGER NOT NULL DEFAULT 0,
+            scanned_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS findings (
+            scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+            account TEXT NOT NULL,
+            region TEXT NOT NULL,
+            check_id TEXT NOT NULL,
+            resource TEXT NOT NULL,
+            status TEXT NOT NULL,
+            severity TEXT,
+            service TEXT,
+            title TEXT,
+            detail TEXT
+        );
+        CREATE INDEX IF NOT EXISTS findings_key ON findings (scan_id, account, region, check_id, resource);
+        CREATE INDEX IF NOT EXISTS findings_status ON findings (scan_id, status, severity);
+        CREATE INDEX IF NOT EXISTS findings_check ON findings (scan_id, check_id);
+        CREATE INDEX IF NOT EXISTS findings_resource ON findings (resource);
+        """
+    )
+    # Bancos criados antes da coluna scanned_at
+    if "scanned_at" not in {row[1] for row in conn.execute("PRAGMA table_info(scans)")}:
+        conn.execute("ALTER TABLE scans ADD COLUMN scanned_at REAL")
+    return conn
+
+def find_csv_files(path):
+    """CSVs de achados sob o diretório da varredura (ignora compliance e o resumo do orquestrador)"""
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, dirs, names in os.walk(path):
+        # Tentativas com falha e execuções em andamento não fazem parte da varredura
+        dirs[:] = sorted(d for d in dirs if d != "compliance" and not d.endswith(".failed") and ".partial-" not in d)
+        files.extend(os.path.join(root, name) for name in sorted(names)
+                     if name.endswith(".csv") and name != "summary.csv")
+    return files
+
+def _fingerprint(files):
+    """Identifica o conteúdo da varredura pelo tamanho e mtime dos arquivos, sem lê-los"""
+    parts = []
+    for name in files:
+        stat = os.stat(name)
+        parts.append([name, stat.st_size, stat.st_mtime_ns])
+    return json.dumps(parts)
+
+def _parse_time(value):
+    try:
+        moment = datetime.datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return moment.timestamp()
+
+def _name_time(name):
+    """Data e hora (hora local) contidas em um nome de diretório ou arquivo"""
+    for match in NAME_TIME.finditer(name):
+        try:
+            moment = datetime.datetime(*(int(part) for part in match.groups(default="0")))
+        except ValueError:
+            continue
+        if 2000 <= moment.year <= 2100:
+            return moment.timestamp()
+    return None
+
+def scan_time(path, files):
+    """Momento da varredura: coluna de horário do primeiro achado, senão o nome do diretório
+    ou dos arquivos; None se não for possível determinar"""
+    for file in files:
+        with open(file, newline="", encoding="utf-8", errors="replace") as f:
+            header = f.readline()
+            delimiter = ";" if header.count(";") > header.count(",") else ","
+            columns = [column.strip().upper() for column in next(csv.reader([header], delimiter=delimiter))]
+            row = next(csv.reader(f, delimiter=delimiter), None)
+        for column in TIME_COLUMNS:
+            if row and column in columns and columns.index(column) < len(row):
+                value = _parse_time(row[columns.index(column)])
+                if value is not None:
+                    return value
+    for name in [os.path.basename(path.rstrip(os.sep))] + [os.path.basename(file) for file in files]:
+        value = _name_time(name)
+        if value is not None:
+            return value
+    return None
+
+def iter_findings(path):
+    """Lê um CSV do Prowler linha a linha, retornando tuplas na ordem de FIELDS"""
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        header = f.readline()
+        delimiter = ";" if header.count(";") > header.count(",") else ","
+        columns = [column.strip().upper() for column in next(csv.reader([header], delimiter=delimiter))]
+        positions = {}
+        for field, aliases in COLUMNS.items():
+            positions[field] = next((columns.index(alias) for alias in aliases if alias in columns), None)
+        if positions["check_id"] is None or positions["status"] is None:
+            return
+        for row in csv.reader(f, delimiter=delimiter):
+            values = []
+            for field in FIELDS:
+                index = positions[field]
+                value = row[index] if index is not None and index < len(row) else ""
+                values.append(value.upper() if field == "status" else value.lower() if field == "severity" else value)
+            yield tuple(values)
+
+def _batches(items, size=BATCH_ROWS):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def ingest_scan(path, name=None, force=False):
+    """Importa os CSVs de uma varredura em streaming, em lotes; reimporta apenas se os arquivos mudaram.
+    Retorna {name, findings, skipped}."""
+    path = os.path.abspath(path)
+    name = name or os.path.basename(path.rstrip(os.sep))
+    files = find_csv_files(path)
+    if not files:
+        raise ValueError(f"Nenhum CSV do Prowler encontrado em {path}")
+    fingerprint = _fingerprint(files)
+    # Campos como RESOURCE_DETAILS podem exceder o limite padrão do módulo csv
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT id, fingerprint, findings FROM scans WHERE name = ?", (name,)).fetchone()
+        if row and row[1] == fingerprint and not force:
+            return {"name": name, "findings": row[2], "skipped": True}
+
+        with conn:
+            if row:
+                conn.execute("DELETE FROM scans WHERE id = ?", (row[0],))
+            scan_id = conn.execute(
+                "INSERT INTO scans (name, path, fingerprint, ingested_at, scanned_at) VALUES (?, ?, ?, ?, ?)",
+                (name, path, fingerprint, time.time(), scan_time(path, files)),
+            ).lastrowid
+            total = 0
+            for file in files:
+                for batch in _batches(iter_findings(file)):
+                    conn.executemany(
+                        f"INSERT INTO findings (scan_id, {', '.join(FIELDS)}) VALUES (?, {', '.join('?' for _ in FIELDS)})",
+                        [(scan_id,) + values for values in batch],
+                    )
+                    total += len(batch)
+            conn.execute("UPDATE scans SET findings = ? WHERE id = ?", (total, scan_id))
+    finally:
+        conn.close()
+    return {"name": name, "findings": total, "skipped": False}
+
+def list_scans():
+    """Varreduras importadas, da mais recente para a mais antiga (pelo horário da varredura)"""
+    conn = _connect()
+    try:
+        return conn.execute(f"SELECT name, path, ingested_at, findings, scanned_at FROM scans "
+                            f"ORDER BY {SCAN_ORDER} DESC, id DESC").fetchall()
+    finally:
+        conn.close()
+
+def _scan_id(conn, name=None):
+    """ID da varredura pelo nome ou, sem nome, a mais recente"""
+    if name:
+        row = conn.execute("SELECT id FROM scans WHERE name = ?", (name,)).fetchone()
+    else:
+        row = conn.execute(f"SELECT id FROM scans ORDER BY {SCAN_ORDER} DESC, id DESC LIMIT 1").fetchone()
+    return row[0] if row else None
+
+def _filters(filters):
+    """Condições SQL para os filtros informados (check e recurso aceitam prefixo/trecho)"""
+    clauses, params = [], []
+    for field in ("account", "region", "service"):
+        if filters.get(field):
+            clauses.append(f"{field} = ?")
+            params.append(filters[field])
+    if filters.get("status"):
+        clauses.append("status = ?")
+        params.append(filters["status"].upper())
+    if filters.get("severity"):
+        clauses.append(f"severity IN ({', '.join('?' for _ in filters['severity'])})")
+        params.extend(severity.lower() for severity in filters["severity"])
+    if filters.get("check"):
+        clauses.append("check_id LIKE ?")
+        params.append(f"{filters['check']}%")
+    if filters.get("resource"):
+        clauses.append("resource LIKE ?")
+        params.append(f"%{filters['resource']}%")
+    return clauses, params
+
+def query_findings(scan=None, limit=DEFAULT_LIMIT, **filters):
+    """Achados filtrados de uma varredura (padrão: a mais recente) e o total sem limite"""
+    conn = _connect()
+    try:
+        scan_id = _scan_id(conn, scan)
+        if scan_id is None:
+            return None, 0
+        clauses, params = _filters(filters)
+        where = " AND ".join(["scan_id = ?"] + clauses)
+        total = conn.execute(f"SELECT COUNT(*) FROM findings WHERE {where}", [scan_id] + params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(FIELDS)} FROM findings WHERE {where} "
+            f"ORDER BY account, region, check_id, resource LIMIT ?",
+            [scan_id] + params + [limit if limit else -1],
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(zip(FIELDS, row)) for row in rows], total
+
+def diff_scans(old=None, new=None, **filters):
+    """Compara as falhas de duas varreduras (padrão: as duas mais recentes) pela chave
+    conta/região/check/recurso. Retorna {new, resolved, still} ou None se faltar alguma varredura."""
+    conn = _connect()
+    try:
+        new_id = _scan_id(conn, new)
+        if old:
+            old_id = _scan_id(conn, old)
+        else:
+            # Sem varredura anterior informada: a executada imediatamente antes da nova
+            row = conn.execute(
+                f"SELECT id FROM scans, (SELECT {SCAN_ORDER} AS moment, id AS new_id FROM scans WHERE id = ?) "
+                f"WHERE {SCAN_ORDER} < moment OR ({SCAN_ORDER} = moment AND id < new_id) "
+                f"ORDER BY {SCAN_ORDER} DESC, id DESC LIMIT 1", (new_id,),
+            ).fetchone()
+            old_id = row[0] if row else None
+        if new_id is None or old_id is None or new_id == old_id:
+            return None
+        clauses, params = _filters(dict(filters, status=None))
+        extra = "".join(f" AND a.{clause}" for clause in clauses)
+        columns = ", ".join(f"a.{field}" for field in FIELDS)
+        key = "b.account = a.account AND b.region = a.region AND b.check_id = a.check_id AND b.resource = a.resource"
+
+        def select(left, right, exists):
+            return [dict(zip(FIELDS, row)) for row in conn.execute(
+                f"SELECT {columns} FROM findings a WHERE a.scan_id = ? AND a.status = 'FAIL'{extra} AND "
+                f"{'' if exists else 'NOT '}EXISTS (SELECT 1 FROM findings b WHERE b.scan_id = ? AND {key} "
+                f"AND b.status = 'FAIL') ORDER BY a.severity, a.account, a.region, a.check_id, a.resource",
+                [left] + params + [right],
+            )]
+
+        return {"new": select(new_id, old_id, False), "resolved": select(old_id, new_id, False),
+                "still": select(new_id, old_id, True)}
+    finally:
+        conn.close()
+
+def render_findings(rows, title):
+    """Exibe os achados em tabela"""
+    table = Table(title=title)
+    for column in ("Conta", "Região", "Check", "Recurso", "Status", "Severidade"):
+        table.add_column(column, overflow="fold")
+    colors = {"FAIL": "red", "PASS": "green"}
+    for row in rows:
+        color = colors.get(row["status"], "yellow")
+        table.add_row(row["account"], row["region"], row["check_id"], row["resource"],
+                      f"[{color}]{row['status']}[/{color}]", row["severity"] or "-")
+    console.print(table)
+
+def _print_ndjson(rows, **extra):
+    for row in rows:
+        sys.stdout.write(json.dumps(dict(row, **extra), ensure_ascii=False) + "\n")
+
+def ingest_paths(paths, name=None, force=False):
+    """Importa uma ou mais varreduras e informa o resultado de cada uma"""
+    if name and len(paths) > 1:
+        log("ERROR", "--name só pode ser usado com uma única varredura.")
+        return False
+    success = True
+    for path in paths:
+        start = time.monotonic()
+        try:
+            result = ingest_scan(path, name, force)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            log("ERROR", f"Falha ao importar '{path}': {str(e)}")
+            success = False
+            continue
+        if result["skipped"]:
+            log("INFO", f"Varredura '{result['name']}' já importada ({result['findings']} achado(s)); use --force para reimportar.")
+        else:
+            log("SUCCESS", f"Varredura '{result['name']}' importada: {result['findings']} achado(s) em "
+                           f"{time.monotonic() - start:.1f}s")
+    return success
+
+def show_findings(scan=None, limit=DEFAULT_LIMIT, fmt="table", **filters):
+    """Consulta os achados armazenados e exibe o resultado"""
+    start = time.monotonic()
+    rows, total = query_findings(scan, limit, **filters)
+    if rows is None:
+        log("ERROR", f"Varredura '{scan}' não encontrada." if scan else
+            "Nenhuma varredura importada. Use 'arch-cli prowler ingest <diretório>'.")
+        return False
+    if fmt == "ndjson":
+        _print_ndjson(rows)
+        return True
+    render_findings(rows, f"Achados ({len(rows)} de {total}, {1000 * (time.monotonic() - start):.0f} ms)")
+    return True
+
+def show_diff(old=None, new=None, fmt="table", **filters):
+    """Exibe os achados novos, resolvidos e que continuam falhando entre duas varreduras"""
+    result = diff_scans(old, new, **filters)
+    if result is None:
+        log("ERROR", "São necessárias duas varreduras importadas e distintas para comparar.")
+        return False
+    if fmt == "ndjson":
+        for change, rows in result.items():
+            _print_ndjson(rows, change=change)
+        return True
+    render_findings(result["new"], f"Novas falhas ({len(result['new'])})")
+    render_findings(result["resolved"], f"Falhas resolvidas ({len(result['resolved'])})")
+    console.print(f"Falhas que continuam: [yellow]{len(result['still'])}[/yellow]")
+    return True
+
+def show_scans():
+    """Exibe as varreduras importadas"""
+    scans = list_scans()
+    if not scans:
+        log("INFO", "Nenhuma varredura importada. Use 'arch-cli prowler ingest <diretório>'.")
+        return True
+    table = Table(title="Varreduras do Prowler importadas")
+    for column in ("Nome", "Executada em", "Importada em", "Achados", "Diretório"):
+        table.add_column(column, overflow="fold")
+    for name, path, ingested_at, findings, scanned_at in scans:
+        table.add_row(name, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(scanned_at)) if scanned_at else "-",
+                      time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ingested_at)), str(findings), path)
+    console.print(table)
+    return True
@@ -3,27 +3,24 @@ Módulo para integração com aws-finops-dashboard
 """
 
 import os
-import sys
-import subprocess
-import platform
+import shutil
 from rich.console import Console
 from rich.prompt import Confirm, Prompt
-from .utils import detect_os, log, run_command
+from .toolchain import probe_tool, probe_tools
+from .process import run_install, run_live
+from .utils import detect_os, get_aws_profiles, log
 
 console = Console()
 REPO_DIR = os.path.expanduser("~/.arch-cli/aws-finops-dashboard")
 
-def check_git():
+def check_git(recheck=False):
     """Verifica se o Git está instalado"""
-    try:
-        result = subprocess.run(["git", "--version"], capture_output=True, text=True)
-        if result.returncode == 0:
-            git_version = result.stdout.strip()
-            log("SUCCESS", f"Git já está instalado: {git_version}")
-            console.print(f"[green]Git já está instalado:[/green] {git_version}")
-            return True
-    except:
-        pass
+    tool = probe_tool("git", recheck)
+    if tool["installed"]:
+        git_version = tool["version"]
+        log("SUCCESS", f"Git já está instalado: {git_version}")
+        console.print(f"[green]Git já está instalado:[/green] {git_version}")
+        return True
     
     log("WARNING", "Git não está instalado.")
     console.print("[yellow]Git não está instalado.[/yellow]")
@@ -31,44 +28,39 @@ def check_git():
     if Confirm.ask("Deseja instalar Git?"):
         os_type = detect_os()
         if os_type in ["debian", "ubuntu"]:
-            run_command(["sudo", "apt-get", "update"])
-            run_command(["sudo", "apt-get", "install", "-y", "git"])
+            run_install(["sudo", "apt-get", "update"])
+            run_install(["sudo", "apt-get", "install", "-y", "git"])
         elif os_type in ["redhat", "amazon-linux"]:
-            run_command(["sudo", "yum", "install", "-y", "git"])
+            run_install(["sudo", "yum", "install", "-y", "git"])
         elif os_type == "macos":
-            run_command(["brew", "install", "git"])
+            run_install(["brew", "install", "git"])
         else:
             log("ERROR", "Sistema operacional não suportado para instalação automática.")
             console.print("[red]Por favor, instale o Git manualmente.[/red]")
             return False
             
-        try:
-            result = subprocess.run(["git", "--version"], capture_output=True, text=True)
-            if result.returncode == 0:
-                git_version = result.stdout.strip()
-                log("SUCCESS", f"Git instalado com sucesso: {git_version}")
-                console.print(f"[green]Git instalado com sucesso:[/green] {git_version}")
-                return True
-        except:
-            log("ERROR", "Falha ao instalar Git.")
-            console.print("[red]Falha ao instalar Git.[/red]")
-            return False
+        tool = probe_tool("git", recheck=True)
+        if tool["installed"]:
+            git_version = tool["version"]
+            log("SUCCESS", f"Git instalado com sucesso: {git_version}")
+            console.print(f"[green]Git instalado com sucesso:[/green] {git_version}")
+            return True
+        log("ERROR", "Falha ao instalar Git.")
+        console.print("[red]Falha ao instalar Git.[/red]")
+        return False
     else:
         log("ERROR", "Git é necessário para continuar.")
         console.print("[red]Git é necessário para continuar.[/red]")
         return False
 
-def check_docker():
+def check_docker(recheck=False):
     """Verifica se o Docker está instalado"""
-    try:
-        result = subprocess.run(["docker", "--version"], capture_output=True, text=True)
-        if result.returncode == 0:
-            docker_version = result.stdout.strip()
-            log("SUCCESS", f"Docker já está instalado: {docker_version}")
-            console.print(f"[green]Docker já está instalado:[/green] {docker_version}")
-            return True
-    except:
-        pass
+    tool = probe_tool("docker", recheck)
+    if tool["installed"]:
+        docker_version = tool["version"]
+        log("SUCCESS", f"Docker já está instalado: {docker_version}")
+        console.print(f"[green]Docker já está instalado:[/green] {docker_version}")
+        return True
     
     log("WARNING", "Docker não está instalado.")
     console.print("[yellow]Docker não está instalado.[/yellow]")
@@ -76,20 +68,20 @@ def check_docker():
     if Confirm.ask("Deseja instalar Docker?"):
         os_type = detect_os()
         if os_type in ["debian", "ubuntu"]:
-            run_command(["sudo", "apt-get", "update"])
-            run_command(["sudo", "apt-get", "install", "-y", "apt-transport-https", "ca-certificates", "curl", "software-properties-common"])
-            run_command(["curl", "-fsSL", "https://download.docker.com/linux/ubuntu/gpg", "|", "sudo", "apt-key", "add", "-"], shell=True)
-            run_command([f'sudo add-apt-repository "deb [arch=amd64] https://download.docker.com/linux/ubuntu $(lsb_release -cs) stable"'], shell=True)
-            run_command(["sudo", "apt-get", "update"])
-            run_command(["sudo", "apt-get", "install", "-y", "docker-ce", "docker-ce-cli", "containerd.io"])
-            run_command([f"sudo usermod -aG docker {os.getenv('USER')}"], shell=True)
+            run_install(["sudo", "apt-get", "update"])
+            run_install(["sudo", "apt-get", "install", "-y", "apt-transport-https", "ca-certificates", "curl", "software-properties-common"])
+            run_install("curl -fsSL https://download.docker.com/linux/ubuntu/gpg | sudo apt-key add -", shell=True)
+            run_install('sudo add-apt-repository "deb [arch=amd64] https://download.docker.com/linux/ubuntu $(lsb_release -cs) stable"', shell=True)
+            run_install(["sudo", "apt-get", "update"])
+            run_install(["sudo", "apt-get", "install", "-y", "docker-ce", "docker-ce-cli", "containerd.io"])
+            run_install(["sudo", "usermod", "-aG", "docker", os.getenv("USER", "")])
         elif os_type in ["redhat", "amazon-linux"]:
-            run_command(["sudo", "yum", "install", "-y", "yum-utils"])
-            run_command(["sudo", "yum-config-manager", "--add-repo", "https://download.docker.com/linux/centos/docker-ce.repo"])
-            run_command(["sudo", "yum", "install", "-y", "docker-ce", "docker-ce-cli", "containerd.io"])
-            run_command(["sudo", "systemctl", "start", "docker"])
-            run_command(["sudo", "systemctl", "enable", "docker"])
-            run_command([f"sudo usermod -aG docker {os.getenv('USER')}"], shell=True)
+            run_install(["sudo", "yum", "install", "-y", "yum-utils"])
+            run_install(["sudo", "yum-config-manager", "--add-repo", "https://download.docker.com/linux/centos/docker-ce.repo"])
+            run_install(["sudo", "yum", "install", "-y", "docker-ce", "docker-ce-cli", "containerd.io"])
+            run_install(["sudo", "systemctl", "start", "docker"])
+            run_install(["sudo", "systemctl", "enable", "docker"])
+            run_install(["sudo", "usermod", "-aG", "docker", os.getenv("USER", "")])
         elif os_type == "macos":
             log("INFO", "Para macOS, por favor instale o Docker Desktop manualmente.")
             console.print("[yellow]Por favor, baixe e instale o Docker Desktop de: https://www.docker.com/products/docker-desktop[/yellow]")
@@ -99,34 +91,29 @@ def check_docker():
             console.print("[red]Por favor, instale o Docker manualmente.[/red]")
             return False
             
-        try:
-            result = subprocess.run(["docker", "--version"], capture_output=True, text=True)
-            if result.returncode == 0:
-                docker_version = result.stdout.strip()
-                log("SUCCESS", f"Docker instalado com sucesso: {docker_version}")
-                console.print(f"[green]Docker instalado com sucesso:[/green] {docker_version}")
-                console.print("[yellow]Pode ser necessário reiniciar o terminal ou o sistema.[/yellow]")
-                return True
-        except:
-            log("ERROR", "Falha ao instalar Docker.")
-            console.print("[red]Falha ao instalar Docker.[/red]")
-            return False
+        tool = probe_tool("docker", recheck=True)
+        if tool["installed"]:
+            docker_version = tool["version"]
+            log("SUCCESS", f"Docker instalado com sucesso: {docker_version}")
+            console.print(f"[green]Docker instalado com sucesso:[/green] {docker_version}")
+            console.print("[yellow]Pode ser necessário reiniciar o terminal ou o sistema.[/yellow]")
+            return True
+        log("ERROR", "Falha ao instalar Docker.")
+        console.print("[red]Falha ao instalar Docker.[/red]")
+        return False
     else:
         log("ERROR", "Docker é necessário para continuar.")
         console.print("[red]Docker é necessário para continuar.[/red]")
         return False
 
-def check_docker_compose():
+def check_docker_compose(recheck=False):
     """Verifica se o Docker Compose está instalado"""
-    try:
-        result = subprocess.run(["docker-compose", "--version"], capture_output=True, text=True)
-        if result.returncode == 0:
-            compose_version = result.stdout.strip()
-            log("SUCCESS", f"Docker Compose já está instalado: {compose_version}")
-            console.print(f"[green]Docker Compose já está instalado:[/green] {compose_version}")
-            return True
-    except:
-        pass
+    tool = probe_tool("docker-compose", recheck)
+    if tool["installed"]:
+        compose_version = tool["version"]
+        log("SUCCESS", f"Docker Compose já está instalado: {compose_version}")
+        console.print(f"[green]Docker Compose já está instalado:[/green] {compose_version}")
+        return True
     
     log("WARNING", "Docker Compose não está instalado.")
     console.print("[yellow]Docker Compose não está instalado.[/yellow]")
@@ -134,8 +121,8 @@ def check_docker_compose():
     if Confirm.ask("Deseja instalar Docker Compose?"):
         os_type = detect_os()
         if os_type in ["debian", "ubuntu", "redhat", "amazon-linux"]:
-            run_command(['sudo curl -L "https://github.com/docker/compose/releases/download/1.29.2/docker-compose-$(uname -s)-$(uname -m)" -o /usr/local/bin/docker-compose'], shell=True)
-            run_command(["sudo", "chmod", "+x", "/usr/local/bin/docker-compose"])
+            run_install('sudo curl -L "https://github.com/docker/compose/releases/download/1.29.2/docker-compose-$(uname -s)-$(uname -m)" -o /usr/local/bin/docker-compose', shell=True)
+            run_install(["sudo", "chmod", "+x", "/usr/local/bin/docker-compose"])
         elif os_type == "macos":
             log("INFO", "Para macOS, o Docker Compose já vem com o Docker Desktop.")
             console.print("[yellow]Se você instalou o Docker Desktop, o Docker Compose já deve estar disponível.[/yellow]")
@@ -144,17 +131,15 @@ def check_docker_compose():
             console.print("[red]Por favor, instale o Docker Compose manualmente.[/red]")
             return False
             
-        try:
-            result = subprocess.run(["docker-compose", "--version"], capture_output=True, text=True)
-            if result.returncode == 0:
-                compose_version = result.stdout.strip()
-                log("SUCCESS", f"Docker Compose instalado com sucesso: {compose_version}")
-                console.print(f"[green]Docker Compose instalado com sucesso:[/green] {compose_version}")
-                return True
-        except:
-            log("ERROR", "Falha ao instalar Docker Compose.")
-            console.print("[red]Falha ao instalar Docker Compose.[/red]")
-            return False
+        tool = probe_tool("docker-compose", recheck=True)
+        if tool["installed"]:
+            compose_version = tool["version"]
+            log("SUCCESS", f"Docker Compose instalado com sucesso: {compose_version}")
+            console.print(f"[green]Docker Compose instalado com sucesso:[/green] {compose_version}")
+            return True
+        log("ERROR", "Falha ao instalar Docker Compose.")
+        console.print("[red]Falha ao instalar Docker Compose.[/red]")
+        return False
     else:
         log("ERROR", "Docker Compose é necessário para continuar.")
         console.print("[red]Docker Compose é necessário para continuar.[/red]")
@@ -167,13 +152,13 @@ def clone_finops_repo():
         console.print("[blue]Repositório aws-finops-dashboard já existe. Atualizando...[/blue]")
         
         os.chdir(REPO_DIR)
-        run_command(["git", "pull"])
+        run_live(["git", "pull"])
     else:
         log("INFO", "Clonando repositório aws-finops-dashboard...")
         console.print("[blue]Clonando repositório aws-finops-dashboard...[/blue]")
         
         os.makedirs(os.path.dirname(REPO_DIR), exist_ok=True)
-        success, output = run_command(["git", "clone", "https://github.com/ravikiranvm/aws-finops-dashboard.git", REPO_DIR])
+        success, output = run_live(["git", "clone", "https://github.com/ravikiranvm/aws-finops-dashboard.git", REPO_DIR])
         
         if not success:
             log("ERROR", "Falha ao clonar o repositório aws-finops-dashboard.")
@@ -195,14 +180,13 @@ def configure_finops_dashboard():
     console.print("[blue]Configurando o AWS FinOps Dashboard...[/blue]")
     
     # Obter perfis AWS disponíveis
-    success, output = run_command(["aws", "configure", "list-profiles"])
-    if not success or not output.strip():
+    profiles = get_aws_profiles()
+    if not profiles:
         log("ERROR", "Nenhum perfil AWS encontrado.")
         console.print("[red]Nenhum perfil AWS encontrado.[/red]")
         console.print("[yellow]Configure um perfil AWS primeiro usando 'arch-cli np'.[/yellow]")
         return False
     
-    profiles = output.strip().split('\n')
     console.print("[blue]Perfis AWS disponíveis:[/blue]")
     for i, profile in enumerate(profiles, 1):
         console.print(f"  {i}. {profile}")
@@ -219,8 +203,7 @@ def configure_finops_dashboard():
         return False
     
     # Verificar se o perfil existe
-    success, _ = run_command(["aws", "configure", "list", "--profile", profile_name])
-    if not success:
+    if profile_name not in profiles:
         log("ERROR", f"Perfil '{profile_name}' não encontrado.")
         console.print(f"[red]Perfil '{profile_name}' não encontrado.[/red]")
         return False
@@ -232,7 +215,7 @@ def configure_finops_dashboard():
     if not os.path.exists(os.path.join(REPO_DIR, ".env")):
         log("INFO", "Criando arquivo .env...")
         if os.path.exists(os.path.join(REPO_DIR, ".env.example")):
-            run_command(["cp", ".env.example", ".env"])
+            shutil.copyfile(".env.example", ".env")
         else:
             # Criar um arquivo .env básico se .env.example não existir
             with open(os.path.join(REPO_DIR, ".env"), "w") as f:
@@ -277,7 +260,7 @@ def start_finops_dashboard():
     os.chdir(REPO_DIR)
     
     console.print("[blue]Iniciando o AWS FinOps Dashboard...[/blue]")
-    success, output = run_command(["docker-compose", "up", "-d"])
+    success, output = run_live(["docker-compose", "up", "-d"])
     
     if success:
         log("SUCCESS", "AWS FinOps Dashboard iniciado com sucesso.")
@@ -303,7 +286,7 @@ def stop_finops_dashboard():
     os.chdir(REPO_DIR)
     
     console.print("[blue]Parando o AWS FinOps Dashboard...[/blue]")
-    success, output = run_command(["docker-compose", "down"])
+    success, output = run_live(["docker-compose", "down"])
     
     if success:
         log("SUCCESS", "AWS FinOps Dashboard parado com sucesso.")
@@ -333,6 +316,8 @@ def finops_menu():
         option = IntPrompt.ask("Escolha uma opção", default=0)
         
         if option == 1:
+            # As três verificações rodam em paralelo; as funções abaixo usam o manifesto atualizado
+            probe_tools(["git", "docker", "docker-compose"])
             if check_git() and check_docker() and check_docker_compose():
                 clone_finops_repo()
         elif option == 2:
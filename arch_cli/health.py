@@ -0,0 +1,273 @@
+"""
+Verificação de saúde concorrente (EC2, RDS, balanceadores de carga e Lambda) com modo de acompanhamento
+que exibe apenas as mudanças de estado e latência das verificações por serviço
+"""
+
+import time
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+from .aws import get_client, paginate
+from .utils import log
+
+console = Console()
+
+SERVICES = ["ec2", "rds", "elb", "lambda"]
+MAX_WORKERS = 16
+DEFAULT_INTERVAL = 30
+LEVEL_COLORS = {"ok": "green", "warning": "yellow", "critical": "red"}
+RDS_CRITICAL = {"failed", "storage-full", "incompatible-parameters", "incompatible-restore", "incompatible-network",
+                "inaccessible-encryption-credentials", "restore-error"}
+TARGET_LEVELS = {"healthy": "ok", "unhealthy": "critical", "unhealthy.draining": "critical"}
+LB_LEVELS = {"active": "ok", "failed": "critical", "active_impaired": "critical"}
+INSTANCE_HEALTH_LEVELS = {"InService": "ok", "OutOfService": "critical"}
+NOT_FOUND = {"TargetGroupNotFound", "LoadBalancerNotFound", "ResourceNotFoundException"}
+
+def _resource(service, resource_id, state, level, detail=None):
+    return {"service": service, "id": resource_id, "state": state, "level": level, "detail": detail or ""}
+
+# Cada verificação recebe o pool das chamadas por recurso e um cache próprio mantido entre as consultas
+# do modo --watch; retorna (recursos, chamadas à API)
+
+def check_ec2(profile, region, executor, cache):
+    client = get_client("ec2", profile, region)
+    resources, calls = [], 0
+    for page in paginate(client, "describe_instance_status", IncludeAllInstances=True):
+        calls += 1
+        for item in page.get("InstanceStatuses", []):
+            state = item["InstanceState"]["Name"]
+            if state == "terminated":
+                continue
+            level = "warning"
+            if state == "running":
+                statuses = (item.get("InstanceStatus", {}).get("Status"), item.get("SystemStatus", {}).get("Status"))
+                level = "ok" if statuses == ("ok", "ok") else "critical" if "impaired" in statuses else "warning"
+                state = f"running ({statuses[0]}/{statuses[1]})"
+            events = [event.get("Description", event.get("Code")) for event in item.get("Events", [])]
+            resources.append(_resource("ec2", item["InstanceId"], state, level, "; ".join(events)))
+    return resources, calls
+
+def check_rds(profile, region, executor, cache):
+    client = get_client("rds", profile, region)
+    resources, calls = [], 0
+    for page in paginate(client, "describe_db_instances"):
+        calls += 1
+        for item in page.get("DBInstances", []):
+            status = item.get("DBInstanceStatus")
+            level = "ok" if status == "available" else "critical" if status in RDS_CRITICAL else "warning"
+            resources.append(_resource("rds", item["DBInstanceIdentifier"], status, level, item.get("DBInstanceClass")))
+    return resources, calls
+
+def _target_health(client, group):
+    """Saúde de todos os alvos de um target group em uma única chamada"""
+    name = group["TargetGroupName"]
+    try:
+        descriptions = client.describe_target_health(TargetGroupArn=group["TargetGroupArn"])["TargetHealthDescriptions"]
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in NOT_FOUND:
+            return []
+        raise
+    resources = []
+    for description in descriptions:
+        target, health = description["Target"], description.get("TargetHealth", {})
+        state = health.get("State", "unknown")
+        port = f":{target['Port']}" if target.get("Port") else ""
+        resources.append(_resource("elb", f"{name}/{target['Id']}{port}", state, TARGET_LEVELS.get(state, "warning"),
+                                   health.get("Description") or health.get("Reason")))
+    if not descriptions and group.get("LoadBalancerArns"):
+        resources.append(_resource("elb", f"{name} (sem alvos)", "vazio", "warning"))
+    return resources
+
+def _instance_health(client, name):
+    """Saúde das instâncias de um Classic Load Balancer"""
+    try:
+        states = client.describe_instance_health(LoadBalancerName=name)["InstanceStates"]
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in NOT_FOUND:
+            return []
+        raise
+    return [_resource("elb", f"{name}/{state['InstanceId']}", state["State"],
+                      INSTANCE_HEALTH_LEVELS.get(state["State"], "warning"), state.get("Description"))
+            for state in states]
+
+def check_elb(profile, region, executor, cache):
+    """ALB/NLB (estado do balanceador e alvos de cada target group) e Classic Load Balancers (todos)"""
+    elbv2 = get_client("elbv2", profile, region)
+    classic = get_client("elb", profile, region)
+    resources, calls, futures = [], 0, []
+    for page in paginate(elbv2, "describe_load_balancers"):
+        calls += 1
+        for balancer in page.get("LoadBalancers", []):
+            state = balancer.get("State", {})
+            resources.append(_resource("elb", balancer["LoadBalancerName"], state.get("Code"),
+                                       LB_LEVELS.get(state.get("Code"), "warning"), state.get("Reason")))
+    for page in paginate(elbv2, "describe_target_groups"):
+        calls += 1
+        futures += [executor.submit(_target_health, elbv2, group) for group in page.get("TargetGroups", [])]
+    for page in paginate(classic, "describe_load_balancers"):
+        calls += 1
+        futures += [executor.submit(_instance_health, classic, balancer["LoadBalancerName"])
+                    for balancer in page.get("LoadBalancerDescriptions", [])]
+    for future in as_completed(futures):
+        resources.extend(future.result())
+        calls += 1
+    return resources, calls
+
+def _settled(config):
+    return config.get("State") in ("Active", "Inactive", "Failed") and config.get("LastUpdateStatus") in (
+        None, "Successful", "Failed")
+
+def check_lambda(profile, region, executor, cache):
+    """Estado das funções; a configuração só é consultada de novo quando a função muda (LastModified)
+    ou ainda está em transição, para não repetir uma chamada por função a cada consulta"""
+    client = get_client("lambda", profile, region)
+    functions, calls = [], 0
+    for page in paginate(client, "list_functions"):
+        calls += 1
+        functions += page.get("Functions", [])
+    names = {function["FunctionName"] for function in functions}
+    for name in set(cache) - names:
+        del cache[name]
+    # Cache: {função: (LastModified listado, configuração)}
+    stale = [function for function in functions
+             if function["FunctionName"] not in cache
+             or cache[function["FunctionName"]][0] != function["LastModified"]
+             or not _settled(cache[function["FunctionName"]][1])]
+    futures = {executor.submit(client.get_function_configuration, FunctionName=function["FunctionName"]): function
+               for function in stale}
+    for future in as_completed(futures):
+        function = futures[future]
+        try:
+            cache[function["FunctionName"]] = (function["LastModified"], future.result())
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in NOT_FOUND:
+                raise
+        calls += 1
+
+    resources = []
+    for function in functions:
+        if function["FunctionName"] not in cache:
+            continue
+        config = cache[function["FunctionName"]][1]
+        state, update = config.get("State", "-"), config.get("LastUpdateStatus")
+        if state == "Failed" or update == "Failed":
+            level = "critical"
+        elif state == "Pending" or update == "InProgress":
+            level = "warning"
+        else:
+            level = "ok"
+        resources.append(_resource("lambda", function["FunctionName"], f"{state}/{update or '-'}", level,
+                                   config.get("LastUpdateStatusReason") or config.get("StateReason")))
+    return resources, calls
+
+CHECKS = {"ec2": check_ec2, "rds": check_rds, "elb": check_elb, "lambda": check_lambda}
+
+def poll(profile, region, services, executor, caches, stats):
+    """Executa as verificações dos serviços em paralelo. Retorna {(serviço, id): recurso}.
+    Falhas de um serviço aparecem como o recurso '(API)' em estado crítico."""
+    def run(service):
+        start = time.monotonic()
+        try:
+            resources, calls = CHECKS[service](profile, region, executor, caches.setdefault(service, {}))
+        except (BotoCoreError, ClientError) as e:
+            resources, calls = [_resource(service, "(API)", "erro", "critical", str(e))], 0
+        return service, resources, calls, time.monotonic() - start
+
+    current = {}
+    with ThreadPoolExecutor(max_workers=len(services)) as service_executor:
+        for service, resources, calls, elapsed in service_executor.map(run, services):
+            entry = stats.setdefault(service, {"polls": 0, "total": 0.0, "max": 0.0, "last": 0.0, "calls": 0})
+            entry["polls"] += 1
+            entry["total"] += elapsed
+            entry["max"] = max(entry["max"], elapsed)
+            entry["last"] = elapsed
+            entry["calls"] += calls
+            for resource in resources:
+                current[(resource["service"], resource["id"])] = resource
+    return current
+
+def collect_health(profile=None, region=None, services=None, max_workers=MAX_WORKERS):
+    """Uma consulta de todos os serviços. Retorna (recursos, estatísticas de latência)."""
+    stats = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        current = poll(profile, region, list(services or SERVICES), executor, {}, stats)
+    return list(current.values()), stats
+
+def _colored(resource):
+    color = LEVEL_COLORS[resource["level"]]
+    return f"[{color}]{escape(resource['state'])}[/{color}]"
+
+def render_health(resources, problems_only=False):
+    """Tabela com o estado de todos os recursos (ou apenas dos que não estão ok)"""
+    rows = sorted(resources.values(), key=lambda resource: (resource["service"], resource["id"]))
+    if problems_only:
+        rows = [resource for resource in rows if resource["level"] != "ok"]
+    table = Table(title=f"Saúde dos serviços - {len(rows)} recurso(s)")
+    for column in ("Serviço", "Recurso", "Estado", "Detalhes"):
+        table.add_column(column, overflow="fold")
+    for resource in rows:
+        table.add_row(resource["service"], escape(resource["id"]), _colored(resource), escape(resource["detail"]))
+    console.print(table)
+
+def render_changes(previous, current):
+    """Exibe apenas os recursos novos, removidos ou cujo estado mudou desde a consulta anterior"""
+    moment = datetime.datetime.now().strftime("%H:%M:%S")
+    changes = 0
+    for key in sorted(set(previous) | set(current)):
+        before, after = previous.get(key), current.get(key)
+        if before and after and (before["state"], before["level"]) == (after["state"], after["level"]):
+            continue
+        changes += 1
+        service, resource_id = key
+        old_state = escape(before["state"]) if before else "[dim]novo[/dim]"
+        new_state = _colored(after) if after else "[dim]removido[/dim]"
+        detail = f" ({escape(after['detail'])})" if after and after["detail"] else ""
+        console.print(f"{moment} {service} {escape(resource_id)}: {old_state} → {new_state}{detail}", highlight=False)
+    return changes
+
+def render_latency(stats):
+    table = Table(title="Latência das verificações por serviço")
+    for column in ("Serviço", "Consultas", "Chamadas à API", "Última (ms)", "Média (ms)", "Máxima (ms)"):
+        table.add_column(column, justify="left" if column == "Serviço" else "right")
+    for service, entry in stats.items():
+        table.add_row(service, str(entry["polls"]), str(entry["calls"]), f"{entry['last'] * 1000:,.0f}",
+                      f"{entry['total'] / entry['polls'] * 1000:,.0f}", f"{entry['max'] * 1000:,.0f}")
+    console.print(table)
+
+def health_check(profile=None, region=None, services=None, watch=False, interval=DEFAULT_INTERVAL,
+                 max_workers=MAX_WORKERS, problems_only=False):
+    """Verifica a saúde de todos os serviços e, com watch, continua consultando e exibindo só as mudanças"""
+    services = list(services or SERVICES)
+    caches, stats, previous = {}, {}, None
+    log("INFO", f"Verificando a saúde de {', '.join(services)}" + (f" a cada {interval:g}s (Ctrl+C para encerrar)"
+                                                                    if watch else ""))
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                started = time.monotonic()
+                current = poll(profile, region, services, executor, caches, stats)
+                if previous is None:
+                    render_health(current, problems_only)
+                else:
+                    render_changes(previous, current)
+                previous = current
+                if not watch:
+                    break
+                # O intervalo conta a partir do início da consulta; consultas lentas não se acumulam
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+
+    render_latency(stats)
+    critical = [resource for resource in (previous or {}).values() if resource["level"] == "critical"]
+    for resource in critical:
+        if resource["id"] == "(API)":
+            log("ERROR", f"Falha ao verificar {resource['service']}: {resource['detail']}")
+    if critical:
+        log("WARNING", f"{len(critical)} recurso(s) em estado crítico.")
+        return watch
+    log("SUCCESS", "Verificação de saúde concluída.")
+    return True
@@ -0,0 +1,237 @@
+"""
+Módulo de análise de IAM baseado em uma única passagem de GetAccountAuthorizationDetails
+"""
+
+import json
+from urllib.parse import unquote
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .fanout import DEFAULT_TIMEOUT, resolve_targets, run_targets
+from .utils import log
+
+console = Console()
+
+ADMIN_POLICY_ARN = "arn:aws:iam::aws:policy/AdministratorAccess"
+CHECKS = ["admin", "wildcard", "unused"]
+
+def _decode(document):
+    """Decodifica um documento de política (o IAM retorna JSON URL-encoded)"""
+    if isinstance(document, str):
+        return json.loads(unquote(document))
+    return document or {}
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _statements(document):
+    return _as_list(document.get("Statement"))
+
+def _policy_name(arn):
+    return arn.rsplit("/", 1)[-1]
+
+def wildcard_actions(document):
+    """Retorna as ações curinga permitidas ("*" ou "serviço:*") de um documento"""
+    found = set()
+    for statement in _statements(document):
+        if statement.get("Effect") != "Allow":
+            continue
+        for action in _as_list(statement.get("Action")):
+            if action == "*" or action.endswith(":*"):
+                found.add(action)
+    return sorted(found)
+
+def is_admin_document(document):
+    """Verifica se o documento concede Action "*" em Resource "*" """
+    for statement in _statements(document):
+        if statement.get("Effect") != "Allow":
+            continue
+        if "*" in _as_list(statement.get("Action")) and "*" in _as_list(statement.get("Resource")):
+            return True
+    return False
+
+def _principal(detail, attached_key, inline_key):
+    return {
+        "attached": [policy["PolicyArn"] for policy in detail.get(attached_key, [])],
+        "inline": {policy["PolicyName"]: _decode(policy.get("PolicyDocument")) for policy in detail.get(inline_key, [])},
+    }
+
+def build_index(pages):
+    """Monta os índices em memória a partir das páginas de GetAccountAuthorizationDetails:
+    usuário→grupos→políticas, grupo→usuários e política→principais anexados"""
+    index = {"users": {}, "groups": {}, "roles": {}, "policies": {}, "attachments": {}, "members": {}}
+
+    def attach(kind, name, arns):
+        for arn in arns:
+            index["attachments"].setdefault(arn, []).append((kind, name))
+
+    for page in pages:
+        for detail in page.get("UserDetailList", []):
+            user = _principal(detail, "AttachedManagedPolicies", "UserPolicyList")
+            user["groups"] = detail.get("GroupList", [])
+            index["users"][detail["UserName"]] = user
+            attach("user", detail["UserName"], user["attached"])
+            for group in user["groups"]:
+                index["members"].setdefault(group, []).append(detail["UserName"])
+
+        for detail in page.get("GroupDetailList", []):
+            group = _principal(detail, "AttachedManagedPolicies", "GroupPolicyList")
+            index["groups"][detail["GroupName"]] = group
+            attach("group", detail["GroupName"], group["attached"])
+
+        for detail in page.get("RoleDetailList", []):
+            role = _principal(detail, "AttachedManagedPolicies", "RolePolicyList")
+            index["roles"][detail["RoleName"]] = role
+            attach("role", detail["RoleName"], role["attached"])
+
+        for detail in page.get("Policies", []):
+            document = {}
+            for version in detail.get("PolicyVersionList", []):
+                if version.get("IsDefaultVersion"):
+                    document = _decode(version.get("Document"))
+            index["policies"][detail["Arn"]] = {
+                "name": detail["PolicyName"],
+                "attachment_count": detail.get("AttachmentCount", 0),
+                "document": document,
+            }
+
+    return index
+
+def fetch_index(profile=None):
+    """Baixa todos os detalhes de autorização da conta em uma única passagem paginada"""
+    client = get_client("iam", profile)
+    pages = paginate(client, "get_account_authorization_details",
+                     Filter=["User", "Role", "Group", "LocalManagedPolicy"])
+    return build_index(pages)
+
+def _admin_sources(principal, admin_arns):
+    sources = [_policy_name(arn) for arn in principal["attached"] if arn in admin_arns]
+    sources.extend(f"{name} (inline)" for name, document in principal["inline"].items() if is_admin_document(document))
+    return sources
+
+def find_admin_principals(index):
+    """Usuários e roles com acesso de administrador, direto, inline ou via grupo"""
+    admin_arns = {ADMIN_POLICY_ARN}
+    admin_arns.update(arn for arn, policy in index["policies"].items() if is_admin_document(policy["document"]))
+
+    group_sources = {name: _admin_sources(group, admin_arns) for name, group in index["groups"].items()}
+
+    results = []
+    for name, user in sorted(index["users"].items()):
+        sources = _admin_sources(user, admin_arns)
+        for group in user["groups"]:
+            sources.extend(f"{source} (via grupo {group})" for source in group_sources.get(group, []))
+        if sources:
+            results.append({"type": "user", "name": name, "sources": sources})
+
+    for name, role in sorted(index["roles"].items()):
+        sources = _admin_sources(role, admin_arns)
+        if sources:
+            results.append({"type": "role", "name": name, "sources": sources})
+    return results
+
+def find_wildcard_policies(index):
+    """Políticas gerenciadas locais e inline que permitem ações curinga"""
+    results = []
+    for arn, policy in sorted(index["policies"].items()):
+        actions = wildcard_actions(policy["document"])
+        if actions:
+            results.append({"policy": policy["name"], "owner": arn, "actions": actions})
+
+    for kind in ("users", "groups", "roles"):
+        for owner, principal in sorted(index[kind].items()):
+            for name, document in sorted(principal["inline"].items()):
+                actions = wildcard_actions(document)
+                if actions:
+                    results.append({"policy": f"{name} (inline)", "owner": f"{kind[:-1]}/{owner}", "actions": actions})
+    return results
+
+def find_unused_policies(index):
+    """Políticas gerenciadas locais sem nenhum principal anexado"""
+    return [
+        {"policy": policy["name"], "arn": arn}
+        for arn, policy in sorted(index["policies"].items())
+        if not policy["attachment_count"] and not index["attachments"].get(arn)
+    ]
+
+def analyze_index(index, checks=None):
+    """Executa as verificações selecionadas sobre os índices"""
+    checks = checks or CHECKS
+    report = {
+        "counts": {kind: len(index[kind]) for kind in ("users", "groups", "roles", "policies")},
+    }
+    if "admin" in checks:
+        report["admin"] = find_admin_principals(index)
+    if "wildcard" in checks:
+        report["wildcard"] = find_wildcard_policies(index)
+    if "unused" in checks:
+        report["unused"] = find_unused_policies(index)
+    return report
+
+def analyze_target(profile, region, checks=None):
+    """Analisa o IAM de um perfil (IAM é global, a região é ignorada)"""
+    return analyze_index(fetch_index(profile), checks)
+
+def render_report(report, profile=None):
+    """Exibe o resultado da análise de IAM"""
+    prefix = f"{profile} - " if profile else ""
+    counts = report["counts"]
+    console.print(f"[bold]{prefix}IAM:[/bold] {counts['users']} usuário(s), {counts['groups']} grupo(s), "
+                  f"{counts['roles']} role(s), {counts['policies']} política(s) locais")
+
+    if "admin" in report:
+        table = Table(title=f"{prefix}Principais com acesso de administrador - {len(report['admin'])}")
+        table.add_column("Tipo")
+        table.add_column("Nome")
+        table.add_column("Origem")
+        for item in report["admin"]:
+            table.add_row(item["type"], item["name"], ", ".join(item["sources"]))
+        console.print(table)
+
+    if "wildcard" in report:
+        table = Table(title=f"{prefix}Políticas com permissões amplas - {len(report['wildcard'])}")
+        table.add_column("Política")
+        table.add_column("ARN / Dono")
+        table.add_column("Ações curinga")
+        for item in report["wildcard"]:
+            table.add_row(item["policy"], item["owner"], ", ".join(item["actions"]))
+        console.print(table)
+
+    if "unused" in report:
+        table = Table(title=f"{prefix}Políticas locais não utilizadas - {len(report['unused'])}")
+        table.add_column("Política")
+        table.add_column("ARN")
+        for item in report["unused"]:
+            table.add_row(item["policy"], item["arn"])
+        console.print(table)
+
+def analyze_iam(profile=None, checks=None, all_profiles=False, processes=None, timeout=DEFAULT_TIMEOUT):
+    """Analisa as políticas IAM de um ou vários perfis"""
+    log("INFO", "Iniciando análise de políticas IAM")
+
+    if not all_profiles:
+        try:
+            render_report(analyze_target(profile, None, checks))
+        except (BotoCoreError, ClientError) as e:
+            log("ERROR", f"Falha ao analisar IAM do perfil '{profile}': {str(e)}")
+            return False
+        log("SUCCESS", "Análise de segurança concluída.")
+        return True
+
+    targets = [(target_profile, None, checks) for target_profile, _ in resolve_targets(profile, all_profiles)]
+    failed = 0
+    for done in run_targets(analyze_target, targets, processes, timeout):
+        if done["error"]:
+            failed += 1
+            log("ERROR", f"Falha ao analisar IAM do perfil '{done['profile']}': {done['error']}")
+            continue
+        render_report(done["result"], done["profile"])
+
+    if failed:
+        log("WARNING", f"{failed} perfil(is) não puderam ser analisados.")
+        return False
+    log("SUCCESS", "Análise de segurança concluída.")
+    return True
@@ -0,0 +1,242 @@
+"""
+Execução concorrente de consultas do CloudWatch Logs Insights em vários grupos e perfis
+"""
+
+import sys
+import json
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .fanout import resolve_targets
+from .logs import parse_time
+from .utils import log
+
+console = Console()
+
+# Limites do Logs Insights: grupos por consulta e consultas simultâneas por conta/região
+MAX_GROUPS_PER_QUERY = 50
+MAX_CONCURRENT = 30
+DEFAULT_GROUPS_PER_QUERY = 10
+DEFAULT_TIMEOUT = 900
+# Alvos (perfil × região) processados ao mesmo tempo
+MAX_WORKERS = 16
+# Backoff das consultas a get_query_results, em segundos
+POLL_INITIAL = 0.5
+POLL_MAX = 8.0
+POLL_FACTOR = 1.5
+
+def resolve_groups(client, groups=None, prefixes=None):
+    """Grupos informados explicitamente mais os encontrados pelos prefixos, sem repetição"""
+    names = list(groups or [])
+    for prefix in prefixes or []:
+        for page in paginate(client, "describe_log_groups", logGroupNamePrefix=prefix):
+            names.extend(group["logGroupName"] for group in page.get("logGroups", []))
+    return list(dict.fromkeys(names))
+
+def _rows(results):
+    """Converte as linhas [{field, value}] em dicionários, descartando o ponteiro interno @ptr"""
+    return [{field["field"]: field.get("value") for field in row if field["field"] != "@ptr"} for row in results]
+
+def _error_code(error):
+    return error.response.get("Error", {}).get("Code", "") if isinstance(error, ClientError) else ""
+
+def run_target_queries(profile, region, query, start, end, groups=None, prefixes=None,
+                       groups_per_query=DEFAULT_GROUPS_PER_QUERY, limit=None, emit=None, stop=None,
+                       timeout=DEFAULT_TIMEOUT):
+    """Executa a consulta em todos os grupos de um alvo, mantendo o máximo de consultas em andamento.
+    Cada consulta concluída é entregue imediatamente a emit(resultado)."""
+    stop = stop or threading.Event()
+    client = get_client("logs", profile, region)
+    names = resolve_groups(client, groups, prefixes)
+    size = max(1, min(groups_per_query, MAX_GROUPS_PER_QUERY))
+    pending = deque(names[i:i + size] for i in range(0, len(names), size))
+    running = {}
+    capacity = MAX_CONCURRENT
+    # Espera para iniciar novas consultas quando a cota está ocupada por consultas de outros clientes
+    retry_at, retry_delay = 0.0, POLL_INITIAL
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def result(batch, status, rows=None, statistics=None, error=None):
+        emit({"profile": profile, "region": region, "groups": batch, "status": status, "rows": rows or [],
+              "statistics": statistics or {}, "error": error})
+
+    try:
+        while (pending or running) and not stop.is_set():
+            # Iniciar consultas até o limite; ao receber LimitExceeded, reduz a capacidade para o que está em andamento
+            # ou, sem consultas próprias em andamento, aguarda com backoff antes de tentar de novo
+            while pending and len(running) < capacity and time.monotonic() >= retry_at:
+                batch = pending.popleft()
+                request = {"logGroupNames": batch, "queryString": query, "startTime": start // 1000,
+                           "endTime": end // 1000}
+                if limit:
+                    request["limit"] = limit
+                try:
+                    query_id = client.start_query(**request)["queryId"]
+                except (BotoCoreError, ClientError) as e:
+                    if _error_code(e) == "LimitExceededException":
+                        pending.appendleft(batch)
+                        if running:
+                            capacity = len(running)
+                        else:
+                            # Nenhuma consulta nossa em andamento: as vagas da conta estão com outros clientes
+                            retry_at = time.monotonic() + retry_delay
+                            retry_delay = min(retry_delay * POLL_FACTOR * 2, POLL_MAX)
+                        break
+                    result(batch, "Failed", error=str(e))
+                    continue
+                retry_delay = POLL_INITIAL
+                running[query_id] = {"batch": batch, "delay": POLL_INITIAL, "next": time.monotonic() + POLL_INITIAL}
+
+            now = time.monotonic()
+            if deadline and now > deadline:
+                break
+
+            for query_id, state in list(running.items()):
+                if state["next"] > now:
+                    continue
+                try:
+                    response = client.get_query_results(queryId=query_id)
+                except (BotoCoreError, ClientError) as e:
+                    if _error_code(e) == "ThrottlingException":
+                        state["delay"] = min(state["delay"] * POLL_FACTOR * 2, POLL_MAX)
+                        state["next"] = now + state["delay"]
+                        continue
+                    del running[query_id]
+                    result(state["batch"], "Failed", error=str(e))
+                    continue
+
+                status = response.get("status")
+                if status in ("Scheduled", "Running", "Unknown"):
+                    state["delay"] = min(state["delay"] * POLL_FACTOR, POLL_MAX)
+                    state["next"] = now + state["delay"]
+                    continue
+                del running[query_id]
+                # Uma vaga foi liberada: volta a tentar a capacidade máxima
+                capacity = MAX_CONCURRENT
+                if status == "Complete":
+                    result(state["batch"], status, _rows(response.get("results", [])), response.get("statistics"))
+                else:
+                    result(state["batch"], status, error=f"Consulta finalizada com status {status}")
+
+            wakeups = [state["next"] for state in running.values()]
+            if pending and retry_at > time.monotonic():
+                wakeups.append(retry_at)
+            if wakeups:
+                stop.wait(max(0.0, min(wakeups) - time.monotonic()))
+    finally:
+        # Consultas interrompidas (timeout ou cancelamento) não devem continuar consumindo a cota
+        for query_id, state in running.items():
+            try:
+                client.stop_query(queryId=query_id)
+            except (BotoCoreError, ClientError):
+                pass
+            result(state["batch"], "Cancelled", error="Consulta interrompida")
+        for batch in pending:
+            result(batch, "Cancelled", error="Consulta não iniciada")
+    return len(names)
+
+def render_result(done, fmt="table", output=None):
+    """Exibe (ou grava) as linhas de uma consulta concluída"""
+    if fmt == "ndjson":
+        lines = "".join(json.dumps(dict(row, **{"@profile": done["profile"], "@region": done["region"]})) + "\n"
+                        for row in done["rows"])
+        output.write(lines)
+        output.flush()
+        return
+
+    groups = done["groups"][0] if len(done["groups"]) == 1 else f"{len(done['groups'])} grupos"
+    title = f"{done['profile']} - {done['region'] or 'padrão'} - {groups}"
+    scanned = done["statistics"].get("bytesScanned", 0) / 1024 / 1024
+    columns = list(dict.fromkeys(key for row in done["rows"] for key in row))
+    table = Table(title=f"{title}: {len(done['rows'])} linha(s), {scanned:,.1f} MB lidos")
+    for column in columns:
+        table.add_column(column, overflow="fold")
+    for row in done["rows"]:
+        table.add_row(*[row.get(column) or "" for column in columns])
+    console.print(table)
+
+def run_insights(query, groups=None, prefixes=None, profile=None, all_profiles=False, regions=None,
+                 since="1h", until=None, groups_per_query=DEFAULT_GROUPS_PER_QUERY, limit=None, fmt="table",
+                 output=None, timeout=DEFAULT_TIMEOUT):
+    """Executa a consulta em todos os alvos (perfil × região) em paralelo, exibindo cada resultado ao concluir"""
+    try:
+        start = parse_time(since)
+        end = parse_time(until) if until else int(time.time() * 1000)
+    except ValueError as e:
+        log("ERROR", f"Intervalo de tempo inválido: {str(e)}")
+        return False
+    if not groups and not prefixes:
+        log("ERROR", "Informe ao menos um grupo de logs (--group) ou prefixo (--group-prefix).")
+        return False
+
+    if output:
+        # Tabelas são apenas para o terminal; em arquivo as linhas são gravadas em NDJSON
+        fmt = "ndjson"
+
+    targets = resolve_targets(profile, all_profiles, regions)
+    if not targets:
+        return False
+    log("INFO", f"Executando consulta do Logs Insights em {len(targets)} alvo(s)")
+
+    results = queue.Queue()
+    stop = threading.Event()
+    # Grupos encontrados em cada alvo (list.append é seguro entre threads)
+    matched = []
+
+    def worker(target_profile, target_region):
+        try:
+            matched.append(run_target_queries(target_profile, target_region, query, start, end, groups, prefixes,
+                                              groups_per_query, limit, results.put, stop, timeout))
+        except Exception as e:
+            # Qualquer falha do alvo (inclusive respostas inesperadas) é contada, nunca descartada em silêncio
+            error = str(e) if isinstance(e, (BotoCoreError, ClientError)) else f"{type(e).__name__}: {str(e)}"
+            results.put({"profile": target_profile, "region": target_region, "groups": [], "status": "Failed",
+                         "rows": [], "statistics": {}, "error": error})
+
+    executor = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(targets)))
+    futures = [executor.submit(worker, *target) for target in targets]
+
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    completed, failed, rows = 0, 0, 0
+    try:
+        while not all(future.done() for future in futures) or not results.empty():
+            try:
+                done = results.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if done["error"]:
+                failed += 1
+                groups_label = ", ".join(done["groups"][:3]) + ("..." if len(done["groups"]) > 3 else "")
+                log("ERROR", f"{done['profile']} - {done['region'] or 'padrão'} - {groups_label or 'grupos'}: "
+                             f"{done['error']}")
+                continue
+            completed += 1
+            rows += len(done["rows"])
+            render_result(done, fmt, out)
+    except KeyboardInterrupt:
+        stop.set()
+        for future in futures:
+            future.cancel()
+        log("WARNING", "Consulta cancelada pelo usuário.")
+        return False
+    finally:
+        # Com stop sinalizado, os alvos em andamento apenas encerram as consultas iniciadas
+        executor.shutdown(wait=True)
+        if output:
+            out.close()
+
+    log("INFO", f"{completed} consulta(s) concluída(s), {rows} linha(s)")
+    if failed:
+        log("WARNING", f"{failed} consulta(s) falharam ou foram interrompidas.")
+        return False
+    if not sum(matched):
+        log("WARNING", "Nenhum grupo de logs encontrado para os grupos e prefixos informados.")
+        return False
+    log("SUCCESS", "Consulta do Logs Insights concluída.")
+    return True
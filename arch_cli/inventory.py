@@ -0,0 +1,294 @@
+"""
+Módulo de inventário de recursos AWS (EC2, S3, RDS, Lambda, IAM, CloudFormation)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .cache import cached_fetch
+from .export import StreamWriter, tee_pages
+from .fanout import DEFAULT_TIMEOUT, resolve_targets, run_targets
+from .utils import log
+
+console = Console()
+
+MAX_WORKERS = 8
+
+def _tag(tags, key):
+    """Retorna o valor de uma tag ou None"""
+    for tag in tags or []:
+        if tag.get("Key") == key:
+            return tag.get("Value")
+    return None
+
+def _fmt(value):
+    """Formata um valor para exibição na tabela, como o AWS CLI faz"""
+    if value is None:
+        return "None"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+def _ec2_items(page):
+    return [instance for reservation in page.get("Reservations", []) for instance in reservation.get("Instances", [])]
+
+def _ec2_row(item):
+    return [item.get("InstanceId"), item.get("State", {}).get("Name"), item.get("InstanceType"), _tag(item.get("Tags"), "Name")]
+
+def _s3_row(item):
+    created = item.get("CreationDate")
+    return [created.strftime("%Y-%m-%d %H:%M:%S") if created else None, item.get("Name")]
+
+def _rds_row(item):
+    return [item.get("DBInstanceIdentifier"), item.get("Engine"), item.get("DBInstanceStatus")]
+
+def _lambda_row(item):
+    return [item.get("FunctionName"), item.get("Runtime"), item.get("LastModified")]
+
+def _iam_row(item):
+    return [item.get("UserName"), item.get("CreateDate")]
+
+def _cloudformation_row(item):
+    return [item.get("StackName"), item.get("StackStatus"), item.get("CreationTime")]
+
+# Definição dos coletores, na mesma ordem e com as mesmas colunas das tabelas do aws_resources.sh
+SERVICES = {
+    "ec2": {
+        "title": "Instâncias EC2",
+        "client": "ec2",
+        "operation": "describe_instances",
+        "items": _ec2_items,
+        "columns": ["InstanceId", "State", "InstanceType", "Name"],
+        "row": _ec2_row,
+        "global": False,
+        "export_name": "ec2_instances",
+    },
+    "s3": {
+        "title": "Buckets S3",
+        "client": "s3",
+        "operation": "list_buckets",
+        "items": lambda page: page.get("Buckets", []),
+        "columns": ["CreationDate", "Name"],
+        "row": _s3_row,
+        "global": True,
+        "export_name": "s3_buckets",
+    },
+    "rds": {
+        "title": "Instâncias RDS",
+        "client": "rds",
+        "operation": "describe_db_instances",
+        "items": lambda page: page.get("DBInstances", []),
+        "columns": ["DBInstanceIdentifier", "Engine", "DBInstanceStatus"],
+        "row": _rds_row,
+        "global": False,
+        "export_name": "rds_instances",
+    },
+    "lambda": {
+        "title": "Funções Lambda",
+        "client": "lambda",
+        "operation": "list_functions",
+        "items": lambda page: page.get("Functions", []),
+        "columns": ["FunctionName", "Runtime", "LastModified"],
+        "row": _lambda_row,
+        "global": False,
+        "export_name": "lambda_functions",
+    },
+    "iam": {
+        "title": "Usuários IAM",
+        "client": "iam",
+        "operation": "list_users",
+        "items": lambda page: page.get("Users", []),
+        "columns": ["UserName", "CreateDate"],
+        "row": _iam_row,
+        "global": True,
+        "export_name": "iam_users",
+    },
+    "cloudformation": {
+        "title": "CloudFormation Stacks",
+        "client": "cloudformation",
+        "operation": "list_stacks",
+        "items": lambda page: page.get("StackSummaries", []),
+        "columns": ["StackName", "StackStatus", "CreationTime"],
+        "row": _cloudformation_row,
+        "global": False,
+        "export_name": "cloudformation_stacks",
+    },
+}
+
+def iter_service_pages(service, profile=None, region=None):
+    """Itera sobre as páginas de um serviço, retornando a lista de itens de cada página"""
+    spec = SERVICES[service]
+    client = get_client(spec["client"], profile, region)
+    for page in paginate(client, spec["operation"]):
+        yield spec["items"](page)
+
+def export_path(export, service, profile=None, region=None):
+    """Caminho (sem extensão) do arquivo de exportação de um serviço"""
+    name = SERVICES[service]["export_name"]
+    if export.get("per_target"):
+        return os.path.join(export["dir"], profile or "default", region or "default", name)
+    return os.path.join(export["dir"], name)
+
+def _fetch_rows(service, profile=None, region=None, export=None, keep_rows=True):
+    """Busca as linhas de um serviço seguindo todos os paginators.
+    Com export, cada página é gravada em disco na mesma passagem que alimenta a tabela."""
+    spec = SERVICES[service]
+    rows = []
+    count = 0
+    writer = None
+    pages = iter_service_pages(service, profile, region)
+    if export:
+        writer = StreamWriter(export_path(export, service, profile, region), export["format"], export.get("gzip", False),
+                              spec["columns"], lambda item: [_fmt(value) for value in spec["row"](item)])
+        pages = tee_pages(pages, writer)
+
+    try:
+        for items in pages:
+            count += len(items)
+            if keep_rows:
+                rows.extend([_fmt(value) for value in spec["row"](item)] for item in items)
+    except BaseException:
+        if writer:
+            writer.close(success=False)
+        raise
+    if writer:
+        writer.close()
+    return rows, count
+
+def collect_service(service, profile=None, region=None, cache_mode=None, export=None, keep_rows=True):
+    """Coleta as linhas de um serviço, usando o cache local quando cache_mode é informado"""
+    result = {"service": service, "profile": profile, "region": region, "rows": [], "count": 0,
+              "error": None, "cached": False, "kept": keep_rows}
+
+    def fetch():
+        try:
+            rows, result["count"] = _fetch_rows(service, profile, region, export, keep_rows)
+            return rows
+        except (BotoCoreError, ClientError) as e:
+            result["error"] = str(e)
+            return None
+
+    # A exportação precisa dos registros completos, então sempre busca na AWS
+    if cache_mode and not export:
+        rows, result["cached"] = cached_fetch(profile, region, service, fetch, cache_mode)
+        result["count"] = len(rows or [])
+    else:
+        rows = fetch()
+    result["rows"] = rows or []
+    return result
+
+def collect_inventory(profile=None, services=None, region=None, max_workers=MAX_WORKERS, cache_mode=None,
+                      export=None, keep_rows=True):
+    """Executa os coletores de todos os serviços em paralelo usando a mesma sessão"""
+    services = services or list(SERVICES)
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(services))))
+    futures = {
+        executor.submit(collect_service, service, profile, region, cache_mode, export, keep_rows): service
+        for service in services
+    }
+    try:
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    finally:
+        # Em caso de interrupção (ex.: tempo limite do alvo), não esperar os coletores restantes
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+    return results
+
+def collect_target(profile, region, services, max_workers=MAX_WORKERS, cache_mode=None, export=None, keep_rows=True):
+    """Coletor de um alvo (perfil × região) executado no pool de processos"""
+    return collect_inventory(profile, services, region, max_workers, cache_mode, export, keep_rows)
+
+def render_service(result, show_profile=False):
+    """Exibe o resultado de um coletor em uma tabela"""
+    spec = SERVICES[result["service"]]
+    title = spec["title"]
+    if result.get("region") and not spec["global"]:
+        title = f"{title} ({result['region']})"
+    if show_profile:
+        title = f"{result['profile']} - {title}"
+    if result.get("cached"):
+        title = f"{title} (cache)"
+
+    if result["error"]:
+        log("ERROR", f"Falha ao listar {spec['title']}: {result['error']}")
+        return
+
+    if not result.get("kept", True):
+        console.print(f"[bold]{title}[/bold]: {result['count']} recurso(s) exportado(s)")
+        return
+
+    table = Table(title=f"{title} - {len(result['rows'])} recurso(s)")
+    for column in spec["columns"]:
+        table.add_column(column)
+    for row in result["rows"]:
+        table.add_row(*row)
+    console.print(table)
+
+def list_resources(profile=None, services=None, region=None, max_workers=MAX_WORKERS, cache_mode=None,
+                   export=None, keep_rows=True):
+    """Lista os recursos AWS do perfil informado"""
+    services = services or list(SERVICES)
+    log("INFO", f"Listando recursos AWS do perfil '{profile}': {', '.join(services)}")
+
+    results = collect_inventory(profile, services, region, max_workers, cache_mode, export, keep_rows)
+    for service in services:
+        render_service(results[service])
+
+    if any(result["error"] for result in results.values()):
+        log("WARNING", "Alguns recursos não puderam ser listados.")
+        return False
+
+    log("SUCCESS", "Recursos listados com sucesso.")
+    if export:
+        log("SUCCESS", f"Resultados exportados para: {export['dir']}")
+    return True
+
+def list_resources_fanout(profile=None, all_profiles=False, regions=None, services=None,
+                          max_workers=MAX_WORKERS, processes=None, timeout=DEFAULT_TIMEOUT, cache_mode=None,
+                          export=None, keep_rows=True):
+    """Lista recursos em vários perfis e regiões, exibindo cada alvo assim que termina"""
+    services = services or list(SERVICES)
+    global_services = [service for service in services if SERVICES[service]["global"]]
+    regional_services = [service for service in services if not SERVICES[service]["global"]]
+
+    resolved = resolve_targets(profile, all_profiles, regions)
+    targets = []
+    if regional_services:
+        targets.extend((target_profile, region, regional_services, max_workers, cache_mode, export, keep_rows) for target_profile, region in resolved)
+    # Serviços globais (S3, IAM) são coletados uma única vez por perfil
+    if global_services:
+        profiles = sorted({target_profile for target_profile, _ in resolved}, key=lambda p: p or "")
+        targets.extend((target_profile, None, global_services, max_workers, cache_mode, export, keep_rows) for target_profile in profiles)
+
+    if not targets:
+        return False
+
+    log("INFO", f"Listando recursos AWS em {len(targets)} alvo(s): {', '.join(services)}")
+    failed = 0
+    for done in run_targets(collect_target, targets, processes, timeout):
+        target_name = f"{done['profile']}/{done['region'] or 'padrão'}"
+        if done["error"]:
+            failed += 1
+            log("ERROR", f"Falha no alvo {target_name}: {done['error']}")
+            continue
+        for service in services:
+            if service in done["result"]:
+                render_service(done["result"][service], show_profile=True)
+                if done["result"][service]["error"]:
+                    failed += 1
+        log("INFO", f"Alvo {target_name} concluído em {done['duration']:.1f}s")
+
+    if failed:
+        log("WARNING", f"{failed} coleta(s) falharam.")
+        return False
+
+    log("SUCCESS", "Recursos listados com sucesso.")
+    if export:
+        log("SUCCESS", f"Resultados exportados para: {export['dir']}")
+    return True
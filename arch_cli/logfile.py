@@ -0,0 +1,246 @@
+"""
+Gravação do arquivo de log com buffer, rotação por tamanho/idade e linhas JSON opcionais
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: rotação sem trava entre processos
+    fcntl = None
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 7
+DEFAULT_BACKUPS = 5
+FLUSH_INTERVAL = 0.5
+BUFFER_LINES = 1000
+FORMATS = ["text", "json"]
+
+# Campos incluídos em cada linha JSON; run_id é herdado pelos processos filhos
+_context = {"run_id": os.urandom(6).hex()}
+_started = time.monotonic()
+_writers = {}
+_writers_lock = threading.Lock()
+_STOP = object()
+
+def set_log_context(**fields):
+    """Define campos (profile, command etc.) incluídos nas linhas JSON seguintes"""
+    _context.update({key: value for key, value in fields.items() if value is not None})
+
+def get_log_context():
+    """Campos atuais do contexto do log"""
+    return dict(_context)
+
+def run_duration():
+    """Segundos desde o início do processo (ou da execução, para processos filhos)"""
+    return time.monotonic() - _started
+
+def _read_settings(config_file):
+    """Configuração "log" do config.json; lida diretamente para não depender de utils.log"""
+    settings = {}
+    try:
+        with open(config_file) as f:
+            settings = json.load(f).get("log", {}) or {}
+    except (OSError, ValueError, AttributeError):
+        pass
+    fmt = os.environ.get("ARCH_CLI_LOG_FORMAT", settings.get("format", "text"))
+    return {
+        "format": fmt if fmt in FORMATS else "text",
+        "max_bytes": int(settings.get("max_bytes", DEFAULT_MAX_BYTES)),
+        "max_age": float(settings.get("max_age_days", DEFAULT_MAX_AGE_DAYS)) * 86400,
+        "backups": int(settings.get("backups", DEFAULT_BACKUPS)),
+    }
+
+def _first_timestamp(path):
+    """Momento da primeira linha do arquivo (texto ou JSON), usado na rotação por idade"""
+    try:
+        with open(path, "rb") as f:
+            line = f.readline(512).decode("utf-8", "replace")
+    except OSError:
+        return None
+    try:
+        if line.startswith("["):
+            return time.mktime(time.strptime(line[1:20], "%Y-%m-%d %H:%M:%S"))
+        if line.startswith("{"):
+            return float(json.loads(line)["epoch"])
+    except (ValueError, KeyError, OverflowError):
+        pass
+    return None
+
+class LogWriter:
+    """Mantém um único descritor aberto em modo append e grava em lotes.
+    Cada lote é um único write() com O_APPEND, então linhas de processos diferentes não se misturam.
+    No processo principal a gravação é feita por uma thread com fila limitada; em processos
+    filhos criados por fork (que encerram sem atexit) a gravação é síncrona."""
+
+    def __init__(self, path, config_file=None, background=True):
+        self.path = path
+        self.pid = os.getpid()
+        self.settings = _read_settings(config_file) if config_file else _read_settings("")
+        self._lock_path = f"{path}.lock"
+        self._fd = None
+        self._opened_at = None
+        self._io_lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._open()
+        if background:
+            self._queue = queue.Queue(maxsize=BUFFER_LINES)
+            self._thread = threading.Thread(target=self._run, name="arch-cli-log", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._opened_at = _first_timestamp(self.path) or time.time()
+
+    def format(self, level, message, fields=None):
+        """Monta a linha no formato configurado"""
+        now = time.time()
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        if self.settings["format"] != "json":
+            return f"[{timestamp}] [{level}] {message}\n"
+        record = {"timestamp": timestamp, "epoch": round(now, 3), "level": level, "message": message,
+                  "pid": os.getpid()}
+        record.update(_context)
+        record.update(fields or {})
+        return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+    def write(self, level, message, **fields):
+        """Enfileira uma linha (bloqueia apenas se o buffer estiver cheio)"""
+        line = self.format(level, message, fields)
+        if self._queue is not None and self._thread.is_alive():
+            self._queue.put(line)
+        else:
+            self._flush([line])
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                continue
+            batch, stop = [], item is _STOP
+            if not stop:
+                batch.append(item)
+            while not stop:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, lines):
+        data = "".join(lines).encode("utf-8", "replace")
+        with self._io_lock:
+            try:
+                if self._fd is None:
+                    # Linha gravada depois de close() (thread daemon ou outro handler do atexit):
+                    # reabre o arquivo e grava de forma síncrona; o descritor é liberado na saída
+                    self._open()
+                self._maybe_rotate(len(data))
+                os.write(self._fd, data)
+            except OSError:
+                pass
+
+    def _needs_rotation(self, size, incoming):
+        if self.settings["max_bytes"] and size and size + incoming > self.settings["max_bytes"]:
+            return True
+        return bool(self.settings["max_age"] and size and time.time() - self._opened_at > self.settings["max_age"])
+
+    def _maybe_rotate(self, incoming):
+        """Rotaciona o arquivo se necessário e reabre o descritor se outro processo já o rotacionou"""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            current = None
+        own = os.fstat(self._fd)
+        if current is None or current.st_ino != own.st_ino:
+            # Outro processo rotacionou (ou removeu) o arquivo: seguir o novo
+            os.close(self._fd)
+            self._open()
+            return
+        if not self._needs_rotation(current.st_size, incoming):
+            return
+
+        lock_fd = os.open(self._lock_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            # Com a trava, confirma que ninguém rotacionou antes
+            try:
+                current = os.stat(self.path)
+            except FileNotFoundError:
+                current = None
+            if current is not None and current.st_ino == own.st_ino:
+                self._rotate_files()
+            os.close(self._fd)
+            self._open()
+        finally:
+            if fcntl:
+                fcntl.flock(lock_fd, fcntl.LOCK_UN)
+            os.close(lock_fd)
+
+    def _rotate_files(self):
+        """arch-cli.log -> arch-cli.log.1 -> ... -> arch-cli.log.N (o mais antigo é descartado)"""
+        backups = self.settings["backups"]
+        if backups <= 0:
+            os.remove(self.path)
+            return
+        for index in range(backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def close(self):
+        """Grava as linhas pendentes e fecha o descritor"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+        with self._io_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+def _is_child_process():
+    """Processo criado pelo multiprocessing (fork, spawn ou forkserver). Um filho sempre já importou
+    o multiprocessing, então o módulo não é carregado aqui só para a verificação."""
+    multiprocessing = sys.modules.get("multiprocessing")
+    return multiprocessing is not None and multiprocessing.parent_process() is not None
+
+def get_writer(path, config_file=None):
+    """Writer do arquivo no processo atual; processos filhos criam o seu, síncrono"""
+    writer = _writers.get(path)
+    if writer is not None and writer.pid == os.getpid():
+        return writer
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None or writer.pid != os.getpid():
+            # Em filhos a thread de gravação não é confiável: herdada do pai (fork) ela não existe, e o pool
+            # encerra os workers sem executar o atexit, descartando as linhas ainda na fila
+            background = writer is None and not _is_child_process()
+            writer = LogWriter(path, config_file, background=background)
+            _writers[path] = writer
+        return writer
+
+def _reset_after_fork():
+    global _writers_lock
+    _writers_lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
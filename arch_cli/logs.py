@@ -0,0 +1,215 @@
+"""
+Leitura paralela de logs do CloudWatch Logs e acompanhamento em tempo real (--follow)
+"""
+
+import re
+import sys
+import json
+import time
+import queue
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import BotoCoreError, ClientError
+from .aws import get_client, paginate
+from .utils import log, status_to_stderr
+
+DEFAULT_SINCE = "1h"
+DEFAULT_SHARDS = 8
+DEFAULT_INTERVAL = 2.0
+# Páginas em memória por fatia; produtores bloqueiam quando a saída não acompanha
+QUEUE_PAGES = 4
+FORMATS = ["text", "ndjson"]
+
+_DONE = object()
+_DURATION = re.compile(r"^(\d+)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_time(value, now=None):
+    """Converte '15m', '2h', '7d' (relativo a agora) ou data ISO em milissegundos desde epoch"""
+    now = now or time.time()
+    match = _DURATION.match(value.strip())
+    if match:
+        return int((now - int(match.group(1)) * _UNITS[match.group(2)]) * 1000)
+    # fromisoformat só aceita o sufixo Z a partir do Python 3.11
+    moment = datetime.datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return int(moment.timestamp() * 1000)
+
+def shard_range(start, end, shards):
+    """Divide [start, end) em até `shards` intervalos contíguos (em ms)"""
+    shards = max(1, min(shards, end - start))
+    step = -(-(end - start) // shards)
+    return [(s, min(s + step, end)) for s in range(start, end, step)]
+
+def _request(group, streams=None, pattern=None):
+    request = {"logGroupName": group}
+    if streams:
+        request["logStreamNames"] = list(streams)
+    if pattern:
+        request["filterPattern"] = pattern
+    return request
+
+def _put(out, item, stop):
+    """Enfileira respeitando a capacidade da fila, desistindo se a leitura for cancelada"""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _fetch_shard(client, request, start, end, out, stop):
+    """Busca uma fatia paginando filter_log_events e enfileira cada página"""
+    try:
+        for page in paginate(client, "filter_log_events", startTime=start, endTime=end - 1, **request):
+            events = page.get("events", [])
+            if events and not _put(out, events, stop):
+                return
+    except Exception as e:
+        _put(out, e, stop)
+    finally:
+        _put(out, _DONE, stop)
+
+def iter_range(client, group, start, end, streams=None, pattern=None, shards=DEFAULT_SHARDS):
+    """Itera pelas páginas de eventos do intervalo, buscando as fatias em paralelo.
+    As páginas saem na ordem das fatias; cada fatia mantém no máximo QUEUE_PAGES páginas em memória."""
+    ranges = shard_range(start, end, shards)
+    request = _request(group, streams, pattern)
+    queues = [queue.Queue(maxsize=QUEUE_PAGES) for _ in ranges]
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(ranges))
+    try:
+        for (shard_start, shard_end), out in zip(ranges, queues):
+            executor.submit(_fetch_shard, client, request, shard_start, shard_end, out, stop)
+        for out in queues:
+            while True:
+                item = out.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+def follow(client, group, start, streams=None, pattern=None, interval=DEFAULT_INTERVAL, stop=None):
+    """Acompanha o grupo consultando apenas eventos a partir do último timestamp visto"""
+    stop = stop or threading.Event()
+    request = _request(group, streams, pattern)
+    last = start
+    # IDs já emitidos com o último timestamp (a consulta seguinte o inclui novamente)
+    seen = set()
+    while not stop.is_set():
+        for page in paginate(client, "filter_log_events", startTime=last, **request):
+            events = [event for event in page.get("events", []) if event["eventId"] not in seen]
+            if not events:
+                continue
+            newest = max(event["timestamp"] for event in events)
+            if newest > last:
+                last = newest
+                seen = set()
+            seen.update(event["eventId"] for event in events if event["timestamp"] == last)
+            yield events
+        stop.wait(interval)
+
+def format_event(event, fmt="text", group=None):
+    """Formata um evento como linha de texto ou JSON"""
+    if fmt == "ndjson":
+        return json.dumps({"group": group, "stream": event.get("logStreamName"), "timestamp": event["timestamp"],
+                           "message": event["message"]})
+    moment = datetime.datetime.fromtimestamp(event["timestamp"] / 1000).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    return f"{moment} {event.get('logStreamName', '-')} {event['message'].rstrip()}"
+
+class QueueWriter:
+    """Grava eventos no terminal ou em arquivo em uma thread dedicada, com fila limitada.
+    Quando a saída é lenta, put() bloqueia e a leitura dos logs desacelera em vez de acumular memória."""
+
+    def __init__(self, output=None, fmt="text", group=None, maxsize=QUEUE_PAGES * 4):
+        self.fmt = fmt
+        self.group = group
+        self.count = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._file = open(output, "a", encoding="utf-8") if output else sys.stdout
+        self._owns_file = bool(output)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            events = self._queue.get()
+            if events is _DONE:
+                break
+            if self.error:
+                continue
+            try:
+                self._file.write("".join(format_event(event, self.fmt, self.group) + "\n" for event in events))
+                self._file.flush()
+                self.count += len(events)
+            except (OSError, ValueError) as e:
+                self.error = e
+
+    def put(self, events):
+        """Enfileira uma página de eventos (bloqueia se a fila estiver cheia)"""
+        if self.error:
+            raise self.error
+        self._queue.put(events)
+
+    def close(self):
+        """Aguarda a gravação das páginas pendentes e fecha o arquivo"""
+        self._queue.put(_DONE)
+        self._thread.join()
+        if self._owns_file:
+            self._file.close()
+
+def read_logs(group, profile=None, region=None, since=DEFAULT_SINCE, until=None, streams=None, pattern=None,
+              shards=DEFAULT_SHARDS, follow_mode=False, interval=DEFAULT_INTERVAL, output=None, fmt="text"):
+    """Lê os eventos do intervalo em paralelo e, opcionalmente, continua acompanhando o grupo"""
+    args = (group, profile, region, since, until, streams, pattern, shards, follow_mode, interval, output, fmt)
+    if output:
+        return _read_logs(*args)
+    # Eventos no stdout (por exemplo, NDJSON redirecionado): as mensagens de status não podem se misturar a eles
+    with status_to_stderr():
+        return _read_logs(*args)
+
+def _read_logs(group, profile, region, since, until, streams, pattern, shards, follow_mode, interval, output, fmt):
+    try:
+        start = parse_time(since)
+        end = parse_time(until) if until else int(time.time() * 1000)
+    except ValueError as e:
+        log("ERROR", f"Intervalo de tempo inválido: {str(e)}")
+        return False
+    if start >= end:
+        log("ERROR", "O início do intervalo deve ser anterior ao fim.")
+        return False
+
+    log("INFO", f"Lendo logs do grupo '{group}' em {len(shard_range(start, end, shards))} fatia(s)")
+    client = get_client("logs", profile, region)
+    writer = QueueWriter(output, fmt, group)
+    success = True
+    try:
+        for events in iter_range(client, group, start, end, streams, pattern, shards):
+            writer.put(events)
+        if follow_mode and not until:
+            log("INFO", f"Acompanhando o grupo '{group}' (Ctrl+C para encerrar)")
+            for events in follow(client, group, end, streams, pattern, interval):
+                writer.put(events)
+    except KeyboardInterrupt:
+        pass
+    except (BotoCoreError, ClientError, OSError) as e:
+        log("ERROR", f"Erro ao obter logs: {str(e)}")
+        success = False
+    finally:
+        writer.close()
+
+    if writer.error:
+        log("ERROR", f"Erro ao gravar logs: {str(writer.error)}")
+        return False
+    if success:
+        log("SUCCESS", f"{writer.count} evento(s) exibidos com sucesso." if not output
+            else f"{writer.count} evento(s) gravados em: {output}")
+    return success
@@ -5,21 +5,27 @@ Módulo principal do Arch CLI que serve como ponto de entrada para o comando arc
 
 import os
 import sys
-import subprocess
 import click
-from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
-from .dependencies import check_dependencies as check_deps_py
+from .utils import get_active_profile
 
-console = Console()
+# rich, boto3 e os módulos de cada comando são importados dentro dos comandos:
+# a inicialização do CLI carrega apenas click (ver arch_cli/startup_bench.py)
 
 # Caminho para o diretório do script bash
 SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 BASH_SCRIPT = os.path.join(SCRIPT_DIR, "arch-cli.sh")
 
+def run_bash(*args):
+    """Executa o script bash com os argumentos informados (subprocess só é importado quando usado)"""
+    import subprocess
+    return subprocess.run(["/bin/bash", BASH_SCRIPT, *args])
+
 def show_header():
     """Exibe o cabeçalho do Arch CLI"""
+    from rich.panel import Panel
+    from rich.text import Text
+    from .utils import get_console
+
     header = Text()
     header.append("\n")
     header.append("                _                _ _ \n", style="green")
@@ -30,92 +36,618 @@ def show_header():
     header.append("\n")
     header.append("Created by: Luiz Machado (@cryptobr)\n")
     
-    console.print(Panel(header, border_style="blue"))
+    get_console().print(Panel(header, border_style="blue"))
+
+def profile_options(func):
+    """Opções comuns para selecionar os perfis de um comando"""
+    func = click.option("--timeout", default=300, show_default=True, help="Tempo limite por alvo (perfil × região), em segundos")(func)
+    func = click.option("--processes", type=int, help="Número de processos para alvos em paralelo (padrão: CPUs)")(func)
+    func = click.option("--all-profiles", is_flag=True, help="Executar em todos os perfis AWS configurados")(func)
+    func = click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")(func)
+    return func
+
+def target_options(func):
+    """Opções comuns para selecionar os alvos (perfil × região) de um comando"""
+    func = click.option("--regions", "--region", "regions", help="Regiões separadas por vírgula ou 'all' para todas as habilitadas")(func)
+    return profile_options(func)
+
+def cache_options(func):
+    """Opções comuns de uso do cache local de recursos"""
+    func = click.option("--refresh", is_flag=True, help="Ignorar o cache local e buscar tudo novamente na AWS")(func)
+    func = click.option("--cached", is_flag=True, help="Usar o cache local mesmo se expirado (sem chamadas à AWS quando houver dados)")(func)
+    return func
+
+def findings_filters(func):
+    """Filtros comuns das consultas de achados do Prowler"""
+    func = click.option("--format", "fmt", type=click.Choice(["table", "ndjson"]), default="table", show_default=True,
+                        help="Formato de saída")(func)
+    func = click.option("--resource", help="Trecho do ID/ARN do recurso")(func)
+    func = click.option("--check", help="ID do check ou prefixo (ex.: iam_, s3_bucket)")(func)
+    func = click.option("--severity", multiple=True, type=click.Choice(["critical", "high", "medium", "low", "informational"]),
+                        help="Severidade (pode ser repetida)")(func)
+    func = click.option("--service", help="Serviço (ex.: s3, iam, ec2)")(func)
+    func = click.option("--region", help="Região")(func)
+    func = click.option("--account", help="ID da conta AWS")(func)
+    return func
+
+def resolve_profile(profile_name):
+    """Perfil informado ou o perfil ativo, registrado no contexto do log"""
+    from .logfile import set_log_context
+    profile_name = profile_name or get_active_profile()
+    set_log_context(profile=profile_name)
+    return profile_name
+
+def track_command(ctx):
+    """Registra o comando no contexto do log e, ao final da execução, a sua duração"""
+    from .logfile import get_log_context, get_writer, run_duration, set_log_context
+    from .utils import CONFIG_FILE, LOG_FILE
+
+    names, current = [ctx.invoked_subcommand], ctx
+    while current.parent is not None:
+        names.insert(0, current.info_name)
+        current = current.parent
+    set_log_context(command=" ".join(filter(None, names)) or None)
+
+    def finished():
+        duration = run_duration()
+        get_writer(LOG_FILE, CONFIG_FILE).write(
+            "INFO", f"Execução de '{get_log_context().get('command')}' finalizada em {duration:.2f}s",
+            duration=round(duration, 3))
+
+    if ctx.parent is None and ctx.invoked_subcommand:
+        ctx.call_on_close(finished)
+
+def get_cache_mode(cached, refresh):
+    """Converte as flags --cached/--refresh no modo do cache"""
+    if cached and refresh:
+        raise click.UsageError("Use apenas uma das opções --cached ou --refresh.")
+    if refresh:
+        return "refresh"
+    if cached:
+        return "cached"
+    return "auto"
 
 @click.group(invoke_without_command=True)
 @click.pass_context
 @click.version_option(version="3.2.0")
 def main(ctx):
     """Arch CLI - Ferramenta para gerenciamento de times de Arquitetura, SRE e DevOps com foco em AWS"""
+    track_command(ctx)
     if ctx.invoked_subcommand is None:
         show_header()
         # Executar o script bash sem argumentos (menu interativo)
-        subprocess.run(["/bin/bash", BASH_SCRIPT])
+        run_bash()
 
 @main.command()
 @click.option("--python", is_flag=True, help="Usar a implementação Python para verificar dependências")
-def deps(python):
+@click.option("--recheck", is_flag=True, help="Ignorar o manifesto em cache e verificar todas as ferramentas novamente (implica --python)")
+def deps(python, recheck):
     """Verifica dependências necessárias (AWS-CLI, Python3, Prowler)"""
-    if python:
+    if python or recheck:
         # Usar a implementação Python
-        check_deps_py()
+        from .dependencies import check_dependencies
+        check_dependencies(recheck)
     else:
         # Usar a implementação Bash
-        subprocess.run(["/bin/bash", BASH_SCRIPT, "--deps"])
+        run_bash("--deps")
 
-@main.command()
-def prowler():
+@main.group(invoke_without_command=True)
+@click.pass_context
+def prowler(ctx):
     """Inicia o Prowler para auditoria de segurança"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--prowler"])
+    track_command(ctx)
+    if ctx.invoked_subcommand is None:
+        run_bash("--prowler")
+
+@prowler.command()
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--all-profiles", is_flag=True, help="Executar em todos os perfis AWS configurados")
+@click.option("--regions", "--region", "regions", help="Regiões separadas por vírgula ou 'all' (padrão: o Prowler varre todas em uma execução)")
+@click.option("--compliance", type=click.Choice(["cis", "pci", "hipaa", "nist"]), help="Framework de compliance a verificar")
+@click.option("--parallel", type=int, help="Máximo de execuções simultâneas (padrão: limitado por CPUs e memória)")
+@click.option("--memory-per-scan", default=2048, show_default=True, help="Memória estimada por execução, em MB")
+@click.option("--timeout", default=14400, show_default=True, help="Tempo limite por execução, em segundos")
+@click.option("--retries", default=1, show_default=True, help="Novas tentativas por alvo em caso de falha")
+@click.option("--output-dir", help="Diretório dos relatórios (padrão: ./prowler_reports/<timestamp>)")
+@click.option("--ingest", is_flag=True, help="Importar os achados no banco local ao final (ver 'prowler findings')")
+def scan(profile_name, all_profiles, regions, compliance, parallel, memory_per_scan, timeout, retries, output_dir,
+         ingest):
+    """Executa o Prowler em vários perfis e regiões em paralelo e consolida os resultados"""
+    from .fanout import parse_regions
+    from .prowler import run_scans
+    if not run_scans(resolve_profile(profile_name), all_profiles, parse_regions(regions), compliance, output_dir,
+                     parallel, memory_per_scan, timeout, retries, ingest):
+        sys.exit(1)
+
+@prowler.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--name", help="Nome da varredura (padrão: nome do diretório)")
+@click.option("--force", is_flag=True, help="Reimportar mesmo que os arquivos não tenham mudado")
+def ingest(paths, name, force):
+    """Importa os CSVs de varreduras do Prowler no banco local de achados"""
+    from .findings import ingest_paths
+    if not ingest_paths(paths, name, force):
+        sys.exit(1)
+
+@prowler.command()
+@click.option("--scan", "scan_name", help="Varredura a consultar (padrão: a mais recente)")
+@click.option("--status", type=click.Choice(["FAIL", "PASS", "MANUAL"], case_sensitive=False), default="FAIL",
+              show_default=True, help="Status dos achados")
+@findings_filters
+@click.option("--limit", default=50, show_default=True, help="Máximo de achados exibidos (0 para todos)")
+@click.option("--list-scans", is_flag=True, help="Listar as varreduras importadas")
+def findings(scan_name, status, account, region, service, severity, check, resource, fmt, limit, list_scans):
+    """Consulta os achados importados com filtros indexados"""
+    from .findings import show_findings, show_scans
+    if list_scans:
+        show_scans()
+        return
+    if not show_findings(scan_name, limit, fmt, status=status, account=account, region=region, service=service,
+                         severity=severity, check=check, resource=resource):
+        sys.exit(1)
+
+@prowler.command()
+@click.argument("old", required=False)
+@click.argument("new", required=False)
+@findings_filters
+def diff(old, new, account, region, service, severity, check, resource, fmt):
+    """Compara duas varreduras: falhas novas, resolvidas e que continuam (padrão: as duas mais recentes;
+    com apenas OLD, compara OLD com a mais recente)"""
+    from .findings import show_diff
+    if not show_diff(old, new, fmt, account=account, region=region, service=service, severity=severity,
+                     check=check, resource=resource):
+        sys.exit(1)
 
 @main.command()
 def np():
     """Configura um novo perfil no AWS CLI"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--np"])
+    run_bash("--np")
 
 @main.command()
 @click.option("--acc", required=True, help="Account ID para criar o usuário de suporte")
 def lsu(acc):
     """Cria um usuário administrativo de suporte na conta AWS"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--lsu", "--acc", acc])
+    run_bash("--lsu", "--acc", acc)
 
 @main.command()
-def list():
+@target_options
+@click.option("--service", "services", multiple=True,
+              type=click.Choice(["ec2", "s3", "rds", "lambda", "iam", "cloudformation"]),
+              help="Serviço a listar (pode ser repetido; padrão: todos)")
+@click.option("--workers", default=8, show_default=True, help="Número máximo de coletores em paralelo")
+@cache_options
+@click.option("--export", "export_format", type=click.Choice(["ndjson", "csv"]),
+              help="Exportar os resultados página a página no formato informado")
+@click.option("--gzip", "compress", is_flag=True, help="Compactar os arquivos exportados com gzip")
+@click.option("--output-dir", help="Diretório de exportação (padrão: ./aws_resources/<timestamp>)")
+@click.option("--no-table", is_flag=True, help="Não exibir as tabelas (apenas exportar e contar os recursos)")
+@click.option("--bash", is_flag=True, help="Usar a implementação Bash (menu interativo)")
+def list(profile_name, all_profiles, regions, processes, timeout, services, workers, cached, refresh,
+         export_format, compress, output_dir, no_table, bash):
     """Lista recursos AWS (EC2, S3, RDS, Lambda, IAM, CloudFormation)"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--list"])
+    if bash:
+        run_bash("--list")
+        return
 
-@main.command()
-def monitor():
+    from .fanout import parse_regions
+    from .inventory import list_resources, list_resources_fanout
+    profile_name = resolve_profile(profile_name)
+    regions = parse_regions(regions)
+    cache_mode = get_cache_mode(cached, refresh)
+    fanout = all_profiles or (regions and len(regions) > 1) or regions == ["all"]
+
+    export = None
+    if export_format:
+        from .export import default_export_dir
+        export = {
+            "dir": output_dir or default_export_dir(),
+            "format": export_format,
+            "gzip": compress,
+            "per_target": bool(fanout),
+        }
+    elif no_table:
+        raise click.UsageError("--no-table só pode ser usado junto com --export.")
+
+    if fanout:
+        success = list_resources_fanout(profile_name, all_profiles, regions, services, workers, processes, timeout,
+                                        cache_mode, export, not no_table)
+    else:
+        success = list_resources(profile_name, services, regions[0] if regions else None, workers, cache_mode,
+                                 export, not no_table)
+    if not success:
+        sys.exit(1)
+
+@main.group(invoke_without_command=True)
+@click.pass_context
+def monitor(ctx):
     """Acessa o menu de monitoramento e observabilidade"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--monitor"])
+    track_command(ctx)
+    if ctx.invoked_subcommand is None:
+        run_bash("--monitor")
 
-@main.command()
-def cost():
+@monitor.command()
+@click.argument("group")
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--region", help="Região AWS (padrão: região do perfil)")
+@click.option("--stream", "streams", multiple=True, help="Stream de logs (pode ser repetido; padrão: todos)")
+@click.option("--filter", "pattern", help="Padrão de filtro do CloudWatch Logs")
+@click.option("--since", default="1h", show_default=True, help="Início: duração relativa (15m, 2h, 7d) ou data ISO")
+@click.option("--until", help="Fim: duração relativa ou data ISO (padrão: agora)")
+@click.option("--shards", default=8, show_default=True, help="Fatias de tempo buscadas em paralelo")
+@click.option("--follow", "-f", "follow_mode", is_flag=True, help="Continuar acompanhando novos eventos")
+@click.option("--interval", default=2.0, show_default=True, help="Intervalo entre consultas no modo --follow, em segundos")
+@click.option("--output", type=click.Path(dir_okay=False), help="Gravar os eventos neste arquivo em vez do terminal")
+@click.option("--format", "fmt", type=click.Choice(["text", "ndjson"]), default="text", show_default=True,
+              help="Formato de saída dos eventos")
+def logs(group, profile_name, region, streams, pattern, since, until, shards, follow_mode, interval, output, fmt):
+    """Lê logs do CloudWatch em paralelo, com acompanhamento em tempo real (--follow)"""
+    from .logs import read_logs
+    if not read_logs(group, resolve_profile(profile_name), region, since, until, streams, pattern, shards,
+                     follow_mode, interval, output, fmt):
+        sys.exit(1)
+
+@monitor.command()
+@click.argument("query")
+@click.option("--group", "groups", multiple=True, help="Grupo de logs (pode ser repetido)")
+@click.option("--group-prefix", "prefixes", multiple=True, help="Incluir todos os grupos com este prefixo (pode ser repetido)")
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--all-profiles", is_flag=True, help="Executar em todos os perfis AWS configurados")
+@click.option("--regions", "--region", "regions", help="Regiões separadas por vírgula ou 'all' para todas as habilitadas")
+@click.option("--since", default="1h", show_default=True, help="Início: duração relativa (15m, 2h, 7d) ou data ISO")
+@click.option("--until", help="Fim: duração relativa ou data ISO (padrão: agora)")
+@click.option("--groups-per-query", default=10, show_default=True, help="Grupos por consulta (máximo 50)")
+@click.option("--limit", type=int, help="Máximo de linhas por consulta")
+@click.option("--format", "fmt", type=click.Choice(["table", "ndjson"]), default="table", show_default=True,
+              help="Formato de saída das linhas")
+@click.option("--output", type=click.Path(dir_okay=False), help="Gravar as linhas em NDJSON neste arquivo")
+@click.option("--timeout", default=900, show_default=True, help="Tempo limite por alvo (perfil × região), em segundos")
+def insights(query, groups, prefixes, profile_name, all_profiles, regions, since, until, groups_per_query, limit,
+             fmt, output, timeout):
+    """Executa uma consulta do Logs Insights em vários grupos e perfis simultaneamente"""
+    from .fanout import parse_regions
+    from .insights import run_insights
+    if not run_insights(query, groups, prefixes, resolve_profile(profile_name), all_profiles,
+                        parse_regions(regions), since, until, groups_per_query, limit, fmt, output, timeout):
+        sys.exit(1)
+
+@monitor.command()
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--region", help="Região AWS (padrão: região do perfil)")
+@click.option("--service", "services", multiple=True, type=click.Choice(["ec2", "rds", "elb", "lambda"]),
+              help="Serviço a verificar (pode ser repetido; padrão: todos)")
+@click.option("--watch", "-w", is_flag=True, help="Continuar consultando e exibir apenas as mudanças de estado")
+@click.option("--interval", default=30.0, show_default=True, type=click.FloatRange(min=5),
+              help="Intervalo entre consultas no modo --watch, em segundos")
+@click.option("--workers", default=16, show_default=True, help="Número máximo de chamadas simultâneas")
+@click.option("--problems-only", is_flag=True, help="Exibir na tabela inicial apenas recursos com problemas")
+def health(profile_name, region, services, watch, interval, workers, problems_only):
+    """Verifica a saúde de EC2, RDS, balanceadores de carga (todos os alvos) e Lambda em paralelo"""
+    from .health import health_check
+    if not health_check(resolve_profile(profile_name), region, services, watch, interval, workers, problems_only):
+        sys.exit(1)
+
+@main.group(invoke_without_command=True)
+@click.pass_context
+def cost(ctx):
     """Acessa o menu de otimização de custos"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--cost"])
+    track_command(ctx)
+    if ctx.invoked_subcommand is None:
+        run_bash("--cost")
 
-@main.command()
-def security():
+@cost.command()
+@profile_options
+@click.option("--tag", help="Agrupar por esta chave de tag em vez de serviço")
+@click.option("--start", type=click.DateTime(formats=["%Y-%m-%d"]), help="Data inicial (padrão: primeiro dia do mês)")
+@click.option("--end", type=click.DateTime(formats=["%Y-%m-%d"]), help="Data final exclusiva (padrão: amanhã)")
+@click.option("--metric", type=click.Choice(["blended", "unblended"]), default="blended", show_default=True,
+              help="Métrica de custo")
+@click.option("--offline", is_flag=True, help="Usar apenas os dados locais, sem sincronizar com o Cost Explorer")
+def report(profile_name, all_profiles, processes, timeout, tag, start, end, metric, offline):
+    """Relatório de custos (mês atual, por serviço ou por tag) calculado localmente"""
+    from .costs import cost_report
+    if not cost_report(resolve_profile(profile_name), tag, start.date() if start else None,
+                       end.date() if end else None, metric, offline, all_profiles, processes, timeout):
+        sys.exit(1)
+
+@cost.command()
+@target_options
+@click.option("--days", default=14, show_default=True, help="Período de análise, em dias")
+@click.option("--period", default=3600, show_default=True, help="Granularidade das métricas, em segundos")
+@click.option("--idle-cpu", default=5.0, show_default=True, help="CPU p95 (%) abaixo da qual a instância é ociosa")
+@click.option("--idle-network", default=10.0, show_default=True, help="Rede p95 (KB/s) abaixo da qual a instância é ociosa")
+@click.option("--downsize-cpu", default=40.0, show_default=True, help="CPU p99 (%) abaixo da qual a instância pode ser reduzida")
+def rightsizing(profile_name, all_profiles, regions, processes, timeout, days, period, idle_cpu, idle_network,
+                downsize_cpu):
+    """Identifica instâncias EC2 ociosas ou superdimensionadas (CPU, rede e EBS)"""
+    from .fanout import parse_regions
+    from .rightsizing import analyze_rightsizing
+    thresholds = {"idle_cpu": idle_cpu, "idle_network": idle_network, "downsize_cpu": downsize_cpu}
+    if not analyze_rightsizing(resolve_profile(profile_name), parse_regions(regions), all_profiles, days,
+                               period, thresholds, processes, timeout):
+        sys.exit(1)
+
+@cost.command()
+@target_options
+@click.option("--older-than", default=90, show_default=True, help="Idade (dias) a partir da qual um snapshot é antigo")
+@click.option("--top", default=20, show_default=True, help="Quantidade de itens nas listas de maiores órfãos/volumes")
+@click.option("--export", "export_format", type=click.Choice(["ndjson", "csv"]),
+              help="Exportar os snapshots antigos página a página no formato informado")
+@click.option("--gzip", "compress", is_flag=True, help="Compactar os arquivos exportados com gzip")
+@click.option("--output-dir", help="Diretório de exportação (padrão: ./ebs_snapshots/<timestamp>)")
+def snapshots(profile_name, all_profiles, regions, processes, timeout, older_than, top, export_format, compress,
+              output_dir):
+    """Varre snapshots e volumes EBS (idade, órfãos, volumes não anexados e custo estimado)"""
+    from .fanout import parse_regions
+    from .snapshots import scan_storage
+    export = None
+    if export_format:
+        from .export import default_export_dir
+        export = {"dir": output_dir or default_export_dir("ebs_snapshots"), "format": export_format, "gzip": compress}
+    if not scan_storage(resolve_profile(profile_name), parse_regions(regions), all_profiles, older_than, top,
+                        export, processes, timeout):
+        sys.exit(1)
+
+@main.group(invoke_without_command=True)
+@click.pass_context
+def security(ctx):
     """Acessa o menu de segurança e compliance"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--security"])
+    track_command(ctx)
+    if ctx.invoked_subcommand is None:
+        run_bash("--security")
 
-@main.command()
-def automation():
+@security.command()
+@profile_options
+@click.option("--check", "checks", multiple=True, type=click.Choice(["admin", "wildcard", "unused"]),
+              help="Verificação a executar (pode ser repetida; padrão: todas)")
+def iam(profile_name, all_profiles, processes, timeout, checks):
+    """Analisa políticas IAM (administradores, curingas e políticas não utilizadas)"""
+    from .iam import analyze_iam
+    if not analyze_iam(resolve_profile(profile_name), checks, all_profiles, processes, timeout):
+        sys.exit(1)
+
+@security.command()
+@profile_options
+@click.option("--check", "checks", multiple=True, type=click.Choice(["keys", "unused", "mfa"]),
+              help="Verificação a executar (pode ser repetida; padrão: todas)")
+@click.option("--max-age", default=90, show_default=True, help="Idade/inatividade máxima aceitável, em dias")
+@click.option("--refresh", is_flag=True, help="Gerar um novo relatório mesmo que o atual ainda seja válido")
+def credentials(profile_name, all_profiles, processes, timeout, checks, max_age, refresh):
+    """Audita idade e uso de chaves de acesso, uso de senha e MFA via relatório de credenciais"""
+    from .credentials import audit_credentials
+    if not audit_credentials(resolve_profile(profile_name), max_age, checks, refresh,
+                             all_profiles, processes, timeout):
+        sys.exit(1)
+
+@main.group(invoke_without_command=True)
+@click.pass_context
+def automation(ctx):
     """Acessa o menu de automação de rotinas"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--automation"])
+    track_command(ctx)
+    if ctx.invoked_subcommand is None:
+        run_bash("--automation")
 
-@main.command()
-def containers():
+@automation.command()
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--region", help="Região AWS (padrão: região do perfil)")
+@click.option("--service", "services", multiple=True, type=click.Choice(["ebs", "rds", "dynamodb"]),
+              help="Serviço a copiar (pode ser repetido; padrão: todos)")
+@click.option("--tag", "tags", multiple=True,
+              help="Copiar apenas volumes/bancos com a tag CHAVE=VALOR (ignora o DynamoDB)")
+@click.option("--run-id", help="Identificador da execução; repetir o mesmo retoma a execução (padrão: data UTC)")
+@click.option("--rate", default=5.0, show_default=True, help="Chamadas de criação por segundo, por serviço")
+@click.option("--workers", default=16, show_default=True, help="Número máximo de chamadas simultâneas")
+@click.option("--timeout", default=120, show_default=True, help="Tempo máximo de espera pela conclusão, em minutos")
+@click.option("--no-wait", is_flag=True, help="Apenas criar os backups, sem esperar a conclusão")
+def backup(profile_name, region, services, tags, run_id, rate, workers, timeout, no_wait):
+    """Cria backups de volumes EBS, bancos RDS e tabelas DynamoDB em paralelo, retomando execuções interrompidas"""
+    from .backup import run_backups
+    try:
+        tag_filters = dict(tag.split("=", 1) for tag in tags)
+    except ValueError:
+        raise click.BadParameter("use o formato CHAVE=VALOR", param_hint="--tag")
+    if not run_backups(resolve_profile(profile_name), region, services, tag_filters, run_id, rate, workers, timeout,
+                       not no_wait):
+        sys.exit(1)
+
+@main.group()
+@click.pass_context
+def scheduler(ctx):
+    """Agendador de tarefas (backup, saúde e rotação de logs) em um processo contínuo"""
+    track_command(ctx)
+
+@scheduler.command()
+@click.option("--config", "config_path", type=click.Path(dir_okay=False),
+              help="Arquivo YAML (padrão: ~/.arch-cli/schedule.yaml)")
+@click.option("--workers", default=4, show_default=True, help="Número máximo de tarefas executadas simultaneamente")
+def start(config_path, workers):
+    """Executa as tarefas do agendamento em primeiro plano até ser interrompido"""
+    from .scheduler import SCHEDULE_FILE, run_scheduler
+    if not run_scheduler(config_path or SCHEDULE_FILE, workers):
+        sys.exit(1)
+
+@scheduler.command()
+@click.argument("name")
+@click.option("--config", "config_path", type=click.Path(dir_okay=False),
+              help="Arquivo YAML (padrão: ~/.arch-cli/schedule.yaml)")
+def run(name, config_path):
+    """Executa imediatamente uma tarefa do agendamento"""
+    from .scheduler import SCHEDULE_FILE, run_job
+    if not run_job(name, config_path or SCHEDULE_FILE):
+        sys.exit(1)
+
+@scheduler.command(name="list")
+@click.option("--config", "config_path", type=click.Path(dir_okay=False),
+              help="Arquivo YAML (padrão: ~/.arch-cli/schedule.yaml)")
+def list_jobs(config_path):
+    """Lista as tarefas agendadas e a próxima execução de cada uma"""
+    from .scheduler import SCHEDULE_FILE, show_jobs
+    if not show_jobs(config_path or SCHEDULE_FILE):
+        sys.exit(1)
+
+@scheduler.command()
+@click.option("--job", help="Exibir apenas esta tarefa")
+@click.option("--limit", default=20, show_default=True, help="Quantidade de execuções exibidas")
+def history(job, limit):
+    """Exibe o histórico de execuções e durações"""
+    from .scheduler import show_history
+    if not show_history(job, limit):
+        sys.exit(1)
+
+@main.group(invoke_without_command=True)
+@click.pass_context
+def containers(ctx):
     """Acessa o menu de gerenciamento de containers"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--containers"])
+    track_command(ctx)
+    if ctx.invoked_subcommand is None:
+        run_bash("--containers")
 
-@main.command()
-def database():
+@containers.command()
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--region", help="Região AWS (padrão: região do perfil)")
+@click.option("--cluster", help="Exibir apenas este cluster (nome ou ARN)")
+@click.option("--workers", default=8, show_default=True, help="Número máximo de clusters coletados em paralelo")
+@cache_options
+def ecs(profile_name, region, cluster, workers, cached, refresh):
+    """Exibe a topologia do ECS: clusters, serviços, tarefas e instâncias de container"""
+    from .ecs import show_ecs
+    if not show_ecs(resolve_profile(profile_name), region, cluster, get_cache_mode(cached, refresh), workers):
+        sys.exit(1)
+
+@containers.command()
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--all-profiles", is_flag=True, help="Executar em todos os perfis AWS configurados")
+@click.option("--regions", "--region", "regions", help="Regiões separadas por vírgula (padrão: todas as habilitadas)")
+@click.option("--min-version", help="Versão mínima aceitável do Kubernetes (ex.: 1.30)")
+@click.option("--outdated-only", is_flag=True, help="Exibir apenas clusters desatualizados ou em suporte estendido")
+@click.option("--workers", default=16, show_default=True, help="Número máximo de chamadas à API em paralelo")
+def eks(profile_name, all_profiles, regions, min_version, outdated_only, workers):
+    """Inventário de clusters EKS com nodegroups, perfis Fargate e add-ons em todas as regiões"""
+    from .eks import eks_inventory
+    from .fanout import parse_regions
+    if not eks_inventory(resolve_profile(profile_name), all_profiles, parse_regions(regions), min_version,
+                         outdated_only, workers):
+        sys.exit(1)
+
+@containers.command()
+@click.argument("cluster")
+@click.argument("service")
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--region", help="Região AWS (padrão: região do perfil)")
+@cache_options
+def inspect(cluster, service, profile_name, region, cached, refresh):
+    """Detalha um serviço ECS: implantações, tarefas, contêineres e eventos"""
+    from .ecs import inspect_service
+    if not inspect_service(resolve_profile(profile_name), region, cluster, service, get_cache_mode(cached, refresh)):
+        sys.exit(1)
+
+@containers.command()
+@click.argument("cluster")
+@click.argument("service")
+@click.argument("count", type=click.IntRange(min=0))
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--region", help="Região AWS (padrão: região do perfil)")
+@click.option("--yes", "-y", is_flag=True, help="Não pedir confirmação")
+def scale(cluster, service, count, profile_name, region, yes):
+    """Altera o número desejado de tarefas de um serviço ECS"""
+    from .ecs import scale_service
+    if not yes:
+        click.confirm(f"Atualizar o serviço {service} do cluster {cluster} para {count} tarefa(s)?", abort=True)
+    if not scale_service(resolve_profile(profile_name), region, cluster, service, count):
+        sys.exit(1)
+
+@containers.command()
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--region", help="Região AWS (padrão: região do perfil)")
+@click.option("--repository", "repositories", multiple=True, help="Repositório (pode ser repetido; padrão: todos)")
+@click.option("--keep-last", type=click.IntRange(min=0), help="Manter sempre as N imagens mais recentes")
+@click.option("--max-age", type=click.IntRange(min=0), help="Excluir apenas imagens com mais de N dias")
+@click.option("--keep-tag", "keep_tags", multiple=True, help="Expressão regular de tags protegidas (pode ser repetida)")
+@click.option("--untagged-only", is_flag=True, help="Considerar apenas imagens sem tag")
+@click.option("--workers", default=8, show_default=True, help="Número máximo de repositórios processados em paralelo")
+@click.option("--apply", is_flag=True, help="Excluir as imagens (padrão: apenas simular)")
+@click.option("--yes", "-y", is_flag=True, help="Não pedir confirmação com --apply")
+def ecr(profile_name, region, repositories, keep_last, max_age, keep_tags, untagged_only, workers, apply, yes):
+    """Aplica regras de retenção às imagens do ECR em todos os repositórios (simulação por padrão)"""
+    from .ecr import apply_retention
+    if apply and not yes:
+        click.confirm("Excluir as imagens que não atendem às regras de retenção?", abort=True)
+    if not apply_retention(resolve_profile(profile_name), region, repositories, keep_last, max_age, keep_tags,
+                           untagged_only, apply, workers):
+        sys.exit(1)
+
+@main.group(invoke_without_command=True)
+@click.pass_context
+def database(ctx):
     """Acessa o menu de gerenciamento de banco de dados"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--database"])
+    track_command(ctx)
+    if ctx.invoked_subcommand is None:
+        run_bash("--database")
+
+@database.command()
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--region", help="Região AWS (padrão: região do perfil)")
+@click.option("--hours", default=24, show_default=True, help="Período exibido, em horas")
+@click.option("--period", default=300, show_default=True, help="Granularidade das métricas, em segundos")
+@click.option("--top", default=20, show_default=True, help="Quantidade de instâncias exibidas (0 para todas)")
+@click.option("--offline", is_flag=True, help="Usar apenas os dados locais, sem consultar o CloudWatch")
+def metrics(profile_name, region, hours, period, top, offline):
+    """Classifica as instâncias RDS por saturação (CPU, conexões, armazenamento, IOPS e latência)"""
+    from .rds import rds_dashboard
+    if not rds_dashboard(resolve_profile(profile_name), region, hours, period, top, offline):
+        sys.exit(1)
+
+@database.command()
+@click.option("--profile", "profile_name", help="Perfil AWS a utilizar (padrão: perfil ativo)")
+@click.option("--region", help="Região AWS (padrão: região do perfil)")
+@click.option("--table", "tables", multiple=True, help="Tabela (pode ser repetida; padrão: todas)")
+@click.option("--days", default=14, show_default=True, help="Período de consumo analisado, em dias")
+@click.option("--period", default=300, show_default=True, help="Granularidade das métricas, em segundos")
+@click.option("--workers", default=8, show_default=True, help="Número máximo de tabelas descritas em paralelo")
+@click.option("--apply", is_flag=True, help="Aplicar as recomendações (padrão: apenas exibir)")
+@click.option("--yes", "-y", is_flag=True, help="Não pedir confirmação com --apply")
+def dynamodb(profile_name, region, tables, days, period, workers, apply, yes):
+    """Recomenda modo de cobrança e capacidade das tabelas e GSIs do DynamoDB a partir do consumo"""
+    from .dynamodb import capacity_advisor
+    if apply and not yes:
+        click.confirm("Aplicar as alterações de capacidade recomendadas?", abort=True)
+    if not capacity_advisor(resolve_profile(profile_name), region, tables, days, period, apply, workers):
+        sys.exit(1)
 
 @main.command()
 @click.argument("profile_name", required=False)
-def profile(profile_name):
+@click.option("--bash", is_flag=True, help="Usar a implementação Bash (menu interativo)")
+def profile(profile_name, bash):
     """Define ou gerencia o perfil AWS ativo"""
+    if bash:
+        run_bash("--profile", *([profile_name] if profile_name else []))
+        return
+
+    from .utils import get_aws_profiles, log, set_active_profile
+    profiles = get_aws_profiles()
+    if not profiles:
+        log("ERROR", "Nenhum perfil AWS CLI encontrado.")
+        click.echo("Use 'arch-cli np' para configurar um novo perfil.")
+        sys.exit(1)
+
     if profile_name:
-        subprocess.run(["/bin/bash", BASH_SCRIPT, "--profile", profile_name])
-    else:
-        subprocess.run(["/bin/bash", BASH_SCRIPT, "--profile"])
+        if profile_name not in profiles:
+            log("ERROR", f"Perfil '{profile_name}' não encontrado.")
+            sys.exit(1)
+        set_active_profile(profile_name)
+        return
+
+    active = get_active_profile()
+    click.echo(f"Perfil ativo atual: {active}\n")
+    click.echo("Perfis disponíveis:")
+    for i, name in enumerate(profiles, 1):
+        click.echo(f"[{i}] {name}{' (ATIVO)' if name == active else ''}")
+    selection = click.prompt(f"Selecione um perfil (1-{len(profiles)})", type=click.IntRange(1, len(profiles)))
+    set_active_profile(profiles[selection - 1])
+
 @main.command()
 def finops():
     """Acessa o menu do AWS FinOps Dashboard"""
-    subprocess.run(["/bin/bash", BASH_SCRIPT, "--finops"])
+    run_bash("--finops")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,111 @@
+"""
+Coleta de métricas do CloudWatch em lote (GetMetricData) e estatísticas vetorizadas
+"""
+
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .aws import paginate
+
+# Limite de consultas por chamada de GetMetricData
+MAX_QUERIES = 500
+
+def metric_query(query_id, namespace, metric, dimensions, stat, period):
+    """Monta uma consulta de GetMetricData (o Id deve começar com letra minúscula)"""
+    return {
+        "Id": query_id,
+        "MetricStat": {
+            "Metric": {
+                "Namespace": namespace,
+                "MetricName": metric,
+                "Dimensions": [{"Name": name, "Value": value} for name, value in dimensions.items()],
+            },
+            "Period": period,
+            "Stat": stat,
+        },
+        "ReturnData": True,
+    }
+
+def _fetch_chunk(client, queries, start, end):
+    """Executa um lote de até 500 consultas seguindo NextToken"""
+    series = {}
+    for page in paginate(client, "get_metric_data", MetricDataQueries=queries, StartTime=start, EndTime=end,
+                         ScanBy="TimestampAscending"):
+        for result in page.get("MetricDataResults", []):
+            timestamps, values = series.setdefault(result["Id"], ([], []))
+            timestamps.extend(timestamp.timestamp() for timestamp in result.get("Timestamps", []))
+            values.extend(result.get("Values", []))
+    return series
+
+def get_metric_data(client, queries, start, end, max_workers=4):
+    """Executa as consultas em lotes de 500 por chamada, com os lotes em paralelo.
+    Retorna {Id: (timestamps, valores)}"""
+    chunks = [queries[i:i + MAX_QUERIES] for i in range(0, len(queries), MAX_QUERIES)]
+    results = {}
+    if not chunks:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        for series in executor.map(lambda chunk: _fetch_chunk(client, chunk, start, end), chunks):
+            results.update(series)
+    return results
+
+def build_matrix(series_list, start, end, period):
+    """Alinha as séries em uma matriz (séries × períodos), com NaN onde não há pontos"""
+    start_ts = start.timestamp()
+    columns = max(1, int((end.timestamp() - start_ts) // period) + 1)
+    matrix = np.full((len(series_list), columns), np.nan)
+    for row, (timestamps, values) in enumerate(series_list):
+        if not timestamps:
+            continue
+        index = ((np.asarray(timestamps) - start_ts) // period).astype(int)
+        mask = (index >= 0) & (index < columns)
+        matrix[row, index[mask]] = np.asarray(values, dtype=float)[mask]
+    return matrix
+
+def summarize(matrix, percentiles=(50, 95, 99)):
+    """Calcula percentis, mínimo, máximo, média e número de amostras por linha, ignorando NaN"""
+    with warnings.catch_warnings():
+        # Linhas sem nenhum ponto geram "All-NaN slice"; o resultado (NaN) já é o esperado
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        stats = {f"p{p}": values for p, values in zip(percentiles, np.nanpercentile(matrix, percentiles, axis=1))}
+        stats["min"] = np.nanmin(matrix, axis=1)
+        stats["max"] = np.nanmax(matrix, axis=1)
+        stats["mean"] = np.nanmean(matrix, axis=1)
+    stats["samples"] = np.count_nonzero(~np.isnan(matrix), axis=1)
+    return stats
+
+def nan_add(*matrices):
+    """Soma matrizes tratando NaN como zero, mas mantendo NaN onde todas são NaN"""
+    stacked = np.stack(matrices)
+    total = np.nansum(stacked, axis=0)
+    total[np.all(np.isnan(stacked), axis=0)] = np.nan
+    return total
+
+def downsample(matrix, buckets, how="max"):
+    """Reduz cada linha a no máximo `buckets` colunas agregando colunas vizinhas (máximo ou média),
+    para exibir intervalos longos sem percorrer todos os pontos"""
+    rows, columns = matrix.shape
+    if columns <= buckets:
+        return matrix
+    width = -(-columns // buckets)
+    buckets = -(-columns // width)
+    padded = np.full((rows, width * buckets), np.nan)
+    padded[:, :columns] = matrix
+    blocks = padded.reshape(rows, buckets, width)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmax(blocks, axis=2) if how == "max" else np.nanmean(blocks, axis=2)
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+def sparkline(values, low=None, high=None):
+    """Representa uma série como caracteres de bloco (espaço onde não há dados)"""
+    values = np.asarray(values, dtype=float)
+    valid = values[~np.isnan(values)]
+    if not valid.size:
+        return ""
+    low = float(valid.min()) if low is None else low
+    high = float(valid.max()) if high is None else high
+    scale = (len(SPARK_CHARS) - 1) / (high - low) if high > low else 0
+    return "".join(" " if value != value else SPARK_CHARS[int(round((min(max(value, low), high) - low) * scale))]
+                   for value in values)
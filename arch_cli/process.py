@@ -0,0 +1,215 @@
+"""
+Execução de processos externos com saída em streaming, tempo limite e lotes concorrentes
+"""
+
+import os
+import sys
+import time
+import signal
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Tempo limite padrão de comandos com saída em tempo real (apt, yum, brew, pip, curl, git, docker-compose...)
+INSTALL_TIMEOUT = 1800
+# Tempo entre SIGTERM e SIGKILL ao encerrar um processo
+KILL_GRACE = 5
+# Linhas finais mantidas quando a saída completa não é capturada
+TAIL_LINES = 50
+
+def _command_label(command):
+    return command if isinstance(command, str) else " ".join(command)
+
+def _reader(stream, name, on_line, sink):
+    """Lê a saída linha a linha, repassando ao callback e ao acumulador"""
+    for line in iter(stream.readline, ""):
+        line = line.rstrip("\n")
+        if on_line:
+            try:
+                on_line(name, line)
+            except Exception:
+                pass
+        sink.append(line)
+    stream.close()
+
+def _terminal():
+    """Descritor do terminal de controle, se este processo estiver em primeiro plano nele (e na thread
+    principal, a única que pode alterar sinais); senão None"""
+    if os.name != "posix" or threading.current_thread() is not threading.main_thread():
+        return None
+    try:
+        fd = sys.stdin.fileno()
+        if os.isatty(fd) and os.tcgetpgrp(fd) == os.getpgrp():
+            return fd
+    except (AttributeError, ValueError, OSError):
+        pass
+    return None
+
+def _set_foreground(fd, pgid):
+    """Entrega o terminal ao grupo de processos informado (SIGTTOU ignorado durante a troca)"""
+    previous = signal.signal(signal.SIGTTOU, signal.SIG_IGN)
+    try:
+        os.tcsetpgrp(fd, pgid)
+    except OSError:
+        pass
+    finally:
+        signal.signal(signal.SIGTTOU, previous)
+
+def kill_process(process, group=True):
+    """Encerra o processo (e o seu grupo de processos): SIGTERM, espera e SIGKILL"""
+    if process.poll() is not None:
+        return
+    if os.name == "posix" and group:
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(KILL_GRACE)
+        except (ProcessLookupError, PermissionError):
+            pass
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+    else:
+        process.terminate()
+        try:
+            process.wait(KILL_GRACE)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    try:
+        process.wait(KILL_GRACE)
+    except subprocess.TimeoutExpired:
+        pass
+
+def run_process(command, shell=False, timeout=None, deadline=None, on_line=None, capture=True, cwd=None, env=None,
+                interactive=False):
+    """Executa um comando repassando cada linha de stdout/stderr a on_line(stream, linha).
+
+    timeout limita este comando; deadline (time.monotonic) limita o lote inteiro. Ao expirar, o grupo
+    de processos é encerrado. Com capture=False apenas as últimas linhas são mantidas em memória.
+    interactive mantém o terminal como entrada e, se houver um, entrega o terminal ao grupo de processos
+    do comando enquanto ele executa (necessário para sudo pedir senha).
+    Retorna {command, returncode, ok, timed_out, stdout, stderr, duration}."""
+    start = time.monotonic()
+    limits = [value for value in (timeout and start + timeout, deadline) if value]
+    end = min(limits) if limits else None
+
+    result = {"command": _command_label(command), "returncode": None, "ok": False, "timed_out": False,
+              "stdout": "", "stderr": "", "duration": 0.0}
+    if end is not None and end <= start:
+        result["timed_out"] = True
+        result["stderr"] = "Tempo limite excedido antes do início"
+        return result
+
+    # O comando sempre tem o seu grupo de processos, para que o tempo limite encerre também os filhos
+    # (com sudo, o comando real e não apenas o sudo)
+    kwargs = {}
+    terminal = _terminal() if interactive else None
+    if os.name != "posix":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    elif terminal is not None:
+        # Novo grupo na mesma sessão, que recebe o terminal logo após o início
+        kwargs["preexec_fn"] = os.setpgrp
+    else:
+        kwargs["start_new_session"] = True
+
+    try:
+        process = subprocess.Popen(command, shell=shell, cwd=cwd, env=env, text=True, errors="replace",
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   stdin=None if interactive else subprocess.DEVNULL, **kwargs)
+    except OSError as e:
+        result["stderr"] = str(e)
+        result["duration"] = time.monotonic() - start
+        return result
+    if terminal is not None:
+        _set_foreground(terminal, process.pid)
+        # O comando pode ter sido parado (SIGTTIN) ao ler o terminal antes da troca
+        try:
+            os.killpg(process.pid, signal.SIGCONT)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    stdout = [] if capture else deque(maxlen=TAIL_LINES)
+    stderr = [] if capture else deque(maxlen=TAIL_LINES)
+    readers = [
+        threading.Thread(target=_reader, args=(process.stdout, "stdout", on_line, stdout), daemon=True),
+        threading.Thread(target=_reader, args=(process.stderr, "stderr", on_line, stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        process.wait(None if end is None else max(0.0, end - time.monotonic()))
+    except subprocess.TimeoutExpired:
+        result["timed_out"] = True
+        kill_process(process)
+    except KeyboardInterrupt:
+        kill_process(process)
+        raise
+    finally:
+        if terminal is not None:
+            _set_foreground(terminal, os.getpgrp())
+    # Processos em segundo plano (daemons iniciados por instaladores, netos) que herdaram os pipes
+    # podem mantê-los abertos depois que o comando termina; não esperar indefinidamente
+    join_until = time.monotonic() + KILL_GRACE
+    for reader in readers:
+        reader.join(max(0.0, join_until - time.monotonic()))
+
+    result["returncode"] = process.returncode
+    result["ok"] = process.returncode == 0 and not result["timed_out"]
+    result["stdout"] = "\n".join(stdout)
+    result["stderr"] = "\n".join(stderr)
+    result["duration"] = time.monotonic() - start
+    if result["timed_out"]:
+        message = f"Tempo limite excedido após {result['duration']:.0f}s"
+        result["stderr"] = "\n".join(filter(None, [result["stderr"], message]))
+    return result
+
+def run_batch(commands, max_workers=4, timeout=None, total_timeout=None, on_line=None, capture=True):
+    """Executa vários comandos com no máximo max_workers ao mesmo tempo, retornando cada resultado
+    (com o índice do comando em "index") à medida que termina. total_timeout limita o lote inteiro."""
+    if not commands:
+        return
+    deadline = time.monotonic() + total_timeout if total_timeout else None
+
+    def run(index, command):
+        callback = (lambda stream, line: on_line(index, stream, line)) if on_line else None
+        return dict(run_process(command, timeout=timeout, deadline=deadline, on_line=callback, capture=capture),
+                    index=index)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(commands))))
+    futures = [executor.submit(run, index, command) for index, command in enumerate(commands)]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+def echo_line(stream, line):
+    """Callback que exibe a saída do processo em tempo real, esmaecida"""
+    from .utils import get_console
+    get_console().print(line, style="dim red" if stream == "stderr" else "dim", markup=False, highlight=False)
+
+def run_command(command, shell=False, timeout=None, on_line=None):
+    """Executa um comando e retorna (sucesso, stdout) ou (False, stderr)"""
+    result = run_process(command, shell=shell, timeout=timeout, on_line=on_line)
+    if result["ok"]:
+        return True, result["stdout"]
+    return False, result["stderr"]
+
+def run_live(command, shell=False, timeout=INSTALL_TIMEOUT):
+    """Executa um comando exibindo a saída em tempo real e retorna (sucesso, stdout) ou (False, stderr).
+    Comandos com sudo recebem o terminal para poder pedir a senha."""
+    interactive = "sudo" in _command_label(command).split()
+    result = run_process(command, shell=shell, timeout=timeout, on_line=echo_line, capture=False,
+                         interactive=interactive)
+    if result["ok"]:
+        return True, result["stdout"]
+    return False, result["stderr"]
+
+def run_install(command, shell=False, timeout=INSTALL_TIMEOUT):
+    """Executa um passo de instalação (apt, yum, brew, pip...) com a saída em tempo real"""
+    return run_live(command, shell=shell, timeout=timeout)
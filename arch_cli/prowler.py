@@ -0,0 +1,215 @@
+"""
+Orquestração do Prowler em vários perfis e regiões com limites de CPU e memória
+"""
+
+import os
+import csv
+import json
+import time
+import shutil
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from rich.console import Console
+from rich.table import Table
+from .fanout import resolve_targets
+from .process import run_process
+from .utils import create_progress_bar, log
+
+console = Console()
+
+DEFAULT_TIMEOUT = 4 * 3600
+DEFAULT_RETRIES = 1
+# Memória estimada de uma execução do Prowler, em MB
+DEFAULT_MEMORY_PER_SCAN = 2048
+# Equivalente ao `ulimit -n 4096` do script bash
+OPEN_FILES_LIMIT = 4096
+OUTPUT_NAME = "prowler"
+# O Prowler encerra com código 3 quando há verificações com falha: a execução foi concluída
+SUCCESS_CODES = (0, 3)
+SEVERITIES = ["critical", "high", "medium", "low", "informational"]
+
+def available_memory_mb():
+    """Memória disponível do sistema em MB (None se não for possível determinar)"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def max_parallel_scans(requested=None, memory_per_scan=DEFAULT_MEMORY_PER_SCAN, targets=1):
+    """Execuções simultâneas limitadas por CPUs, memória disponível e número de alvos"""
+    limits = [os.cpu_count() or 1, targets]
+    memory = available_memory_mb()
+    if memory is not None and memory_per_scan:
+        limits.append(memory // memory_per_scan)
+    if requested:
+        limits.append(requested)
+    return max(1, min(limits))
+
+def raise_open_files_limit(limit=OPEN_FILES_LIMIT):
+    """Aumenta o limite de arquivos abertos herdado pelas execuções do Prowler"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        target = limit if hard == resource.RLIM_INFINITY else min(limit, hard)
+        if soft != resource.RLIM_INFINITY and soft < target:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+def target_dir(output_dir, profile, region):
+    return os.path.join(output_dir, profile or "default", region or "all-regions")
+
+def build_command(profile, region, output, compliance=None):
+    """Linha de comando do Prowler para um alvo"""
+    command = ["prowler", "aws", "--profile", profile, "-M", "csv", "html", "-o", output, "-F", OUTPUT_NAME]
+    if region:
+        command += ["-f", region]
+    if compliance:
+        command += ["--compliance", compliance]
+    return command
+
+def _summarize_csv(directory):
+    """Conta achados por status e severidade a partir dos CSVs do Prowler (separados por ';')"""
+    counts = {"total": 0, "pass": 0, "fail": 0, "manual": 0}
+    counts.update({f"fail_{severity}": 0 for severity in SEVERITIES})
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(".csv") or "compliance" in root:
+                continue
+            with open(os.path.join(root, name), newline="", encoding="utf-8", errors="replace") as f:
+                header = f.readline()
+                delimiter = ";" if header.count(";") > header.count(",") else ","
+                f.seek(0)
+                for row in csv.DictReader(f, delimiter=delimiter):
+                    row = {(key or "").upper(): value for key, value in row.items()}
+                    status = (row.get("STATUS") or "").lower()
+                    counts["total"] += 1
+                    if status in ("pass", "fail", "manual"):
+                        counts[status] += 1
+                    severity = (row.get("SEVERITY") or "").lower()
+                    if status == "fail" and f"fail_{severity}" in counts:
+                        counts[f"fail_{severity}"] += 1
+    return counts
+
+def scan_target(profile, region, output_dir, compliance=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+    """Executa o Prowler em um alvo, com novas tentativas, publicando o diretório apenas ao concluir"""
+    final_dir = target_dir(output_dir, profile, region)
+    os.makedirs(os.path.dirname(final_dir), exist_ok=True)
+    result = {"profile": profile, "region": region, "dir": final_dir, "attempts": 0, "ok": False,
+              "error": None, "duration": 0.0, "summary": None}
+    start = time.monotonic()
+
+    for attempt in range(retries + 1):
+        result["attempts"] = attempt + 1
+        tmp_dir = f"{final_dir}.partial-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        with open(os.path.join(tmp_dir, "prowler.log"), "w", encoding="utf-8") as log_file:
+            run = run_process(build_command(profile, region, tmp_dir, compliance), timeout=timeout, capture=False,
+                              on_line=lambda stream, line: log_file.write(line + "\n"))
+
+        if not run["timed_out"] and run["returncode"] in SUCCESS_CODES:
+            result["summary"] = _summarize_csv(tmp_dir)
+            shutil.rmtree(final_dir, ignore_errors=True)
+            os.replace(tmp_dir, final_dir)
+            result["ok"] = True
+            result["error"] = None
+            break
+
+        result["error"] = run["stderr"].splitlines()[-1] if run["stderr"] else f"código de saída {run['returncode']}"
+        failed_dir = f"{final_dir}.failed"
+        shutil.rmtree(failed_dir, ignore_errors=True)
+        os.replace(tmp_dir, failed_dir)
+        if attempt < retries:
+            time.sleep(min(60, 5 * 2 ** attempt))
+
+    result["duration"] = time.monotonic() - start
+    return result
+
+def write_summary(results, output_dir):
+    """Grava o resumo consolidado (JSON e CSV) na raiz do diretório de relatórios"""
+    rows = []
+    for result in results:
+        row = {"profile": result["profile"], "region": result["region"] or "all", "ok": result["ok"],
+               "attempts": result["attempts"], "duration": round(result["duration"], 1), "error": result["error"],
+               "dir": result["dir"] if result["ok"] else f"{result['dir']}.failed"}
+        row.update(result["summary"] or {})
+        rows.append(row)
+
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(rows, f, indent=2)
+    columns = ["profile", "region", "ok", "attempts", "duration", "total", "pass", "fail", "manual"] + \
+              [f"fail_{severity}" for severity in SEVERITIES] + ["error", "dir"]
+    with open(os.path.join(output_dir, "summary.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+def render_summary(rows):
+    """Exibe o resumo consolidado por alvo"""
+    table = Table(title="Resumo do Prowler")
+    for column in ("Perfil", "Região", "Status", "Tentativas", "Duração", "PASS", "FAIL", "Críticos", "Altos"):
+        table.add_column(column)
+    for row in sorted(rows, key=lambda row: (row["profile"] or "", row["region"])):
+        status = "[green]ok[/green]" if row["ok"] else "[red]falha[/red]"
+        table.add_row(row["profile"], row["region"], status, str(row["attempts"]), f"{row['duration']:.0f}s",
+                      str(row.get("pass", "-")), str(row.get("fail", "-")), str(row.get("fail_critical", "-")),
+                      str(row.get("fail_high", "-")))
+    console.print(table)
+
+def run_scans(profile=None, all_profiles=False, regions=None, compliance=None, output_dir=None, parallel=None,
+              memory_per_scan=DEFAULT_MEMORY_PER_SCAN, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, ingest=False):
+    """Executa o Prowler em todos os alvos em paralelo, consolida os resultados e, opcionalmente,
+    importa os achados no banco local"""
+    if not shutil.which("prowler"):
+        log("ERROR", "Prowler não está instalado. Execute 'arch-cli deps' para instalá-lo.")
+        return False
+
+    targets = resolve_targets(profile, all_profiles, regions)
+    if not targets:
+        return False
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    output_dir = output_dir or os.path.join(".", "prowler_reports", f"{timestamp}{f'_{compliance}' if compliance else ''}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    workers = max_parallel_scans(parallel, memory_per_scan, len(targets))
+    raise_open_files_limit()
+    log("INFO", f"Executando o Prowler em {len(targets)} alvo(s), {workers} por vez. Relatórios em: {output_dir}")
+
+    results = []
+    with create_progress_bar() as progress:
+        task = progress.add_task("Prowler", total=len(targets))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(scan_target, p, r, output_dir, compliance, timeout, retries): (p, r)
+                       for p, r in targets}
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                label = f"{result['profile']}/{result['region'] or 'todas'}"
+                if result["ok"]:
+                    progress.console.print(f"[green]✓[/green] {label} ({result['duration']:.0f}s)")
+                else:
+                    progress.console.print(f"[red]✗[/red] {label}: {result['error']}")
+                failed = sum(1 for item in results if not item["ok"])
+                progress.update(task, advance=1,
+                                description=f"Prowler ({len(results)}/{len(targets)}, {failed} falha(s))")
+
+    render_summary(write_summary(results, output_dir))
+    if ingest and any(result["ok"] for result in results):
+        from .findings import ingest_paths
+        ingest_paths([output_dir])
+    failed = [result for result in results if not result["ok"]]
+    if failed:
+        log("WARNING", f"{len(failed)} alvo(s) falharam. Resumo em: {os.path.join(output_dir, 'summary.csv')}")
+        return False
+    log("SUCCESS", f"Prowler concluído. Resumo em: {os.path.join(output_dir, 'summary.csv')}")
+    return True
@@ -0,0 +1,262 @@
+"""
+Painel de desempenho da frota RDS com GetMetricData em lote e cache local de séries temporais
+"""
+
+import os
+import time
+import sqlite3
+import datetime
+import numpy as np
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .metrics import build_matrix, downsample, get_metric_data, metric_query, sparkline, summarize
+from .utils import CONFIG_DIR, log
+
+console = Console()
+
+METRICS_DB = os.path.join(CONFIG_DIR, "metrics.db")
+DEFAULT_HOURS = 24
+DEFAULT_PERIOD = 300
+DEFAULT_TOP = 20
+# Pontos mais recentes que este intervalo ainda podem ser atualizados pelo CloudWatch:
+# são usados na exibição, mas não gravados no cache (que só recebe pontos definitivos)
+SETTLE_SECONDS = 900
+# Pontos mais antigos que isso são removidos do cache
+RETENTION_DAYS = 35
+# Colunas da tendência de CPU após o downsampling
+TREND_BUCKETS = 24
+# Latência (ms) considerada saturação total no cálculo do índice
+LATENCY_LIMIT_MS = 20.0
+
+# Métricas coletadas por instância: (chave, métrica, estatística)
+METRICS = [
+    ("cpu", "CPUUtilization", "Average"),
+    ("connections", "DatabaseConnections", "Average"),
+    ("free_storage", "FreeStorageSpace", "Minimum"),
+    ("read_iops", "ReadIOPS", "Average"),
+    ("write_iops", "WriteIOPS", "Average"),
+    ("read_latency", "ReadLatency", "Average"),
+    ("write_latency", "WriteLatency", "Average"),
+]
+
+def _connect():
+    """Abre o cache de séries temporais, criando o esquema se necessário"""
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    conn = sqlite3.connect(METRICS_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS points (
+            profile TEXT NOT NULL,
+            region TEXT NOT NULL,
+            period INTEGER NOT NULL,
+            resource TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (profile, region, period, resource, metric, ts)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS watermarks (
+            profile TEXT NOT NULL,
+            region TEXT NOT NULL,
+            period INTEGER NOT NULL,
+            resource TEXT NOT NULL,
+            synced_from INTEGER NOT NULL,
+            settled_until INTEGER NOT NULL,
+            PRIMARY KEY (profile, region, period, resource)
+        );
+        """
+    )
+    return conn
+
+def list_db_instances(profile=None, region=None):
+    """Instâncias RDS com classe, engine e armazenamento alocado"""
+    client = get_client("rds", profile, region)
+    instances = []
+    for page in paginate(client, "describe_db_instances"):
+        for item in page.get("DBInstances", []):
+            instances.append({
+                "id": item["DBInstanceIdentifier"],
+                "class": item.get("DBInstanceClass"),
+                "engine": item.get("Engine"),
+                "status": item.get("DBInstanceStatus"),
+                # Aurora não tem armazenamento alocado por instância
+                "allocated_gb": item.get("AllocatedStorage") if not item.get("Engine", "").startswith("aurora") else None,
+            })
+    return instances
+
+def _watermarks(conn, profile, region, period, ids):
+    """Intervalo [synced_from, settled_until) já gravado de cada instância (ou None)"""
+    rows = conn.execute(
+        "SELECT resource, synced_from, settled_until FROM watermarks WHERE profile = ? AND region = ? AND period = ?",
+        (profile or "", region or "", period),
+    ).fetchall()
+    known = {resource: (synced_from, settled_until) for resource, synced_from, settled_until in rows}
+    return {resource: known.get(resource) for resource in ids}
+
+def sync_metrics(profile, region, instances, start, end, period):
+    """Busca apenas o intervalo ainda não definitivo de cada instância (uma varredura de GetMetricData
+    por ponto de partida), grava os pontos definitivos e retorna o trecho recente em memória.
+    Retorna ({(instância, chave): ([ts], [valores])} do trecho recente, chamadas à API)."""
+    start_ts, end_ts = int(start.timestamp()), int(end.timestamp())
+    settled = end_ts - SETTLE_SECONDS
+    settled -= settled % period
+    conn = _connect()
+    try:
+        watermarks = _watermarks(conn, profile, region, period, [instance["id"] for instance in instances])
+        groups = {}
+        for instance in instances:
+            mark = watermarks[instance["id"]]
+            # O intervalo gravado só é aproveitado se cobrir o início da janela sem lacuna até ela; janela maior
+            # que a sincronizada, começando depois de settled_until ou instância nova: busca desde o início
+            contiguous = mark and mark[0] <= start_ts <= mark[1]
+            fetch_from = mark[1] if contiguous else start_ts
+            synced_from = mark[0] if contiguous else start_ts
+            groups.setdefault((fetch_from, synced_from), []).append(instance["id"])
+
+        client = get_client("cloudwatch", profile, region)
+        recent, calls = {}, 0
+        with conn:
+            for (fetch_from, synced_from), ids in groups.items():
+                if fetch_from >= end_ts:
+                    continue
+                queries = [metric_query(f"m{i}_{j}", "AWS/RDS", metric, {"DBInstanceIdentifier": db_id}, stat, period)
+                           for i, db_id in enumerate(ids) for j, (_, metric, stat) in enumerate(METRICS)]
+                series = get_metric_data(client, queries, datetime.datetime.fromtimestamp(fetch_from, datetime.timezone.utc),
+                                         end)
+                calls += -(-len(queries) // 500)
+                points = []
+                for i, db_id in enumerate(ids):
+                    for j, (key, _, _) in enumerate(METRICS):
+                        timestamps, values = series.get(f"m{i}_{j}", ([], []))
+                        tail = recent.setdefault((db_id, key), ([], []))
+                        for ts, value in zip(timestamps, values):
+                            ts = int(ts)
+                            if ts < settled:
+                                points.append((profile or "", region or "", period, db_id, key, ts, value))
+                            else:
+                                tail[0].append(ts)
+                                tail[1].append(value)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO watermarks (profile, region, period, resource, synced_from, settled_until) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (profile or "", region or "", period, db_id, synced_from, max(settled, fetch_from)))
+                # Somente acréscimos: pontos já definitivos nunca são reescritos
+                conn.executemany("INSERT OR IGNORE INTO points VALUES (?, ?, ?, ?, ?, ?, ?)", points)
+            cutoff = int(time.time() - RETENTION_DAYS * 86400)
+            conn.execute("DELETE FROM points WHERE ts < ?", (cutoff,))
+            # O trecho removido deixa de contar como sincronizado: janelas que o alcançam buscam de novo
+            conn.execute("UPDATE watermarks SET synced_from = ? WHERE synced_from < ?", (cutoff, cutoff))
+    finally:
+        conn.close()
+    return recent, calls
+
+def load_series(profile, region, period, ids, start, end, recent=None):
+    """Séries do cache no intervalo, completadas com o trecho recente em memória"""
+    series = {(db_id, key): ([], []) for db_id in ids for key, _, _ in METRICS}
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "SELECT resource, metric, ts, value FROM points WHERE profile = ? AND region = ? AND period = ? "
+            "AND ts >= ? AND ts < ? ORDER BY ts",
+            (profile or "", region or "", period, int(start.timestamp()), int(end.timestamp())),
+        )
+        for resource, metric, ts, value in cursor:
+            entry = series.get((resource, metric))
+            if entry is not None:
+                entry[0].append(ts)
+                entry[1].append(value)
+    finally:
+        conn.close()
+    for key, (timestamps, values) in (recent or {}).items():
+        if key in series:
+            series[key][0].extend(timestamps)
+            series[key][1].extend(values)
+    return series
+
+def saturation(instances, stats):
+    """Índice de saturação (0-100) de cada instância: o pior entre CPU, armazenamento usado e latência.
+    Retorna (índices, dimensão responsável)."""
+    allocated = np.array([instance["allocated_gb"] or np.nan for instance in instances], dtype=float) * 1024 ** 3
+    with np.errstate(invalid="ignore", divide="ignore"):
+        storage = 100.0 * (1.0 - stats["free_storage"]["min"] / allocated)
+    latency = np.fmax(stats["read_latency"]["p95"], stats["write_latency"]["p95"]) * 1000 / LATENCY_LIMIT_MS * 100
+    dimensions = np.vstack([stats["cpu"]["p95"], storage, np.minimum(latency, 100.0)])
+    dimensions = np.nan_to_num(dimensions, nan=-1.0)
+    return np.clip(dimensions.max(axis=0), 0, 100), np.array(["CPU", "armazenamento", "latência"])[dimensions.argmax(axis=0)]
+
+def _num(value, digits=1):
+    return "-" if value != value else f"{value:,.{digits}f}"
+
+def render_dashboard(rows, title):
+    """Exibe as instâncias da mais saturada para a menos"""
+    table = Table(title=title)
+    for column in ("#", "Instância", "Classe", "CPU p95", "Conexões p95", "Livre (GB)", "IOPS L/E p95",
+                   "Latência L/E p95 (ms)", "Saturação", "Gargalo", "Tendência da CPU"):
+        table.add_column(column, justify="right" if column not in ("Instância", "Classe", "Gargalo", "Tendência da CPU") else "left")
+    for rank, row in enumerate(rows, 1):
+        color = "red" if row["saturation"] >= 80 else "yellow" if row["saturation"] >= 60 else "green"
+        table.add_row(str(rank), row["id"], row["class"] or "-", _num(row["cpu_p95"]), _num(row["connections_p95"], 0),
+                      _num(row["free_gb"]), f"{_num(row['read_iops_p95'], 0)}/{_num(row['write_iops_p95'], 0)}",
+                      f"{_num(row['read_latency_ms'], 2)}/{_num(row['write_latency_ms'], 2)}",
+                      f"[{color}]{row['saturation']:.0f}%[/{color}]" if row["samples"] else "sem dados",
+                      row["bottleneck"] if row["samples"] else "-", row["trend"])
+    console.print(table)
+
+def rds_dashboard(profile=None, region=None, hours=DEFAULT_HOURS, period=DEFAULT_PERIOD, top=DEFAULT_TOP,
+                  offline=False):
+    """Sincroniza (a menos que offline) e exibe o ranking de saturação das instâncias RDS"""
+    try:
+        instances = list_db_instances(profile, region)
+    except (BotoCoreError, ClientError) as e:
+        log("ERROR", f"Falha ao listar instâncias RDS: {str(e)}")
+        return False
+    if not instances:
+        log("INFO", "Nenhuma instância RDS encontrada.")
+        return True
+
+    now = int(time.time())
+    end = datetime.datetime.fromtimestamp(now - now % period, datetime.timezone.utc)
+    start = end - datetime.timedelta(hours=hours)
+    recent = {}
+    if not offline:
+        sync_start = time.monotonic()
+        try:
+            recent, calls = sync_metrics(profile, region, instances, start, end, period)
+        except (BotoCoreError, ClientError) as e:
+            log("ERROR", f"Falha ao obter métricas do CloudWatch: {str(e)}")
+            return False
+        log("INFO", f"Métricas de {len(instances)} instância(s) sincronizadas em {calls} chamada(s) "
+                    f"({time.monotonic() - sync_start:.1f}s)")
+
+    ids = [instance["id"] for instance in instances]
+    series = load_series(profile, region, period, ids, start, end, recent)
+    matrices = {key: build_matrix([series[(db_id, key)] for db_id in ids], start, end, period) for key, _, _ in METRICS}
+    stats = {key: summarize(matrix) for key, matrix in matrices.items()}
+    scores, bottlenecks = saturation(instances, stats)
+    trends = downsample(matrices["cpu"], TREND_BUCKETS)
+
+    rows = [
+        {
+            "id": instance["id"], "class": instance["class"],
+            "cpu_p95": float(stats["cpu"]["p95"][i]),
+            "connections_p95": float(stats["connections"]["p95"][i]),
+            "free_gb": float(stats["free_storage"]["min"][i]) / 1024 ** 3,
+            "read_iops_p95": float(stats["read_iops"]["p95"][i]),
+            "write_iops_p95": float(stats["write_iops"]["p95"][i]),
+            "read_latency_ms": float(stats["read_latency"]["p95"][i]) * 1000,
+            "write_latency_ms": float(stats["write_latency"]["p95"][i]) * 1000,
+            "saturation": float(scores[i]), "bottleneck": str(bottlenecks[i]),
+            "samples": int(stats["cpu"]["samples"][i]),
+            "trend": sparkline(trends[i], 0, 100),
+        }
+        for i, instance in enumerate(instances)
+    ]
+    rows.sort(key=lambda row: (row["samples"] > 0, row["saturation"]), reverse=True)
+    shown = rows[:top] if top else rows
+    render_dashboard(shown, f"Instâncias RDS por saturação - últimas {hours}h "
+                            f"({len(shown)} de {len(rows)}{', dados locais' if offline else ''})")
+    log("SUCCESS", "Painel de desempenho do RDS gerado.")
+    return True
@@ -0,0 +1,148 @@
+"""
+Análise de rightsizing de instâncias EC2 com GetMetricData em lote
+"""
+
+import datetime
+import numpy as np
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .fanout import DEFAULT_TIMEOUT, resolve_targets, run_targets
+from .metrics import build_matrix, get_metric_data, metric_query, nan_add, summarize
+from .utils import log
+
+console = Console()
+
+DEFAULT_DAYS = 14
+DEFAULT_PERIOD = 3600
+
+# Limiares padrão das recomendações
+THRESHOLDS = {
+    "idle_cpu": 5.0,        # CPU p95 (%) abaixo da qual a instância é considerada ociosa
+    "idle_network": 10.0,   # rede p95 (KB/s) abaixo da qual a instância é considerada ociosa
+    "downsize_cpu": 40.0,   # CPU p99 (%) abaixo da qual a instância pode ser reduzida
+    "saturated_cpu": 90.0,  # CPU p99 (%) a partir da qual a instância está saturada
+}
+
+# Métricas coletadas por instância: (chave, métrica, estatística)
+METRICS = [
+    ("cpu", "CPUUtilization", "Average"),
+    ("net_in", "NetworkIn", "Sum"),
+    ("net_out", "NetworkOut", "Sum"),
+    ("ebs_read", "EBSReadOps", "Sum"),
+    ("ebs_write", "EBSWriteOps", "Sum"),
+]
+
+def list_running_instances(profile=None, region=None):
+    """Lista as instâncias em execução com tipo e tag Name"""
+    client = get_client("ec2", profile, region)
+    instances = []
+    for page in paginate(client, "describe_instances",
+                         Filters=[{"Name": "instance-state-name", "Values": ["running"]}]):
+        for reservation in page.get("Reservations", []):
+            for instance in reservation.get("Instances", []):
+                name = next((tag["Value"] for tag in instance.get("Tags", []) if tag["Key"] == "Name"), "")
+                instances.append({"id": instance["InstanceId"], "type": instance["InstanceType"], "name": name})
+    return instances
+
+def classify(cpu, network, thresholds):
+    """Classifica todas as instâncias de uma vez a partir das estatísticas vetorizadas"""
+    conditions = [
+        cpu["samples"] == 0,
+        (cpu["p95"] < thresholds["idle_cpu"]) & (network["p95"] < thresholds["idle_network"]),
+        cpu["p99"] >= thresholds["saturated_cpu"],
+        cpu["p99"] < thresholds["downsize_cpu"],
+    ]
+    choices = ["sem dados", "ociosa", "saturada", "reduzir"]
+    return np.select(conditions, choices, default="ok")
+
+def analyze_target(profile, region, days=DEFAULT_DAYS, period=DEFAULT_PERIOD, thresholds=None):
+    """Analisa todas as instâncias em execução de um alvo (perfil × região)"""
+    thresholds = dict(THRESHOLDS, **(thresholds or {}))
+    instances = list_running_instances(profile, region)
+    if not instances:
+        return []
+
+    end = datetime.datetime.now(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start = end - datetime.timedelta(days=days)
+
+    queries = [
+        metric_query(f"{key}_{i}", "AWS/EC2", metric, {"InstanceId": instance["id"]}, stat, period)
+        for i, instance in enumerate(instances)
+        for key, metric, stat in METRICS
+    ]
+    series = get_metric_data(get_client("cloudwatch", profile, region), queries, start, end)
+
+    matrices = {
+        key: build_matrix([series.get(f"{key}_{i}", ([], [])) for i in range(len(instances))], start, end, period)
+        for key, _, _ in METRICS
+    }
+    cpu = summarize(matrices["cpu"])
+    # Sums por período convertidos em taxas (KB/s para rede, operações/s para EBS)
+    network = summarize(nan_add(matrices["net_in"], matrices["net_out"]) / period / 1024)
+    ebs = summarize(nan_add(matrices["ebs_read"], matrices["ebs_write"]) / period)
+    recommendations = classify(cpu, network, thresholds)
+
+    return [
+        {
+            "id": instance["id"],
+            "name": instance["name"],
+            "type": instance["type"],
+            "cpu_p50": float(cpu["p50"][i]),
+            "cpu_p95": float(cpu["p95"][i]),
+            "cpu_p99": float(cpu["p99"][i]),
+            "cpu_max": float(cpu["max"][i]),
+            "net_p95": float(network["p95"][i]),
+            "ebs_p95": float(ebs["p95"][i]),
+            "recommendation": str(recommendations[i]),
+        }
+        for i, instance in enumerate(instances)
+    ]
+
+def _num(value, digits=1):
+    return "-" if value != value else f"{value:.{digits}f}"
+
+def render_rightsizing(rows, title):
+    """Exibe as recomendações, das mais acionáveis para as menos"""
+    order = {"ociosa": 0, "reduzir": 1, "saturada": 2, "ok": 3, "sem dados": 4}
+    table = Table(title=f"{title} - {len(rows)} instância(s)")
+    for column in ("InstanceId", "Name", "Tipo", "CPU p50", "CPU p95", "CPU p99", "CPU máx",
+                   "Rede p95 (KB/s)", "EBS p95 (ops/s)", "Recomendação"):
+        table.add_column(column)
+    for row in sorted(rows, key=lambda row: (order.get(row["recommendation"], 9), row["cpu_p95"])):
+        table.add_row(row["id"], row["name"], row["type"], _num(row["cpu_p50"]), _num(row["cpu_p95"]),
+                      _num(row["cpu_p99"]), _num(row["cpu_max"]), _num(row["net_p95"]), _num(row["ebs_p95"]),
+                      row["recommendation"])
+    console.print(table)
+
+def analyze_rightsizing(profile=None, regions=None, all_profiles=False, days=DEFAULT_DAYS, period=DEFAULT_PERIOD,
+                        thresholds=None, processes=None, timeout=DEFAULT_TIMEOUT):
+    """Analisa rightsizing de EC2 em um ou vários alvos (perfil × região)"""
+    log("INFO", f"Analisando utilização de instâncias EC2 nos últimos {days} dias")
+
+    if not all_profiles and (not regions or len(regions) == 1) and regions != ["all"]:
+        region = regions[0] if regions else None
+        try:
+            rows = analyze_target(profile, region, days, period, thresholds)
+        except (BotoCoreError, ClientError) as e:
+            log("ERROR", f"Falha ao analisar instâncias EC2: {str(e)}")
+            return False
+        render_rightsizing(rows, f"Rightsizing EC2{f' ({region})' if region else ''}")
+        log("SUCCESS", "Análise de custos concluída.")
+        return True
+
+    targets = [(p, r, days, period, thresholds) for p, r in resolve_targets(profile, all_profiles, regions)]
+    failed = 0
+    for done in run_targets(analyze_target, targets, processes, timeout):
+        if done["error"]:
+            failed += 1
+            log("ERROR", f"Falha no alvo {done['profile']}/{done['region'] or 'padrão'}: {done['error']}")
+            continue
+        render_rightsizing(done["result"], f"{done['profile']} - Rightsizing EC2 ({done['region'] or 'padrão'})")
+
+    if failed:
+        log("WARNING", f"{failed} alvo(s) não puderam ser analisados.")
+        return False
+    log("SUCCESS", "Análise de custos concluída.")
+    return True
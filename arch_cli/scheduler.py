@@ -0,0 +1,395 @@
+"""
+Agendador de tarefas em processo (backup, verificação de saúde e rotação de logs) a partir de um arquivo YAML,
+com limite de execuções simultâneas por tarefa, jitter e histórico local das execuções
+"""
+
+import os
+import gzip
+import time
+import heapq
+import random
+import shutil
+import signal
+import fnmatch
+import sqlite3
+import datetime
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import yaml
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .backup import DEFAULT_RATE, DEFAULT_TIMEOUT, MAX_WORKERS as BACKUP_WORKERS, run_backups
+from .health import collect_health
+from .utils import CONFIG_DIR, log
+
+console = Console()
+
+SCHEDULE_FILE = os.path.join(CONFIG_DIR, "schedule.yaml")
+HISTORY_DB = os.path.join(CONFIG_DIR, "scheduler.db")
+MAX_WORKERS = 4
+# Intervalo máximo entre verificações do relógio (ajustes de horário e sinais de parada)
+MAX_SLEEP = 60
+
+# Campos de uma expressão cron: (mínimo, máximo) de minuto, hora, dia do mês, mês e dia da semana
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+EXAMPLE_SCHEDULE = """\
+jobs:
+  - name: backup-noturno
+    type: backup
+    cron: "0 2 * * *"
+    jitter: 300
+    profile: producao
+    options:
+      services: [ebs, rds]
+      tags: {Backup: "true"}
+  - name: saude
+    type: health
+    every: 3600
+    options:
+      email: sre@example.com
+  - name: logs
+    type: log_rotation
+    cron: "0 0 * * *"
+    options:
+      path: /var/log/app
+"""
+
+def parse_cron(expression):
+    """Converte uma expressão cron de 5 campos em conjuntos de valores aceitos"""
+    parts = str(expression).split()
+    if len(parts) != 5:
+        raise ValueError(f"expressão cron inválida (5 campos esperados): '{expression}'")
+    fields = []
+    for part, (low, high) in zip(parts, CRON_FIELDS):
+        values = set()
+        for item in part.split(","):
+            base, _, step = item.partition("/")
+            try:
+                step = int(step) if step else 1
+                if base == "*":
+                    start, end = low, high
+                elif "-" in base:
+                    start, end = (int(value) for value in base.split("-", 1))
+                else:
+                    start = int(base)
+                    end = high if step > 1 else start
+            except ValueError:
+                raise ValueError(f"campo cron inválido: '{item}'")
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"campo cron fora do intervalo {low}-{high}: '{item}'")
+            values.update(range(start, end + 1, step))
+        fields.append(values)
+    # Domingo pode ser 0 ou 7
+    if 7 in fields[4]:
+        fields[4] = (fields[4] - {7}) | {0}
+    return {"minutes": fields[0], "hours": fields[1], "days": fields[2], "months": fields[3], "weekdays": fields[4],
+            "any_day": parts[2] == "*", "any_weekday": parts[4] == "*"}
+
+def _day_matches(cron, moment):
+    in_month = moment.day in cron["days"]
+    in_week = (moment.weekday() + 1) % 7 in cron["weekdays"]
+    if cron["any_day"] or cron["any_weekday"]:
+        return in_month and in_week
+    # Com os dois campos restritos, o cron aceita qualquer um deles
+    return in_month or in_week
+
+def next_cron(cron, after):
+    """Próximo horário (hora local, sem segundos) que atende à expressão, depois de `after`"""
+    moment = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+    limit = moment + datetime.timedelta(days=366 * 5)
+    while moment < limit:
+        if moment.month not in cron["months"]:
+            moment = (moment.replace(day=1, hour=0, minute=0) + datetime.timedelta(days=32)).replace(day=1)
+        elif not _day_matches(cron, moment):
+            moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+        elif moment.hour not in cron["hours"]:
+            moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+        elif moment.minute not in cron["minutes"]:
+            moment += datetime.timedelta(minutes=1)
+        else:
+            return moment
+    raise ValueError("a expressão cron nunca é atendida")
+
+def next_slot(job, after):
+    """Próximo horário nominal da tarefa (sem o jitter)"""
+    if job["cron"] is not None:
+        return next_cron(job["cron"], after)
+    return after + datetime.timedelta(seconds=job["every"])
+
+def load_schedule(path=SCHEDULE_FILE):
+    """Lê e valida o agendamento. Lança ValueError com a descrição do problema."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except OSError as e:
+        raise ValueError(f"não foi possível ler {path}: {e.strerror}")
+    except yaml.YAMLError as e:
+        raise ValueError(f"YAML inválido em {path}: {str(e)}")
+
+    jobs, names = [], set()
+    for index, item in enumerate(data.get("jobs") or [], 1):
+        if not isinstance(item, dict):
+            raise ValueError(f"tarefa #{index}: formato inválido")
+        name = item.get("name") or f"tarefa-{index}"
+        if name in names:
+            raise ValueError(f"tarefa '{name}' definida mais de uma vez")
+        names.add(name)
+        if item.get("type") not in JOB_TYPES:
+            raise ValueError(f"tarefa '{name}': tipo deve ser um de {', '.join(JOB_TYPES)}")
+        if ("cron" in item) == ("every" in item):
+            raise ValueError(f"tarefa '{name}': informe 'cron' ou 'every' (segundos)")
+        try:
+            job = {
+                "name": name,
+                "type": item["type"],
+                "cron": parse_cron(item["cron"]) if "cron" in item else None,
+                "schedule": item.get("cron") or f"a cada {int(item['every'])}s",
+                "every": int(item["every"]) if "every" in item else None,
+                "jitter": float(item.get("jitter", 0)),
+                "max_concurrent": int(item.get("max_concurrent", 1)),
+                "profile": item.get("profile"),
+                "region": item.get("region"),
+                "options": item.get("options") or {},
+            }
+            if job["cron"] is not None:
+                # Expressões válidas campo a campo podem nunca ocorrer (por exemplo, 30 de fevereiro)
+                next_cron(job["cron"], datetime.datetime.now())
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"tarefa '{name}': {str(e)}")
+        if (job["every"] is not None and job["every"] <= 0) or job["max_concurrent"] < 1 or job["jitter"] < 0:
+            raise ValueError(f"tarefa '{name}': 'every' e 'max_concurrent' devem ser positivos e 'jitter' não negativo")
+        if job["type"] == "log_rotation" and not job["options"].get("path"):
+            raise ValueError(f"tarefa '{name}': informe options.path com o diretório de logs")
+        jobs.append(job)
+    if not jobs:
+        raise ValueError(f"nenhuma tarefa definida em {path}")
+    return jobs
+
+# Tarefas: recebem a definição e o horário nominal da execução e retornam True em caso de sucesso
+
+def _backup_job(job, slot):
+    options = job["options"]
+    return run_backups(job["profile"], job["region"], options.get("services"), options.get("tags"),
+                       slot.strftime(options.get("run_id", "%Y-%m-%d")), options.get("rate", DEFAULT_RATE),
+                       options.get("workers", BACKUP_WORKERS), options.get("timeout", DEFAULT_TIMEOUT),
+                       options.get("wait", True))
+
+def _send_alert(email, issues):
+    """Envia o alerta pelo comando mail, como os scripts gerados pelo menu de automação"""
+    if not shutil.which("mail"):
+        log("WARNING", "Comando 'mail' não encontrado: alerta de saúde não enviado.")
+        return
+    body = f"Alerta de saúde da AWS - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n" + "\n".join(issues)
+    subprocess.run(["mail", "-s", "Alerta de saúde AWS", email], input=body, text=True, check=False)
+
+def _health_job(job, slot):
+    resources, _ = collect_health(job["profile"], job["region"], job["options"].get("services"))
+    issues = [f"{resource['service']} {resource['id']}: {resource['state']}"
+              + (f" ({resource['detail']})" if resource["detail"] else "")
+              for resource in resources if resource["level"] != "ok"]
+    for issue in issues:
+        log("WARNING", issue)
+    if issues and job["options"].get("email"):
+        _send_alert(job["options"]["email"], issues)
+    return not issues
+
+def rotate_logs(path, compress_after=7, delete_after=30, pattern="*.log"):
+    """Comprime (gzip) os logs mais antigos que compress_after dias e remove os comprimidos mais
+    antigos que delete_after dias. Retorna (comprimidos, removidos, erros)."""
+    now = time.time()
+    compressed, removed, errors = 0, 0, 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            full = os.path.join(root, name)
+            try:
+                stat = os.stat(full)
+                age = (now - stat.st_mtime) / 86400
+                if name.endswith(".gz"):
+                    if age > delete_after:
+                        os.remove(full)
+                        removed += 1
+                elif fnmatch.fnmatch(name, pattern) and age > compress_after:
+                    with open(full, "rb") as source, gzip.open(f"{full}.gz.part", "wb") as target:
+                        shutil.copyfileobj(source, target)
+                    # Mantém a data original para que a remoção conte a partir dela, como o gzip
+                    os.utime(f"{full}.gz.part", (stat.st_atime, stat.st_mtime))
+                    os.replace(f"{full}.gz.part", f"{full}.gz")
+                    os.remove(full)
+                    compressed += 1
+            except OSError as e:
+                log("WARNING", f"Falha ao rotacionar {full}: {str(e)}")
+                errors += 1
+    return compressed, removed, errors
+
+def _log_rotation_job(job, slot):
+    options = job["options"]
+    compressed, removed, errors = rotate_logs(options["path"], options.get("compress_after_days", 7),
+                                              options.get("delete_after_days", 30), options.get("pattern", "*.log"))
+    log("INFO", f"Rotação de logs em {options['path']}: {compressed} comprimido(s), {removed} removido(s)")
+    return not errors
+
+JOB_TYPES = {"backup": _backup_job, "health": _health_job, "log_rotation": _log_rotation_job}
+
+def _connect():
+    """Abre o histórico de execuções, criando o esquema se necessário"""
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    conn = sqlite3.connect(HISTORY_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job TEXT NOT NULL,
+            type TEXT NOT NULL,
+            scheduled_at TEXT NOT NULL,
+            started_at TEXT,
+            duration REAL,
+            status TEXT NOT NULL,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_runs_job ON runs (job, id);
+        """
+    )
+    return conn
+
+def record_run(job, slot, status, started=None, duration=None, error=None):
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO runs (job, type, scheduled_at, started_at, duration, status, error) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job["name"], job["type"], slot.isoformat(timespec="seconds"),
+                 started.isoformat(timespec="seconds") if started else None,
+                 round(duration, 3) if duration is not None else None, status, error),
+            )
+    finally:
+        conn.close()
+
+def execute_job(job, slot, slots=None):
+    """Executa uma tarefa no processo atual e registra o resultado no histórico"""
+    started, start = datetime.datetime.now(), time.monotonic()
+    log("INFO", f"Iniciando a tarefa '{job['name']}' ({job['type']})")
+    error = None
+    try:
+        status = "success" if JOB_TYPES[job["type"]](job, slot) else "failed"
+    except (BotoCoreError, ClientError, OSError, ValueError) as e:
+        status, error = "error", str(e)
+    except Exception as e:
+        # Uma tarefa com erro inesperado não pode derrubar o agendador
+        status, error = "error", f"{type(e).__name__}: {str(e)}"
+    finally:
+        if slots is not None:
+            slots.release()
+    duration = time.monotonic() - start
+    record_run(job, slot, status, started, duration, error)
+    level = {"success": "SUCCESS", "failed": "WARNING"}.get(status, "ERROR")
+    log(level, f"Tarefa '{job['name']}' finalizada ({status}) em {duration:.1f}s" + (f": {error}" if error else ""))
+    return status == "success"
+
+def run_scheduler(path=SCHEDULE_FILE, max_workers=MAX_WORKERS):
+    """Executa as tarefas do agendamento até receber SIGINT/SIGTERM"""
+    try:
+        jobs = load_schedule(path)
+    except ValueError as e:
+        log("ERROR", f"Agendamento inválido: {str(e)}")
+        return False
+
+    stop = threading.Event()
+    def request_stop(signum, frame):
+        stop.set()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, request_stop)
+
+    now = datetime.datetime.now()
+    queue = []
+    for index, job in enumerate(jobs):
+        job["slots"] = threading.BoundedSemaphore(job["max_concurrent"])
+        slot = next_slot(job, now)
+        heapq.heappush(queue, (slot + datetime.timedelta(seconds=random.uniform(0, job["jitter"])), slot, index))
+    log("INFO", f"Agendador iniciado com {len(jobs)} tarefa(s) ({path}); até {max_workers} execução(ões) simultânea(s)")
+
+    # Os clientes boto3 criados pelas tarefas ficam em cache no processo e são reutilizados nas execuções seguintes
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while not stop.is_set():
+            due, slot, index = queue[0]
+            remaining = (due - datetime.datetime.now()).total_seconds()
+            if remaining > 0:
+                stop.wait(min(remaining, MAX_SLEEP))
+                continue
+            heapq.heappop(queue)
+            job = jobs[index]
+            if job["slots"].acquire(blocking=False):
+                executor.submit(execute_job, job, slot, job["slots"])
+            else:
+                # Execução anterior ainda em andamento: não sobrepõe além do limite da tarefa
+                log("WARNING", f"Tarefa '{job['name']}' ignorada: {job['max_concurrent']} execução(ões) em andamento")
+                record_run(job, slot, "skipped")
+            following = next_slot(job, slot)
+            if following <= datetime.datetime.now():
+                # Horários perdidos (tarefa longa, máquina suspensa) não são executados em sequência
+                following = next_slot(job, datetime.datetime.now())
+            heapq.heappush(queue, (following + datetime.timedelta(seconds=random.uniform(0, job["jitter"])),
+                                   following, index))
+        log("INFO", "Parando o agendador: aguardando as tarefas em andamento")
+    log("SUCCESS", "Agendador finalizado.")
+    return True
+
+def run_job(name, path=SCHEDULE_FILE):
+    """Executa imediatamente uma tarefa do agendamento (sem jitter)"""
+    try:
+        jobs = load_schedule(path)
+    except ValueError as e:
+        log("ERROR", f"Agendamento inválido: {str(e)}")
+        return False
+    job = next((job for job in jobs if job["name"] == name), None)
+    if job is None:
+        log("ERROR", f"Tarefa '{name}' não encontrada em {path}.")
+        return False
+    return execute_job(job, datetime.datetime.now())
+
+def show_jobs(path=SCHEDULE_FILE):
+    """Lista as tarefas e o próximo horário de cada uma"""
+    try:
+        jobs = load_schedule(path)
+    except ValueError as e:
+        log("ERROR", f"Agendamento inválido: {str(e)}")
+        if not os.path.exists(path):
+            console.print(f"Exemplo de {path}:\n\n{EXAMPLE_SCHEDULE}")
+        return False
+    table = Table(title=f"Tarefas agendadas - {path}")
+    for column in ("Tarefa", "Tipo", "Agendamento", "Jitter (s)", "Simultâneas", "Perfil", "Próxima execução"):
+        table.add_column(column)
+    now = datetime.datetime.now()
+    for job in jobs:
+        table.add_row(job["name"], job["type"], job["schedule"], f"{job['jitter']:g}", str(job["max_concurrent"]),
+                      job["profile"] or "-", next_slot(job, now).strftime("%Y-%m-%d %H:%M:%S"))
+    console.print(table)
+    return True
+
+def show_history(job=None, limit=20):
+    """Exibe as últimas execuções registradas"""
+    conn = _connect()
+    try:
+        query = "SELECT job, type, scheduled_at, started_at, duration, status, error FROM runs"
+        params = []
+        if job:
+            query += " WHERE job = ?"
+            params.append(job)
+        rows = conn.execute(query + " ORDER BY id DESC LIMIT ?", params + [limit]).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        log("INFO", "Nenhuma execução registrada.")
+        return True
+    table = Table(title="Histórico do agendador")
+    for column in ("Tarefa", "Tipo", "Agendada para", "Início", "Duração (s)", "Status", "Erro"):
+        table.add_column(column, justify="right" if column == "Duração (s)" else "left", overflow="fold")
+    colors = {"success": "green", "failed": "yellow", "error": "red", "skipped": "dim"}
+    for name, kind, scheduled, started, duration, status, error in rows:
+        table.add_row(name, kind, scheduled, started or "-", f"{duration:.1f}" if duration is not None else "-",
+                      f"[{colors[status]}]{status}[/{colors[status]}]", error or "")
+    console.print(table)
+    return True
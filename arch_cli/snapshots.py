@@ -0,0 +1,233 @@
+"""
+Varredura em streaming de snapshots e volumes EBS com memória constante
+"""
+
+import os
+import re
+import heapq
+import datetime
+from botocore.exceptions import BotoCoreError, ClientError
+from rich.console import Console
+from rich.table import Table
+from .aws import get_client, paginate
+from .export import StreamWriter
+from .fanout import DEFAULT_TIMEOUT, resolve_targets, run_targets
+from .utils import log
+
+console = Console()
+
+DEFAULT_OLDER_THAN = 90
+DEFAULT_TOP = 20
+PAGE_SIZE = 1000
+# Volumes de origem mantidos na agregação por volume, por item exibido; o excedente é descartado a cada página
+BY_VOLUME_FACTOR = 10
+
+# Snapshots criados por CopySnapshot (cópias entre regiões ou de DR) informam este VolumeId
+COPY_VOLUME_ID = "vol-ffffffff"
+
+# Faixas de idade dos snapshots, em dias (limite superior exclusivo)
+AGE_BUCKETS = [(30, "0-30 dias"), (90, "30-90 dias"), (180, "90-180 dias"), (365, "180-365 dias"), (None, "> 365 dias")]
+
+# Preço por GB-mês (us-east-1); o custo de snapshots é estimado pelo tamanho do volume de origem
+SNAPSHOT_PRICES = {"standard": 0.05, "archive": 0.0125}
+VOLUME_PRICES = {"gp2": 0.10, "gp3": 0.08, "io1": 0.125, "io2": 0.125, "st1": 0.045, "sc1": 0.015, "standard": 0.05}
+
+AMI_PATTERN = re.compile(r"\b(ami-[0-9a-f]+)\b")
+
+def _bucket(age):
+    for limit, label in AGE_BUCKETS:
+        if limit is None or age < limit:
+            return label
+
+def _add(aggregate, key, size, cost):
+    entry = aggregate.setdefault(key, [0, 0, 0.0])
+    entry[0] += 1
+    entry[1] += size
+    entry[2] += cost
+
+def _prune_top(aggregate, limit):
+    """Mantém apenas as `limit` entradas de maior tamanho. Um volume descartado que reaparece em páginas
+    seguintes recomeça do zero, então os totais exibidos são aproximados, mas a memória fica constante."""
+    if len(aggregate) > limit:
+        kept = heapq.nlargest(limit, aggregate.items(), key=lambda item: item[1][1])
+        aggregate.clear()
+        aggregate.update(kept)
+
+def _push_top(heap, top, item):
+    """Mantém apenas os `top` maiores itens (por tamanho) em um heap de tamanho fixo"""
+    entry = (item["size"], item["id"], item)
+    if len(heap) < top:
+        heapq.heappush(heap, entry)
+    elif entry[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, entry)
+
+def _scan_images(client):
+    """AMIs próprias existentes e os snapshots referenciados por elas"""
+    images, image_snapshots = set(), set()
+    for page in paginate(client, "describe_images", Owners=["self"]):
+        for image in page.get("Images", []):
+            images.add(image["ImageId"])
+            for mapping in image.get("BlockDeviceMappings", []):
+                snapshot_id = mapping.get("Ebs", {}).get("SnapshotId")
+                if snapshot_id:
+                    image_snapshots.add(snapshot_id)
+    return images, image_snapshots
+
+def _scan_volumes(client, summary, top):
+    """IDs dos volumes existentes, agregando os não anexados (status available)"""
+    volumes = set()
+    heap = []
+    for page in paginate(client, "describe_volumes", PaginationConfig={"PageSize": PAGE_SIZE}):
+        for volume in page.get("Volumes", []):
+            volumes.add(volume["VolumeId"])
+            if volume.get("State") != "available":
+                continue
+            cost = volume["Size"] * VOLUME_PRICES.get(volume.get("VolumeType"), 0.10)
+            _add(summary["unattached"], volume.get("VolumeType", "-"), volume["Size"], cost)
+            _push_top(heap, top, {"id": volume["VolumeId"], "size": volume["Size"], "type": volume.get("VolumeType"),
+                                  "created": volume["CreateTime"].date().isoformat(),
+                                  "zone": volume.get("AvailabilityZone"), "cost": cost})
+    summary["unattached_top"] = [entry[2] for entry in sorted(heap, reverse=True)]
+    return volumes
+
+def scan_target(profile, region, older_than=DEFAULT_OLDER_THAN, top=DEFAULT_TOP, export=None):
+    """Varre snapshots e volumes de um alvo agregando página a página.
+    A memória depende do número de volumes/AMIs, não do número de snapshots."""
+    client = get_client("ec2", profile, region)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    summary = {"buckets": {}, "by_volume": {}, "unattached": {}, "orphans": {}, "total": [0, 0, 0.0], "old": [0, 0, 0.0]}
+
+    images, image_snapshots = _scan_images(client)
+    volumes = _scan_volumes(client, summary, top)
+
+    writer = None
+    if export:
+        path = os.path.join(export["dir"], profile or "default", region or "default", "old_snapshots")
+        writer = StreamWriter(path, export["format"], export.get("gzip", False),
+                              ["SnapshotId", "VolumeId", "StartTime", "VolumeSize", "Description"],
+                              lambda s: [s["SnapshotId"], s.get("VolumeId"), s["StartTime"].isoformat(),
+                                         s.get("VolumeSize"), s.get("Description", "")])
+
+    orphan_heap = []
+    try:
+        for page in paginate(client, "describe_snapshots", OwnerIds=["self"],
+                             PaginationConfig={"PageSize": PAGE_SIZE}):
+            old_page = []
+            for snapshot in page.get("Snapshots", []):
+                size = snapshot.get("VolumeSize", 0)
+                age = (now - snapshot["StartTime"]).days
+                cost = size * SNAPSHOT_PRICES.get(snapshot.get("StorageTier", "standard"), SNAPSHOT_PRICES["standard"])
+
+                summary["total"][0] += 1
+                summary["total"][1] += size
+                summary["total"][2] += cost
+                _add(summary["buckets"], _bucket(age), size, cost)
+                copy = snapshot.get("VolumeId") == COPY_VOLUME_ID
+                _add(summary["by_volume"], "cópia" if copy else snapshot.get("VolumeId", "-"), size, cost)
+
+                if age >= older_than:
+                    summary["old"][0] += 1
+                    summary["old"][1] += size
+                    summary["old"][2] += cost
+                    old_page.append(snapshot)
+
+                if snapshot["SnapshotId"] in image_snapshots:
+                    continue
+                match = AMI_PATTERN.search(snapshot.get("Description", ""))
+                if match and match.group(1) not in images:
+                    reason = "AMI removida"
+                elif not copy and snapshot.get("VolumeId") not in volumes:
+                    reason = "volume removido"
+                else:
+                    continue
+                _add(summary["orphans"], reason, size, cost)
+                _push_top(orphan_heap, top, {"id": snapshot["SnapshotId"], "size": size, "volume": snapshot.get("VolumeId"),
+                                             "created": snapshot["StartTime"].date().isoformat(), "reason": reason,
+                                             "cost": cost})
+            if writer and old_page:
+                writer.write_page(old_page)
+            _prune_top(summary["by_volume"], top * BY_VOLUME_FACTOR)
+    except BaseException:
+        if writer:
+            writer.close(success=False)
+        raise
+    if writer:
+        writer.close()
+
+    summary["orphans_top"] = [entry[2] for entry in sorted(orphan_heap, reverse=True)]
+    # Apenas os volumes de origem com mais snapshots seguem para exibição
+    summary["by_volume"] = sorted(summary["by_volume"].items(), key=lambda item: -item[1][1])[:top]
+    return summary
+
+def _aggregate_table(title, first_column, rows):
+    table = Table(title=title)
+    table.add_column(first_column)
+    table.add_column("Quantidade", justify="right")
+    table.add_column("GiB", justify="right")
+    table.add_column("Custo estimado (USD/mês)", justify="right")
+    for key, (count, size, cost) in rows:
+        table.add_row(str(key), str(count), str(size), f"{cost:,.2f}")
+    return table
+
+def render_scan(summary, older_than=DEFAULT_OLDER_THAN, title=""):
+    """Exibe o resultado da varredura"""
+    prefix = f"{title} - " if title else ""
+    count, size, cost = summary["total"]
+    old_count, old_size, old_cost = summary["old"]
+    console.print(f"[bold]{prefix}Snapshots:[/bold] {count} ({size} GiB, ~{cost:,.2f} USD/mês); "
+                  f"com mais de {older_than} dias: {old_count} ({old_size} GiB, ~{old_cost:,.2f} USD/mês)")
+
+    order = {label: i for i, (_, label) in enumerate(AGE_BUCKETS)}
+    buckets = sorted(summary["buckets"].items(), key=lambda item: order[item[0]])
+    console.print(_aggregate_table(f"{prefix}Snapshots por idade", "Idade", buckets))
+    console.print(_aggregate_table(f"{prefix}Volumes de origem com mais snapshots", "VolumeId", summary["by_volume"]))
+    console.print(_aggregate_table(f"{prefix}Snapshots órfãos", "Motivo", sorted(summary["orphans"].items())))
+
+    if summary["orphans_top"]:
+        table = Table(title=f"{prefix}Maiores snapshots órfãos")
+        for column in ("SnapshotId", "VolumeId", "Criação", "GiB", "Motivo", "USD/mês"):
+            table.add_column(column)
+        for item in summary["orphans_top"]:
+            table.add_row(item["id"], item["volume"] or "-", item["created"], str(item["size"]), item["reason"],
+                          f"{item['cost']:,.2f}")
+        console.print(table)
+
+    console.print(_aggregate_table(f"{prefix}Volumes EBS não anexados por tipo", "Tipo",
+                                   sorted(summary["unattached"].items())))
+    if summary["unattached_top"]:
+        table = Table(title=f"{prefix}Maiores volumes não anexados")
+        for column in ("VolumeId", "Tipo", "GiB", "Criação", "Zona", "USD/mês"):
+            table.add_column(column)
+        for item in summary["unattached_top"]:
+            table.add_row(item["id"], item["type"] or "-", str(item["size"]), item["created"], item["zone"] or "-",
+                          f"{item['cost']:,.2f}")
+        console.print(table)
+
+def scan_storage(profile=None, regions=None, all_profiles=False, older_than=DEFAULT_OLDER_THAN, top=DEFAULT_TOP,
+                 export=None, processes=None, timeout=DEFAULT_TIMEOUT):
+    """Varre snapshots e volumes EBS de um ou vários alvos (perfil × região)"""
+    log("INFO", "Varrendo snapshots e volumes EBS")
+    targets = [(p, r, older_than, top, export) for p, r in resolve_targets(profile, all_profiles, regions)]
+
+    if len(targets) == 1:
+        try:
+            render_scan(scan_target(*targets[0]), older_than)
+        except (BotoCoreError, ClientError) as e:
+            log("ERROR", f"Falha ao varrer snapshots: {str(e)}")
+            return False
+    else:
+        failed = 0
+        for done in run_targets(scan_target, targets, processes, timeout):
+            if done["error"]:
+                failed += 1
+                log("ERROR", f"Falha no alvo {done['profile']}/{done['region'] or 'padrão'}: {done['error']}")
+                continue
+            render_scan(done["result"], older_than, f"{done['profile']}/{done['region'] or 'padrão'}")
+        if failed:
+            log("WARNING", f"{failed} alvo(s) não puderam ser varridos.")
+            return False
+
+    if export:
+        log("SUCCESS", f"Snapshots com mais de {older_than} dias exportados para: {export['dir']}")
+    log("SUCCESS", "Análise de custos concluída.")
+    return True
@@ -0,0 +1,144 @@
+"""
+Benchmark de inicialização do arch-cli: mede a partida a frio dos comandos contra um orçamento
+
+O orçamento vale para o custo do próprio arch-cli: o tempo de cada comando menos o de um processo
+Python que apenas carrega as bibliotecas de que o comando precisa (click e, para comandos que
+exibem mensagens, rich). Assim o resultado não depende da velocidade da máquina.
+
+Uso: python -m arch_cli.startup_bench [--budget-ms 40] [--runs 10]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+DEFAULT_BUDGET_MS = 40
+DEFAULT_RUNS = 10
+
+# Perfil do arquivo de configuração temporário usado na execução real de `arch-cli profile`
+BENCH_PROFILE = "startup-bench"
+
+# Base de comparação: processo que apenas carrega (e usa) as bibliotecas de que o comando precisa.
+# Retorna (código executado, módulos que o comando pode carregar)
+FLOORS = {
+    "click": ("import click", ["click"]),
+    "rich": ("import click\nfrom rich.console import Console\nConsole().print('[blue][INFO][/blue] ok')",
+             ["click", "rich"]),
+}
+
+# Comandos medidos (cada execução é um novo processo Python) e a base de cada um
+COMMANDS = [
+    (["--help"], "click"),
+    (["profile", "--help"], "click"),
+    (["list", "--help"], "click"),
+    (["monitor", "logs", "--help"], "click"),
+    (["cost", "report", "--help"], "click"),
+    # Execução real: lê os perfis do AWS CLI, grava o perfil ativo e exibe a confirmação com rich
+    (["profile", BENCH_PROFILE], "rich"),
+]
+
+# Módulos que não podem ser carregados apenas para montar o CLI (exceto os que o comando precisa)
+HEAVY_MODULES = ["rich", "boto3", "botocore", "numpy", "subprocess", "arch_cli.finops", "arch_cli.dependencies"]
+
+def _env(home):
+    """Ambiente isolado: HOME e arquivos do AWS CLI temporários e bytecode em cache próprio"""
+    env = dict(os.environ)
+    # Garante que o pacote medido é o desta árvore, mesmo sem instalação
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    env.pop("PYTHONSTARTUP", None)
+    # Como em uma instalação, os módulos são medidos já compilados (sem recompilar o fonte a cada execução)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPYCACHEPREFIX"] = os.path.join(home, "pycache")
+    env["HOME"] = home
+    env["AWS_CONFIG_FILE"] = os.path.join(home, ".aws", "config")
+    env["AWS_SHARED_CREDENTIALS_FILE"] = os.path.join(home, ".aws", "credentials")
+    return env
+
+def _prepare_home():
+    home = tempfile.mkdtemp(prefix="arch-cli-bench-")
+    os.makedirs(os.path.join(home, ".aws"))
+    with open(os.path.join(home, ".aws", "config"), "w") as f:
+        f.write(f"[default]\nregion = us-east-1\n\n[profile {BENCH_PROFILE}]\nregion = us-east-1\n")
+    return home
+
+def _timed(argv, env):
+    """Tempo (ms) e código de saída de uma execução de argv"""
+    start = time.perf_counter()
+    result = subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return (time.perf_counter() - start) * 1000, result.returncode
+
+def measure(args, code, env, runs=DEFAULT_RUNS):
+    """Tempos (ms) de `python -m arch_cli.main <args>` e da base `python -c <code>` em processos novos,
+    alternados para que variações de carga da máquina afetem os dois igualmente.
+    Retorna (tempos do comando, tempos da base, código de saída do comando)."""
+    command, floor = [sys.executable, "-m", "arch_cli.main", *args], [sys.executable, "-c", code]
+    # Aquecimento: grava o bytecode e carrega os arquivos no cache do sistema
+    _timed(command, env)
+    _timed(floor, env)
+    timings, baseline, returncode = [], [], 0
+    for _ in range(runs):
+        elapsed, status = _timed(command, env)
+        timings.append(elapsed)
+        returncode = returncode or status
+        baseline.append(_timed(floor, env)[0])
+    return timings, baseline, returncode
+
+def heavy_imports(args, env, allowed=()):
+    """Módulos pesados carregados ao executar o comando, além dos permitidos"""
+    candidates = [module for module in HEAVY_MODULES
+                  if not any(item == module or item.startswith(module + ".") for item in allowed)]
+    code = (
+        "import sys, json, arch_cli.main\n"
+        "try:\n"
+        "    arch_cli.main.main(sys.argv[1:], prog_name='arch-cli')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"sys.stderr.write('\\n' + json.dumps([m for m in {candidates!r} if m in sys.modules]))"
+    )
+    result = subprocess.run([sys.executable, "-c", code, *args], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+def run(budget_ms=DEFAULT_BUDGET_MS, runs=DEFAULT_RUNS):
+    """Executa o benchmark; retorna True se todos os comandos ficarem dentro do orçamento"""
+    home = _prepare_home()
+    try:
+        env = _env(home)
+        ok = True
+        print(f"{'Comando':<28} {'mediana':>9} {'p90':>9} {'base':>9} {'custo':>9}  orçamento {budget_ms:g} ms")
+        for args, floor in COMMANDS:
+            code, modules = FLOORS[floor]
+            loaded = heavy_imports(args, env, modules)
+            if loaded:
+                ok = False
+                print(f"FALHA  '{' '.join(args)}' carregou módulos pesados: {', '.join(loaded)}")
+            timings, baseline, returncode = measure(args, code, env, runs)
+            timings.sort()
+            median, base = statistics.median(timings), statistics.median(baseline)
+            p90 = timings[min(len(timings) - 1, int(len(timings) * 0.9))]
+            cost = median - base
+            passed = returncode == 0 and cost <= budget_ms
+            ok = ok and passed
+            status = "ok" if passed else f"FALHA (saída {returncode})" if returncode else "FALHA"
+            print(f"{' '.join(args):<28} {median:>7.1f}ms {p90:>7.1f}ms {base:>7.1f}ms {cost:>7.1f}ms  {status}")
+        return ok
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a inicialização a frio do arch-cli contra um orçamento")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Custo máximo (mediana menos a base) por comando, em ms (padrão: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help=f"Execuções por comando (padrão: {DEFAULT_RUNS})")
+    options = parser.parse_args(argv)
+    sys.exit(0 if run(options.budget_ms, options.runs) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Verificação paralela das ferramentas externas com manifesto em cache (~/.arch-cli/toolchain.json)
+"""
+
+import os
+import json
+import time
+import shutil
+from .process import run_batch
+from .utils import CONFIG_DIR
+
+MANIFEST_FILE = os.path.join(CONFIG_DIR, "toolchain.json")
+PROBE_TIMEOUT = 30
+
+# Comando usado para obter a versão de cada ferramenta
+TOOLS = {
+    "aws": ["aws", "--version"],
+    "python3": ["python3", "--version"],
+    "pip3": ["pip3", "--version"],
+    "prowler": ["prowler", "--version"],
+    "jq": ["jq", "--version"],
+    "git": ["git", "--version"],
+    "docker": ["docker", "--version"],
+    "docker-compose": ["docker-compose", "--version"],
+}
+
+def fingerprint(name):
+    """Identifica o binário resolvido no PATH (caminho, destino real, mtime e inode), sem executá-lo"""
+    path = shutil.which(name)
+    if not path:
+        return None
+    real = os.path.realpath(path)
+    try:
+        stat = os.stat(real)
+    except OSError:
+        return None
+    return [path, real, stat.st_mtime_ns, stat.st_ino, stat.st_size]
+
+def load_manifest():
+    """Carrega o manifesto; é descartado por completo quando o PATH mudou"""
+    try:
+        with open(MANIFEST_FILE) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"path": os.environ.get("PATH", ""), "tools": {}}
+    if manifest.get("path") != os.environ.get("PATH", ""):
+        return {"path": os.environ.get("PATH", ""), "tools": {}}
+    return manifest
+
+def save_manifest(manifest):
+    """Grava o manifesto de forma atômica (vários processos podem verificar ao mesmo tempo)"""
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    tmp_path = f"{MANIFEST_FILE}.{os.getpid()}.part"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+def _version(result):
+    """Resultado do comando de versão: instalado e primeira linha da saída"""
+    if not result["ok"]:
+        return {"installed": False, "version": None}
+    # Algumas ferramentas (ex.: AWS CLI v1) escrevem a versão em stderr
+    output = (result["stdout"].strip() or result["stderr"].strip()).splitlines()
+    return {"installed": True, "version": output[0] if output else "Versão desconhecida"}
+
+def probe_tools(names, recheck=False):
+    """Retorna {ferramenta: {installed, version, cached}}, executando em paralelo apenas as
+    verificações cujo binário mudou desde a última vez (ou todas, com recheck)"""
+    manifest = load_manifest()
+    results, stale = {}, {}
+    for name in names:
+        current = fingerprint(name)
+        entry = manifest["tools"].get(name)
+        if not recheck and entry and entry.get("fingerprint") == current:
+            results[name] = {"installed": entry["installed"], "version": entry["version"], "cached": True}
+        elif current is None:
+            # Não encontrado no PATH: nada a executar
+            results[name] = {"installed": False, "version": None, "cached": False}
+            stale[name] = current
+        else:
+            stale[name] = current
+
+    to_run = [name for name in stale if stale[name] is not None]
+    for result in run_batch([TOOLS[name] for name in to_run], max_workers=len(to_run) or 1, timeout=PROBE_TIMEOUT):
+        results[to_run[result["index"]]] = dict(_version(result), cached=False)
+
+    if stale:
+        # Relê o manifesto para não descartar verificações feitas por outro processo nesse meio tempo
+        manifest = load_manifest()
+        for name, current in stale.items():
+            manifest["tools"][name] = {"fingerprint": current, "installed": results[name]["installed"],
+                                       "version": results[name]["version"], "checked_at": time.time()}
+        try:
+            save_manifest(manifest)
+        except OSError:
+            pass
+    return results
+
+def probe_tool(name, recheck=False):
+    """Atalho para verificar uma única ferramenta"""
+    return probe_tools([name], recheck)[name]
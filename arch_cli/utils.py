@@ -3,18 +3,37 @@ Utilitários para o Arch CLI em Python
 """
 
 import os
-import platform
-import subprocess
 import json
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+import contextlib
+from .logfile import get_writer
 
-console = Console()
+# rich é importado apenas na primeira mensagem exibida, mantendo a inicialização do CLI rápida
+_console = None
+
+def get_console():
+    """Retorna o Console compartilhado do rich, criando-o no primeiro uso"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+@contextlib.contextmanager
+def status_to_stderr():
+    """Durante o bloco, as mensagens de log() vão para o stderr e o stdout fica só com a saída do comando"""
+    global _console
+    from rich.console import Console
+    previous, _console = _console, Console(stderr=True)
+    try:
+        yield
+    finally:
+        _console = previous
 
 # Configurações
 CONFIG_DIR = os.path.expanduser("~/.arch-cli")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 LOG_FILE = os.path.join(CONFIG_DIR, "arch-cli.log")
+ACTIVE_PROFILE_FILE = os.path.join(CONFIG_DIR, "active_profile")
 
 def setup_config_dir():
     """Cria o diretório de configuração se não existir"""
@@ -29,12 +48,9 @@ def setup_config_dir():
 
 def log(level, message):
     """Registra mensagens no arquivo de log"""
-    import datetime
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    with open(LOG_FILE, "a") as f:
-        f.write(f"[{timestamp}] [{level}] {message}\n")
+    get_writer(LOG_FILE, CONFIG_FILE).write(level, message)
     
+    console = get_console()
     if level == "INFO":
         console.print(f"[blue][INFO][/blue] {message}")
     elif level == "SUCCESS":
@@ -48,6 +64,8 @@ def log(level, message):
 
 def detect_os():
     """Detecta o sistema operacional"""
+    import platform
+
     system = platform.system().lower()
     
     if system == "linux":
@@ -77,33 +95,67 @@ def detect_os():
     else:
         return "unknown"
 
-def run_command(command, shell=False):
-    """Executa um comando e retorna o resultado"""
-    try:
-        if shell:
-            result = subprocess.run(command, shell=True, check=True, text=True, capture_output=True)
-        else:
-            result = subprocess.run(command, check=True, text=True, capture_output=True)
-        return True, result.stdout
-    except subprocess.CalledProcessError as e:
-        return False, e.stderr
+def run_command(command, shell=False, timeout=None, on_line=None):
+    """Executa um comando e retorna o resultado (ver arch_cli.process para streaming e lotes)"""
+    from .process import run_command as run
+    return run(command, shell=shell, timeout=timeout, on_line=on_line)
+
+def _aws_config_files():
+    """Arquivos de credenciais e configuração do AWS CLI, respeitando as variáveis de ambiente"""
+    credentials = os.environ.get("AWS_SHARED_CREDENTIALS_FILE", os.path.expanduser("~/.aws/credentials"))
+    config = os.environ.get("AWS_CONFIG_FILE", os.path.expanduser("~/.aws/config"))
+    return credentials, config
 
 def get_aws_profiles():
-    """Obtém a lista de perfis AWS configurados"""
-    success, output = run_command(["aws", "configure", "list-profiles"])
-    if success:
-        return output.strip().split("\n")
-    return []
+    """Obtém a lista de perfis AWS configurados lendo os arquivos do AWS CLI
+    (mesmo resultado de `aws configure list-profiles`, sem iniciar um processo)"""
+    import configparser
+
+    credentials_file, config_file = _aws_config_files()
+    profiles = []
+    for path, is_config in ((credentials_file, False), (config_file, True)):
+        parser = configparser.RawConfigParser()
+        try:
+            parser.read(path)
+        except configparser.Error as e:
+            log("WARNING", f"Erro ao ler {path}: {str(e)}")
+            continue
+        for section in parser.sections():
+            if is_config:
+                if section.startswith("profile "):
+                    section = section[len("profile "):].strip()
+                elif section != "default":
+                    # sso-session, services etc. não são perfis
+                    continue
+            profiles.append(section)
+    return list(dict.fromkeys(profiles))
+
+def set_active_profile(profile):
+    """Define o perfil AWS ativo usado pelo arch-cli (Python e bash)"""
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    with open(ACTIVE_PROFILE_FILE, "w") as f:
+        f.write(f"{profile}\n")
+    log("INFO", f"Perfil ativo definido para: {profile}")
+
+def get_active_profile():
+    """Obtém o perfil AWS ativo definido pelo arch-cli"""
+    if os.path.exists(ACTIVE_PROFILE_FILE):
+        with open(ACTIVE_PROFILE_FILE) as f:
+            profile = f.read().strip()
+            if profile:
+                return profile
+    return "default"
 
 def create_progress_bar(description="Processando"):
     """Cria uma barra de progresso"""
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
     return Progress(
         SpinnerColumn(),
         TextColumn("[bold blue]{task.description}"),
         BarColumn(),
         TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
         TimeElapsedColumn(),
-        console=console
+        console=get_console()
     )
 
 def load_config():
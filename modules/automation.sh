@@ -179,6 +179,10 @@ schedule_tasks() {
 #!/bin/bash
 # Script de backup automático criado pelo Arch CLI
 export AWS_PROFILE=$profile_name
+# Orquestrador em Python: snapshots em paralelo, espera pela conclusão e retomada da execução do dia
+if command -v arch-cli &> /dev/null; then
+    exec arch-cli automation backup --profile "$profile_name" --service ebs
+fi
 aws ec2 describe-volumes --query 'Volumes[*].VolumeId' --output text | while read vol; do
     aws ec2 create-snapshot --volume-id "\$vol" --description "Backup automático - \$(date +%Y-%m-%d)"
 done
@@ -251,7 +251,10 @@ check_service_health() {
                 aws elbv2 describe-target-groups --profile "$profile_name" --query 'TargetGroups[*].[TargetGroupName,TargetType]' --output table
             elif [ "$lb_type" -eq 3 ]; then
                 aws elb describe-load-balancers --profile "$profile_name" --query 'LoadBalancerDescriptions[*].[LoadBalancerName,DNSName]' --output table
-                aws elb describe-instance-health --profile "$profile_name" --load-balancer-name $(aws elb describe-load-balancers --profile "$profile_name" --query 'LoadBalancerDescriptions[0].LoadBalancerName' --output text) --query 'InstanceStates[*].[InstanceId,State]' --output table
+                for lb_name in $(aws elb describe-load-balancers --profile "$profile_name" --query 'LoadBalancerDescriptions[*].LoadBalancerName' --output text); do
+                    echo "Instâncias do balanceador $lb_name:"
+                    aws elb describe-instance-health --profile "$profile_name" --load-balancer-name "$lb_name" --query 'InstanceStates[*].[InstanceId,State]' --output table
+                done
             else
                 echo "Opção inválida."
             fi
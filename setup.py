@@ -30,6 +30,7 @@ setup(
         "boto3>=1.20.0",
         "rich>=10.0.0",
         "pyyaml>=6.0",
+        "numpy>=1.20.0",
     ],
     entry_points={
         "console_scripts": [
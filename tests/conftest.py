@@ -0,0 +1,68 @@
+"""
+Fixtures compartilhadas pelos testes: diretório de configuração isolado e clientes boto3 com botocore Stubber
+"""
+
+import os
+import shutil
+import tempfile
+
+# Os módulos calculam os caminhos de ~/.arch-cli ao serem importados: o HOME temporário vem antes de qualquer import
+HOME = tempfile.mkdtemp(prefix="arch-cli-tests-")
+os.environ["HOME"] = HOME
+# Diretório de configuração já existente, como após a primeira execução do arch-cli (setup_config_dir)
+os.makedirs(os.path.join(HOME, ".arch-cli"))
+os.environ["AWS_CONFIG_FILE"] = os.path.join(HOME, ".aws", "config")
+os.environ["AWS_SHARED_CREDENTIALS_FILE"] = os.path.join(HOME, ".aws", "credentials")
+os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+for variable in ("AWS_PROFILE", "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN", "ARCH_CLI_LOG_FORMAT"):
+    os.environ.pop(variable, None)
+
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.stub import Stubber
+from arch_cli import aws, cache
+
+class StubbedClients(dict):
+    """Substitui o cache de clientes de arch_cli.aws: get_client devolve, para qualquer perfil e região,
+    o cliente do serviço registrado com um Stubber"""
+
+    def __init__(self):
+        super().__init__()
+        self.stubbers = {}
+
+    def stub(self, service):
+        if service not in self.stubbers:
+            # Sem novas tentativas do botocore: cada erro registrado no Stubber chega ao código testado
+            client = boto3.client(service, region_name="us-east-1", aws_access_key_id="testing",
+                                  aws_secret_access_key="testing", config=Config(retries={"total_max_attempts": 1}))
+            self.stubbers[service] = Stubber(client)
+            self.stubbers[service].activate()
+        return self.stubbers[service]
+
+    def __contains__(self, key):
+        return key[1] in self.stubbers
+
+    def __getitem__(self, key):
+        return self.stubbers[key[1]].client
+
+@pytest.fixture
+def aws_stub(monkeypatch):
+    """Retorna stub(serviço) -> Stubber do cliente usado pelos módulos; respostas não consumidas falham o teste"""
+    clients = StubbedClients()
+    monkeypatch.setattr(aws, "_clients", clients)
+    yield clients.stub
+    for stubber in clients.stubbers.values():
+        stubber.deactivate()
+    for stubber in clients.stubbers.values():
+        stubber.assert_no_pending_responses()
+
+@pytest.fixture
+def local_cache(tmp_path, monkeypatch):
+    """Cache de recursos (arch_cli/cache.py) vazio e exclusivo do teste"""
+    monkeypatch.setattr(cache, "CACHE_FILE", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(cache, "_initialized", False)
+    return cache
+
+def pytest_unconfigure(config):
+    shutil.rmtree(HOME, ignore_errors=True)
@@ -0,0 +1,143 @@
+"""
+Orquestrador de backups: limite de taxa, diário e retomada (arch_cli/backup.py)
+"""
+
+import json
+import datetime
+import pytest
+from arch_cli import backup
+
+BACKUP_ARN = "arn:aws:dynamodb:us-east-1:123456789012:table/{}/backup/01700000000000-abcdef12"
+
+@pytest.fixture(autouse=True)
+def journal_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, "JOURNAL_DIR", str(tmp_path / "backups"))
+    monkeypatch.setattr(backup.time, "sleep", lambda seconds: None)
+    return tmp_path / "backups"
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = backup.Journal(str(tmp_path / "run.jsonl"))
+    yield journal
+    journal.close()
+
+def test_token_bucket_allows_a_burst_then_the_rate(monkeypatch):
+    clock = [100.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(backup.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(backup.time, "sleep", sleep)
+    bucket = backup.TokenBucket(rate=2, capacity=3)
+    for _ in range(5):
+        bucket.acquire()
+    # Três chamadas imediatas e as duas seguintes a 2 por segundo
+    assert sleeps == [0.5, 0.5]
+
+def test_journal_resume_keeps_the_last_record_of_each_resource(tmp_path):
+    path = str(tmp_path / "runs" / "run.jsonl")
+    journal = backup.Journal(path)
+    assert not journal.resumed
+    journal.record("ebs:vol-1", status="created", backup_id="snap-1")
+    journal.record("ebs:vol-1", status="completed")
+    journal.record("rds:db1", status="failed", error="boom")
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "rds:db1", "status": "crea')
+
+    resumed = backup.Journal(path)
+    resumed.close()
+    assert resumed.resumed
+    assert resumed.entries["ebs:vol-1"]["status"] == "completed"
+    assert resumed.entries["ebs:vol-1"]["backup_id"] == "snap-1"
+    assert resumed.entries["rds:db1"]["status"] == "failed"
+
+def test_create_backup_retries_throttling(aws_stub, journal):
+    ec2 = aws_stub("ec2")
+    ec2.add_client_error("create_snapshot", "RequestLimitExceeded")
+    ec2.add_response("create_snapshot", {"SnapshotId": "snap-1"})
+    buckets = {"ec2": backup.TokenBucket(100)}
+
+    backup.create_backup({"ebs": ec2.client}, buckets, journal, {"kind": "ebs", "id": "vol-1"}, "2025-01-01")
+    assert journal.entries["ebs:vol-1"]["status"] == "created"
+    assert journal.entries["ebs:vol-1"]["backup_id"] == "snap-1"
+
+def test_create_backup_treats_existing_rds_snapshot_as_created(aws_stub, journal):
+    rds = aws_stub("rds")
+    rds.add_client_error("create_db_snapshot", "DBSnapshotAlreadyExists")
+    rds.add_client_error("create_db_snapshot", "InvalidDBInstanceState", "instância parada")
+    buckets = {"rds": backup.TokenBucket(100)}
+
+    backup.create_backup({"rds": rds.client}, buckets, journal, {"kind": "rds", "id": "db1"}, "run")
+    backup.create_backup({"rds": rds.client}, buckets, journal, {"kind": "rds", "id": "db2"}, "run")
+    assert journal.entries["rds:db1"]["backup_id"] == "db1-arch-run"
+    assert journal.entries["rds:db2"]["status"] == "failed"
+    assert "instância parada" in journal.entries["rds:db2"]["error"]
+
+def test_reconcile_adopts_backups_created_before_the_interruption(aws_stub, journal):
+    ec2, dynamodb = aws_stub("ec2"), aws_stub("dynamodb")
+    journal.record("ebs:vol-1", status="completed")
+    ec2.add_response("describe_snapshots", {"Snapshots": [
+        {"SnapshotId": "snap-2", "VolumeId": "vol-2", "State": "pending"},
+        {"SnapshotId": "snap-3", "VolumeId": "vol-3", "State": "error"},
+    ]}, {"OwnerIds": ["self"], "Filters": [{"Name": "tag:arch-cli:run-id", "Values": ["run"]}]})
+    dynamodb.add_response("list_backups", {"BackupSummaries": [
+        {"TableName": "orders", "BackupName": "orders-arch-run", "BackupArn": BACKUP_ARN.format("orders")},
+        {"TableName": "events", "BackupName": "events-manual", "BackupArn": BACKUP_ARN.format("events")},
+    ]}, {"BackupType": "USER"})
+    resources = [{"kind": "ebs", "id": "vol-1"}, {"kind": "ebs", "id": "vol-2"}, {"kind": "ebs", "id": "vol-3"},
+                 {"kind": "dynamodb", "id": "orders"}, {"kind": "dynamodb", "id": "events"}]
+
+    backup.reconcile("dev", "us-east-1", "run", journal, resources)
+    assert journal.entries["ebs:vol-2"]["backup_id"] == "snap-2"
+    assert journal.entries["dynamodb:orders"]["backup_id"] == BACKUP_ARN.format("orders")
+    assert "ebs:vol-3" not in journal.entries
+    assert "dynamodb:events" not in journal.entries
+
+def test_wait_batch_records_the_state_of_each_backup(aws_stub, journal):
+    ec2 = aws_stub("ec2")
+    snapshots = {"Snapshots": [{"SnapshotId": "snap-1", "State": "completed"},
+                               {"SnapshotId": "snap-2", "State": "error"}]}
+    # O waiter falha pelo snapshot com erro; o estado individual é lido em seguida
+    ec2.add_response("describe_snapshots", snapshots, {"SnapshotIds": ["snap-1", "snap-2"]})
+    ec2.add_response("describe_snapshots", snapshots, {"SnapshotIds": ["snap-1", "snap-2"]})
+
+    backup.wait_batch(ec2.client, journal, "ebs", [("ebs:vol-1", "snap-1"), ("ebs:vol-2", "snap-2")],
+                      backup.time.monotonic() + 600)
+    assert journal.entries["ebs:vol-1"]["status"] == "completed"
+    assert journal.entries["ebs:vol-2"]["status"] == "failed"
+
+def test_run_resumed_with_the_same_run_id_does_not_create_again(aws_stub, journal_dir):
+    ec2 = aws_stub("ec2")
+    # Clientes dos demais serviços são criados pela execução, mas não recebem chamadas
+    aws_stub("rds"), aws_stub("dynamodb")
+    ec2.add_response("describe_volumes", {"Volumes": [{"VolumeId": "vol-1"}]})
+    ec2.add_response("create_snapshot", {"SnapshotId": "snap-1"})
+    # Segunda execução: apenas acompanha o snapshot criado na primeira
+    ec2.add_response("describe_volumes", {"Volumes": [{"VolumeId": "vol-1"}]})
+    completed = {"Snapshots": [{"SnapshotId": "snap-1", "State": "completed",
+                                "StartTime": datetime.datetime(2025, 1, 1)}]}
+    ec2.add_response("describe_snapshots", completed, {"SnapshotIds": ["snap-1"]})
+    ec2.add_response("describe_snapshots", completed, {"SnapshotIds": ["snap-1"]})
+
+    assert backup.run_backups("dev", "us-east-1", ["ebs"], run_id="2025/01/01", wait=False)
+    assert backup.run_backups("dev", "us-east-1", ["ebs"], run_id="2025/01/01")
+
+    with open(journal_dir / "dev-us-east-1-2025-01-01.jsonl", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["status"] for record in records] == ["created", "completed"]
+    assert records[-1]["backup_id"] == "snap-1"
+
+def test_summarize_counts_each_status_per_kind(journal):
+    journal.record("ebs:vol-1", status="completed")
+    journal.record("ebs:vol-2", status="created", backup_id="snap-2")
+    journal.record("rds:db1", status="failed", error="boom")
+    resources = [{"kind": "ebs", "id": "vol-1"}, {"kind": "ebs", "id": "vol-2"}, {"kind": "rds", "id": "db1"},
+                 {"kind": "rds", "id": "db2"}]
+    assert backup.summarize(journal, resources) == {
+        "ebs": {"total": 2, "completed": 1, "created": 1, "failed": 0},
+        "rds": {"total": 2, "completed": 0, "created": 0, "failed": 1},
+    }
@@ -0,0 +1,73 @@
+"""
+Cache local de recursos (arch_cli/cache.py)
+"""
+
+import time
+import pytest
+from arch_cli import cache, inventory
+
+@pytest.fixture(autouse=True)
+def ttl_config(local_cache, monkeypatch):
+    monkeypatch.setattr(cache, "load_config", lambda: {"cache_ttl": {"ec2": 60}})
+
+class Fetch:
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.data
+
+def _age(profile, region, service, seconds):
+    conn = cache._connect()
+    with conn:
+        conn.execute("UPDATE resources SET fetched_at = ? WHERE profile = ? AND region = ? AND service = ?",
+                     (time.time() - seconds, profile or "", region or "", service))
+    conn.close()
+
+def test_ttl_from_config_overrides_default():
+    assert cache.get_ttl("ec2") == 60
+    assert cache.get_ttl("s3") == cache.SERVICE_TTLS["s3"]
+    assert cache.get_ttl("desconhecido") == cache.DEFAULT_TTL
+
+def test_auto_mode_only_fetches_expired_entries():
+    fetch = Fetch([["i-1"]])
+    assert cache.cached_fetch("dev", "us-east-1", "ec2", fetch) == ([["i-1"]], False)
+    assert cache.cached_fetch("dev", "us-east-1", "ec2", fetch) == ([["i-1"]], True)
+    assert fetch.calls == 1
+
+    _age("dev", "us-east-1", "ec2", 120)
+    fetch.data = [["i-2"]]
+    assert cache.cached_fetch("dev", "us-east-1", "ec2", fetch) == ([["i-2"]], False)
+    assert fetch.calls == 2
+
+def test_cached_mode_accepts_expired_entries_and_refresh_ignores_cache():
+    cache.put_entry("dev", None, "s3", [["logs"]])
+    _age("dev", None, "s3", 10 ** 6)
+    fetch = Fetch([["novo"]])
+
+    assert cache.cached_fetch("dev", None, "s3", fetch, cache.MODE_CACHED) == ([["logs"]], True)
+    assert cache.cached_fetch("dev", None, "s3", fetch, cache.MODE_REFRESH) == ([["novo"]], False)
+    assert fetch.calls == 1
+
+def test_failed_fetch_is_not_cached():
+    assert cache.cached_fetch("dev", None, "iam", Fetch(None)) == (None, False)
+    assert cache.get_entry("dev", None, "iam") is None
+
+def test_entries_are_separated_by_profile_and_region():
+    cache.put_entry("dev", "us-east-1", "ec2", [["a"]])
+    cache.put_entry("prod", "us-east-1", "ec2", [["b"]])
+    cache.clear_cache("dev")
+
+    assert cache.get_entry("dev", "us-east-1", "ec2") is None
+    assert cache.get_entry("prod", "us-east-1", "ec2")[0] == [["b"]]
+
+def test_inventory_uses_cache_before_calling_aws(aws_stub):
+    aws_stub("lambda").add_response("list_functions", {"Functions": [{"FunctionName": "api"}]}, {})
+
+    first = inventory.collect_service("lambda", "dev", "us-east-1", cache_mode=cache.MODE_AUTO)
+    second = inventory.collect_service("lambda", "dev", "us-east-1", cache_mode=cache.MODE_AUTO)
+
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["rows"] == first["rows"] == [["api", "None", "None"]]
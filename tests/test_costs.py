@@ -0,0 +1,73 @@
+"""
+Armazenamento local de custos (arch_cli/costs.py)
+"""
+
+import datetime
+import pytest
+from arch_cli import costs
+
+D = datetime.date
+
+@pytest.fixture(autouse=True)
+def cost_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(costs, "COST_DB", str(tmp_path / "costs.db"))
+
+def _day(day, groups, estimated=False):
+    return {"TimePeriod": {"Start": day, "End": day}, "Estimated": estimated, "Groups": [
+        {"Keys": [key], "Metrics": {"BlendedCost": {"Amount": str(amount), "Unit": "USD"},
+                                    "UnblendedCost": {"Amount": str(amount), "Unit": "USD"}}}
+        for key, amount in groups]}
+
+def _request(start, end, group_by, token=None):
+    request = {"TimePeriod": {"Start": start, "End": end}, "Granularity": "DAILY",
+               "Metrics": ["BlendedCost", "UnblendedCost"], "GroupBy": [group_by]}
+    if token:
+        request["NextPageToken"] = token
+    return request
+
+def test_ranges_groups_contiguous_days():
+    days = [D(2025, 1, 1), D(2025, 1, 2), D(2025, 1, 5)]
+    assert costs._ranges(days) == [[D(2025, 1, 1), D(2025, 1, 3)], [D(2025, 1, 5), D(2025, 1, 6)]]
+    assert costs._ranges([]) == []
+
+def test_days_to_fetch_skips_final_days_outside_the_mutable_window():
+    conn = costs._connect()
+    with conn:
+        conn.executemany("INSERT INTO synced_days VALUES ('dev', 'SERVICE', ?, ?, 0)",
+                         [("2025-01-01", 0), ("2025-01-02", 1), ("2025-01-09", 0)])
+    days = costs.days_to_fetch(conn, "dev", "SERVICE", D(2025, 1, 1), D(2025, 1, 11), today=D(2025, 1, 10))
+    conn.close()
+
+    # 02 ainda estimado, 03-06 ausentes, 07-10 dentro da janela mutável
+    assert days == [D(2025, 1, day) for day in (2, 3, 4, 5, 6, 7, 8, 9, 10)]
+
+def test_sync_fetches_only_missing_or_estimated_days(aws_stub):
+    service = {"Type": "DIMENSION", "Key": "SERVICE"}
+    ce = aws_stub("ce")
+    ce.add_response("get_cost_and_usage", {"ResultsByTime": [_day("2025-01-01", [("Amazon EC2", 10), ("AWS Lambda", 1)])],
+                                           "NextPageToken": "p2"}, _request("2025-01-01", "2025-01-04", service))
+    ce.add_response("get_cost_and_usage", {"ResultsByTime": [_day("2025-01-02", [("Amazon EC2", 12)]),
+                                                             _day("2025-01-03", [("Amazon EC2", 5)], estimated=True)]},
+                    _request("2025-01-01", "2025-01-04", service, "p2"))
+    ce.add_response("get_cost_and_usage", {"ResultsByTime": [_day("2025-01-03", [("Amazon EC2", 8)])]},
+                    _request("2025-01-03", "2025-01-04", service))
+
+    assert costs.sync_costs("dev", start=D(2025, 1, 1), end=D(2025, 1, 4)) == {"calls": 1, "days": 3}
+    assert costs.sync_costs("dev", start=D(2025, 1, 1), end=D(2025, 1, 4)) == {"calls": 1, "days": 1}
+    assert costs.sync_costs("dev", start=D(2025, 1, 1), end=D(2025, 1, 4)) == {"calls": 0, "days": 0}
+
+    assert costs.query_costs("dev", start=D(2025, 1, 1), end=D(2025, 1, 4)) == [("Amazon EC2", 30.0, "USD"),
+                                                                              ("AWS Lambda", 1.0, "USD")]
+    assert costs.query_costs("dev", start=D(2025, 1, 2), end=D(2025, 1, 3)) == [("Amazon EC2", 12.0, "USD")]
+
+def test_tag_dimension_is_stored_separately(aws_stub):
+    tag = {"Type": "TAG", "Key": "Environment"}
+    aws_stub("ce").add_response("get_cost_and_usage",
+                                {"ResultsByTime": [_day("2025-02-01", [("Environment$prod", 7), ("Environment$", 2)])]},
+                                _request("2025-02-01", "2025-02-02", tag))
+
+    costs.sync_costs("dev", tag="Environment", start=D(2025, 2, 1), end=D(2025, 2, 2))
+
+    assert costs.query_costs("dev", tag="Environment", start=D(2025, 2, 1), end=D(2025, 2, 2)) == [
+        ("prod", 7.0, "USD"), ("(sem tag)", 2.0, "USD")]
+    assert costs.query_costs("dev", start=D(2025, 2, 1), end=D(2025, 2, 2)) == []
@@ -0,0 +1,74 @@
+"""
+Auditoria do relatório de credenciais (arch_cli/credentials.py)
+"""
+
+import datetime
+import pytest
+from arch_cli import credentials
+
+NOW = datetime.datetime(2025, 6, 1, tzinfo=datetime.timezone.utc)
+HEADER = ("user,password_enabled,password_last_used,mfa_active,access_key_1_active,access_key_1_last_rotated,"
+          "access_key_1_last_used_date,access_key_2_active,access_key_2_last_rotated,access_key_2_last_used_date\n")
+REPORT = HEADER + (
+    "<root_account>,not_supported,2025-05-30T10:00:00+00:00,true,false,N/A,N/A,false,N/A,N/A\n"
+    "ana,true,2025-05-31T10:00:00+00:00,true,true,2025-05-01T00:00:00+00:00,2025-05-31T00:00:00+00:00,false,N/A,N/A\n"
+    "bia,true,no_information,false,true,2024-01-01T00:00:00Z,N/A,true,2025-05-20T00:00:00+00:00,2025-01-01T00:00:00+00:00\n"
+    "caio,false,N/A,false,false,N/A,N/A,false,N/A,N/A\n"
+)
+
+@pytest.fixture
+def report(tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_text(REPORT, encoding="utf-8")
+    return str(path)
+
+def test_audit_in_a_single_pass(report):
+    result = credentials.audit_report(report, max_age=90, now=NOW)
+
+    assert (result["users"], result["console_users"], result["console_mfa"]) == (4, 2, 1)
+    assert result["keys"] == [{"user": "bia", "key": "access_key_1", "age": 517}]
+    assert [(item["user"], item["credential"], item["detail"]) for item in result["unused"]] == [
+        ("bia", "senha", "Nunca utilizada"),
+        ("bia", "access_key_1", "Nunca utilizada"),
+        ("bia", "access_key_2", "Não utilizada há 151 dias (última vez: 2025-01-01)"),
+    ]
+    assert result["mfa"] == [{"user": "bia", "console": True}, {"user": "caio", "console": False}]
+
+def test_only_selected_checks(report):
+    result = credentials.audit_report(report, max_age=30, checks=["keys"], now=NOW)
+
+    assert [item["user"] for item in result["keys"]] == ["ana", "bia"]
+    assert result["unused"] == result["mfa"] == []
+
+def test_report_is_downloaded_once_until_it_expires(aws_stub, local_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(credentials, "REPORT_DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr(credentials.time, "sleep", lambda seconds: None)
+    client = aws_stub("iam")
+    client.add_response("generate_credential_report", {"State": "STARTED"}, {})
+    client.add_response("generate_credential_report", {"State": "COMPLETE"}, {})
+    client.add_response("get_credential_report", {"Content": REPORT.encode(), "ReportFormat": "text/csv",
+                                                  "GeneratedTime": datetime.datetime.now(datetime.timezone.utc)}, {})
+
+    first = credentials.audit_target("dev", None)
+    second = credentials.audit_target("dev", None)
+
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["users"] == first["users"] == 4
+    assert second["generated_at"] == first["generated_at"]
+
+def test_report_generation_gives_up_after_the_deadline(aws_stub, local_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(credentials, "REPORT_DIR", str(tmp_path / "reports"))
+    clock = [0.0]
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    monkeypatch.setattr(credentials.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(credentials.time, "sleep", sleep)
+    client = aws_stub("iam")
+    # Esperas de 1, 2, 4, 8 e depois 10 s: a 16ª consulta já passa de REPORT_TIMEOUT
+    for _ in range(16):
+        client.add_response("generate_credential_report", {"State": "INPROGRESS"}, {})
+
+    with pytest.raises(TimeoutError, match="120s"):
+        credentials.download_report("dev")
@@ -0,0 +1,146 @@
+"""
+Recomendação de capacidade e atualização de tabelas do DynamoDB (arch_cli/dynamodb.py)
+"""
+
+import datetime
+import numpy as np
+from arch_cli import dynamodb
+
+COLUMNS = 100
+
+def _resource(table="orders", index=None, mode="PROVISIONED", read=10, write=10, autoscaled=False):
+    return {"table": table, "index": index, "mode": mode, "status": "ACTIVE", "read": read, "write": write,
+            "autoscaled": autoscaled}
+
+def _matrices(read, write, throttles=None):
+    """Matrizes (recursos × períodos) com o consumo por segundo de cada recurso"""
+    read, write = np.array(read, dtype=float), np.array(write, dtype=float)
+    zeros = np.zeros_like(read)
+    return {"read": read, "write": write, "read_throttles": zeros if throttles is None else np.array(throttles),
+            "write_throttles": zeros}
+
+def _steady(value):
+    return [value] * COLUMNS
+
+def test_overprovisioned_table_is_adjusted_to_the_peak_with_headroom():
+    resources = dynamodb.recommend([_resource(read=100, write=100)], _matrices([_steady(1)], [_steady(1)]))
+    resource = resources[0]
+    assert resource["action"] == "ajustar"
+    assert (resource["new_read"], resource["new_write"]) == (2, 2)
+    assert resource["new_mode"] == "PROVISIONED"
+    assert resource["new_cost"] < resource["current_cost"]
+
+def test_bursty_provisioned_table_switches_to_on_demand():
+    burst = [0] * (COLUMNS - 1) + [100]
+    resource = dynamodb.recommend([_resource()], _matrices([burst], [burst]))[0]
+    assert resource["action"] == "sob demanda"
+    assert resource["new_mode"] == "PAY_PER_REQUEST"
+
+def test_steady_on_demand_table_switches_to_provisioned():
+    resource = dynamodb.recommend([_resource(mode="PAY_PER_REQUEST", read=0, write=0)],
+                                  _matrices([_steady(100)], [_steady(100)]))[0]
+    assert resource["action"] == "provisionado"
+    # ceil(100 / TARGET_UTILIZATION)
+    assert (resource["new_read"], resource["new_write"]) == (143, 143)
+    assert resource["new_cost"] < resource["current_cost"]
+
+def test_throttled_resource_gets_headroom_over_the_peak():
+    read = [_steady(5)[:-1] + [10]]
+    assert dynamodb.recommend([_resource(read=10, write=1)], _matrices(read, [_steady(0)]))[0]["action"] == "manter"
+
+    resource = dynamodb.recommend([_resource(read=10, write=1)],
+                                  _matrices(read, [_steady(0)], throttles=[[0] * (COLUMNS - 1) + [3]]))[0]
+    assert resource["throttles"] == 3
+    assert resource["action"] == "ajustar"
+    assert (resource["new_read"], resource["new_write"]) == (15, 1)
+
+def test_autoscaled_resource_is_left_to_auto_scaling():
+    resource = dynamodb.recommend([_resource(read=100, write=100, autoscaled=True)],
+                                  _matrices([_steady(1)], [_steady(1)]))[0]
+    assert resource["action"] == "auto scaling"
+
+def test_mode_switch_is_decided_per_table_including_indexes():
+    resources = [_resource(mode="PAY_PER_REQUEST"), _resource(index="by-customer", mode="PAY_PER_REQUEST")]
+    # A tabela sozinha não compensa o modo provisionado; somada ao GSI com consumo constante, compensa
+    dynamodb.recommend(resources, _matrices([_steady(0.1), _steady(100)], [_steady(0.1), _steady(100)]))
+    assert [resource["action"] for resource in resources] == ["provisionado", "provisionado"]
+
+def _recommended(action, mode="PROVISIONED", new_mode=None, **kwargs):
+    resource = _resource(mode=mode, **kwargs)
+    resource.update(action=action, new_mode=new_mode or mode, new_read=5, new_write=3)
+    return resource
+
+def test_switch_to_provisioned_sets_capacity_of_every_index():
+    updates, skipped = dynamodb.build_updates([
+        _recommended("provisionado", "PAY_PER_REQUEST", "PROVISIONED"),
+        _recommended("provisionado", "PAY_PER_REQUEST", "PROVISIONED", index="by-customer"),
+    ])
+    assert skipped == []
+    assert updates == [{
+        "TableName": "orders", "BillingMode": "PROVISIONED",
+        "ProvisionedThroughput": {"ReadCapacityUnits": 5, "WriteCapacityUnits": 3},
+        "GlobalSecondaryIndexUpdates": [{"Update": {
+            "IndexName": "by-customer", "ProvisionedThroughput": {"ReadCapacityUnits": 5, "WriteCapacityUnits": 3}}}],
+    }]
+
+def test_adjusting_only_an_index_leaves_the_table_capacity_untouched():
+    updates, _ = dynamodb.build_updates([_recommended("manter"), _recommended("ajustar", index="by-customer")])
+    assert updates == [{"TableName": "orders", "GlobalSecondaryIndexUpdates": [{"Update": {
+        "IndexName": "by-customer", "ProvisionedThroughput": {"ReadCapacityUnits": 5, "WriteCapacityUnits": 3}}}]}]
+
+def test_switch_to_on_demand_only_sets_the_billing_mode():
+    updates, _ = dynamodb.build_updates([_recommended("sob demanda", new_mode="PAY_PER_REQUEST"),
+                                         _recommended("sob demanda", new_mode="PAY_PER_REQUEST", index="gsi")])
+    assert updates == [{"TableName": "orders", "BillingMode": "PAY_PER_REQUEST"}]
+
+def test_unsafe_updates_are_skipped():
+    creating = _recommended("ajustar", table="creating", index="gsi")
+    creating["status"] = "CREATING"
+    resources = [
+        _recommended("ajustar", table="creating"), creating,
+        _recommended("sob demanda", table="scaled", new_mode="PAY_PER_REQUEST", autoscaled=True),
+        _recommended("manter", table="unchanged"),
+        _recommended("auto scaling", table="autoscaled", autoscaled=True),
+    ]
+    updates, skipped = dynamodb.build_updates(resources)
+    assert updates == []
+    assert skipped == ["creating: tabela ou índice não está ACTIVE",
+                       "scaled: remova o auto scaling antes de trocar o modo de cobrança"]
+
+def test_list_resources_splits_indexes_and_marks_autoscaled(aws_stub):
+    ddb = aws_stub("dynamodb")
+    autoscaling = aws_stub("application-autoscaling")
+    ddb.add_response("list_tables", {"TableNames": ["orders"]}, {})
+    ddb.add_response("describe_table", {"Table": {
+        "TableName": "orders", "TableStatus": "ACTIVE",
+        "ProvisionedThroughput": {"ReadCapacityUnits": 10, "WriteCapacityUnits": 5},
+        "GlobalSecondaryIndexes": [{"IndexName": "by-customer", "IndexStatus": "ACTIVE",
+                                    "ProvisionedThroughput": {"ReadCapacityUnits": 4, "WriteCapacityUnits": 2}}],
+    }}, {"TableName": "orders"})
+    autoscaling.add_response("describe_scalable_targets", {"ScalableTargets": [{
+        "ServiceNamespace": "dynamodb", "ResourceId": "table/orders/index/by-customer",
+        "ScalableDimension": "dynamodb:index:ReadCapacityUnits", "MinCapacity": 1, "MaxCapacity": 10,
+        "RoleARN": "arn:aws:iam::123456789012:role/scaling", "CreationTime": datetime.datetime(2025, 1, 1),
+    }]}, {"ServiceNamespace": "dynamodb"})
+
+    resources, errors = dynamodb.list_resources("dev", "us-east-1")
+    assert errors == []
+    assert [(r["index"], r["mode"], r["read"], r["write"], r["autoscaled"]) for r in resources] == [
+        (None, "PROVISIONED", 10, 5, False), ("by-customer", "PROVISIONED", 4, 2, True)]
+
+def test_apply_updates_retries_limits_and_reports_errors(aws_stub, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(dynamodb.time, "sleep", sleeps.append)
+    ddb = aws_stub("dynamodb")
+    first = {"TableName": "orders", "BillingMode": "PAY_PER_REQUEST"}
+    second = {"TableName": "events", "BillingMode": "PAY_PER_REQUEST"}
+    ddb.add_client_error("update_table", "LimitExceededException", expected_params=first)
+    ddb.add_response("update_table", {}, first)
+    ddb.add_client_error("update_table", "ValidationException", "modo inválido", expected_params=second)
+
+    results = dynamodb.apply_updates(ddb.client, [first, second], batch_size=1, interval=2.0)
+    assert results["orders"] is None
+    assert "modo inválido" in results["events"]
+    # Um backoff da nova tentativa e um intervalo entre os dois lotes
+    assert len(sleeps) == 2
+    assert 1 <= sleeps[0] < 2
@@ -0,0 +1,97 @@
+"""
+Retenção de imagens do ECR (arch_cli/ecr.py)
+"""
+
+import datetime
+import pytest
+from arch_cli import ecr
+
+NOW = 1_750_000_000.0
+DAY = 86400
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(ecr.time, "sleep", lambda seconds: None)
+
+def _digest(i):
+    return f"sha256:{i:064x}"
+
+def _images():
+    # (digest, tags, enviada em, bytes), da mais nova para a mais antiga
+    return [
+        (_digest(1), ("latest",), NOW - 1 * DAY, 100),
+        (_digest(2), (), NOW - 10 * DAY, 100),
+        (_digest(3), ("v1.2.0",), NOW - 40 * DAY, 100),
+        (_digest(4), ("build-7",), NOW - 50 * DAY, 100),
+        (_digest(5), (), NOW - 60 * DAY, 100),
+    ]
+
+def _expired(**rules):
+    return [image[0] for image in ecr.select_expired(_images(), ecr.compile_rules(**rules), now=NOW)]
+
+def test_keep_last():
+    assert _expired(keep_last=3) == [_digest(4), _digest(5)]
+
+def test_max_age_and_protected_tags():
+    assert _expired(max_age=30) == [_digest(3), _digest(4), _digest(5)]
+    assert _expired(max_age=30, keep_tags=[r"^v\d"]) == [_digest(4), _digest(5)]
+
+def test_untagged_only_combined_with_keep_last():
+    assert _expired(untagged_only=True) == [_digest(2), _digest(5)]
+    assert _expired(untagged_only=True, keep_last=2) == [_digest(5)]
+
+def test_delete_images_in_batches_of_100(aws_stub):
+    stub = aws_stub("ecr")
+    digests = [_digest(i) for i in range(150)]
+    for chunk in (digests[:100], digests[100:]):
+        ids = [{"imageDigest": digest} for digest in chunk]
+        stub.add_response("batch_delete_image", {"imageIds": ids, "failures": []},
+                          {"repositoryName": "app", "imageIds": ids, "registryId": "111111111111"})
+
+    assert ecr.delete_images(stub.client, "app", digests, "111111111111") == (150, [])
+
+def test_delete_retries_only_throttled_images(aws_stub):
+    stub = aws_stub("ecr")
+    digests = [_digest(i) for i in range(3)]
+    throttled = {"imageId": {"imageDigest": digests[2]}, "failureCode": "TooManyRequestsException",
+                 "failureReason": "Rate exceeded"}
+    missing = {"imageId": {"imageDigest": digests[1]}, "failureCode": "ImageNotFound", "failureReason": "não existe"}
+    stub.add_response("batch_delete_image", {"imageIds": [{"imageDigest": digests[0]}], "failures": [missing, throttled]},
+                      {"repositoryName": "app", "imageIds": [{"imageDigest": digest} for digest in digests]})
+    stub.add_client_error("batch_delete_image", "ThrottlingException",
+                          expected_params={"repositoryName": "app", "imageIds": [{"imageDigest": digests[2]}]})
+    stub.add_response("batch_delete_image", {"imageIds": [{"imageDigest": digests[2]}], "failures": []},
+                      {"repositoryName": "app", "imageIds": [{"imageDigest": digests[2]}]})
+
+    assert ecr.delete_images(stub.client, "app", digests) == (2, [missing])
+
+def test_delete_gives_up_after_the_retries(aws_stub, monkeypatch):
+    monkeypatch.setattr(ecr, "DELETE_RETRIES", 1)
+    stub = aws_stub("ecr")
+    ids = [{"imageDigest": _digest(1)}]
+    throttled = {"imageId": ids[0], "failureCode": "ThrottlingException", "failureReason": "Rate exceeded"}
+    for _ in range(2):
+        stub.add_response("batch_delete_image", {"failures": [throttled]},
+                          {"repositoryName": "app", "imageIds": ids})
+
+    assert ecr.delete_images(stub.client, "app", [_digest(1)]) == (0, [throttled])
+
+def test_other_errors_are_not_retried(aws_stub):
+    stub = aws_stub("ecr")
+    stub.add_client_error("batch_delete_image", "RepositoryNotFoundException")
+
+    with pytest.raises(ecr.ClientError):
+        ecr.delete_images(stub.client, "app", [_digest(1)])
+
+def test_process_repository_simulates_by_default(aws_stub):
+    stub = aws_stub("ecr")
+    pushed = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=90)
+    stub.add_response("describe_images", {"imageDetails": [
+        {"imageDigest": _digest(i), "imagePushedAt": pushed, "imageSizeInBytes": 2 ** 30} for i in range(3)]},
+        {"repositoryName": "app", "registryId": "111111111111", "maxResults": ecr.PAGE_SIZE})
+    rules = ecr.compile_rules(keep_last=1)
+
+    result = ecr.process_repository(stub.client, {"repositoryName": "app", "registryId": "111111111111"}, rules)
+
+    assert (result["images"], result["expired"], result["reclaimable"], result["deleted"]) == (3, 2, 2 * 2 ** 30, 0)
+    assert result["error"] is None
@@ -0,0 +1,92 @@
+"""
+Snapshot da topologia do ECS (arch_cli/ecs.py)
+"""
+
+import pytest
+from arch_cli import ecs
+
+CLUSTER = "arn:aws:ecs:us-east-1:111:cluster/prod"
+
+@pytest.fixture(autouse=True)
+def cache(local_cache):
+    return local_cache
+
+def _arn(kind, name):
+    return f"arn:aws:ecs:us-east-1:111:{kind}/prod/{name}"
+
+def _stub_cluster(ecs_stub, services, tasks=(), instances=()):
+    ecs_stub.add_response("list_services", {"serviceArns": [_arn("service", name) for name in services]},
+                          {"cluster": CLUSTER})
+    for chunk in ecs._chunks(list(services), ecs.SERVICES_PER_CALL):
+        ecs_stub.add_response("describe_services", {"services": [
+            {"serviceArn": _arn("service", name), "serviceName": name, "desiredCount": 2, "runningCount": 2,
+             "launchType": "FARGATE", "taskDefinition": f"arn:aws:ecs:us-east-1:111:task-definition/{name}:3"}
+            for name in chunk]}, {"cluster": CLUSTER, "services": [_arn("service", name) for name in chunk]})
+    ecs_stub.add_response("list_tasks", {"taskArns": [_arn("task", task) for task in tasks]}, {"cluster": CLUSTER})
+    if tasks:
+        ecs_stub.add_response("describe_tasks", {"tasks": [
+            {"taskArn": _arn("task", task), "group": f"service:{services[0]}", "lastStatus": "RUNNING",
+             "containers": [{"name": "app", "lastStatus": "RUNNING", "exitCode": 0}]}
+            for task in tasks]}, {"cluster": CLUSTER, "tasks": [_arn("task", task) for task in tasks]})
+    ecs_stub.add_response("list_container_instances",
+                          {"containerInstanceArns": [_arn("container-instance", item) for item in instances]},
+                          {"cluster": CLUSTER})
+    if instances:
+        ecs_stub.add_response("describe_container_instances", {"containerInstances": [
+            {"containerInstanceArn": _arn("container-instance", item), "ec2InstanceId": "i-1", "agentConnected": True,
+             "remainingResources": [{"name": "CPU", "type": "INTEGER", "integerValue": 512}]}
+            for item in instances]}, {"cluster": CLUSTER, "containerInstances": [
+                _arn("container-instance", item) for item in instances]})
+
+def _stub_clusters(ecs_stub):
+    ecs_stub.add_response("list_clusters", {"clusterArns": [CLUSTER]}, {})
+    ecs_stub.add_response("describe_clusters", {"clusters": [{"clusterArn": CLUSTER, "clusterName": "prod",
+                                                              "status": "ACTIVE"}]}, {"clusters": [CLUSTER]})
+
+def test_collect_cluster_uses_the_largest_batches(aws_stub):
+    stub = aws_stub("ecs")
+    services = [f"svc-{i:02d}" for i in range(12)]
+    _stub_cluster(stub, services, tasks=["t1", "t2"], instances=["c1"])
+
+    result = ecs.collect_cluster(stub.client, {"clusterArn": CLUSTER, "clusterName": "prod"})
+
+    assert result["error"] is None
+    assert [service["name"] for service in result["services"]] == services
+    assert result["services"][0]["task_definition"] == "svc-00:3"
+    assert [(task["id"], task["service"]) for task in result["tasks"]] == [("t1", "svc-00"), ("t2", "svc-00")]
+    assert result["instances"][0]["remaining_cpu"] == 512
+
+def test_snapshot_is_cached_and_find_service(aws_stub):
+    stub = aws_stub("ecs")
+    _stub_clusters(stub)
+    _stub_cluster(stub, ["api"])
+
+    snapshot, cached, error = ecs.get_snapshot("dev", "us-east-1")
+    again, cached_again, _ = ecs.get_snapshot("dev", "us-east-1")
+
+    assert (cached, cached_again, error) == (False, True, None)
+    assert again["clusters"][0]["services"][0]["name"] == "api"
+    cluster, service = ecs.find_service(again, "prod", _arn("service", "api"))
+    assert (cluster["name"], service["name"]) == ("prod", "api")
+    assert ecs.find_service(again, CLUSTER, "web") == (cluster, None)
+    assert ecs.find_service(again, "outro", "api") == (None, None)
+
+def test_partial_snapshot_is_shown_but_not_cached(aws_stub, cache):
+    stub = aws_stub("ecs")
+    _stub_clusters(stub)
+    stub.add_client_error("list_services", "AccessDeniedException", "negado", expected_params={"cluster": CLUSTER})
+
+    snapshot, cached, error = ecs.get_snapshot("dev", "us-east-1")
+
+    assert "negado" in snapshot["clusters"][0]["error"]
+    assert (cached, error) == (False, None)
+    assert cache.get_entry("dev", "us-east-1", ecs.CACHE_KEY) is None
+
+def test_scale_invalidates_the_snapshot(aws_stub, cache):
+    stub = aws_stub("ecs")
+    _stub_clusters(stub)
+    _stub_cluster(stub, ["api"])
+    stub.add_response("update_service", {}, {"cluster": CLUSTER, "service": _arn("service", "api"), "desiredCount": 4})
+
+    assert ecs.scale_service("dev", "us-east-1", "prod", "api", 4)
+    assert cache.get_entry("dev", "us-east-1", ecs.CACHE_KEY) is None
@@ -0,0 +1,77 @@
+"""
+Inventário do EKS (arch_cli/eks.py)
+"""
+
+from arch_cli import eks
+
+def _cluster(version):
+    return {"version": version}
+
+def test_version_key_orders_numerically():
+    assert sorted(["1.9", "1.30", "1.28"], key=eks._version_key) == ["1.9", "1.28", "1.30"]
+    assert eks._version_key("latest") == ()
+
+def test_classify_with_version_status():
+    support = {"1.31": "STANDARD_SUPPORT", "1.28": "EXTENDED_SUPPORT", "1.23": "UNSUPPORTED"}
+
+    assert eks.classify(_cluster("1.31"), support) == "padrão"
+    assert eks.classify(_cluster("1.28"), support) == "suporte estendido"
+    assert eks.classify(_cluster("1.23"), support) == "desatualizado"
+    # Versões que saíram da lista do EKS estão fora de suporte
+    assert eks.classify(_cluster("1.20"), support) == "desatualizado"
+    assert eks.classify(_cluster(None), support) == "-"
+
+def test_classify_with_legacy_status_field():
+    support = {"1.31": "active", "1.28": "extended-support", "1.23": "unsupported"}
+
+    assert [eks.classify(_cluster(version), support) for version in ("1.31", "1.28", "1.23")] == [
+        "padrão", "suporte estendido", "desatualizado"]
+
+def test_classify_min_version_and_unknown_support():
+    assert eks.classify(_cluster("1.29"), {"1.29": "STANDARD_SUPPORT"}, min_version="1.30") == "desatualizado"
+    assert eks.classify(_cluster("1.29"), {}) == "-"
+
+def test_version_support_is_empty_on_errors(aws_stub):
+    aws_stub("eks").add_client_error("describe_cluster_versions", "AccessDeniedException")
+
+    assert eks.get_version_support("dev", "us-east-1") == {}
+
+def test_collect_inventory_describes_every_resource(aws_stub):
+    stub = aws_stub("eks")
+    stub.add_response("list_clusters", {"clusters": ["prod"]}, {})
+    stub.add_response("describe_cluster", {"cluster": {"name": "prod", "version": "1.29", "status": "ACTIVE",
+                                                       "upgradePolicy": {"supportType": "EXTENDED"}}},
+                      {"name": "prod"})
+    stub.add_response("list_nodegroups", {"nodegroups": ["ng-1"]}, {"clusterName": "prod"})
+    stub.add_response("list_fargate_profiles", {"fargateProfileNames": []}, {"clusterName": "prod"})
+    stub.add_response("list_addons", {"addons": []}, {"clusterName": "prod"})
+    stub.add_response("describe_nodegroup", {"nodegroup": {
+        "nodegroupName": "ng-1", "version": "1.28", "instanceTypes": ["m5.large"], "capacityType": "SPOT",
+        "scalingConfig": {"desiredSize": 3, "minSize": 1, "maxSize": 5}}},
+        {"clusterName": "prod", "nodegroupName": "ng-1"})
+
+    # Um único worker executa as chamadas na ordem em que foram enfileiradas
+    clusters, errors = eks.collect_inventory([("dev", "us-east-1")], max_workers=1)
+
+    assert errors == []
+    (cluster,) = clusters
+    assert (cluster["name"], cluster["version"], cluster["support_type"], cluster["errors"]) == (
+        "prod", "1.29", "EXTENDED", [])
+    assert cluster["nodegroups"] == [{"name": "ng-1", "status": None, "version": "1.28",
+                                      "instance_types": ["m5.large"], "capacity_type": "SPOT",
+                                      "desired": 3, "min": 1, "max": 5}]
+
+def test_collect_inventory_keeps_partial_results(aws_stub):
+    stub = aws_stub("eks")
+    stub.add_response("list_clusters", {"clusters": ["prod"]}, {})
+    stub.add_client_error("list_clusters", "UnrecognizedClientException", "região desabilitada")
+    stub.add_client_error("describe_cluster", "AccessDeniedException", "negado")
+    stub.add_response("list_nodegroups", {"nodegroups": []}, {"clusterName": "prod"})
+    stub.add_response("list_fargate_profiles", {"fargateProfileNames": []}, {"clusterName": "prod"})
+    stub.add_response("list_addons", {"addons": []}, {"clusterName": "prod"})
+
+    clusters, errors = eks.collect_inventory([("dev", "us-east-1"), ("dev", "ap-east-1")], max_workers=1)
+
+    assert [cluster["name"] for cluster in clusters] == ["prod"]
+    assert "describe_cluster" in clusters[0]["errors"][0]
+    assert [(error["region"], "região desabilitada" in error["error"]) for error in errors] == [("ap-east-1", True)]
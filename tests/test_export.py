@@ -0,0 +1,66 @@
+"""
+Exportação em streaming (arch_cli/export.py)
+"""
+
+import os
+import csv
+import gzip
+import json
+import datetime
+import pytest
+from arch_cli import export, inventory
+
+def test_ndjson_keeps_full_records(tmp_path):
+    created = datetime.datetime(2025, 5, 1, tzinfo=datetime.timezone.utc)
+    with export.StreamWriter(str(tmp_path / "itens"), "ndjson") as writer:
+        writer.write_page([{"id": 1, "created": created}])
+        writer.write_page([{"id": 2, "tags": {"a": "b"}}])
+
+    with open(tmp_path / "itens.ndjson", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [{"id": 1, "created": "2025-05-01T00:00:00+00:00"}, {"id": 2, "tags": {"a": "b"}}]
+    assert writer.count == 2
+
+def test_csv_gzip_uses_table_columns(tmp_path):
+    writer = export.StreamWriter(str(tmp_path / "itens"), "csv", True, ["Id", "Nome"], lambda item: [item["id"], item["name"]])
+    writer.write_page([{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+    writer.close()
+
+    with gzip.open(tmp_path / "itens.csv.gz", "rt", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [["Id", "Nome"], ["1", "a"], ["2", "b"]]
+
+def test_failed_export_is_not_published(tmp_path):
+    with pytest.raises(RuntimeError):
+        with export.StreamWriter(str(tmp_path / "itens"), "ndjson") as writer:
+            writer.write_page([{"id": 1}])
+            raise RuntimeError("falha na paginação")
+
+    assert os.listdir(tmp_path) == []
+
+def test_invalid_format(tmp_path):
+    with pytest.raises(ValueError):
+        export.StreamWriter(str(tmp_path / "itens"), "xml")
+
+def test_inventory_export_writes_pages_in_the_same_pass(aws_stub, tmp_path):
+    ec2 = aws_stub("ec2")
+    ec2.add_response("describe_instances", {"Reservations": [{"Instances": [{"InstanceId": "i-1"}]}],
+                                            "NextToken": "t1"}, {})
+    ec2.add_response("describe_instances", {"Reservations": [{"Instances": [{"InstanceId": "i-2"}]}]},
+                     {"NextToken": "t1"})
+    target = {"dir": str(tmp_path), "format": "ndjson", "per_target": True}
+
+    result = inventory.collect_service("ec2", "dev", "us-east-1", export=target, keep_rows=False)
+
+    assert result["count"] == 2
+    with open(tmp_path / "dev" / "us-east-1" / "ec2_instances.ndjson", encoding="utf-8") as f:
+        assert [json.loads(line)["InstanceId"] for line in f] == ["i-1", "i-2"]
+
+def test_inventory_export_is_discarded_on_error(aws_stub, tmp_path):
+    ec2 = aws_stub("ec2")
+    ec2.add_response("describe_instances", {"Reservations": [], "NextToken": "t1"}, {})
+    ec2.add_client_error("describe_instances", "RequestLimitExceeded", expected_params={"NextToken": "t1"})
+
+    result = inventory.collect_service("ec2", export={"dir": str(tmp_path), "format": "csv"})
+
+    assert "RequestLimitExceeded" in result["error"]
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,75 @@
+"""
+Execução em vários perfis e regiões (arch_cli/fanout.py)
+"""
+
+import time
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from arch_cli import fanout
+
+def _describe(profile, region, suffix):
+    return f"{profile}/{region}/{suffix}"
+
+def _fail(profile, region):
+    raise RuntimeError(f"falha em {profile}")
+
+def _sleep(profile, region, seconds):
+    time.sleep(seconds)
+    return seconds
+
+def _stuck(seconds):
+    # Simula um filho que não atende ao SIGALRM (ex.: preso em código nativo)
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(seconds)
+
+def test_parse_regions():
+    assert fanout.parse_regions(None) is None
+    assert fanout.parse_regions(" us-east-1, ,sa-east-1 ") == ["us-east-1", "sa-east-1"]
+
+def test_resolve_targets_crosses_profiles_and_regions(monkeypatch):
+    monkeypatch.setattr(fanout, "get_aws_profiles", lambda: ["dev", "prod", ""])
+
+    assert fanout.resolve_targets("dev") == [("dev", None)]
+    assert fanout.resolve_targets(all_profiles=True, regions=["us-east-1", "sa-east-1"]) == [
+        ("dev", "us-east-1"), ("dev", "sa-east-1"), ("prod", "us-east-1"), ("prod", "sa-east-1")]
+
+def test_resolve_targets_all_regions_skips_failed_profiles(monkeypatch):
+    def enabled_regions(profile):
+        if profile == "prod":
+            raise RuntimeError("sem permissão")
+        return ["us-east-1", "eu-west-1"]
+
+    monkeypatch.setattr(fanout, "get_aws_profiles", lambda: ["dev", "prod"])
+    monkeypatch.setattr("arch_cli.aws.get_enabled_regions", enabled_regions)
+
+    assert fanout.resolve_targets(all_profiles=True, regions=["all"]) == [("dev", "eu-west-1"), ("dev", "us-east-1")]
+
+def test_run_target_interrupts_on_timeout():
+    done = fanout._run_target(_sleep, "dev", None, (5,), 0.2)
+
+    assert done["result"] is None
+    assert "Tempo limite" in done["error"]
+    assert done["duration"] < 2
+
+def test_run_targets_yields_results_and_errors():
+    results = list(fanout.run_targets(_describe, [("dev", "us-east-1", "a"), ("prod", None, "b")], max_workers=2))
+    assert sorted(done["result"] for done in results) == ["dev/us-east-1/a", "prod/None/b"]
+
+    (failed,) = fanout.run_targets(_fail, [("dev", None)])
+    assert failed["error"] == "falha em dev"
+
+def test_terminate_stops_workers_that_ignore_the_alarm():
+    executor = ProcessPoolExecutor(max_workers=1)
+    executor.submit(_stuck, 60)
+    deadline = time.monotonic() + 10
+    while not executor._processes and time.monotonic() < deadline:
+        time.sleep(0.05)
+    processes = list(executor._processes.values())
+    time.sleep(0.2)
+
+    start = time.monotonic()
+    fanout._terminate(executor)
+    executor.shutdown(wait=True)
+
+    assert time.monotonic() - start < 10
+    assert not any(process.is_alive() for process in processes)
@@ -0,0 +1,90 @@
+"""
+Banco local de achados do Prowler (arch_cli/findings.py)
+"""
+
+import os
+import datetime
+import pytest
+from arch_cli import findings
+
+HEADER = "ACCOUNT_UID;REGION;CHECK_ID;STATUS;SEVERITY;RESOURCE_UID;TIMESTAMP\n"
+
+@pytest.fixture(autouse=True)
+def findings_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(findings, "FINDINGS_DB", str(tmp_path / "findings.db"))
+
+def _scan(root, name, rows, timestamp="2025-05-01T12:00:00+00:00"):
+    directory = root / name / "prod" / "us-east-1"
+    directory.mkdir(parents=True)
+    lines = [f"111;us-east-1;{check};{status};{severity};{resource};{timestamp}\n"
+             for check, status, severity, resource in rows]
+    (directory / "prowler.csv").write_text(HEADER + "".join(lines))
+    # Resultados de compliance e tentativas com falha não fazem parte da varredura
+    (directory / "compliance").mkdir()
+    (directory / "compliance" / "cis.csv").write_text(HEADER + lines[0])
+    return str(root / name)
+
+def test_ingest_is_skipped_when_files_did_not_change(tmp_path):
+    path = _scan(tmp_path, "scan-a", [("s3_public", "FAIL", "CRITICAL", "bucket-a"), ("iam_mfa", "pass", "high", "root")])
+
+    assert findings.ingest_scan(path) == {"name": "scan-a", "findings": 2, "skipped": False}
+    assert findings.ingest_scan(path) == {"name": "scan-a", "findings": 2, "skipped": True}
+    assert findings.ingest_scan(path, force=True)["skipped"] is False
+    assert len(findings.list_scans()) == 1
+
+def test_query_filters(tmp_path):
+    findings.ingest_scan(_scan(tmp_path, "scan-a", [
+        ("s3_bucket_public", "FAIL", "critical", "arn:aws:s3:::logs"),
+        ("s3_bucket_versioning", "FAIL", "low", "arn:aws:s3:::dados"),
+        ("iam_root_mfa", "FAIL", "high", "root"),
+        ("s3_bucket_public", "PASS", "critical", "arn:aws:s3:::site"),
+    ]))
+
+    rows, total = findings.query_findings(check="s3_", status="fail", severity=["CRITICAL", "low"], limit=1)
+    assert total == 2
+    assert [row["resource"] for row in rows] == ["arn:aws:s3:::logs"]
+
+    rows, total = findings.query_findings(resource="logs", limit=0)
+    assert (total, rows[0]["check_id"], rows[0]["severity"]) == (1, "s3_bucket_public", "critical")
+    assert findings.query_findings(scan="inexistente") == (None, 0)
+
+def test_diff_compares_failures_between_scans(tmp_path):
+    findings.ingest_scan(_scan(tmp_path, "scan-a", [("s3_public", "FAIL", "high", "a"), ("iam_mfa", "FAIL", "high", "root")],
+                               "2025-05-01T12:00:00Z"))
+    findings.ingest_scan(_scan(tmp_path, "scan-b", [("s3_public", "FAIL", "high", "a"), ("iam_mfa", "PASS", "high", "root"),
+                                                    ("ec2_sg_open", "FAIL", "medium", "sg-1")], "2025-05-02T12:00:00Z"))
+
+    diff = findings.diff_scans()
+
+    assert [row["resource"] for row in diff["new"]] == ["sg-1"]
+    assert [row["resource"] for row in diff["resolved"]] == ["root"]
+    assert [row["resource"] for row in diff["still"]] == ["a"]
+    assert findings.diff_scans(old="scan-a", new="scan-a") is None
+
+def test_scans_are_ordered_by_scan_time_not_ingestion(tmp_path):
+    # A varredura mais nova é importada primeiro
+    findings.ingest_scan(_scan(tmp_path, "nova", [("s3_public", "FAIL", "high", "b")], "2025-05-02T12:00:00Z"))
+    findings.ingest_scan(_scan(tmp_path, "antiga", [("s3_public", "FAIL", "high", "a")], "2025-05-01T12:00:00Z"))
+
+    assert [scan[0] for scan in findings.list_scans()] == ["nova", "antiga"]
+    diff = findings.diff_scans()
+    assert ([row["resource"] for row in diff["new"]], [row["resource"] for row in diff["resolved"]]) == (["b"], ["a"])
+
+def test_scan_time_from_csv_column_or_name(tmp_path):
+    path = tmp_path / "prowler-output-111-20250501120000.csv"
+    path.write_text("ACCOUNT_UID,CHECK_ID,STATUS\n111,x,PASS\n")
+
+    assert findings.scan_time(str(tmp_path / "2025-05-03_08-30-00"), []) == \
+        datetime.datetime(2025, 5, 3, 8, 30).timestamp()
+    assert findings.scan_time(str(tmp_path / "sem-data"), [str(path)]) == datetime.datetime(2025, 5, 1, 12).timestamp()
+    assert findings.scan_time(str(tmp_path / "sem-data"), []) is None
+    assert findings._name_time("relatorio-1234") is None
+
+def test_failed_and_partial_attempts_are_ignored(tmp_path):
+    path = _scan(tmp_path, "scan-a", [("s3_public", "FAIL", "high", "a")])
+    failed = os.path.join(path, "dev", "us-east-1.failed")
+    os.makedirs(failed)
+    with open(os.path.join(failed, "prowler.csv"), "w") as f:
+        f.write(HEADER + "222;us-east-1;x;FAIL;high;r;2025-05-01T12:00:00Z\n")
+
+    assert findings.find_csv_files(path) == [os.path.join(path, "prod", "us-east-1", "prowler.csv")]
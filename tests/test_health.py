@@ -0,0 +1,165 @@
+"""
+Verificação de saúde concorrente e modo de acompanhamento (arch_cli/health.py)
+"""
+
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from arch_cli import health
+
+TARGET_GROUP_ARN = "arn:aws:elasticloadbalancing:us-east-1:123456789012:targetgroup/{}/0123456789abcdef"
+
+@pytest.fixture
+def executor():
+    # Um único worker: as chamadas por recurso chegam ao Stubber na ordem de submissão
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+def _levels(resources):
+    return {resource["id"]: (resource["state"], resource["level"]) for resource in resources}
+
+def test_check_ec2_levels(aws_stub, executor):
+    aws_stub("ec2").add_response("describe_instance_status", {"InstanceStatuses": [
+        {"InstanceId": "i-ok", "InstanceState": {"Name": "running"},
+         "InstanceStatus": {"Status": "ok"}, "SystemStatus": {"Status": "ok"}},
+        {"InstanceId": "i-impaired", "InstanceState": {"Name": "running"},
+         "InstanceStatus": {"Status": "impaired"}, "SystemStatus": {"Status": "ok"},
+         "Events": [{"Code": "system-reboot", "Description": "reinicialização agendada"}]},
+        {"InstanceId": "i-stopped", "InstanceState": {"Name": "stopped"}},
+        {"InstanceId": "i-gone", "InstanceState": {"Name": "terminated"}},
+    ]}, {"IncludeAllInstances": True})
+
+    resources, calls = health.check_ec2("dev", "us-east-1", executor, {})
+    assert calls == 1
+    assert _levels(resources) == {"i-ok": ("running (ok/ok)", "ok"),
+                                  "i-impaired": ("running (impaired/ok)", "critical"),
+                                  "i-stopped": ("stopped", "warning")}
+    assert resources[1]["detail"] == "reinicialização agendada"
+
+def test_check_rds_levels(aws_stub, executor):
+    aws_stub("rds").add_response("describe_db_instances", {"DBInstances": [
+        {"DBInstanceIdentifier": "db-ok", "DBInstanceStatus": "available", "DBInstanceClass": "db.t3.micro"},
+        {"DBInstanceIdentifier": "db-full", "DBInstanceStatus": "storage-full"},
+        {"DBInstanceIdentifier": "db-backup", "DBInstanceStatus": "backing-up"},
+    ]})
+
+    resources, _ = health.check_rds("dev", "us-east-1", executor, {})
+    assert _levels(resources) == {"db-ok": ("available", "ok"), "db-full": ("storage-full", "critical"),
+                                  "db-backup": ("backing-up", "warning")}
+
+def test_check_elb_covers_target_groups_and_every_classic_balancer(aws_stub, executor):
+    elbv2, classic = aws_stub("elbv2"), aws_stub("elb")
+    elbv2.add_response("describe_load_balancers", {"LoadBalancers": [
+        {"LoadBalancerName": "alb", "State": {"Code": "active"}}]})
+    elbv2.add_response("describe_target_groups", {"TargetGroups": [
+        {"TargetGroupName": "web", "TargetGroupArn": TARGET_GROUP_ARN.format("web")},
+        {"TargetGroupName": "old", "TargetGroupArn": TARGET_GROUP_ARN.format("old")},
+        {"TargetGroupName": "idle", "TargetGroupArn": TARGET_GROUP_ARN.format("idle"),
+         "LoadBalancerArns": ["arn:aws:elasticloadbalancing:us-east-1:123456789012:loadbalancer/app/alb/1"]},
+    ]})
+    elbv2.add_response("describe_target_health", {"TargetHealthDescriptions": [
+        {"Target": {"Id": "i-1", "Port": 80}, "TargetHealth": {"State": "healthy"}},
+        {"Target": {"Id": "i-2", "Port": 80},
+         "TargetHealth": {"State": "unhealthy", "Description": "Health checks failed"}},
+    ]}, {"TargetGroupArn": TARGET_GROUP_ARN.format("web")})
+    # Target group removido entre a listagem e a consulta de saúde
+    elbv2.add_client_error("describe_target_health", "TargetGroupNotFound",
+                           expected_params={"TargetGroupArn": TARGET_GROUP_ARN.format("old")})
+    elbv2.add_response("describe_target_health", {"TargetHealthDescriptions": []},
+                       {"TargetGroupArn": TARGET_GROUP_ARN.format("idle")})
+    classic.add_response("describe_load_balancers", {"LoadBalancerDescriptions": [
+        {"LoadBalancerName": "classic-a"}, {"LoadBalancerName": "classic-b"}]})
+    classic.add_response("describe_instance_health", {"InstanceStates": [
+        {"InstanceId": "i-3", "State": "InService"}]}, {"LoadBalancerName": "classic-a"})
+    classic.add_response("describe_instance_health", {"InstanceStates": [
+        {"InstanceId": "i-4", "State": "OutOfService", "Description": "Instance has failed"}]},
+        {"LoadBalancerName": "classic-b"})
+
+    resources, calls = health.check_elb("dev", "us-east-1", executor, {})
+    assert calls == 8
+    assert _levels(resources) == {
+        "alb": ("active", "ok"),
+        "web/i-1:80": ("healthy", "ok"), "web/i-2:80": ("unhealthy", "critical"),
+        "idle (sem alvos)": ("vazio", "warning"),
+        "classic-a/i-3": ("InService", "ok"), "classic-b/i-4": ("OutOfService", "critical"),
+    }
+
+def _function(name, modified):
+    return {"FunctionName": name, "LastModified": modified}
+
+def test_check_lambda_only_fetches_changed_or_unsettled_functions(aws_stub, executor):
+    stub = aws_stub("lambda")
+    stub.add_response("list_functions", {"Functions": [_function("api", "v1"), _function("worker", "v1")]})
+    stub.add_response("get_function_configuration", {"State": "Active", "LastUpdateStatus": "Successful"},
+                      {"FunctionName": "api"})
+    stub.add_response("get_function_configuration", {"State": "Pending", "LastUpdateStatus": "InProgress"},
+                      {"FunctionName": "worker"})
+    # Segunda consulta: api não mudou; worker ainda estava em transição; jobs é nova
+    stub.add_response("list_functions", {"Functions": [_function("api", "v1"), _function("worker", "v1"),
+                                                       _function("jobs", "v1")]})
+    stub.add_response("get_function_configuration", {"State": "Active", "LastUpdateStatus": "Failed",
+                                                     "LastUpdateStatusReason": "falta de memória"},
+                      {"FunctionName": "worker"})
+    stub.add_response("get_function_configuration", {"State": "Active"}, {"FunctionName": "jobs"})
+    # Terceira consulta: api foi alterada e worker removida
+    stub.add_response("list_functions", {"Functions": [_function("api", "v2"), _function("jobs", "v1")]})
+    stub.add_response("get_function_configuration", {"State": "Active", "LastUpdateStatus": "Successful"},
+                      {"FunctionName": "api"})
+
+    cache = {}
+    resources, calls = health.check_lambda("dev", "us-east-1", executor, cache)
+    assert calls == 3
+    assert _levels(resources) == {"api": ("Active/Successful", "ok"), "worker": ("Pending/InProgress", "warning")}
+
+    resources, calls = health.check_lambda("dev", "us-east-1", executor, cache)
+    assert calls == 3
+    assert _levels(resources)["worker"] == ("Active/Failed", "critical")
+    assert _levels(resources)["jobs"] == ("Active/-", "ok")
+
+    resources, calls = health.check_lambda("dev", "us-east-1", executor, cache)
+    assert calls == 2
+    assert sorted(cache) == ["api", "jobs"]
+    assert cache["api"][0] == "v2"
+
+def test_poll_reports_api_failures_and_latency(aws_stub, executor):
+    ec2, rds = aws_stub("ec2"), aws_stub("rds")
+    for _ in range(2):
+        ec2.add_response("describe_instance_status", {"InstanceStatuses": [
+            {"InstanceId": "i-ok", "InstanceState": {"Name": "stopped"}}]})
+        rds.add_client_error("describe_db_instances", "AccessDenied", "sem permissão")
+    stats = {}
+    current = health.poll("dev", "us-east-1", ["ec2", "rds"], executor, {}, stats)
+    health.poll("dev", "us-east-1", ["ec2", "rds"], executor, {}, stats)
+
+    assert current[("ec2", "i-ok")]["state"] == "stopped"
+    assert current[("rds", "(API)")]["level"] == "critical"
+    assert "sem permissão" in current[("rds", "(API)")]["detail"]
+    assert stats["ec2"]["polls"] == 2 and stats["ec2"]["calls"] == 2
+    assert stats["rds"]["polls"] == 2 and stats["rds"]["calls"] == 0
+
+def _state(service, resource_id, state, level):
+    return {(service, resource_id): health._resource(service, resource_id, state, level)}
+
+def test_render_changes_shows_only_what_changed(capsys):
+    previous = {**_state("ec2", "i-1", "running (ok/ok)", "ok"), **_state("ec2", "i-2", "stopped", "warning"),
+                **_state("rds", "db1", "available", "ok")}
+    current = {**_state("ec2", "i-1", "running (ok/ok)", "ok"), **_state("ec2", "i-3", "pending", "warning"),
+               **_state("rds", "db1", "storage-full", "critical")}
+
+    assert health.render_changes(previous, current) == 3
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    assert "ec2 i-2: stopped → removido" in lines[0]
+    assert "ec2 i-3: novo → pending" in lines[1]
+    assert "rds db1: available → storage-full" in lines[2]
+
+    assert health.render_changes(current, current) == 0
+    assert capsys.readouterr().out == ""
+
+def test_collect_health_returns_every_resource(aws_stub):
+    aws_stub("rds").add_response("describe_db_instances", {"DBInstances": [
+        {"DBInstanceIdentifier": "db1", "DBInstanceStatus": "available",
+         "InstanceCreateTime": datetime.datetime(2025, 1, 1)}]})
+    resources, stats = health.collect_health("dev", "us-east-1", ["rds"])
+    assert [(resource["id"], resource["level"]) for resource in resources] == [("db1", "ok")]
+    assert stats["rds"]["calls"] == 1
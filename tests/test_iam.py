@@ -0,0 +1,97 @@
+"""
+Análise de IAM (arch_cli/iam.py)
+"""
+
+import json
+from urllib.parse import quote
+from arch_cli import iam
+
+ADMIN = {"Version": "2012-10-17", "Statement": [{"Effect": "Allow", "Action": "*", "Resource": "*"}]}
+S3_ALL = {"Statement": [{"Effect": "Allow", "Action": ["s3:*", "ec2:Describe*"], "Resource": "*"}]}
+DENY_ALL = {"Statement": {"Effect": "Deny", "Action": "*", "Resource": "*"}}
+
+LOCAL_ADMIN = "arn:aws:iam::123456789012:policy/local-admin"
+UNUSED = "arn:aws:iam::123456789012:policy/esquecida"
+
+def _encoded(document):
+    # O IAM retorna os documentos de política como JSON URL-encoded
+    return quote(json.dumps(document))
+
+PAGES = [
+    {
+        "UserDetailList": [
+            {"UserName": "ana", "GroupList": ["admins"], "AttachedManagedPolicies": []},
+            {"UserName": "bia", "GroupList": [], "AttachedManagedPolicies": [{"PolicyArn": LOCAL_ADMIN}]},
+            {"UserName": "caio", "GroupList": ["leitura"],
+             "UserPolicyList": [{"PolicyName": "s3", "PolicyDocument": _encoded(S3_ALL)}]},
+        ],
+        "GroupDetailList": [
+            {"GroupName": "admins", "AttachedManagedPolicies": [{"PolicyArn": iam.ADMIN_POLICY_ARN}]},
+            {"GroupName": "leitura", "AttachedManagedPolicies": []},
+        ],
+    },
+    {
+        "RoleDetailList": [
+            {"RoleName": "deploy", "RolePolicyList": [{"PolicyName": "tudo", "PolicyDocument": _encoded(ADMIN)}]},
+            {"RoleName": "auditoria", "RolePolicyList": [{"PolicyName": "nada", "PolicyDocument": _encoded(DENY_ALL)}]},
+        ],
+        "Policies": [
+            {"Arn": LOCAL_ADMIN, "PolicyName": "local-admin", "AttachmentCount": 1,
+             "PolicyVersionList": [{"IsDefaultVersion": False, "Document": _encoded(S3_ALL)},
+                                   {"IsDefaultVersion": True, "Document": _encoded(ADMIN)}]},
+            {"Arn": UNUSED, "PolicyName": "esquecida", "AttachmentCount": 0,
+             "PolicyVersionList": [{"IsDefaultVersion": True, "Document": _encoded(S3_ALL)}]},
+        ],
+    },
+]
+
+def test_wildcard_actions_only_considers_allow():
+    assert iam.wildcard_actions(S3_ALL) == ["s3:*"]
+    assert iam.wildcard_actions(ADMIN) == ["*"]
+    assert iam.wildcard_actions(DENY_ALL) == []
+
+def test_is_admin_document():
+    assert iam.is_admin_document(ADMIN)
+    assert not iam.is_admin_document(S3_ALL)
+    assert not iam.is_admin_document(DENY_ALL)
+
+def test_build_index_across_pages():
+    index = iam.build_index(PAGES)
+
+    assert index["members"] == {"admins": ["ana"], "leitura": ["caio"]}
+    assert index["attachments"][LOCAL_ADMIN] == [("user", "bia")]
+    assert index["policies"][LOCAL_ADMIN]["document"] == ADMIN
+    assert index["users"]["caio"]["inline"]["s3"] == S3_ALL
+
+def test_admin_principals_direct_inline_and_via_group():
+    admins = iam.find_admin_principals(iam.build_index(PAGES))
+
+    assert admins == [
+        {"type": "user", "name": "ana", "sources": ["AdministratorAccess (via grupo admins)"]},
+        {"type": "user", "name": "bia", "sources": ["local-admin"]},
+        {"type": "role", "name": "deploy", "sources": ["tudo (inline)"]},
+    ]
+
+def test_wildcard_and_unused_policies():
+    report = iam.analyze_index(iam.build_index(PAGES), ["wildcard", "unused"])
+
+    assert "admin" not in report
+    assert report["counts"] == {"users": 3, "groups": 2, "roles": 2, "policies": 2}
+    assert [(item["policy"], item["actions"]) for item in report["wildcard"]] == [
+        ("esquecida", ["s3:*"]), ("local-admin", ["*"]), ("s3 (inline)", ["s3:*"]), ("tudo (inline)", ["*"])]
+    assert report["unused"] == [{"policy": "esquecida", "arn": UNUSED}]
+
+def test_fetch_index_uses_a_single_paginated_call(aws_stub):
+    filters = {"Filter": ["User", "Role", "Group", "LocalManagedPolicy"]}
+    client = aws_stub("iam")
+    client.add_response("get_account_authorization_details",
+                        {"UserDetailList": [{"UserName": "ana", "GroupList": ["admins"]}], "IsTruncated": True,
+                         "Marker": "m1"}, filters)
+    client.add_response("get_account_authorization_details",
+                        {"GroupDetailList": [{"GroupName": "admins", "AttachedManagedPolicies": [
+                            {"PolicyName": "AdministratorAccess", "PolicyArn": iam.ADMIN_POLICY_ARN}]}],
+                         "IsTruncated": False}, dict(filters, Marker="m1"))
+
+    report = iam.analyze_target("dev", None, ["admin"])
+
+    assert report["admin"] == [{"type": "user", "name": "ana", "sources": ["AdministratorAccess (via grupo admins)"]}]
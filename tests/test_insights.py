@@ -0,0 +1,108 @@
+"""
+Consultas concorrentes do Logs Insights (arch_cli/insights.py)
+"""
+
+import time
+import pytest
+from arch_cli import insights
+
+QUERY = "fields @message"
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(insights, "POLL_INITIAL", 0.01)
+    monkeypatch.setattr(insights, "POLL_MAX", 0.05)
+
+def _start(stub, groups, query_id):
+    stub.add_response("start_query", {"queryId": query_id}, {"logGroupNames": groups, "queryString": QUERY,
+                                                             "startTime": 1, "endTime": 2})
+
+def _results(stub, query_id, status, rows=()):
+    stub.add_response("get_query_results", {"status": status, "results": list(rows),
+                                            "statistics": {"bytesScanned": 10.0}}, {"queryId": query_id})
+
+def _run(groups, groups_per_query=10, timeout=5):
+    done = []
+    insights.run_target_queries("dev", "us-east-1", QUERY, 1000, 2000, groups=groups,
+                                groups_per_query=groups_per_query, emit=done.append, timeout=timeout)
+    return done
+
+def test_rows_drop_internal_pointer():
+    assert insights._rows([[{"field": "@message", "value": "oi"}, {"field": "@ptr", "value": "x"}]]) == [
+        {"@message": "oi"}]
+
+def test_resolve_groups_merges_prefixes_without_duplicates(aws_stub):
+    logs = aws_stub("logs")
+    logs.add_response("describe_log_groups", {"logGroups": [{"logGroupName": "/ecs/a"}, {"logGroupName": "/ecs/b"}]},
+                      {"logGroupNamePrefix": "/ecs/"})
+
+    assert insights.resolve_groups(logs.client, ["/ecs/a", "/app"], ["/ecs/"]) == ["/ecs/a", "/app", "/ecs/b"]
+
+def test_query_is_polled_until_complete(aws_stub):
+    logs = aws_stub("logs")
+    _start(logs, ["/a", "/b"], "q1")
+    _results(logs, "q1", "Running")
+    _results(logs, "q1", "Complete", [[{"field": "@message", "value": "erro"}, {"field": "@ptr", "value": "p"}]])
+
+    (done,) = _run(["/a", "/b"])
+
+    assert (done["status"], done["rows"], done["error"]) == ("Complete", [{"@message": "erro"}], None)
+    assert done["statistics"] == {"bytesScanned": 10.0}
+
+def test_limit_exceeded_while_running_waits_for_a_free_slot(aws_stub):
+    logs = aws_stub("logs")
+    _start(logs, ["/a"], "q1")
+    logs.add_client_error("start_query", "LimitExceededException", expected_params={
+        "logGroupNames": ["/b"], "queryString": QUERY, "startTime": 1, "endTime": 2})
+    _results(logs, "q1", "Complete")
+    _start(logs, ["/b"], "q2")
+    _results(logs, "q2", "Complete")
+
+    done = _run(["/a", "/b"], groups_per_query=1)
+
+    assert [(item["groups"], item["status"]) for item in done] == [(["/a"], "Complete"), (["/b"], "Complete")]
+
+def test_limit_exceeded_with_nothing_running_backs_off(aws_stub):
+    logs = aws_stub("logs")
+    logs.add_client_error("start_query", "LimitExceededException")
+    logs.add_client_error("start_query", "LimitExceededException")
+    _start(logs, ["/a"], "q1")
+    _results(logs, "q1", "Complete")
+
+    start = time.monotonic()
+    (done,) = _run(["/a"])
+
+    assert done["status"] == "Complete"
+    # Duas esperas: POLL_INITIAL e depois o atraso aumentado
+    assert time.monotonic() - start >= 0.01 + 0.03
+
+def test_failed_start_is_reported_and_others_continue(aws_stub):
+    logs = aws_stub("logs")
+    logs.add_client_error("start_query", "ResourceNotFoundException", "grupo inexistente")
+    _start(logs, ["/b"], "q2")
+    _results(logs, "q2", "Complete")
+
+    done = _run(["/a", "/b"], groups_per_query=1)
+
+    assert [(item["groups"], item["status"]) for item in done] == [(["/a"], "Failed"), (["/b"], "Complete")]
+    assert "grupo inexistente" in done[0]["error"]
+
+def test_timeout_stops_running_queries(aws_stub):
+    logs = aws_stub("logs")
+    _start(logs, ["/a"], "q1")
+    logs.add_response("stop_query", {"success": True}, {"queryId": "q1"})
+
+    (done,) = _run(["/a"], timeout=1e-6)
+
+    assert (done["status"], done["error"]) == ("Cancelled", "Consulta interrompida")
+
+def test_unexpected_target_error_fails_the_run(monkeypatch):
+    def broken(*args):
+        raise KeyError("queryId")
+
+    monkeypatch.setattr(insights, "run_target_queries", broken)
+    assert not insights.run_insights(QUERY, groups=["/a"], profile="dev")
+
+def test_no_matching_group_is_not_reported_as_success(aws_stub):
+    aws_stub("logs").add_response("describe_log_groups", {"logGroups": []}, {"logGroupNamePrefix": "/nada/"})
+    assert not insights.run_insights(QUERY, prefixes=["/nada/"], profile="dev")
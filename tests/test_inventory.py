@@ -0,0 +1,54 @@
+"""
+Motor de inventário (arch_cli/inventory.py)
+"""
+
+import datetime
+from arch_cli import inventory
+
+def _instance(instance_id, name=None):
+    instance = {"InstanceId": instance_id, "InstanceType": "t3.micro", "State": {"Name": "running"}}
+    if name:
+        instance["Tags"] = [{"Key": "Name", "Value": name}]
+    return instance
+
+def test_collect_service_follows_every_page(aws_stub):
+    ec2 = aws_stub("ec2")
+    ec2.add_response("describe_instances", {"Reservations": [{"Instances": [_instance("i-1", "web")]}],
+                                            "NextToken": "t1"}, {})
+    ec2.add_response("describe_instances", {"Reservations": [{"Instances": [_instance("i-2")]}]},
+                     {"NextToken": "t1"})
+
+    result = inventory.collect_service("ec2", "dev", "us-east-1")
+
+    assert result["error"] is None
+    assert result["count"] == 2
+    assert result["rows"] == [["i-1", "running", "t3.micro", "web"], ["i-2", "running", "t3.micro", "None"]]
+
+def test_collect_service_reports_errors_without_raising(aws_stub):
+    aws_stub("rds").add_client_error("describe_db_instances", "AccessDenied", "negado")
+
+    result = inventory.collect_service("rds")
+
+    assert "AccessDenied" in result["error"]
+    assert result["rows"] == []
+
+def test_collect_inventory_runs_every_service(aws_stub):
+    created = datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    aws_stub("s3").add_response("list_buckets", {"Buckets": [{"Name": "logs", "CreationDate": created}]}, {})
+    aws_stub("lambda").add_response("list_functions", {"Functions": [{"FunctionName": "api", "Runtime": "python3.12",
+                                                                      "LastModified": "2025-01-02"}]}, {})
+
+    results = inventory.collect_inventory(services=["s3", "lambda"], max_workers=2)
+
+    assert results["s3"]["rows"] == [["2025-01-02 03:04:05", "logs"]]
+    assert results["lambda"]["rows"] == [["api", "python3.12", "2025-01-02"]]
+
+def test_keep_rows_false_only_counts(aws_stub):
+    aws_stub("iam").add_response("list_users", {"Users": [
+        {"UserName": name, "UserId": "AIDA" + "X" * 16, "Arn": f"arn:aws:iam::123456789012:user/{name}", "Path": "/",
+         "CreateDate": datetime.datetime(2025, 1, 1)} for name in ("ana", "bia")]}, {})
+
+    result = inventory.collect_service("iam", keep_rows=False)
+
+    assert result["count"] == 2
+    assert result["rows"] == []
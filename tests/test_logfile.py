@@ -0,0 +1,116 @@
+"""
+Gravação do arquivo de log (arch_cli/logfile.py)
+"""
+
+import os
+import json
+import time
+import pytest
+from arch_cli import logfile
+
+@pytest.fixture
+def config(tmp_path):
+    def write(**settings):
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps({"log": settings}))
+        return str(path)
+    return write
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+def test_text_lines_are_written_in_order(tmp_path):
+    path = str(tmp_path / "arch-cli.log")
+    writer = logfile.LogWriter(path)
+    for i in range(100):
+        writer.write("INFO", f"mensagem {i}")
+    writer.close()
+
+    lines = _lines(path)
+    assert len(lines) == 100
+    assert lines[0].endswith("] [INFO] mensagem 0")
+    assert lines[-1].endswith("mensagem 99")
+
+def test_json_lines_include_the_context(tmp_path, config, monkeypatch):
+    monkeypatch.setattr(logfile, "_context", {"run_id": "abc"})
+    logfile.set_log_context(profile="prod", command=None)
+    path = str(tmp_path / "arch-cli.log")
+    writer = logfile.LogWriter(path, config(format="json"), background=False)
+    writer.write("ERROR", "falhou", duration=1.5)
+    writer.close()
+
+    record = json.loads(_lines(path)[0])
+    assert record["level"] == "ERROR"
+    assert record["message"] == "falhou"
+    assert (record["run_id"], record["profile"], record["duration"], record["pid"]) == ("abc", "prod", 1.5, os.getpid())
+    assert "command" not in record
+
+def test_environment_overrides_the_format(tmp_path, config, monkeypatch):
+    monkeypatch.setenv("ARCH_CLI_LOG_FORMAT", "json")
+    assert logfile._read_settings(config(format="text"))["format"] == "json"
+    monkeypatch.setenv("ARCH_CLI_LOG_FORMAT", "xml")
+    assert logfile._read_settings(config())["format"] == "text"
+
+def test_rotation_by_size_keeps_the_configured_backups(tmp_path, config):
+    path = str(tmp_path / "arch-cli.log")
+    writer = logfile.LogWriter(path, config(max_bytes=100, backups=2), background=False)
+    for i in range(10):
+        writer.write("INFO", f"linha {i} " + "x" * 40)
+    writer.close()
+
+    assert sorted(os.listdir(tmp_path)) == ["arch-cli.log", "arch-cli.log.1", "arch-cli.log.2", "arch-cli.log.lock",
+                                            "config.json"]
+    assert _lines(path)[-1].startswith("[") and "linha 9" in _lines(path)[-1]
+    assert all(os.path.getsize(f"{path}{suffix}") <= 100 for suffix in ("", ".1", ".2"))
+
+def test_rotation_by_age(tmp_path, config):
+    path = tmp_path / "arch-cli.log"
+    old = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - 3 * 86400))
+    path.write_text(f"[{old}] [INFO] antiga\n")
+    writer = logfile.LogWriter(str(path), config(max_age_days=1), background=False)
+    writer.write("INFO", "nova")
+    writer.close()
+
+    assert _lines(f"{path}.1") == [f"[{old}] [INFO] antiga"]
+    assert _lines(path)[0].endswith("nova")
+
+def test_follows_a_file_rotated_by_another_process(tmp_path):
+    path = str(tmp_path / "arch-cli.log")
+    writer = logfile.LogWriter(path, background=False)
+    writer.write("INFO", "antes")
+    os.replace(path, f"{path}.1")
+    writer.write("INFO", "depois")
+    writer.close()
+
+    assert _lines(f"{path}.1")[0].endswith("antes")
+    assert _lines(path)[0].endswith("depois")
+
+def test_write_after_close_is_not_lost(tmp_path):
+    path = str(tmp_path / "arch-cli.log")
+    writer = logfile.LogWriter(path)
+    writer.write("INFO", "primeira")
+    writer.close()
+    writer.write("INFO", "depois do close")
+    writer.close()
+
+    assert [line.split("] ", 2)[-1] for line in _lines(path)] == ["primeira", "depois do close"]
+
+def _child_writer_state(path):
+    writer = logfile.get_writer(path)
+    writer.write("INFO", "mensagem do filho")
+    return writer._thread is None
+
+def test_spawned_pool_workers_write_synchronously(tmp_path, monkeypatch):
+    # Workers do pool são encerrados sem atexit: uma linha na fila da thread de gravação seria perdida
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    monkeypatch.setattr(logfile, "_writers", {})
+    path = str(tmp_path / "arch-cli.log")
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        assert executor.submit(_child_writer_state, path).result()
+    assert _lines(path)[0].endswith("[INFO] mensagem do filho")
+    # No processo principal a gravação continua em segundo plano
+    assert logfile.get_writer(path)._thread is not None
+    logfile.get_writer(path).close()
@@ -0,0 +1,106 @@
+"""
+Leitura paralela de logs do CloudWatch (arch_cli/logs.py)
+"""
+
+import json
+import datetime
+import threading
+import pytest
+from arch_cli import logs
+
+class ShardClient:
+    """Cliente mínimo de filter_log_events: um evento por fatia, respondendo fora de ordem"""
+
+    def __init__(self, fail_from=None):
+        self.fail_from = fail_from
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def can_paginate(self, operation):
+        return False
+
+    def filter_log_events(self, **request):
+        with self._lock:
+            self.calls.append((request["startTime"], request["endTime"]))
+        if self.fail_from is not None and request["startTime"] >= self.fail_from:
+            raise RuntimeError("falha na fatia")
+        return {"events": [{"eventId": str(request["startTime"]), "timestamp": request["startTime"], "message": "m"}]}
+
+def test_parse_time_relative_and_iso():
+    assert logs.parse_time("15m", now=10000) == (10000 - 900) * 1000
+    assert logs.parse_time("2d", now=200000) == (200000 - 2 * 86400) * 1000
+    expected = int(datetime.datetime(2025, 5, 1, 12, tzinfo=datetime.timezone.utc).timestamp() * 1000)
+    assert logs.parse_time("2025-05-01T12:00:00Z") == expected
+    assert logs.parse_time("2025-05-01T09:00:00-03:00") == expected
+    with pytest.raises(ValueError):
+        logs.parse_time("ontem")
+
+def test_shard_range_covers_the_interval_without_gaps():
+    ranges = logs.shard_range(0, 10, 3)
+    assert ranges == [(0, 4), (4, 8), (8, 10)]
+    assert logs.shard_range(0, 2, 8) == [(0, 1), (1, 2)]
+    assert logs.shard_range(5, 6, 1) == [(5, 6)]
+
+def test_iter_range_yields_pages_in_shard_order():
+    client = ShardClient()
+
+    pages = list(logs.iter_range(client, "/app", 0, 4000, shards=4))
+
+    assert [page[0]["timestamp"] for page in pages] == [0, 1000, 2000, 3000]
+    assert sorted(client.calls) == [(0, 999), (1000, 1999), (2000, 2999), (3000, 3999)]
+
+def test_iter_range_propagates_shard_errors():
+    with pytest.raises(RuntimeError, match="falha na fatia"):
+        list(logs.iter_range(ShardClient(fail_from=2000), "/app", 0, 4000, shards=4))
+
+def test_iter_range_follows_pagination(aws_stub):
+    client = aws_stub("logs")
+    request = {"logGroupName": "/app", "filterPattern": "ERROR", "startTime": 0, "endTime": 999}
+    client.add_response("filter_log_events", {"events": [{"eventId": "1", "timestamp": 1, "message": "a"}],
+                                              "nextToken": "n1"}, request)
+    client.add_response("filter_log_events", {"events": [{"eventId": "2", "timestamp": 2, "message": "b"}]},
+                        dict(request, nextToken="n1"))
+
+    pages = list(logs.iter_range(client.client, "/app", 0, 1000, pattern="ERROR", shards=1))
+
+    assert [[event["eventId"] for event in page] for page in pages] == [["1"], ["2"]]
+
+def test_follow_does_not_repeat_events_at_the_last_timestamp(aws_stub):
+    client = aws_stub("logs")
+    client.add_response("filter_log_events", {"events": [{"eventId": "a", "timestamp": 100, "message": "a"},
+                                                         {"eventId": "b", "timestamp": 100, "message": "b"}]},
+                        {"logGroupName": "/app", "startTime": 50})
+    client.add_response("filter_log_events", {"events": [{"eventId": "b", "timestamp": 100, "message": "b"},
+                                                         {"eventId": "c", "timestamp": 150, "message": "c"}]},
+                        {"logGroupName": "/app", "startTime": 100})
+    stop = threading.Event()
+
+    pages = logs.follow(client.client, "/app", 50, interval=0, stop=stop)
+    first, second = next(pages), next(pages)
+    stop.set()
+
+    assert [event["eventId"] for event in first] == ["a", "b"]
+    assert [event["eventId"] for event in second] == ["c"]
+    assert list(pages) == []
+
+def test_queue_writer_writes_ndjson(tmp_path):
+    output = tmp_path / "app.ndjson"
+    writer = logs.QueueWriter(str(output), "ndjson", "/app")
+    writer.put([{"eventId": "1", "timestamp": 1, "message": "ok", "logStreamName": "s1"}])
+    writer.close()
+
+    assert writer.count == 1
+    assert json.loads(output.read_text(encoding="utf-8")) == {"group": "/app", "stream": "s1", "timestamp": 1,
+                                                              "message": "ok"}
+
+def test_events_on_stdout_keep_status_messages_on_stderr(aws_stub, capsys):
+    aws_stub("logs").add_response("filter_log_events", {"events": [
+        {"eventId": "1", "timestamp": 1704067200000, "message": "ok", "logStreamName": "s1"}]},
+        {"logGroupName": "/app", "startTime": 1704067200000, "endTime": 1704067259999})
+
+    assert logs.read_logs("/app", "dev", since="2024-01-01T00:00:00Z", until="2024-01-01T00:01:00Z", shards=1,
+                          fmt="ndjson")
+
+    out, err = capsys.readouterr()
+    assert [json.loads(line)["message"] for line in out.splitlines()] == ["ok"]
+    assert "[INFO]" in err and "1 evento(s)" in err
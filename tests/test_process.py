@@ -0,0 +1,104 @@
+"""
+Executor de processos externos (arch_cli/process.py)
+"""
+
+import os
+import sys
+import time
+from arch_cli import process
+
+PYTHON = sys.executable
+
+def _python(code):
+    return [PYTHON, "-c", code]
+
+def test_lines_are_streamed_to_the_callback():
+    lines = []
+    result = process.run_process(_python("import sys\nprint('a')\nprint('b', file=sys.stderr)\nprint('c')"),
+                                 on_line=lambda stream, line: lines.append((stream, line)))
+
+    assert result["ok"] and result["returncode"] == 0
+    assert result["stdout"] == "a\nc"
+    assert result["stderr"] == "b"
+    assert [line for line in lines if line[0] == "stdout"] == [("stdout", "a"), ("stdout", "c")]
+
+def test_without_capture_only_the_tail_is_kept(monkeypatch):
+    monkeypatch.setattr(process, "TAIL_LINES", 3)
+    result = process.run_process(_python("for i in range(100): print(i)"), capture=False)
+
+    assert result["stdout"] == "97\n98\n99"
+
+def test_timeout_kills_the_whole_process_group(tmp_path):
+    # O filho grava o próprio pid e continua vivo enquanto o comando não for encerrado
+    pid_file = tmp_path / "child.pid"
+    code = (f"import subprocess, sys, time\n"
+            f"child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+            f"time.sleep(60)")
+    start = time.monotonic()
+    result = process.run_process(_python(code), timeout=1)
+
+    assert result["timed_out"] and not result["ok"]
+    assert "Tempo limite excedido" in result["stderr"]
+    assert time.monotonic() - start < process.KILL_GRACE + 5
+    child = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            os.kill(child, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        raise AssertionError("o processo filho continuou em execução")
+
+def test_background_process_holding_the_pipes_does_not_block(monkeypatch):
+    monkeypatch.setattr(process, "KILL_GRACE", 1)
+    # Simula um instalador que inicia um daemon herdando stdout e termina em seguida
+    code = ("import subprocess, sys\n"
+            "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'], start_new_session=True)\n"
+            "print('instalado')")
+    start = time.monotonic()
+    result = process.run_process(_python(code))
+
+    assert result["ok"]
+    assert time.monotonic() - start < 5
+
+def test_missing_command_and_expired_deadline():
+    missing = process.run_process(["arch-cli-comando-inexistente"])
+    assert not missing["ok"] and missing["returncode"] is None and missing["stderr"]
+
+    expired = process.run_process(_python("print(1)"), deadline=time.monotonic() - 1)
+    assert expired["timed_out"] and expired["returncode"] is None
+
+def test_run_batch_limits_concurrency_and_reports_indexes():
+    commands = [_python(f"import time; time.sleep(0.3); print({i})") for i in range(4)]
+    start = time.monotonic()
+    results = sorted(process.run_batch(commands, max_workers=2), key=lambda result: result["index"])
+    elapsed = time.monotonic() - start
+
+    assert [result["stdout"] for result in results] == ["0", "1", "2", "3"]
+    assert elapsed >= 0.6
+
+def test_run_batch_total_timeout():
+    commands = [_python("import time; time.sleep(30)")] * 2
+    start = time.monotonic()
+    results = list(process.run_batch(commands, max_workers=1, total_timeout=0.5))
+
+    assert all(result["timed_out"] for result in results)
+    assert time.monotonic() - start < process.KILL_GRACE + 5
+
+def test_run_command_returns_success_and_output():
+    assert process.run_command(_python("print('ok')")) == (True, "ok")
+    assert process.run_command(_python("import sys; sys.exit('erro')")) == (False, "erro")
+
+def test_run_live_gives_the_terminal_only_to_sudo(monkeypatch):
+    calls = []
+    monkeypatch.setattr(process, "run_process", lambda command, **kwargs: calls.append(kwargs["interactive"]) or
+                        {"ok": True, "stdout": ""})
+
+    process.run_live(["sudo", "apt-get", "install", "-y", "jq"])
+    process.run_live("git clone https://example.com/repo.git", shell=True)
+    process.run_install("pseudo-sudo --version", shell=True)
+
+    assert calls == [True, False, False]
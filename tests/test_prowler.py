@@ -0,0 +1,94 @@
+"""
+Orquestrador do Prowler (arch_cli/prowler.py)
+"""
+
+import os
+import sys
+import json
+import pytest
+from arch_cli import prowler
+
+CSV = ("ACCOUNT_UID;REGION;CHECK_ID;STATUS;SEVERITY;RESOURCE_UID\n"
+       "111;us-east-1;s3_bucket_public;FAIL;critical;arn:aws:s3:::a\n"
+       "111;us-east-1;iam_root_mfa;FAIL;high;root\n"
+       "111;us-east-1;ec2_ebs_encrypted;PASS;medium;vol-1\n"
+       "111;us-east-1;manual_check;MANUAL;low;x\n")
+
+FAKE_PROWLER = """#!{python}
+import os, sys
+state = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs")
+runs = int(open(state).read()) + 1 if os.path.exists(state) else 1
+open(state, "w").write(str(runs))
+if runs <= int(os.environ.get("FAKE_PROWLER_FAILURES", "0")):
+    sys.exit("falha simulada")
+output = sys.argv[sys.argv.index("-o") + 1]
+with open(os.path.join(output, "prowler.csv"), "w") as f:
+    f.write(os.environ["FAKE_PROWLER_CSV"])
+print("varredura concluída")
+sys.exit(3)
+"""
+
+@pytest.fixture
+def fake_prowler(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "prowler"
+    script.write_text(FAKE_PROWLER.format(python=sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_PROWLER_CSV", CSV)
+    monkeypatch.setattr(prowler.time, "sleep", lambda seconds: None)
+    return bin_dir
+
+def test_parallel_scans_are_capped_by_cpu_memory_and_targets(monkeypatch):
+    monkeypatch.setattr(prowler.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(prowler, "available_memory_mb", lambda: 5000)
+
+    assert prowler.max_parallel_scans(targets=10) == 2
+    assert prowler.max_parallel_scans(targets=10, memory_per_scan=1000) == 5
+    assert prowler.max_parallel_scans(requested=3, memory_per_scan=0, targets=10) == 3
+    assert prowler.max_parallel_scans(memory_per_scan=1000, targets=1) == 1
+    monkeypatch.setattr(prowler, "available_memory_mb", lambda: 100)
+    assert prowler.max_parallel_scans(targets=10) == 1
+
+def test_build_command():
+    assert prowler.build_command("prod", "sa-east-1", "/tmp/out", "cis") == [
+        "prowler", "aws", "--profile", "prod", "-M", "csv", "html", "-o", "/tmp/out", "-F", "prowler",
+        "-f", "sa-east-1", "--compliance", "cis"]
+    assert "-f" not in prowler.build_command("prod", None, "/tmp/out")
+
+def test_summary_ignores_compliance_csvs(tmp_path):
+    (tmp_path / "prowler.csv").write_text(CSV)
+    (tmp_path / "compliance").mkdir()
+    (tmp_path / "compliance" / "cis.csv").write_text(CSV)
+
+    summary = prowler._summarize_csv(str(tmp_path))
+
+    assert (summary["total"], summary["pass"], summary["fail"], summary["manual"]) == (4, 1, 2, 1)
+    assert (summary["fail_critical"], summary["fail_high"], summary["fail_medium"]) == (1, 1, 0)
+
+def test_scan_is_retried_and_published_atomically(fake_prowler, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_PROWLER_FAILURES", "1")
+    output = tmp_path / "reports"
+
+    result = prowler.scan_target("prod", "us-east-1", str(output), retries=1)
+
+    assert result["ok"] and result["attempts"] == 2
+    assert result["summary"]["fail"] == 2
+    assert sorted(os.listdir(output / "prod")) == ["us-east-1", "us-east-1.failed"]
+    assert "varredura concluída" in (output / "prod" / "us-east-1" / "prowler.log").read_text()
+
+def test_failed_scan_keeps_the_output_for_inspection(fake_prowler, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_PROWLER_FAILURES", "5")
+    output = tmp_path / "reports"
+
+    result = prowler.scan_target("dev", None, str(output), retries=1)
+
+    assert not result["ok"] and result["attempts"] == 2
+    assert result["error"] == "falha simulada"
+    assert os.listdir(output / "dev") == ["all-regions.failed"]
+
+    rows = prowler.write_summary([result], str(output))
+    assert rows[0]["dir"].endswith("all-regions.failed")
+    with open(output / "summary.json") as f:
+        assert json.load(f)[0]["error"] == "falha simulada"
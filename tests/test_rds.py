@@ -0,0 +1,107 @@
+"""
+Painel de desempenho do RDS e cache de séries temporais (arch_cli/rds.py)
+"""
+
+import time
+import datetime
+import numpy as np
+import pytest
+from botocore.stub import ANY
+from arch_cli import rds
+
+PERIOD = 300
+INSTANCES = [{"id": "db1", "class": "db.m5.large", "engine": "postgres", "status": "available", "allocated_gb": 100}]
+
+@pytest.fixture(autouse=True)
+def metrics_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(rds, "METRICS_DB", str(tmp_path / "metrics.db"))
+
+def _moment(ts):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc)
+
+def _window(hours, end_offset=0):
+    now = int(time.time()) + end_offset
+    end = now - now % PERIOD
+    return end - hours * 3600, end
+
+def _settled(end):
+    settled = end - rds.SETTLE_SECONDS
+    return settled - settled % PERIOD
+
+def _expect_fetch(cloudwatch, fetch_from, end):
+    """GetMetricData a partir de fetch_from, com a CPU de db1 em todos os períodos até end"""
+    timestamps = [_moment(ts) for ts in range(fetch_from, end, PERIOD)]
+    cloudwatch.add_response("get_metric_data", {"MetricDataResults": [
+        {"Id": "m0_0", "Timestamps": timestamps, "Values": [50.0] * len(timestamps)}]},
+        {"MetricDataQueries": ANY, "StartTime": _moment(fetch_from), "EndTime": _moment(end),
+         "ScanBy": "TimestampAscending"})
+
+def _sync(start, end):
+    return rds.sync_metrics("dev", "us-east-1", INSTANCES, _moment(start), _moment(end), PERIOD)
+
+def test_second_run_only_fetches_the_unsettled_tail(aws_stub):
+    cloudwatch = aws_stub("cloudwatch")
+    start, end = _window(2)
+    _expect_fetch(cloudwatch, start, end)
+    _expect_fetch(cloudwatch, _settled(end), end)
+
+    recent, calls = _sync(start, end)
+    assert calls == 1
+    # Pontos ainda mutáveis ficam apenas em memória
+    assert recent[("db1", "cpu")][0] == list(range(_settled(end), end, PERIOD))
+
+    recent, calls = _sync(start, end)
+    assert calls == 1
+    series = rds.load_series("dev", "us-east-1", PERIOD, ["db1"], _moment(start), _moment(end), recent)
+    assert series[("db1", "cpu")][0] == list(range(start, end, PERIOD))
+
+def test_window_after_the_synced_range_is_fetched_entirely(aws_stub):
+    cloudwatch = aws_stub("cloudwatch")
+    start, end = _window(2, end_offset=-6 * 3600)
+    _expect_fetch(cloudwatch, start, end)
+    later_start, later_end = _window(2)
+    # O intervalo gravado termina em _settled(end), antes de later_start: buscar desde later_start, sem lacuna
+    _expect_fetch(cloudwatch, later_start, later_end)
+
+    _sync(start, end)
+    recent, _ = _sync(later_start, later_end)
+
+    series = rds.load_series("dev", "us-east-1", PERIOD, ["db1"], _moment(later_start), _moment(later_end), recent)
+    assert series[("db1", "cpu")][0] == list(range(later_start, later_end, PERIOD))
+
+def test_window_before_the_synced_range_is_fetched_from_its_start(aws_stub):
+    cloudwatch = aws_stub("cloudwatch")
+    start, end = _window(2)
+    _expect_fetch(cloudwatch, start, end)
+    _expect_fetch(cloudwatch, start - 3600, end)
+
+    _sync(start, end)
+    _sync(start - 3600, end)
+
+    series = rds.load_series("dev", "us-east-1", PERIOD, ["db1"], _moment(start - 3600), _moment(end))
+    assert series[("db1", "cpu")][0] == list(range(start - 3600, _settled(end), PERIOD))
+
+def test_points_purged_by_retention_are_fetched_again(aws_stub, monkeypatch):
+    # Retenção de 1 hora: a primeira hora da janela é apagada logo após a gravação
+    monkeypatch.setattr(rds, "RETENTION_DAYS", 1 / 24)
+    cloudwatch = aws_stub("cloudwatch")
+    start, end = _window(2)
+    _expect_fetch(cloudwatch, start, end)
+    _expect_fetch(cloudwatch, start, end)
+
+    _sync(start, end)
+    _sync(start, end)
+
+def test_saturation_uses_the_worst_dimension():
+    instances = [{"allocated_gb": 100}, {"allocated_gb": None}, {"allocated_gb": 10}]
+    stats = {
+        "cpu": {"p95": np.array([30.0, 95.0, np.nan])},
+        "free_storage": {"min": np.array([10.0 * 1024 ** 3, 0.0, np.nan])},
+        "read_latency": {"p95": np.array([0.001, 0.001, 0.015])},
+        "write_latency": {"p95": np.array([0.002, np.nan, 0.001])},
+    }
+
+    scores, bottlenecks = rds.saturation(instances, stats)
+
+    np.testing.assert_allclose(scores, [90.0, 95.0, 75.0])
+    assert list(bottlenecks) == ["armazenamento", "CPU", "latência"]
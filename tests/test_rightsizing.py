@@ -0,0 +1,83 @@
+"""
+Métricas em lote e rightsizing de EC2 (arch_cli/metrics.py e arch_cli/rightsizing.py)
+"""
+
+import datetime
+import numpy as np
+from botocore.stub import ANY
+from arch_cli import metrics, rightsizing
+
+START = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+END = START + datetime.timedelta(hours=4)
+
+def _at(hours):
+    return (START + datetime.timedelta(hours=hours)).timestamp()
+
+def test_build_matrix_aligns_series_by_period():
+    matrix = metrics.build_matrix([([_at(0), _at(2), _at(10)], [1.0, 3.0, 99.0]), ([], [])], START, END, 3600)
+
+    assert matrix.shape == (2, 5)
+    np.testing.assert_array_equal(matrix[0], [1.0, np.nan, 3.0, np.nan, np.nan])
+    assert np.isnan(matrix[1]).all()
+
+def test_summarize_ignores_missing_points():
+    stats = metrics.summarize(np.array([[1.0, np.nan, 3.0], [np.nan, np.nan, np.nan]]))
+
+    assert (stats["min"][0], stats["max"][0], stats["mean"][0], stats["p50"][0]) == (1.0, 3.0, 2.0, 2.0)
+    assert list(stats["samples"]) == [2, 0]
+    assert np.isnan(stats["p99"][1])
+
+def test_nan_add_and_downsample():
+    total = metrics.nan_add(np.array([[1.0, np.nan, np.nan]]), np.array([[2.0, 5.0, np.nan]]))
+    np.testing.assert_array_equal(total, [[3.0, 5.0, np.nan]])
+
+    matrix = np.arange(10, dtype=float).reshape(1, 10)
+    np.testing.assert_array_equal(metrics.downsample(matrix, 4), [[2.0, 5.0, 8.0, 9.0]])
+    np.testing.assert_array_equal(metrics.downsample(matrix, 5, how="mean"), [[0.5, 2.5, 4.5, 6.5, 8.5]])
+    assert metrics.downsample(matrix, 20) is matrix
+
+def test_sparkline():
+    assert metrics.sparkline([0, np.nan, 7]) == "▁ █"
+    assert metrics.sparkline([np.nan]) == ""
+
+def test_get_metric_data_splits_queries_in_batches_of_500(aws_stub):
+    queries = [metrics.metric_query(f"q{i}", "AWS/EC2", "CPUUtilization", {"InstanceId": f"i-{i}"}, "Average", 3600)
+               for i in range(501)]
+    cloudwatch = aws_stub("cloudwatch")
+    for chunk in (queries[:500], queries[500:]):
+        last = chunk[-1]["Id"]
+        cloudwatch.add_response("get_metric_data",
+                                {"MetricDataResults": [{"Id": last, "Timestamps": [START], "Values": [1.0]}]},
+                                {"MetricDataQueries": chunk, "StartTime": START, "EndTime": END,
+                                 "ScanBy": "TimestampAscending"})
+
+    series = metrics.get_metric_data(cloudwatch.client, queries, START, END, max_workers=1)
+
+    assert series == {"q499": ([START.timestamp()], [1.0]), "q500": ([START.timestamp()], [1.0])}
+
+def test_classify():
+    cpu = {"samples": np.array([0, 10, 10, 10, 10]), "p95": np.array([np.nan, 2.0, 50.0, 30.0, 60.0]),
+           "p99": np.array([np.nan, 3.0, 95.0, 35.0, 70.0])}
+    network = {"p95": np.array([np.nan, 1.0, 1.0, 1.0, 500.0])}
+
+    assert list(rightsizing.classify(cpu, network, rightsizing.THRESHOLDS)) == [
+        "sem dados", "ociosa", "saturada", "reduzir", "ok"]
+
+def test_analyze_target_uses_one_metric_call_for_the_fleet(aws_stub):
+    aws_stub("ec2").add_response("describe_instances", {"Reservations": [{"Instances": [
+        {"InstanceId": "i-1", "InstanceType": "m5.large", "Tags": [{"Key": "Name", "Value": "api"}]},
+        {"InstanceId": "i-2", "InstanceType": "t3.small"},
+    ]}]}, {"Filters": [{"Name": "instance-state-name", "Values": ["running"]}]})
+    now = datetime.datetime.now(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+    hours = [now - datetime.timedelta(hours=hour) for hour in range(1, 25)]
+    aws_stub("cloudwatch").add_response("get_metric_data", {"MetricDataResults": [
+        {"Id": "cpu_0", "Timestamps": hours, "Values": [2.0] * 24},
+        {"Id": "net_in_0", "Timestamps": hours, "Values": [3600.0] * 24},
+    ]}, {"MetricDataQueries": ANY, "StartTime": ANY, "EndTime": ANY, "ScanBy": "TimestampAscending"})
+
+    rows = rightsizing.analyze_target("dev", "us-east-1", days=2)
+
+    assert [(row["id"], row["name"], row["recommendation"]) for row in rows] == [("i-1", "api", "ociosa"),
+                                                                                ("i-2", "", "sem dados")]
+    assert rows[0]["cpu_p95"] == 2.0
+    assert abs(rows[0]["net_p95"] - 3600.0 / 3600 / 1024) < 1e-9
@@ -0,0 +1,164 @@
+"""
+Agendador em processo: expressões cron, validação do agendamento e execução das tarefas (arch_cli/scheduler.py)
+"""
+
+import os
+import gzip
+import time
+import signal
+import sqlite3
+import datetime
+import threading
+import pytest
+from arch_cli import scheduler
+
+@pytest.fixture(autouse=True)
+def history_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "CONFIG_DIR", str(tmp_path))
+    monkeypatch.setattr(scheduler, "HISTORY_DB", str(tmp_path / "scheduler.db"))
+    return tmp_path / "scheduler.db"
+
+def _runs(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute("SELECT job, status, error FROM runs ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+def _write_schedule(tmp_path, text):
+    path = tmp_path / "schedule.yaml"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_parse_cron_expands_ranges_steps_and_sunday():
+    cron = scheduler.parse_cron("*/15 9-17/4 * 1,6 5-7")
+    assert cron["minutes"] == {0, 15, 30, 45}
+    assert cron["hours"] == {9, 13, 17}
+    assert cron["months"] == {1, 6}
+    assert cron["weekdays"] == {0, 5, 6}
+    assert cron["any_day"] and not cron["any_weekday"]
+    # "5/10" vai de 5 até o máximo do campo
+    assert scheduler.parse_cron("5/20 0 * * *")["minutes"] == {5, 25, 45}
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 5-2 * * *", "*/0 * * * *", "a * * * *"])
+def test_parse_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        scheduler.parse_cron(expression)
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("30 2 * * *", datetime.datetime(2025, 1, 1, 2, 30, 15), datetime.datetime(2025, 1, 2, 2, 30)),
+    ("0 0 1 * *", datetime.datetime(2025, 1, 31, 12, 0), datetime.datetime(2025, 2, 1, 0, 0)),
+    ("0 9 * * 1-5", datetime.datetime(2025, 6, 6, 10, 0), datetime.datetime(2025, 6, 9, 9, 0)),
+    # Dia do mês e dia da semana restritos: basta atender a um deles (sexta-feira ou dia 13)
+    ("0 0 13 * 5", datetime.datetime(2025, 6, 1), datetime.datetime(2025, 6, 6, 0, 0)),
+    ("0 0 29 2 *", datetime.datetime(2025, 3, 1), datetime.datetime(2028, 2, 29, 0, 0)),
+    ("0 0 1 1 *", datetime.datetime(2025, 12, 31, 23, 59), datetime.datetime(2026, 1, 1, 0, 0)),
+])
+def test_next_cron(expression, after, expected):
+    assert scheduler.next_cron(scheduler.parse_cron(expression), after) == expected
+
+def test_next_cron_never_matching_expression():
+    with pytest.raises(ValueError):
+        scheduler.next_cron(scheduler.parse_cron("0 0 31 2 *"), datetime.datetime(2025, 1, 1))
+
+def test_next_slot_with_interval():
+    job = {"cron": None, "every": 90}
+    assert scheduler.next_slot(job, datetime.datetime(2025, 1, 1, 0, 0)) == datetime.datetime(2025, 1, 1, 0, 1, 30)
+
+def test_load_schedule_reads_the_example(tmp_path):
+    jobs = scheduler.load_schedule(_write_schedule(tmp_path, scheduler.EXAMPLE_SCHEDULE))
+    assert [(job["name"], job["type"], job["max_concurrent"]) for job in jobs] == [
+        ("backup-noturno", "backup", 1), ("saude", "health", 1), ("logs", "log_rotation", 1)]
+    assert jobs[0]["jitter"] == 300 and jobs[0]["options"]["services"] == ["ebs", "rds"]
+    assert jobs[1]["every"] == 3600 and jobs[1]["schedule"] == "a cada 3600s"
+
+@pytest.mark.parametrize("text, message", [
+    ("jobs:\n  - {name: a, type: health, every: 60}\n  - {name: a, type: health, every: 60}\n", "mais de uma vez"),
+    ("jobs:\n  - {name: a, type: health, every: 60, cron: '* * * * *'}\n", "informe 'cron' ou 'every'"),
+    ("jobs:\n  - {name: a, type: deploy, every: 60}\n", "tipo deve ser"),
+    ("jobs:\n  - {name: a, type: log_rotation, every: 60}\n", "options.path"),
+    ("jobs:\n  - {name: a, type: health, cron: '0 25 * * *'}\n", "tarefa 'a': campo cron"),
+    ("jobs:\n  - {name: a, type: health, cron: '0 0 30 2 *'}\n", "tarefa 'a': a expressão cron nunca é atendida"),
+    ("jobs:\n  - {name: a, type: health, every: 60, max_concurrent: 0}\n", "devem ser positivos"),
+    ("jobs: []\n", "nenhuma tarefa"),
+    ("jobs: [\n", "YAML inválido"),
+])
+def test_load_schedule_validation(tmp_path, text, message):
+    with pytest.raises(ValueError, match=message):
+        scheduler.load_schedule(_write_schedule(tmp_path, text))
+
+def test_rotate_logs_compresses_old_logs_and_removes_old_archives(tmp_path):
+    now = time.time()
+
+    def create(name, days, content=b"linha\n"):
+        path = tmp_path / name
+        path.write_bytes(content)
+        os.utime(path, (now - days * 86400, now - days * 86400))
+        return path
+
+    old = create("app.log", 10)
+    create("recent.log", 1)
+    create("notes.txt", 10)
+    create("archived.log.gz", 40)
+    create("kept.log.gz", 20)
+
+    assert scheduler.rotate_logs(str(tmp_path)) == (1, 1, 0)
+    assert sorted(os.listdir(tmp_path)) == ["app.log.gz", "kept.log.gz", "notes.txt", "recent.log"]
+    with gzip.open(str(old) + ".gz") as f:
+        assert f.read() == b"linha\n"
+    # A data original é mantida: o arquivo comprimido é removido 30 dias após a última escrita do log
+    assert abs(os.stat(str(old) + ".gz").st_mtime - (now - 10 * 86400)) < 1
+
+def _job(name="job", kind="health", **kwargs):
+    job = {"name": name, "type": kind, "cron": None, "every": 60, "jitter": 0, "max_concurrent": 1,
+           "profile": None, "region": None, "options": {}}
+    job.update(kwargs)
+    return job
+
+def test_execute_job_records_status_and_releases_the_slot(monkeypatch, history_db):
+    outcomes = iter([True, False, RuntimeError("falhou")])
+
+    def fake(job, slot):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setitem(scheduler.JOB_TYPES, "health", fake)
+    slots = threading.BoundedSemaphore(1)
+    for _ in range(3):
+        assert slots.acquire(blocking=False)
+        scheduler.execute_job(_job(), datetime.datetime(2025, 1, 1), slots)
+    assert _runs(history_db) == [("job", "success", None), ("job", "failed", None),
+                                 ("job", "error", "RuntimeError: falhou")]
+
+def test_scheduler_skips_slots_while_the_previous_run_is_still_going(tmp_path, monkeypatch, history_db):
+    release = threading.Event()
+    started = []
+
+    def slow(job, slot):
+        started.append(slot)
+        return release.wait(10)
+
+    monkeypatch.setitem(scheduler.JOB_TYPES, "health", slow)
+    path = _write_schedule(tmp_path, "jobs:\n  - {name: lento, type: health, every: 1}\n")
+    previous = {signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)}
+
+    def stop():
+        release.set()
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    timer = threading.Timer(3.5, stop)
+    timer.start()
+    try:
+        assert scheduler.run_scheduler(path)
+    finally:
+        timer.cancel()
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    statuses = [status for _, status, _ in _runs(history_db)]
+    # Uma única execução (max_concurrent: 1); os horários seguintes foram ignorados sem sobrepor
+    assert len(started) == 1
+    assert statuses.count("success") == 1
+    assert statuses.count("skipped") >= 1
@@ -0,0 +1,80 @@
+"""
+Varredura de snapshots e volumes EBS (arch_cli/snapshots.py)
+"""
+
+import datetime
+from arch_cli import snapshots
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+def _snapshot(snapshot_id, volume_id, days, size=10, description=""):
+    return {"SnapshotId": snapshot_id, "VolumeId": volume_id, "StartTime": NOW - datetime.timedelta(days=days),
+            "VolumeSize": size, "Description": description}
+
+def _stub_scan(aws_stub, snapshot_pages, volumes=(), images=()):
+    ec2 = aws_stub("ec2")
+    ec2.add_response("describe_images", {"Images": list(images)}, {"Owners": ["self"]})
+    ec2.add_response("describe_volumes", {"Volumes": list(volumes)}, {"MaxResults": snapshots.PAGE_SIZE})
+    for i, page in enumerate(snapshot_pages):
+        response = {"Snapshots": page}
+        params = {"OwnerIds": ["self"], "MaxResults": snapshots.PAGE_SIZE}
+        if i + 1 < len(snapshot_pages):
+            response["NextToken"] = f"t{i + 1}"
+        if i:
+            params["NextToken"] = f"t{i}"
+        ec2.add_response("describe_snapshots", response, params)
+
+def test_prune_top_keeps_largest_entries():
+    aggregate = {"a": [1, 5, 0.0], "b": [1, 50, 0.0], "c": [1, 20, 0.0]}
+    snapshots._prune_top(aggregate, 2)
+    assert sorted(aggregate) == ["b", "c"]
+
+def test_push_top_keeps_fixed_size_heap():
+    heap = []
+    for size in (5, 1, 9, 3):
+        snapshots._push_top(heap, 2, {"id": f"x-{size}", "size": size})
+    assert sorted(entry[0] for entry in heap) == [5, 9]
+
+def test_scan_aggregates_orphans_buckets_and_unattached_volumes(aws_stub):
+    _stub_scan(aws_stub, [
+        [_snapshot("snap-1", "vol-1", 10), _snapshot("snap-2", "vol-gone", 100, 20),
+         _snapshot("snap-3", "vol-1", 400, description="Created by CreateImage(i-1) for ami-0aa from vol-1")],
+        [_snapshot("snap-4", "vol-1", 200, description="Created by CreateImage(i-1) for ami-0bb from vol-1"),
+         _snapshot("snap-5", "vol-1", 5)],
+    ], volumes=[
+        {"VolumeId": "vol-1", "Size": 10, "State": "in-use", "VolumeType": "gp3", "CreateTime": NOW},
+        {"VolumeId": "vol-2", "Size": 100, "State": "available", "VolumeType": "gp2", "CreateTime": NOW,
+         "AvailabilityZone": "us-east-1a"},
+    ], images=[{"ImageId": "ami-0bb", "BlockDeviceMappings": [{"Ebs": {"SnapshotId": "snap-4"}}]}])
+
+    summary = snapshots.scan_target("dev", "us-east-1", older_than=90, top=5)
+
+    assert summary["total"][:2] == [5, 60]
+    assert summary["old"][:2] == [3, 40]
+    assert summary["buckets"]["0-30 dias"][0] == 2
+    assert summary["buckets"]["> 365 dias"][0] == 1
+    assert {reason: entry[0] for reason, entry in summary["orphans"].items()} == {"AMI removida": 1, "volume removido": 1}
+    assert [item["id"] for item in summary["orphans_top"]] == ["snap-2", "snap-3"]
+    assert summary["unattached"] == {"gp2": [1, 100, 10.0]}
+    assert summary["unattached_top"][0]["id"] == "vol-2"
+
+def test_copies_are_not_orphans_nor_a_single_volume(aws_stub):
+    copy = snapshots.COPY_VOLUME_ID
+    _stub_scan(aws_stub, [[_snapshot("snap-1", copy, 10), _snapshot("snap-2", copy, 20)]])
+
+    summary = snapshots.scan_target("dev", "us-east-1")
+
+    assert summary["orphans"] == {}
+    assert summary["by_volume"] == [("cópia", [2, 20, 1.0])]
+
+def test_by_volume_stays_bounded_between_pages(aws_stub, monkeypatch):
+    monkeypatch.setattr(snapshots, "BY_VOLUME_FACTOR", 1)
+    _stub_scan(aws_stub, [
+        [_snapshot(f"snap-a{i}", f"vol-{i}", 1, size=i) for i in range(1, 6)],
+        [_snapshot("snap-b1", "vol-5", 1, size=5), _snapshot("snap-b2", "vol-3", 1, size=3)],
+    ], volumes=[{"VolumeId": f"vol-{i}", "Size": 1, "State": "in-use", "CreateTime": NOW} for i in range(1, 10)])
+
+    summary = snapshots.scan_target("dev", "us-east-1", top=2)
+
+    # vol-3 foi descartado na primeira página e recomeça do zero: a agregação não cresce com o número de volumes
+    assert [(volume, entry[1]) for volume, entry in summary["by_volume"]] == [("vol-5", 10), ("vol-4", 4)]
@@ -0,0 +1,31 @@
+"""
+Inicialização a frio do CLI (arch_cli/startup_bench.py)
+"""
+
+import os
+import shutil
+import pytest
+from arch_cli import startup_bench
+
+@pytest.fixture(scope="module")
+def env():
+    home = startup_bench._prepare_home()
+    yield startup_bench._env(home)
+    shutil.rmtree(home, ignore_errors=True)
+
+@pytest.mark.parametrize("args, floor", startup_bench.COMMANDS,
+                         ids=lambda value: " ".join(value) if isinstance(value, list) else value)
+def test_command_does_not_load_heavy_modules(env, args, floor):
+    assert startup_bench.heavy_imports(args, env, startup_bench.FLOORS[floor][1]) == []
+
+def test_profile_invocation_sets_active_profile(env):
+    _, _, returncode = startup_bench.measure(["profile", startup_bench.BENCH_PROFILE], "pass", env, runs=1)
+    assert returncode == 0
+    with open(f"{env['HOME']}/.arch-cli/active_profile") as f:
+        assert f.read().strip() == startup_bench.BENCH_PROFILE
+
+# Medição de tempo: depende da carga da máquina, então só roda quando pedida explicitamente
+@pytest.mark.skipif(not os.environ.get("ARCH_CLI_BENCH"), reason="defina ARCH_CLI_BENCH=1 para medir o orçamento")
+def test_cold_start_within_budget(capsys):
+    ok = startup_bench.run(runs=5)
+    assert ok, capsys.readouterr().out
@@ -0,0 +1,59 @@
+"""
+Manifesto das ferramentas externas (arch_cli/toolchain.py)
+"""
+
+import os
+import pytest
+from arch_cli import toolchain
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    """Diretório no PATH com uma ferramenta falsa que conta quantas vezes foi executada"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    calls = tmp_path / "calls"
+    script = bin_dir / "fake-tool"
+    script.write_text(f"#!/bin/sh\necho x >> {calls}\necho 'fake-tool 1.0'\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setattr(toolchain, "CONFIG_DIR", str(tmp_path))
+    monkeypatch.setattr(toolchain, "MANIFEST_FILE", str(tmp_path / "toolchain.json"))
+    monkeypatch.setitem(toolchain.TOOLS, "fake-tool", ["fake-tool", "--version"])
+    monkeypatch.setitem(toolchain.TOOLS, "missing-tool", ["missing-tool", "--version"])
+    return script
+
+def _executions(script):
+    calls = script.parent.parent / "calls"
+    return len(calls.read_text().splitlines()) if calls.exists() else 0
+
+def test_repeated_checks_do_not_run_the_tool(tools):
+    first = toolchain.probe_tool("fake-tool")
+    second = toolchain.probe_tool("fake-tool")
+
+    assert first == {"installed": True, "version": "fake-tool 1.0", "cached": False}
+    assert second == dict(first, cached=True)
+    assert _executions(tools) == 1
+
+def test_changed_binary_or_recheck_runs_again(tools):
+    toolchain.probe_tool("fake-tool")
+    stat = os.stat(tools)
+    os.utime(tools, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert toolchain.probe_tool("fake-tool")["cached"] is False
+    assert toolchain.probe_tool("fake-tool")["cached"] is True
+    assert toolchain.probe_tool("fake-tool", recheck=True)["cached"] is False
+    assert _executions(tools) == 3
+
+def test_path_change_discards_the_manifest(tools, monkeypatch):
+    toolchain.probe_tool("fake-tool")
+    monkeypatch.setenv("PATH", f"{tools.parent}{os.pathsep}{tools.parent.parent}")
+
+    assert toolchain.probe_tool("fake-tool")["cached"] is False
+    assert _executions(tools) == 2
+
+def test_missing_tool_is_cached_without_running_anything(tools):
+    assert toolchain.probe_tools(["missing-tool", "fake-tool"]) == {
+        "missing-tool": {"installed": False, "version": None, "cached": False},
+        "fake-tool": {"installed": True, "version": "fake-tool 1.0", "cached": False},
+    }
+    assert toolchain.probe_tool("missing-tool") == {"installed": False, "version": None, "cached": True}
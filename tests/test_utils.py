@@ -0,0 +1,37 @@
+"""
+Perfis do AWS CLI e reexportações sob demanda (arch_cli/utils.py e arch_cli/__init__.py)
+"""
+
+import pytest
+import arch_cli
+from arch_cli import utils
+
+def test_profiles_are_read_from_the_aws_cli_files(tmp_path, monkeypatch):
+    credentials, config = tmp_path / "credentials", tmp_path / "config"
+    credentials.write_text("[default]\naws_access_key_id = x\n\n[dev]\naws_access_key_id = y\n")
+    config.write_text("[default]\nregion = us-east-1\n\n[profile dev]\nregion = sa-east-1\n\n"
+                      "[profile prod]\nsso_session = corp\n\n[sso-session corp]\nsso_region = us-east-1\n")
+    monkeypatch.setenv("AWS_SHARED_CREDENTIALS_FILE", str(credentials))
+    monkeypatch.setenv("AWS_CONFIG_FILE", str(config))
+
+    assert utils.get_aws_profiles() == ["default", "dev", "prod"]
+
+def test_missing_files_mean_no_profiles(tmp_path, monkeypatch):
+    monkeypatch.setenv("AWS_SHARED_CREDENTIALS_FILE", str(tmp_path / "nada"))
+    monkeypatch.setenv("AWS_CONFIG_FILE", str(tmp_path / "nada"))
+
+    assert utils.get_aws_profiles() == []
+
+def test_active_profile_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "CONFIG_DIR", str(tmp_path))
+    monkeypatch.setattr(utils, "ACTIVE_PROFILE_FILE", str(tmp_path / "active_profile"))
+
+    assert utils.get_active_profile() == "default"
+    utils.set_active_profile("prod")
+    assert utils.get_active_profile() == "prod"
+
+def test_package_exports_are_resolved_on_first_access():
+    assert arch_cli.detect_os is utils.detect_os
+    assert "finops_menu" in dir(arch_cli)
+    with pytest.raises(AttributeError):
+        arch_cli.nao_existe